@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la búsqueda del mejor eclipse a menos de un radio
+
+Mide:
+- la construcción del índice espacial (franjas centrales y ubicaciones curadas
+  del catálogo completo)
+- `find_best_eclipse` para varias ciudades, radios y ventanas de años
+- la misma consulta por fuerza bruta: distancia a todos los puntos de todas
+  las franjas de la ventana y `local_circumstances` en cada eclipse, sin
+  índice ni criba, para comparar tiempos y comprobar que el mejor eclipse
+  coincide (sin los registros curados)
+
+Uso: python benchmarks/bench_best_eclipse.py [--locations Madrid Dallas "Guatemala City"] [--radii 200 500 1500] [--years 10 50 200]
+"""
+
+import argparse
+import sys
+import time
+from datetime import date as date_type
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+from best_eclipse import (EclipseSpatialIndex, _distance_km, _toward, _unit_vectors, find_best_eclipse,
+                          get_spatial_index)
+from besselian import local_circumstances
+from eclipse_store import get_store
+from gazetteer import get_gazetteer
+
+AFTER_DATE = "1999-12-31"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def brute_force(index: EclipseSpatialIndex, latitude: float, longitude: float, radius_km: float, years: float):
+    """Mejor eclipse por oscurecimiento y duración evaluando todos los puntos de la ventana"""
+    start = date_type.fromisoformat(AFTER_DATE).toordinal()
+    origin = _unit_vectors(latitude, longitude)
+    best = None
+    for i in np.flatnonzero((index.ordinals > start) & (index.ordinals <= start + int(round(years * 365.25)))):
+        points = np.flatnonzero((index.eclipse == i) & ~index.curated)
+        distance = _distance_km(index.vectors[points], origin)
+        inside = distance - index.half_width[points] <= radius_km
+        lat, lon = _toward(index.vectors[points[inside]], origin, distance[inside], radius_km)
+        lat, lon = np.concatenate([[latitude], lat]), np.concatenate([[longitude], lon])
+        c = local_circumstances(index.elements[i], lat, lon)
+        duration = np.nan_to_num(c["t_c3"] - c["t_c2"]) * 3600.0
+        for k in np.flatnonzero(c["visible"]).tolist():
+            key = (round(float(c["obscuration"][k]), 3), float(duration[k]))
+            if best is None or key > best[0]:
+                best = (key, index.dates[i])
+    return best[1] if best else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", nargs="+", default=["Madrid", "Dallas", "Guatemala City"])
+    parser.add_argument("--radii", nargs="+", type=float, default=[200, 500, 1500])
+    parser.add_argument("--years", nargs="+", type=float, default=[10, 50, 200])
+    args = parser.parse_args()
+
+    store, gazetteer = get_store(), get_gazetteer()
+    index, elapsed = timed(lambda: get_spatial_index(store, gazetteer))
+    print(f"Índice: {len(index)} puntos de {len(index.dates)} eclipses solares en {elapsed:.0f} ms\n")
+    print(f"{'Ubicación':<16} {'Radio km':>9} {'Años':>5} {'Índice ms':>10} {'Fuerza bruta ms':>16} "
+          f"{'Eclipses':>9} {'Mejor':>11} {'Coincide':>9}")
+    for location in args.locations:
+        place = gazetteer.resolve(location).place
+        for radius in args.radii:
+            for years in args.years:
+                result, indexed = timed(lambda: find_best_eclipse(store, gazetteer, location, radius, years,
+                                                                  AFTER_DATE))
+                expected, brute = timed(lambda: brute_force(index, place.latitude, place.longitude, radius, years))
+                best = result["results"][0]["date"] if result["results"] else None
+                print(f"{location:<16} {radius:>9.0f} {years:>5.0f} {indexed:>10.1f} {brute:>16.1f} "
+                      f"{result['candidates']:>9} {best or '-':>11} {'sí' if best == expected else 'no':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de asignación de memoria por turno del ConversationManager
+
+Simula turnos como los de MCPChatbot.run (mensaje del usuario, tool_use,
+tool_result y respuesta final, con get_messages() antes de cada llamada al LLM)
+y compara la implementación actual contra la anterior basada en listas.
+
+Uso: python benchmarks/bench_conversation_alloc.py [--turns 500] [--max-messages 50]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+from conversation_manager import ConversationManager
+
+
+class LegacyConversationManager:
+    """Implementación anterior: recorte por slicing y vista API reconstruida en cada llamada"""
+
+    def __init__(self, max_messages: int = 50):
+        self.messages = []
+        self.max_messages = max_messages
+
+    def add_message(self, role, content):
+        self.messages.append({"role": role, "content": content, "timestamp": datetime.now().isoformat()})
+        if len(self.messages) > self.max_messages:
+            self.messages = self.messages[:2] + self.messages[-(self.max_messages - 2):]
+
+    def get_messages(self):
+        return [{"role": m["role"], "content": m["content"]} for m in self.messages]
+
+
+def run_turn(manager, i: int) -> None:
+    manager.add_message("user", f"¿Cuándo es el próximo eclipse visible desde Madrid? ({i})")
+    manager.get_messages()
+    manager.add_message("assistant", [{"type": "tool_use", "id": f"toolu_{i}", "name": "predict_next_eclipse",
+                                       "input": {"location": "Madrid"}}])
+    manager.add_message("user", [{"type": "tool_result", "tool_use_id": f"toolu_{i}",
+                                  "content": '{"next_eclipse": {"date": "2026-08-12"}}'}])
+    manager.get_messages()
+    manager.add_message("assistant", [{"type": "text", "text": "El próximo eclipse es el 12 de agosto de 2026."}])
+
+
+LLM_CALLS_PER_TURN = 2  # Llamada inicial + una vuelta del bucle de herramientas
+
+
+def measure(factory, turns: int):
+    manager = factory()
+    for i in range(50):  # Llenar la ventana antes de medir
+        run_turn(manager, i)
+
+    # Memoria asignada por las vistas API de un turno mientras la petición al LLM
+    # las mantiene vivas (las vistas descartadas se reciclan en las free lists
+    # de CPython y tracemalloc no las vería)
+    tracemalloc.start()
+    allocated = 0
+    for i in range(turns):
+        before, _ = tracemalloc.get_traced_memory()
+        views = [manager.get_messages() for _ in range(LLM_CALLS_PER_TURN)]
+        after, _ = tracemalloc.get_traced_memory()
+        allocated += after - before
+        del views
+        run_turn(manager, i)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(turns):
+        run_turn(manager, i)
+    elapsed = time.perf_counter() - start
+    return allocated / turns, elapsed / turns * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--max-messages", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'implementación':18s} {'bytes asignados/turno':>22s} {'µs/turno':>10s}")
+    for name, factory in (("anterior (listas)", lambda: LegacyConversationManager(args.max_messages)),
+                          ("actual (deque)", lambda: ConversationManager(args.max_messages))):
+        alloc, us = measure(factory, args.turns)
+        print(f"{name:18s} {alloc:22.0f} {us:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ventanas inválidas enviadas a la API
+
+Reproduce turnos con un número variable de vueltas del bucle de herramientas
+y cuenta cuántas veces la ventana que se enviaría a Claude tiene un tool_use
+o un tool_result sin su pareja (la API la rechaza y MCPChatbot.run reiniciaba
+la conversación). Compara el recorte anterior por slicing con el actual, que
+descarta cada intercambio de herramientas como una unidad.
+
+Uso: python benchmarks/bench_conversation_pairs.py [--turns 2000] [--max-messages 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+from conversation_manager import ConversationManager, repair_messages
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from bench_conversation_alloc import LegacyConversationManager
+
+
+def run_turn(manager, i: int, tool_rounds: int) -> int:
+    """Un turno del agente; devuelve cuántas ventanas enviadas eran inválidas"""
+    invalid = 0
+    manager.add_message("user", f"Pregunta {i}: ¿qué eclipses hay este año?")
+    invalid += bool(repair_messages(list(manager.get_messages()))[1])
+    for r in range(tool_rounds):
+        tool_id = f"toolu_{i}_{r}"
+        manager.add_message("assistant", [{"type": "tool_use", "id": tool_id, "name": "predict_next_eclipse",
+                                           "input": {"location": "Madrid"}}])
+        manager.add_message("user", [{"type": "tool_result", "tool_use_id": tool_id,
+                                      "content": '{"next_eclipse": {"date": "2026-08-12"}}'}])
+        invalid += bool(repair_messages(list(manager.get_messages()))[1])
+    manager.add_message("assistant", [{"type": "text", "text": f"Respuesta {i}"}])
+    return invalid
+
+
+def measure(factory, turns: int, seed: int = 7):
+    rng = random.Random(seed)
+    manager = factory()
+    requests = invalid = 0
+    start = time.perf_counter()
+    for i in range(turns):
+        tool_rounds = rng.choice([0, 1, 1, 2, 3])
+        requests += 1 + tool_rounds
+        invalid += run_turn(manager, i, tool_rounds)
+    elapsed = time.perf_counter() - start
+    return requests, invalid, elapsed / turns * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--max-messages", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'Implementación':<16} {'Peticiones':>11} {'Inválidas':>10} {'µs/turno':>10}")
+    for name, factory in [
+        ("Anterior", lambda: LegacyConversationManager(args.max_messages)),
+        ("Actual", lambda: ConversationManager(args.max_messages)),
+    ]:
+        requests, invalid, per_turn = measure(factory, args.turns)
+        print(f"{name:<16} {requests:>11} {invalid:>10} {per_turn:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
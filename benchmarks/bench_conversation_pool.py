@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pool de conversaciones con presupuesto de memoria
+
+Simula muchos usuarios con acceso sesgado (unos pocos muy activos, muchos
+esporádicos) y compara la memoria de tener todas las conversaciones
+residentes contra el ConversationPool con presupuesto, junto con la latencia
+de rehidratación de las conversaciones volcadas a disco.
+
+Uso: python benchmarks/bench_conversation_pool.py [--users 2000] [--messages 40000] [--budget-mb 8]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+from conversation_manager import ConversationManager
+from conversation_pool import ConversationPool
+
+TOOL_RESULT = '{"next_eclipse": {"date": "2026-08-12", "type": "Total", "location": "Madrid"}}' * 4
+
+
+def workload(users: int, messages: int, seed: int = 11):
+    """Secuencia de (usuario, rol, contenido) con popularidad tipo Zipf"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(users)]
+    for i, user in enumerate(rng.choices(range(users), weights=weights, k=messages // 2)):
+        yield f"user{user}", "user", f"Mensaje {i}: ¿cuándo es el próximo eclipse? " + "contexto " * 20
+        yield f"user{user}", "assistant", [{"type": "text", "text": f"Respuesta {i}. " + TOOL_RESULT}]
+
+
+def run_unbounded(args):
+    conversations = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    for user, role, content in workload(args.users, args.messages):
+        conversation = conversations.get(user)
+        if conversation is None:
+            conversation = conversations[user] = ConversationManager()
+        conversation.add_message(role, content)
+        conversation.get_messages()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, elapsed, {"resident": len(conversations)}
+
+
+def run_pool(args, spill_dir):
+    pool = ConversationPool(spill_dir=spill_dir, memory_budget=args.budget_mb * 1024 * 1024)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for user, role, content in workload(args.users, args.messages):
+        pool.add_message(user, role, content).get_messages()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, elapsed, pool.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40000)
+    parser.add_argument("--budget-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for name, run in [("Todas residentes", run_unbounded),
+                          (f"Pool ({args.budget_mb} MB)", lambda a: run_pool(a, spill_dir))]:
+            current, peak, elapsed, stats = run(args)
+            print(f"{name:<18} memoria {current / 2**20:7.1f} MB (pico {peak / 2**20:7.1f} MB) "
+                  f"{elapsed / args.messages * 1e6:7.1f} µs/mensaje")
+            print(f"  {stats}")
+
+
+if __name__ == "__main__":
+    main()
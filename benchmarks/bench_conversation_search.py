@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark de búsqueda en conversaciones largas
+
+Compara el índice invertido de ConversationManager contra el recorrido lineal
+anterior (minúsculas + `in` sobre cada mensaje) con 10k+ mensajes en la ventana.
+
+Uso: python benchmarks/bench_conversation_search.py [--messages 10000] [--queries 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+from conversation_manager import ConversationManager
+
+WORDS = ("eclipse solar lunar total anular madrid guatemala sydney calendario carrera monaco "
+         "estrategia neumáticos rutina ejercicios repositorio commit archivo readme visibilidad "
+         "cobertura magnitud duración fecha próximo temporada piloto vuelta parada").split()
+
+
+def build(messages: int, rng: random.Random) -> ConversationManager:
+    conversation = ConversationManager(max_messages=messages + 2)
+    for i in range(messages):
+        words = rng.choices(WORDS, k=rng.randint(8, 40)) + [f"id{i}"]
+        if i % 3 == 2:
+            conversation.add_message("user", [{"type": "tool_result", "tool_use_id": f"t{i}",
+                                               "content": " ".join(words)}])
+        else:
+            conversation.add_message("user" if i % 3 == 0 else "assistant", " ".join(words))
+    return conversation
+
+
+def linear_search(conversation: ConversationManager, keyword: str):
+    keyword = keyword.lower()
+    return [m for m in conversation._iter_messages() if keyword in m.text.lower()]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    start = time.perf_counter()
+    conversation = build(args.messages, rng)
+    build_s = time.perf_counter() - start
+    single = [rng.choice(WORDS) for _ in range(args.queries)]
+    rare = [f"id{rng.randrange(args.messages)}" for _ in range(args.queries)]
+    multi = [" ".join(rng.sample(WORDS, 3)) for _ in range(args.queries)]
+    prefixes = [rng.choice(WORDS)[:4] for _ in range(args.queries)]
+
+    print(f"{args.messages} mensajes indexados en {build_s:.2f}s "
+          f"({build_s / args.messages * 1e6:.0f} µs/mensaje)\n")
+    print(f"{'consulta':34s} {'lineal (ms)':>12s} {'índice (ms)':>12s}")
+    rows = (
+        ("search_context, término frecuente", lambda q: linear_search(conversation, q), conversation.search_context, single),
+        ("search_context, término raro", lambda q: linear_search(conversation, q), conversation.search_context, rare),
+        ("has_context_about", lambda q: any(True for _ in linear_search(conversation, q)),
+         conversation.has_context_about, single),
+    )
+    for name, linear, indexed, queries in rows:
+        print(f"{name:34s} {timed(linear, queries):12.3f} {timed(indexed, queries):12.3f}")
+    print(f"{'search (3 términos, top 10)':34s} {'-':>12s} "
+          f"{timed(lambda q: conversation.search(q, limit=10), multi):12.3f}")
+    print(f"{'search (prefijo, top 10)':34s} {'-':>12s} "
+          f"{timed(lambda q: conversation.search(q, limit=10), prefixes):12.3f}")
+
+
+if __name__ == "__main__":
+    main()
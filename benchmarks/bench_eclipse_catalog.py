@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark del catálogo generado de eclipses
+
+Mide:
+- la generación (años y eclipses por segundo) con 1 proceso y con N procesos
+- el tamaño del archivo columnar frente al mismo catálogo en JSON
+- la carga: sólo los arrays, los registros (`load_catalog`) y el almacén
+  completo (`get_store`) frente al catálogo curado solo
+
+Uso: python benchmarks/bench_eclipse_catalog.py [--start 1900] [--end 2100] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+import numpy as np
+
+from eclipse_catalog import generate_catalog, load_catalog, save_catalog
+from eclipse_store import DEFAULT_DATA_FILE, get_store
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--start", type=int, default=1900)
+    parser.add_argument("--end", type=int, default=2100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    years = args.end - args.start + 1
+
+    print(f"Generación {args.start}–{args.end} ({years} años), {os.cpu_count()} CPU")
+    print(f"{'Procesos':>8} {'s':>8} {'años/s':>8} {'eclipses/s':>11}")
+    columns = None
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        result = generate_catalog(args.start, args.end, workers)
+        elapsed = time.perf_counter() - start
+        if columns is not None:
+            assert np.array_equal(result["date"], columns["date"])
+        columns = result
+        print(f"{workers:>8} {elapsed:>8.2f} {years / elapsed:>8.1f} {len(columns['date']) / elapsed:>11.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "catalog.npz")
+        save_catalog(columns, path)
+        records = load_catalog(path, preload=False)
+        json_size = len(json.dumps({"eclipses": records}))
+        print(f"\n{len(records)} eclipses: .npz {os.path.getsize(path) / 1024:.0f} KiB, "
+              f"mismos registros en JSON {json_size / 1024:.0f} KiB")
+
+        def arrays():
+            with np.load(path) as data:
+                return {name: data[name] for name in data.files}
+
+        def store(catalog_path):
+            get_store.cache_clear()
+            return get_store(DEFAULT_DATA_FILE, catalog_path)
+
+        print(f"{'Carga':<38} {'ms':>8}")
+        for label, fn, fn_args in [
+            ("arrays (np.load)", arrays, ()),
+            ("registros (load_catalog)", load_catalog, (path,)),
+            ("almacén curado + generado (get_store)", store, (path,)),
+            ("almacén sólo curado", store, ("",)),
+        ]:
+            elapsed, _ = best_of(5, fn, *fn_args)
+            print(f"{label:<38} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
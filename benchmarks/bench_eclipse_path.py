@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la franja de totalidad/anularidad calculada
+
+Para cada eclipse mide:
+- el muestreo adaptativo con varias resoluciones (puntos y tiempo en frío)
+- por tolerancia de simplificación: puntos devueltos, tiempo de la respuesta
+  con el muestreo ya en caché y bytes del JSON como lista de puntos y como
+  polilínea codificada
+
+Uso: python benchmarks/bench_eclipse_path.py [--dates 2024-04-08 2026-08-12] [--resolution 1.0]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+import eclipse_path as ep
+from besselian import besselian_elements
+
+RESOLUTIONS = (10.0, 1.0, 0.1)
+TOLERANCES = (0.0, 0.5, 1.0, 5.0, 20.0)
+
+
+def payload(result) -> int:
+    return len(json.dumps(result, separators=(",", ":")).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dates", nargs="+", default=["2024-04-08", "2026-08-12", "2023-04-20", "2026-02-17"])
+    parser.add_argument("--resolution", type=float, default=1.0)
+    args = parser.parse_args()
+
+    for date in args.dates:
+        elements = besselian_elements(date)
+        print(f"\nEclipse {date}")
+        print(f"{'Resolución (km)':<18} {'Puntos':>8} {'ms':>8}")
+        for resolution in RESOLUTIONS:
+            start = time.perf_counter()
+            points = ep.sample_path(elements, resolution)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{resolution:<18} {len(points['t']):>8} {elapsed:>8.1f}")
+
+        ep._sampled.cache_clear()
+        ep.eclipse_path(date, args.resolution)  # Muestreo en caché para el resto
+        print(f"{'Tolerancia (km)':<18} {'Puntos':>8} {'ms':>8} {'JSON puntos':>12} {'Polilínea':>10}")
+        for tolerance in TOLERANCES:
+            start = time.perf_counter()
+            result = ep.eclipse_path(date, args.resolution, tolerance)
+            elapsed = (time.perf_counter() - start) * 1000
+            encoded = ep.eclipse_path(date, args.resolution, tolerance, encoding="polyline")
+            returned = sum(result["returned_points"].values())
+            print(f"{tolerance:<18} {returned:>8} {elapsed:>8.1f} {payload(result):>12} {payload(encoded):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark de consultas al catálogo de eclipses
+
+Genera un catálogo sintético de 10k+ eclipses y compara las consultas
+anteriores (recorrer el dict completo, filtrar por cadena y ordenar) con las
+del EclipseStore (índices ordenados y búsqueda binaria):
+- próximo eclipse visible desde una ubicación después de una fecha
+- eclipses de un año
+- eclipses entre dos fechas
+
+Uso: python benchmarks/bench_eclipse_queries.py [--eclipses 20000] [--locations 300] [--queries 2000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+from eclipse_store import EclipseStore
+
+TYPES = ["solar_total", "solar_annular", "solar_partial", "lunar_total", "lunar_partial", "lunar_penumbral"]
+
+
+def synthetic_catalog(n: int, n_locations: int, seed: int = 5):
+    rng = random.Random(seed)
+    locations = [f"City {i}" for i in range(n_locations)]
+    day = date(1000, 1, 1)
+    catalog = {}
+    for _ in range(n):
+        day += timedelta(days=rng.randint(20, 50))
+        key = day.isoformat()
+        catalog[key] = {
+            "date": key,
+            "type": rng.choice(TYPES),
+            "locations": {loc: {"visible": rng.random() < 0.7, "coverage": f"{rng.randint(1, 100)}%"}
+                          for loc in rng.sample(locations, 20)},
+        }
+    return catalog, locations
+
+
+def legacy_next(catalog, location, after_date, limit=5):
+    future = []
+    for d, eclipse in catalog.items():
+        if d > after_date:
+            data = eclipse["locations"].get(location)
+            if data and data.get("visible"):
+                future.append(d)
+    future.sort()
+    return future[:limit]
+
+
+def legacy_year(catalog, year):
+    return [d for d in catalog if d.startswith(str(year))]
+
+
+def legacy_between(catalog, start, end):
+    return sorted(d for d in catalog if start <= d <= end)
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(*q) for q in queries]
+    return (time.perf_counter() - start) / len(queries) * 1e6, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--eclipses", type=int, default=20000)
+    parser.add_argument("--locations", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    catalog, locations = synthetic_catalog(args.eclipses, args.locations)
+    start = time.perf_counter()
+    store = EclipseStore(catalog.values())
+    print(f"Catálogo: {len(store)} eclipses, {len(locations)} ubicaciones "
+          f"(indexado en {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    rng = random.Random(9)
+    first, last = int(store.dates[0][:4]), int(store.dates[-1][:4])
+    next_queries = [(rng.choice(locations), f"{rng.randint(first, last):04d}-06-01") for _ in range(args.queries)]
+    year_queries = [(rng.randint(first, last),) for _ in range(args.queries)]
+    range_queries = [(f"{y:04d}-01-01", f"{y + 5:04d}-12-31") for y in (rng.randint(first, last) for _ in range(args.queries))]
+
+    cases = [
+        ("próximos 5 por ubicación", next_queries,
+         lambda loc, after: legacy_next(catalog, loc, after),
+         lambda loc, after: store.next_after(after, location=loc, limit=5)[0]),
+        ("eclipses de un año", year_queries,
+         lambda year: legacy_year(catalog, year),
+         lambda year: store.dates_for_year(year)),
+        ("entre dos fechas (6 años)", range_queries,
+         lambda a, b: legacy_between(catalog, a, b),
+         lambda a, b: store.between(a, b)),
+    ]
+    print(f"{'Consulta':<28} {'Anterior µs':>12} {'Índice µs':>10} {'Aceleración':>12}")
+    for name, queries, legacy, indexed in cases:
+        legacy_us, expected = timed(legacy, queries)
+        indexed_us, got = timed(indexed, queries)
+        assert got == expected, name
+        print(f"{name:<28} {legacy_us:>12.1f} {indexed_us:>10.2f} {legacy_us / indexed_us:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
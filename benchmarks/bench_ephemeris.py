@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la tabla de efemérides Sol/Luna frente a ephem y astropy
+
+Sobre instantes aleatorios de un rango de años mide:
+- el relleno en frío de los bloques de la tabla (filas/s con ephem)
+- la interpolación vectorizada en caliente frente a llamar a ephem instante a
+  instante (y a astropy, vectorizado, si está instalado)
+- el error de la interpolación respecto a ephem, y de ambos respecto a astropy
+- la búsqueda de lunas nuevas con la tabla frente a `ephem.next_new_moon`
+
+La tabla se crea en un directorio temporal nuevo.
+
+Uso: python benchmarks/bench_ephemeris.py [--timestamps 2000] [--start-year 2000] [--years 10] [--no-astropy]
+"""
+
+import argparse
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+os.environ["ECLIPSE_EPHEMERIS_CACHE"] = tempfile.mkdtemp(prefix="bench-ephemeris-")
+atexit.register(shutil.rmtree, os.environ["ECLIPSE_EPHEMERIS_CACHE"], True)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+import ephem
+import numpy as np
+
+from ephemeris import NEW_MOON, direct_positions, get_table, moon_phases
+
+EPHEM_DATE_TO_JD = 2415020.0  # ephem.Date 0 = 1899-12-31 12:00 UT
+
+
+def angle_arcsec(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.degrees(np.arccos(np.clip((a * b).sum(axis=1), -1, 1))) * 3600
+
+
+def best_of(repeat, fn, *args):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def astropy_positions(times: np.ndarray):
+    """Vectores Sol/Luna aparentes de la fecha (TETE) con astropy, o None si no está instalado"""
+    try:
+        import astropy.units as u
+        from astropy.coordinates import TETE, get_body
+        from astropy.time import Time
+        from astropy.utils import iers
+    except ImportError:
+        return None
+    iers.conf.auto_download = False
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        t = Time(times + EPHEM_DATE_TO_JD, format="jd", scale="utc")
+        out = {}
+        for name in ("sun", "moon"):
+            c = get_body(name, t).transform_to(TETE(obstime=t))
+            ra, dec, distance = c.ra.rad, c.dec.rad, c.distance.to(u.au).value
+            out[name] = distance[:, None] * np.stack(
+                [np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=1)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--timestamps", type=int, default=2000)
+    parser.add_argument("--start-year", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--no-astropy", action="store_true")
+    args = parser.parse_args()
+
+    start = ephem.Date(f"{args.start_year}/1/1")
+    end = ephem.Date(f"{args.start_year + args.years}/1/1")
+    times = start + np.random.default_rng(5).random(args.timestamps) * (end - start)
+    table = get_table()
+
+    cold_s, _ = best_of(1, table.positions, times)
+    filled = int(np.asarray(table.filled).sum())
+    print(f"{args.timestamps} instantes en {args.start_year}–{args.start_year + args.years - 1}")
+    print(f"Relleno en frío: {filled} bloques en {cold_s:.2f} s "
+          f"({filled * 128 / cold_s:.0f} filas/s con ephem)\n")
+
+    warm_s, table_pos = best_of(5, table.positions, times)
+    single_s, _ = best_of(200, table.positions, times[:1])
+    direct_s, direct_pos = best_of(1, direct_positions, times)
+    print(f"{'Método':<28} {'ms':>10} {'µs/instante':>12}")
+    print(f"{'tabla (caliente)':<28} {warm_s * 1000:>10.2f} {warm_s * 1e6 / times.size:>12.2f}")
+    print(f"{'tabla, un instante':<28} {single_s * 1000:>10.3f} {single_s * 1e6:>12.2f}")
+    print(f"{'ephem instante a instante':<28} {direct_s * 1000:>10.1f} {direct_s * 1e6 / times.size:>12.2f}")
+    reference = None if args.no_astropy else astropy_positions(times[:1])  # Importar y cachear fuera de la medida
+    if reference is not None:
+        astropy_s, reference = best_of(1, astropy_positions, times)
+        print(f"{'astropy (vectorizado)':<28} {astropy_s * 1000:>10.1f} {astropy_s * 1e6 / times.size:>12.2f}")
+
+    print(f"\n{'Error':<28} {'máx.':>10} {'p99':>10}")
+    for body in ("sun", "moon"):
+        error = angle_arcsec(table_pos[body], direct_pos[body])
+        print(f"{body + ' tabla vs ephem (″)':<28} {error.max():>10.4f} {np.percentile(error, 99):>10.4f}")
+    sidereal = np.abs(np.angle(np.exp(1j * (table_pos["sidereal"] - direct_pos["sidereal"])))) * 206264.8
+    print(f"{'tiempo sidéreo (″)':<28} {sidereal.max():>10.4f} {np.percentile(sidereal, 99):>10.4f}")
+    if reference is not None:
+        for body in ("sun", "moon"):
+            for label, pos in (("tabla", table_pos), ("ephem", direct_pos)):
+                error = angle_arcsec(pos[body], reference[body])
+                print(f"{f'{body} {label} vs astropy (″)':<28} {error.max():>10.3f} {np.percentile(error, 99):>10.3f}")
+
+    table.positions(np.arange(start, end, 30.0))  # Tabla completa del rango antes de medir las fases
+    phases_s, found = best_of(3, moon_phases, start, end, NEW_MOON)
+
+    def ephem_phases():
+        out, when = [], ephem.next_new_moon(start)
+        while when < end:
+            out.append(float(when))
+            when = ephem.next_new_moon(ephem.Date(when + 1))
+        return np.array(out)
+
+    ephem_s, expected = best_of(1, ephem_phases)
+    assert found.size == expected.size
+    print(f"\nLunas nuevas ({found.size}): tabla {phases_s * 1000:.1f} ms, ephem {ephem_s * 1000:.1f} ms, "
+          f"diferencia máx. {np.abs(found - expected).max() * 86400:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
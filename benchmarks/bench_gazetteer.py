@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark de búsqueda de ubicaciones en el gazetteer
+
+Mide el tiempo de carga del índice y la latencia (p50/p95) de las búsquedas
+por nombre exacto, por nombre alternativo o prefijo y con errores de
+escritura generados a partir de los propios nombres del gazetteer.
+
+Uso: python benchmarks/bench_gazetteer.py [--queries 5000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+from gazetteer import Gazetteer, DEFAULT_GAZETTEER_FILE
+
+
+def typo(name: str, rng: random.Random) -> str:
+    """Transponer, borrar o duplicar una letra"""
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 2)
+    kind = rng.choice(["swap", "drop", "double"])
+    if kind == "swap":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if kind == "drop":
+        return name[:i] + name[i + 1:]
+    return name[:i] + name[i] + name[i:]
+
+
+def measure(gazetteer: Gazetteer, queries):
+    latencies, hits = [], 0
+    for query, expected in queries:
+        start = time.perf_counter()
+        match = gazetteer.resolve(query)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        hits += bool(match and match.place.name == expected)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)], hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    gazetteer = Gazetteer.from_file(DEFAULT_GAZETTEER_FILE)
+    print(f"Gazetteer: {len(gazetteer)} lugares (cargado en {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    rng = random.Random(3)
+    places = [p for p in gazetteer.places if len(p.name) >= 5]
+    with_alternates = [p for p in places if p.alternate_names]
+    cases = [
+        ("nombre exacto", [(p.name, p.name) for p in rng.choices(places, k=args.queries)]),
+        ("alternativo", [(rng.choice(p.alternate_names).lower(), p.name) for p in rng.choices(with_alternates, k=args.queries)]),
+        ("prefijo", [(p.name[:max(4, len(p.name) - 3)], p.name) for p in rng.choices(places, k=args.queries)]),
+        ("error de escritura", [(typo(p.name, rng), p.name) for p in rng.choices(places, k=args.queries)]),
+    ]
+    print(f"{'Consulta':<20} {'p50 µs':>8} {'p95 µs':>8} {'Aciertos':>9}")
+    for name, queries in cases:
+        p50, p95, hit_rate = measure(gazetteer, queries)
+        print(f"{name:<20} {p50:>8.1f} {p95:>8.1f} {hit_rate:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
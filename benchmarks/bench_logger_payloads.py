@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark del tamaño del log MCP por cada 1,000 llamadas
+
+Compara el log sin límite de payload (comportamiento anterior: `str(response)`
+en línea) contra el log con payloads recortados y cuerpos completos en el
+almacén de blobs direccionado por contenido.
+
+Uso: python benchmarks/bench_logger_payloads.py [--calls 1000] [--max-payload 512]
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+from logger import MCPLogger
+
+
+def sample_payloads():
+    """Respuestas representativas: calendario F1, git status y eclipses"""
+    races = [{"round": i, "name": f"Grand Prix {i}", "circuit": f"Circuit {i}",
+              "date": f"2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}", "laps": 50 + i} for i in range(24)]
+    f1_calendar = json.dumps({"season": 2024, "races": races}, indent=2)
+    git_status = json.dumps({"current_branch": "main", "staged_changes": {},
+                             "unstaged_changes": {"Modified": [f"src/file_{i}.py" for i in range(40)]}}, indent=2)
+    eclipse = json.dumps({"year": 2026, "eclipses": [{"date": "2026-02-17", "type": "solar_annular",
+                                                      "visible_in": ["Guatemala City"]}] * 6}, indent=2)
+    small = json.dumps({"status": "success", "message": "ok"})
+    return [("f1", "get_calendar", f1_calendar), ("git", "git_status", git_status),
+            ("eclipse", "list_eclipses_by_year", eclipse), ("filesystem", "write_file", small)]
+
+
+def run(calls: int, max_payload, workdir: Path):
+    log_file = workdir / "mcp_log.json"
+    with redirect_stdout(io.StringIO()):
+        logger = MCPLogger(str(log_file), max_payload=max_payload)
+        rng = random.Random(42)
+        payloads = sample_payloads()
+        start = time.perf_counter()
+        for _ in range(calls):
+            server, method, response = rng.choice(payloads)
+            logger.log_mcp_request(server, method, {"season": 2024})
+            logger.log_mcp_response(server, method, response)
+        elapsed = time.perf_counter() - start
+    blob_files = [p for p in (workdir / "blobs").rglob("*.z")]
+    return {
+        "log_bytes": log_file.stat().st_size,
+        "blob_bytes": sum(p.stat().st_size for p in blob_files),
+        "blobs": len(blob_files),
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--max-payload", type=int, default=512)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as before_dir, tempfile.TemporaryDirectory() as after_dir:
+        before = run(args.calls, None, Path(before_dir))
+        after = run(args.calls, args.max_payload, Path(after_dir))
+
+    print(f"Log MCP por {args.calls} llamadas (petición + respuesta):")
+    print(f"  {'':24s} {'log (KB)':>10s} {'blobs (KB)':>11s} {'blobs':>6s} {'tiempo (s)':>11s}")
+    for name, r in (("sin límite (antes)", before), (f"límite {args.max_payload} (después)", after)):
+        print(f"  {name:24s} {r['log_bytes'] / 1024:10.1f} {r['blob_bytes'] / 1024:11.1f} "
+              f"{r['blobs']:6d} {r['seconds']:11.2f}")
+    total_after = after["log_bytes"] + after["blob_bytes"]
+    print(f"\nReducción del tamaño total en disco: {1 - total_after / before['log_bytes']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark del cálculo de eclipses lunares por ubicación
+
+Para cada eclipse mide:
+- los contactos globales (P1, U1–U4, P4)
+- `lunar_local_circumstances` vectorizado para N observadores al azar
+  frente a un bucle de `lunar_circumstances` (un observador por llamada)
+- `visibility_batch` con N coordenadas (incluye resolver las ubicaciones)
+
+Uso: python benchmarks/bench_lunar.py [--dates 2025-03-14 2025-09-07] [--observers 100 1000 10000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+from eclipse_batch import visibility_batch
+from eclipse_store import get_store
+from gazetteer import get_gazetteer
+from lunar import contact_times, lunar_circumstances, lunar_eclipse, lunar_local_circumstances
+
+LOOP_LIMIT = 1000  # El bucle por observador se mide como mucho con estos observadores
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dates", nargs="+", default=["2025-03-14", "2025-09-07", "2024-03-25"])
+    parser.add_argument("--observers", nargs="+", type=int, default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    store, gazetteer = get_store(), get_gazetteer()
+    rng = np.random.default_rng(0)
+    for date in args.dates:
+        eclipse = lunar_eclipse(date)
+        _, elapsed = timed(lambda: contact_times(eclipse.greatest))
+        print(f"\nEclipse {date} ({eclipse.type}): contactos en {elapsed:.1f} ms")
+        print(f"{'Observadores':<14} {'Vectorizado ms':>15} {'Bucle ms':>10} {'Lote ms':>10} {'Visibles':>9}")
+        for n in args.observers:
+            lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))  # Uniformes sobre la esfera
+            lon = rng.uniform(-180, 180, n)
+            c, vectorized = timed(lambda: lunar_local_circumstances(eclipse, lat, lon))
+            loop = "-"
+            if n <= LOOP_LIMIT:
+                _, elapsed = timed(lambda: [lunar_circumstances(date, a, o) for a, o in zip(lat.tolist(), lon.tolist())])
+                loop = f"{elapsed:.1f}"
+            locations = [{"latitude": a, "longitude": o} for a, o in zip(lat.tolist(), lon.tolist())]
+            _, batch = timed(lambda: visibility_batch([date], locations, store, gazetteer))
+            print(f"{n:<14} {vectorized:>15.1f} {loop:>10} {batch:>10.1f} {int(c['visible'].sum()):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark del costo de las métricas /metrics del servidor remoto
+
+Mide el costo por operación de contadores, gauges e histogramas, el costo de la
+instrumentación completa de una petición /mcp y lo compara con la latencia de
+extremo a extremo de una petición en proceso (ASGI, sin red).
+
+Uso: python benchmarks/bench_remote_metrics.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+os.environ.setdefault("MCP_TRACING", "0")
+
+from metrics import Registry, DEFAULT_SIZE_BUCKETS
+
+
+def per_op_ns(fn, iterations: int = 200_000) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def bench_primitives():
+    registry = Registry()
+    counter = registry.counter("c_total", "c", ["command"])
+    gauge = registry.gauge("g", "g", ["command"])
+    histogram = registry.histogram("h_seconds", "h", ["command"])
+    sizes = registry.histogram("s_bytes", "s", ["command"], buckets=DEFAULT_SIZE_BUCKETS)
+
+    def instrument_request():
+        # Misma secuencia que handle_mcp_request + ResponseSizeMiddleware
+        sizes.labels("list_eclipses_by_year").observe(58)
+        in_flight = gauge.labels("list_eclipses_by_year")
+        in_flight.inc()
+        started = time.perf_counter()
+        in_flight.dec()
+        counter.labels("list_eclipses_by_year").inc()
+        histogram.labels("list_eclipses_by_year").observe(time.perf_counter() - started)
+        sizes.labels("list_eclipses_by_year").observe(517)
+
+    results = {
+        "counter.labels().inc()": per_op_ns(lambda: counter.labels("status").inc()),
+        "gauge.labels().inc()": per_op_ns(lambda: gauge.labels("status").inc()),
+        "histogram.labels().observe()": per_op_ns(lambda: histogram.labels("status").observe(0.003)),
+        "instrumentación por petición": per_op_ns(instrument_request, 100_000),
+    }
+    for _ in range(50):
+        for command in ("status", "list_eclipses_by_year", "predict_next_eclipse"):
+            histogram.labels(command).observe(0.01)
+    start = time.perf_counter_ns()
+    text = registry.render()
+    results["render /metrics"] = time.perf_counter_ns() - start
+    return results, len(text)
+
+
+async def bench_end_to_end(requests: int) -> float:
+    import httpx
+    from remote_mcp_server import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payload = {"command": "list_eclipses_by_year", "params": {"year": 2026}}
+        for _ in range(50):
+            await client.post("/mcp", json=payload)
+        start = time.perf_counter_ns()
+        for _ in range(requests):
+            await client.post("/mcp", json=payload)
+        return (time.perf_counter_ns() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    results, render_size = bench_primitives()
+    print("Costo de métricas (ns/op):")
+    for name, ns in results.items():
+        print(f"  {name:32s} {ns:10.0f}")
+    print(f"  (tamaño de /metrics: {render_size} bytes)")
+
+    request_ns = asyncio.run(bench_end_to_end(args.requests))
+    overhead = results["instrumentación por petición"]
+    print(f"\nPetición /mcp en proceso: {request_ns / 1000:.1f} µs")
+    print(f"Sobrecosto de instrumentación: {overhead / 1000:.2f} µs ({overhead / request_ns:.2%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las respuestas memoizadas de las consultas estáticas
+
+Sobre el handler `tools/call` del servidor de cálculo (en proceso, sin stdio)
+y para cada grupo de consultas estáticas mide:
+- la ruta anterior: `jsonschema.validate` de los argumentos (lo que hacía el
+  SDK en cada llamada), el método del servidor y `json.dumps(indent=2)`, con
+  las cachés de cálculo ya calientes (una pasada previa sin medir)
+- la primera llamada al handler (calcula y guarda la respuesta compacta)
+- las llamadas repetidas al handler (búsqueda en la caché)
+- los bytes de la respuesta con sangría frente a la compacta
+
+Los grupos son el espacio de claves finito del catálogo curado (cada fecha
+× ubicación), las series Saros de cada eclipse, las franjas de los eclipses
+centrales de una década y las predicciones con `after_date`.
+
+Con `--stdio N` mide además la ruta real del chatbot, `EclipseMCPClient` sobre
+stdio, con N consultas fecha × ubicación repetidas: un servidor por llamada
+(sin `keep_open`, la caché nunca acierta) frente a una sesión abierta durante
+toda la ejecución (`keep_open=True`, como `MCPChatbot`).
+
+Uso: python benchmarks/bench_response_cache.py [--repeat 5] [--stdio 3]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+import jsonschema
+from mcp import types
+
+import eclipse_calculator_mcp
+from eclipse_calculator_mcp import ECLIPSES, EclipseCalculatorServer
+from eclipse_mcp_client import EclipseMCPClient
+
+CITIES = ["Madrid", "Guatemala City", "Mexico City", "Buenos Aires", "Tokyo", "Sydney", "Cairo", "New York"]
+
+
+def query_groups():
+    """(grupo, [(herramienta, argumentos, método del servidor, args posicionales)])"""
+    curated = [(date, name) for date in ECLIPSES.dates for name in ECLIPSES.get(date).get("locations", {})]
+    central = [d for d in ECLIPSES.between("2020-01-01", "2030-12-31")
+               if ECLIPSES.get(d)["type"] in ("solar_total", "solar_annular", "solar_hybrid")]
+    return [
+        ("fecha × ubicación", [("calculate_eclipse_visibility", {"date": d, "location": n},
+                                "calculate_eclipse_visibility", (d, n)) for d, n in curated]),
+        ("serie Saros", [("list_saros_series", {"date": d}, "list_saros_series", (None, d))
+                         for d in ECLIPSES.between("2000-01-01", "2040-12-31")]),
+        ("franja (polilínea)", [("get_eclipse_path", {"date": d, "encoding": "polyline"},
+                                 "get_eclipse_path", (d, 1.0, 1.0, "polyline")) for d in central]),
+        ("predicción con after_date", [("predict_next_eclipse", {"location": c, "after_date": "2026-01-01", "limit": 3},
+                                        "predict_next_eclipse", (c, "2026-01-01", None, 3)) for c in CITIES]),
+    ]
+
+
+async def run(repeat: int):
+    server = EclipseCalculatorServer()
+    server.setup_handlers()
+    handler = server.server.request_handlers[types.CallToolRequest]
+    listed = await server.server.request_handlers[types.ListToolsRequest](types.ListToolsRequest(method="tools/list"))
+    schemas = {tool.name: tool.inputSchema for tool in listed.root.tools}
+
+    async def call(name, arguments):
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        return (await handler(request)).root.content[0].text
+
+    print(f"{'Grupo':<26} {'Consultas':>9} {'Anterior ms':>12} {'1ª llamada ms':>14} {'Repetida ms':>12} "
+          f"{'Bytes indent=2':>15} {'Bytes compactos':>16} {'Ahorro':>7}")
+    for group, queries in query_groups():
+        for _, _, method, args in queries:
+            await getattr(server, method)(*args)
+        start = time.perf_counter()
+        indented = 0
+        for name, arguments, method, args in queries:
+            jsonschema.validate(instance=arguments, schema=schemas[name])
+            indented += len(json.dumps(await getattr(server, method)(*args), indent=2, ensure_ascii=False)
+                            .encode("utf-8"))
+        previous = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        compact = 0
+        for name, arguments, _, _ in queries:
+            compact += len((await call(name, arguments)).encode("utf-8"))
+        first = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for name, arguments, _, _ in queries:
+                await call(name, arguments)
+        repeated = (time.perf_counter() - start) * 1000 / repeat
+
+        print(f"{group:<26} {len(queries):>9} {previous:>12.1f} {first:>14.1f} {repeated:>12.1f} "
+              f"{indented:>15} {compact:>16} {1 - compact / indented:>7.0%}")
+    stats = eclipse_calculator_mcp.RESPONSES.stats()
+    print(f"\nCaché: {stats['entries']} respuestas, {stats['bytes'] / 1024:.0f} KiB, "
+          f"{stats['hits']} aciertos, {stats['misses']} fallos")
+
+
+async def run_stdio(queries: int, repeat: int):
+    """Ruta real: cada consulta `repeat` veces a través del cliente stdio, con y sin sesión persistente"""
+    curated = [(date, name) for date in ECLIPSES.dates for name in ECLIPSES.get(date).get("locations", {})][:queries]
+    print(f"\n{'Cliente stdio':<26} {'Llamadas':>9} {'1ª pasada ms':>13} {'Repetida ms/llamada':>20}")
+    for label, keep_open in (("servidor por llamada", False), ("sesión persistente", True)):
+        client = EclipseMCPClient(keep_open=keep_open)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for date, name in curated:
+                async with client:
+                    await client.calculate_eclipse_visibility(date, name)
+            timings.append((time.perf_counter() - start) * 1000)
+        await client.close()
+        repeated = sum(timings[1:]) / max(len(timings) - 1, 1) / len(curated)
+        print(f"{label:<26} {len(curated) * repeat:>9} {timings[0]:>13.1f} {repeated:>20.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stdio", type=int, default=0, metavar="N",
+                        help="Consultas medidas también a través del cliente stdio (0 = no)")
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+    if args.stdio:
+        asyncio.run(run_stdio(args.stdio, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark del índice Saros–Inex del catálogo de eclipses
+
+Sobre el catálogo real (curado + generado) mide:
+- el coste de numerar todos los eclipses al cargar (`saros_inex`)
+- el siguiente miembro de la serie de cada eclipse: recorriendo el catálogo
+  en busca del eclipse 223 lunaciones después frente a `series_neighbor`
+- `next_visible_member` desde varias ciudades (incluye los cálculos de visibilidad)
+
+Uso: python benchmarks/bench_saros.py [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+from eclipse_store import SAROS_LUNATIONS, SYNODIC_MONTH, get_store, saros_inex
+from gazetteer import get_gazetteer
+from saros import next_visible_member
+
+CITIES = ["Madrid", "Guatemala City", "Mexico City", "Buenos Aires", "Tokyo", "Sydney", "Cairo", "New York"]
+
+
+def scan_next(store, date):
+    """Siguiente miembro de la serie recorriendo todas las fechas de la misma clase"""
+    eclipse = store.get(date)
+    kind = eclipse["type"].split("_")[0]
+    start = datetime.fromisoformat(eclipse["greatest_eclipse"]["time"])
+    for other in store.dates:
+        candidate = store.get(other)
+        if candidate["type"].startswith(kind) and "greatest_eclipse" in candidate:
+            lunations = (datetime.fromisoformat(candidate["greatest_eclipse"]["time"]) - start).total_seconds()
+            if round(lunations / 86400.0 / SYNODIC_MONTH) == SAROS_LUNATIONS:
+                return other
+    return None
+
+
+def timed(label, fn, repeat, count):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<44} {elapsed * 1000:>10.2f} ms {elapsed / count * 1e6:>10.2f} µs/op")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    store = get_store()
+    gazetteer = get_gazetteer()
+    indexed = [d for d in store.dates if "saros" in store.get(d)]
+    print(f"{len(store)} eclipses, {len(indexed)} con número Saros")
+    print(f"{'Operación':<44} {'Total':>13} {'Por op.':>16}")
+
+    timed("numerar (saros_inex)", lambda: [
+        saros_inex(store.get(d)["type"].split("_")[0], store.get(d)["greatest_eclipse"]["time"]) for d in indexed
+    ], args.repeat, len(indexed))
+    sample = indexed[::10]
+    scanned = timed("siguiente miembro, recorriendo el catálogo", lambda: [scan_next(store, d) for d in sample],
+                    1, len(sample))
+    jumped = timed("siguiente miembro, series_neighbor", lambda: [store.series_neighbor(d) for d in sample],
+                   args.repeat, len(sample))
+    assert scanned == jumped
+    timed("next_visible_member (8 ciudades, Saros 139)", lambda: [
+        next_visible_member(store, gazetteer, city, saros=139, after_date="1900-01-01") for city in CITIES
+    ], args.repeat, len(CITIES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark del arranque del servidor MCP de eclipses por stdio
+
+Lanza `chatbot/src/eclipse_mcp_server.py` como lo hace el cliente (un proceso
+nuevo por conexión) y mide, con JSON-RPC sobre stdin/stdout:
+- el tiempo hasta la respuesta a `initialize` (lo que espera el chatbot al conectar)
+- el tiempo de la primera llamada a una herramienta, que paga la importación
+  diferida de los módulos de cálculo y la carga del catálogo
+
+Termina con error (código 1) si la mediana hasta `initialize` supera el
+presupuesto (`--budget-ms` o `ECLIPSE_MCP_STARTUP_BUDGET_MS`, 1500 ms por defecto).
+Para ver en qué se va el tiempo: python chatbot/src/eclipse_mcp_server.py --profile-startup
+
+Uso: python benchmarks/bench_server_startup.py [--runs 5] [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SERVER = Path(__file__).resolve().parents[1] / "chatbot" / "src" / "eclipse_mcp_server.py"
+PROTOCOL_VERSION = "2025-06-18"
+DEFAULT_BUDGET_MS = float(os.getenv("ECLIPSE_MCP_STARTUP_BUDGET_MS", "1500"))
+FIRST_CALL = {"name": "calculate_eclipse_visibility", "arguments": {"date": "2024-04-08", "location": "Dallas"}}
+
+
+def request(process, message):
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def response(process, request_id):
+    """Leer líneas de stdout hasta la respuesta con ese id"""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("El servidor cerró stdout sin responder")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def measure():
+    """(ms hasta la respuesta a initialize, ms de la primera llamada a una herramienta)"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(SERVER)], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    try:
+        request(process, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": PROTOCOL_VERSION, "capabilities": {},
+            "clientInfo": {"name": "bench_server_startup", "version": "1.0"}}})
+        response(process, 1)
+        initialized = (time.perf_counter() - start) * 1000
+        request(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        start = time.perf_counter()
+        request(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": FIRST_CALL})
+        result = response(process, 2)
+        first_call = (time.perf_counter() - start) * 1000
+        if "error" in result or result["result"].get("isError"):
+            raise RuntimeError(f"La primera llamada falló: {result}")
+        return initialized, first_call
+    finally:
+        process.stdin.close()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    print(f"{'Ejecución':<10} {'initialize ms':>14} {'1ª herramienta ms':>18}")
+    runs = []
+    for i in range(args.runs):
+        runs.append(measure())
+        print(f"{i + 1:<10} {runs[-1][0]:>14.1f} {runs[-1][1]:>18.1f}")
+    initialized = statistics.median(r[0] for r in runs)
+    first_call = statistics.median(r[1] for r in runs)
+    print(f"{'Mediana':<10} {initialized:>14.1f} {first_call:>18.1f}")
+    if initialized > args.budget_ms:
+        sys.exit(f"Arranque fuera de presupuesto: {initialized:.0f} ms hasta initialize > {args.budget_ms:.0f} ms")
+    print(f"Dentro del presupuesto de {args.budget_ms:.0f} ms hasta initialize")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la conversión a hora local con zonas horarias offline
+
+Mide:
+- zona de N coordenadas al azar: búsqueda vectorizada en frío y con la caché
+- hora local de N instantes: `datetime.astimezone` con ZoneInfo por fila
+  frente a `local_iso` (desfase memoizado por zona y cuarto de hora)
+- duración de un registro: `strptime` de las horas de reloj (como el antiguo
+  `_calculate_duration`) frente a restar los instantes UTC ya calculados
+- `visibility_batch` con N coordenadas (incluye las columnas de hora local)
+
+Uso: python benchmarks/bench_timezones.py [--n 10000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+import timezones
+from eclipse_batch import visibility_batch
+from eclipse_store import get_store
+from gazetteer import get_gazetteer
+from timezones import format_duration, get_zone, local_iso, timezones_at
+
+
+def timed(label, fn, count):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<48} {elapsed * 1000:>10.2f} ms {elapsed / count * 1e6:>10.2f} µs/op")
+    return result
+
+
+def strptime_duration(start_time, end_time):
+    start = datetime.strptime(start_time, "%H:%M:%S")
+    end = datetime.strptime(end_time, "%H:%M:%S")
+    return f"{(end - start).seconds // 3600:02d}:{(end - start).seconds % 3600 // 60:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.n
+    lat = np.degrees(np.arcsin(rng.uniform(-0.9, 0.95, n)))
+    lon = rng.uniform(-180, 180, n)
+    print(f"{'Operación':<48} {'Total':>13} {'Por op.':>16}")
+
+    timezones.get_timezone_index()
+    zones = timed("zona por coordenadas (en frío)", lambda: timezones_at(lat, lon), n)
+    timed("zona por coordenadas (en caché)", lambda: timezones_at(lat, lon), n)
+
+    epochs = (1712596641 + rng.uniform(0, 3 * 3600, n)).tolist()
+    timed("hora local: astimezone(ZoneInfo) por fila", lambda: [
+        datetime.fromtimestamp(e, timezone.utc).astimezone(get_zone(z)).isoformat(timespec="seconds")
+        for e, z in zip(epochs, zones)], n)
+    timed("hora local: local_iso (desfase memoizado)", lambda: [local_iso(e, z) for e, z in zip(epochs, zones)], n)
+
+    clocks = [(f"{h:02d}:{m:02d}:00", f"{h + 2:02d}:{m:02d}:00") for h, m in zip(rng.integers(0, 21, n).tolist(),
+                                                                                 rng.integers(0, 60, n).tolist())]
+    timed("duración: strptime de las horas", lambda: [strptime_duration(a, b) for a, b in clocks], n)
+    timed("duración: resta de instantes UTC", lambda: [format_duration(e, e + 7200) for e in epochs], n)
+
+    store, gazetteer = get_store(), get_gazetteer()
+    count = min(n, 5000)
+    locations = [{"latitude": a, "longitude": o} for a, o in zip(lat[:count].tolist(), lon[:count].tolist())]
+    timed(f"visibility_batch 2024-04-08 × {count} coordenadas", lambda: visibility_batch(
+        ["2024-04-08"], locations, store, gazetteer), count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de deduplicación de tool_result en el historial
+
+Reproduce sesiones guardadas (journal de SessionStore) o, si no se indica
+ninguna, una sesión sintética que consulta varias veces el mismo eclipse y el
+mismo calendario de F1. Cada sesión se reproduce con y sin deduplicación y se
+comparan los tokens de entrada por petición (estimados) y la memoria de la
+ventana.
+
+Uso: python benchmarks/bench_tool_result_dedupe.py [--sessions DIR] [--turns 300]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "chatbot" / "src"))
+
+from context_compactor import estimate_tokens
+from conversation_manager import ConversationManager
+from session_store import RESET_MARKER, SessionStore
+
+ECLIPSE_RESULT = json.dumps(str({
+    "location": "Madrid", "date": "2026-08-12", "type": "Total",
+    "visibility": "Visible", "max_time": "18:27 UTC", "coverage": "100%",
+    "description": "Eclipse solar total visible desde el norte de España al atardecer.",
+}))
+F1_RESULT = json.dumps(str({"season": 2024, "races": [
+    {"round": r, "name": f"Gran Premio {r}", "date": f"2024-{(r % 12) + 1:02d}-{(r % 27) + 1:02d}"}
+    for r in range(1, 25)
+]}))
+
+
+def synthetic_session(turns: int, seed: int = 3):
+    """Registros de una sesión donde se repiten las mismas consultas"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(turns):
+        tool, result = rng.choice([("calculate_eclipse_visibility", ECLIPSE_RESULT),
+                                   ("get_f1_calendar", F1_RESULT),
+                                   ("predict_next_eclipse", ECLIPSE_RESULT.replace("Madrid", f"Ciudad {i % 7}"))])
+        tool_id = f"toolu_{i}"
+        records.append({"role": "user", "content": f"Pregunta {i} sobre {tool}"})
+        records.append({"role": "assistant", "content": [
+            {"type": "tool_use", "id": tool_id, "name": tool, "input": {}}]})
+        records.append({"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": tool_id, "content": result}]})
+        records.append({"role": "assistant", "content": [{"type": "text", "text": f"Respuesta {i}"}]})
+    return records
+
+
+def replay(records, dedupe: bool):
+    """Reproducir una sesión; devuelve (tokens de entrada por petición, bytes retenidos)"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    # Los registros se decodifican como en una carga desde disco: cada payload es un objeto nuevo
+    records = json.loads(json.dumps(records))
+    manager = ConversationManager(dedupe_tool_results=dedupe)
+    tokens = requests = 0
+    for record in records:
+        if record.get("type") == RESET_MARKER:
+            manager.clear_conversation()
+            continue
+        manager.add_message(record["role"], record["content"])
+        if record["role"] == "user":
+            # Tras cada mensaje del usuario (o tool_result) se llama al LLM
+            tokens += estimate_tokens(json.dumps(manager.get_messages(), ensure_ascii=False))
+            requests += 1
+    del records
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tokens / max(requests, 1), retained - before, manager
+
+
+def load_sessions(root: str):
+    store = SessionStore(root)
+    for session_id in store.list_sessions():
+        journal = Path(root) / session_id / "journal.jsonl"
+        yield session_id, store._parse_lines(journal.read_text(encoding="utf-8").splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", help="Directorio de sesiones a reproducir (MCP_SESSIONS_DIR)")
+    parser.add_argument("--turns", type=int, default=300, help="Turnos de la sesión sintética")
+    args = parser.parse_args()
+
+    sessions = list(load_sessions(args.sessions)) if args.sessions else [("sintética", synthetic_session(args.turns))]
+    print(f"{'Sesión':<24} {'Tokens/petición':>16} {'Con dedupe':>11} {'Ahorro':>7} "
+          f"{'Memoria KB':>11} {'Con dedupe':>11}")
+    for session_id, records in sessions:
+        plain_tokens, plain_mem, _ = replay(records, dedupe=False)
+        dedupe_tokens, dedupe_mem, manager = replay(records, dedupe=True)
+        saving = 1 - dedupe_tokens / plain_tokens if plain_tokens else 0
+        print(f"{session_id:<24} {plain_tokens:>16.0f} {dedupe_tokens:>11.0f} {saving:>7.1%} "
+              f"{plain_mem / 1024:>11.1f} {dedupe_mem / 1024:>11.1f}")
+        print(f"  {manager.get_conversation_stats()['tool_results']}")
+
+
+if __name__ == "__main__":
+    main()
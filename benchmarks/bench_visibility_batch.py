@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark de visibilidad en lote frente a llamadas individuales
+
+Compara el camino anterior (una llamada a `calculate_eclipse_visibility` por
+cada par fecha × ubicación, con su respuesta JSON) con una sola llamada a
+`calculate_eclipse_visibility_batch` sobre el mismo producto cartesiano.
+Sólo mide el trabajo del servidor y la serialización: cada llamada individual
+añade además en la práctica un viaje MCP y un paso del LLM.
+
+Uso: python benchmarks/bench_visibility_batch.py [--locations 50] [--repeat 3]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+from besselian import besselian_elements
+from eclipse_batch import visibility_batch
+from eclipse_store import get_store
+from gazetteer import get_gazetteer
+from remote_mcp_server import EclipseCalculatorServer
+
+
+def per_call(server, dates, locations):
+    cells, size = 0, 0
+    for date in dates:
+        for location in locations:
+            size += len(json.dumps(server.calculate_eclipse_visibility(date, location)))
+            cells += 1
+    return cells, size
+
+
+def batched(store, gazetteer, dates, locations):
+    result = visibility_batch(dates, locations, store, gazetteer)
+    return result["rows"], len(json.dumps(result, separators=(",", ":")))
+
+
+def best_of(repeat, fn, *args):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Sólo los eclipses del catálogo curado, que tienen datos por ciudad
+    store, gazetteer = get_store(catalog_path=""), get_gazetteer()
+    dates = store.dates_for_type("solar_total") + store.dates_for_type("solar_annular")
+    dates = [d for d in sorted(dates) if besselian_elements(d) is not None]
+    locations = [p.name for p in random.Random(7).sample(gazetteer.places, args.locations)]
+    server = EclipseCalculatorServer()
+    print(f"{len(dates)} eclipses solares × {len(locations)} ubicaciones = {len(dates) * len(locations)} combinaciones")
+
+    single_s, (cells, single_bytes) = best_of(args.repeat, per_call, server, dates, locations)
+    batch_s, (rows, batch_bytes) = best_of(args.repeat, batched, store, gazetteer, dates, locations)
+    assert cells == rows
+
+    print(f"{'Camino':<22} {'Tiempo ms':>10} {'Comb./s':>10} {'Llamadas':>9} {'Bytes':>10}")
+    print(f"{'una llamada por par':<22} {single_s * 1000:>10.1f} {cells / single_s:>10.0f} {cells:>9} {single_bytes:>10}")
+    print(f"{'lote':<22} {batch_s * 1000:>10.1f} {rows / batch_s:>10.0f} {1:>9} {batch_bytes:>10}")
+    print(f"Aceleración: {single_s / batch_s:.1f}x, respuesta {single_bytes / batch_bytes:.1f}x más pequeña")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark de mapas de oscurecimiento con caché de teselas
+
+Mide, para un eclipse y una resolución:
+- el mapa global en frío con 1 proceso y con N procesos
+- la misma petición repetida (todo desde el memmap)
+- una región solapada con la anterior y otra nueva en una resolución distinta
+
+Cada configuración usa un directorio de caché temporal nuevo.
+
+Uso: python benchmarks/bench_visibility_map.py [--date 2024-04-08] [--resolution 0.5] [--workers 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "eclipse-mcp-remote"))
+
+import visibility_map as vm
+
+
+def timed(label, **kwargs):
+    start = time.perf_counter()
+    result = vm.visibility_map(include_raster=False, **kwargs)
+    elapsed = (time.perf_counter() - start) * 1000
+    cache = result["cache"]
+    print(f"{label:<34} {elapsed:>9.1f} {cache['tiles_computed']:>9} {cache['tiles_cached']:>8} "
+          f"{result['shape'][0]}x{result['shape'][1]}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--date", default="2024-04-08")
+    parser.add_argument("--resolution", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"Eclipse {args.date}, resolución {args.resolution}°, {os.cpu_count()} CPU")
+    print(f"{'Petición':<34} {'ms':>9} {'Calculadas':>9} {'Caché':>8} Celdas")
+    baseline = None
+    for workers in sorted({1, args.workers}):
+        vm.MAP_WORKERS = workers
+        vm.shutdown_executor()
+        if workers > 1:
+            vm.get_executor().submit(int).result()  # Arrancar el pool fuera de la medición
+        with tempfile.TemporaryDirectory() as cache_dir:
+            result = timed(f"global en frío, {workers} proceso(s)", date=args.date,
+                           resolution=args.resolution, cache_dir=cache_dir)
+            if baseline is None:
+                baseline = result["summary"]
+            assert result["summary"] == baseline
+            timed("global repetido", date=args.date, resolution=args.resolution, cache_dir=cache_dir)
+            timed("región solapada (30..50, -110..-70)", date=args.date, resolution=args.resolution,
+                  lat_min=30, lat_max=50, lon_min=-110, lon_max=-70, cache_dir=cache_dir)
+            timed("misma región a 0.1°", date=args.date, resolution=0.1,
+                  lat_min=30, lat_max=50, lon_min=-110, lon_max=-70, cache_dir=cache_dir)
+            timed("misma región a 0.1°, repetida", date=args.date, resolution=0.1,
+                  lat_min=30, lat_max=50, lon_min=-110, lon_max=-70, cache_dir=cache_dir)
+    vm.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# chatbot/src/blob_store.py
+"""
+Almacén de blobs direccionado por contenido para payloads grandes del log MCP.
+
+Cada blob se guarda comprimido (zlib) bajo su hash SHA-256, por lo que
+respuestas idénticas se almacenan una sola vez.
+"""
+
+import hashlib
+import os
+import zlib
+from pathlib import Path
+from typing import Union
+
+
+class BlobStore:
+    """Guarda y recupera payloads por su hash SHA-256"""
+
+    def __init__(self, root: str = "logs/blobs"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest[2:]}.z"
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """
+        Guardar un payload si aún no existe
+
+        Args:
+            data: Contenido a guardar (str se codifica en UTF-8)
+
+        Returns:
+            Hash SHA-256 en hexadecimal que referencia el blob
+        """
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # Escritura atómica: un blob nunca queda a medio escribir
+            tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(raw, 6))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Recuperar el contenido (UTF-8) de un blob por su hash"""
+        with open(self._path(digest), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
@@ -0,0 +1,155 @@
+# chatbot/src/context_compactor.py
+"""
+Compactación del contexto por resumen en segundo plano
+
+Cuando la ventana del ConversationManager descarta mensajes, en lugar de
+perderlos se acumulan y se resumen con un modelo barato en un hilo aparte,
+fuera del camino crítico del usuario. El resumen acumulado se envía como un
+mensaje fijo al inicio del contexto.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+SUMMARY_MODEL = "claude-3-5-haiku-latest"
+SUMMARY_PREFIX = "[Resumen de la conversación anterior]"
+
+SUMMARY_PROMPT = """Actualiza el resumen de una conversación entre un usuario y un chatbot con herramientas MCP.
+
+Resumen actual:
+{summary}
+
+Mensajes nuevos que salieron del contexto:
+{transcript}
+
+Escribe el resumen actualizado en español, en viñetas breves y en menos de 250 palabras.
+Conserva hechos, datos devueltos por herramientas (fechas, ubicaciones, resultados),
+decisiones y preferencias del usuario. Omite saludos y relleno."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida de tokens (~4 caracteres por token)"""
+    return (len(text) + 3) // 4
+
+
+class ContextCompactor:
+    """Resume en segundo plano los mensajes descartados de la ventana"""
+
+    def __init__(self, summarize_fn: Callable[[str], Optional[str]] = None, batch_size: int = 8,
+                 max_transcript_chars: int = 12000):
+        """
+        Args:
+            summarize_fn: Función prompt → texto del resumen (None si falla);
+                por defecto llama a Claude con SUMMARY_MODEL
+            batch_size: Mensajes descartados que se acumulan antes de resumir
+            max_transcript_chars: Límite de caracteres por mensaje enviados al resumen
+        """
+        self.summarize_fn = summarize_fn or _summarize_with_claude
+        self.batch_size = batch_size
+        self.max_transcript_chars = max_transcript_chars
+        self.summary = ""
+        self.version = 0  # Cambia con cada resumen nuevo (invalida vistas cacheadas)
+        self._generation = 0  # Cambia con cada restore/reinicio (descarta resúmenes en curso)
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-compactor")
+        self.stats = {
+            "summarized_messages": 0,
+            "evicted_tokens": 0,
+            "summary_calls": 0,
+            "failed_calls": 0,
+        }
+
+    def evicted(self, role: str, text: str) -> None:
+        """Registrar un mensaje que salió de la ventana; resume al completar un lote"""
+        if not text:
+            return
+        with self._lock:
+            self._pending.append(f"{role}: {text[:self.max_transcript_chars]}")
+            self.stats["evicted_tokens"] += estimate_tokens(text)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+            generation = self._generation
+        self._executor.submit(self._summarize, batch, generation)
+
+    def flush(self, wait: bool = False) -> None:
+        """Resumir lo pendiente aunque el lote no esté completo"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            generation = self._generation
+        future = self._executor.submit(self._summarize, batch, generation) if batch else None
+        if wait and future:
+            future.result()
+
+    def _summarize(self, batch: List[str], generation: int) -> None:
+        """
+        Resumir un lote sobre el resumen actual
+
+        Si entre el envío del lote y el fin de la llamada hubo un restore
+        (reinicio de la conversación o sesión reanudada), el resultado
+        pertenece al contexto descartado y no se aplica.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            current = self.summary
+            self.stats["summary_calls"] += 1
+        prompt = SUMMARY_PROMPT.format(summary=current or "(vacío)", transcript="\n".join(batch))
+        summary = self.summarize_fn(prompt)
+        with self._lock:
+            if not summary:
+                self.stats["failed_calls"] += 1
+                return
+            if generation != self._generation:
+                return
+            self.summary = summary.strip()
+            self.stats["summarized_messages"] += len(batch)
+            self.version += 1
+
+    def restore(self, summary: str, pending: List[str] = None) -> None:
+        """Restaurar un resumen guardado (p. ej. al reanudar una sesión) y su lote pendiente"""
+        with self._lock:
+            self.summary = summary or ""
+            self._pending = list(pending or [])
+            self.version += 1
+            self._generation += 1
+
+    @property
+    def pending(self) -> List[str]:
+        """Mensajes descartados que aún no se resumieron"""
+        with self._lock:
+            return list(self._pending)
+
+    def close(self) -> None:
+        """Esperar los resúmenes en curso y liberar el hilo de trabajo"""
+        self._executor.shutdown(wait=True)
+
+    def summary_message(self) -> Optional[Dict[str, str]]:
+        """Mensaje fijo con el resumen, o None si aún no hay resumen"""
+        with self._lock:
+            summary = self.summary
+        if not summary:
+            return None
+        return {"role": "user", "content": f"{SUMMARY_PREFIX}\n{summary}"}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Tokens de contexto ahorrados frente a reenviar el historial completo, y llamadas extra"""
+        with self._lock:
+            stats = dict(self.stats)
+            summary_tokens = estimate_tokens(self.summary)
+        return {
+            **stats,
+            "summary_tokens": summary_tokens,
+            "context_tokens_saved_per_request": max(stats["evicted_tokens"] - summary_tokens, 0),
+        }
+
+
+def _summarize_with_claude(prompt: str) -> Optional[str]:
+    from llm_client import ask_claude  # Import diferido: evita crear el cliente al importar
+
+    response = ask_claude([{"role": "user", "content": prompt}], model=SUMMARY_MODEL, max_tokens=512)
+    if response.get("type") == "error":
+        return None
+    return "".join(b.get("text", "") for b in response.get("content", []) if b.get("type") == "text")
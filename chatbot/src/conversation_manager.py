@@ -4,22 +4,223 @@ Gestor de conversación que mantiene el contexto de la sesión
 Funcionalidad requerida: Mantener contexto entre preguntas
 """
 
+from collections import deque
 from datetime import datetime
+import hashlib
+from itertools import chain
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple, Union
+
+from context_compactor import ContextCompactor
+from search_index import InvertedIndex
+from session_store import SessionStore, RESET_MARKER
+
+Content = Union[str, List[Dict[str, Any]]]
+
+# Referencia que reemplaza a un tool_result idéntico a otro que sigue en la ventana
+TOOL_RESULT_REFERENCE = "[Resultado idéntico al de la llamada {tool_use_id}, ver arriba]"
+
+
+def content_text(content: Content) -> str:
+    """
+    Extraer el texto plano de un contenido de mensaje
+
+    Args:
+        content: Texto o lista de bloques (text, tool_use, tool_result)
+
+    Returns:
+        Texto concatenado de los bloques
+    """
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+            continue
+        block_type = block.get("type")
+        if block_type == "text":
+            parts.append(block.get("text", ""))
+        elif block_type == "tool_use":
+            parts.append(f"[tool_use {block.get('name')}] {json.dumps(block.get('input', {}), ensure_ascii=False)}")
+        elif block_type == "tool_result":
+            parts.append(content_text(block.get("content")))
+    return "\n".join(p for p in parts if p)
+
+
+def block_ids(content: Content, block_type: str) -> Set[str]:
+    """
+    IDs de los bloques tool_use ('tool_use') o tool_result ('tool_result') de un contenido
+
+    Para tool_result se devuelve el tool_use_id al que responde cada bloque.
+    """
+    if not isinstance(content, list):
+        return set()
+    key = "id" if block_type == "tool_use" else "tool_use_id"
+    return {b.get(key) for b in content if isinstance(b, dict) and b.get("type") == block_type}
+
+
+def _repair_plan(messages: List[Dict[str, Any]]) -> Tuple[List[Optional[Content]], int]:
+    """
+    Calcular cómo reparar una ventana de mensajes para que la API la acepte
+
+    Reglas:
+    - Cada tool_use del asistente debe responderse en el mensaje siguiente
+      (salvo en el último mensaje, que puede ser un llamado en curso)
+    - Cada tool_result debe responder a un tool_use del mensaje anterior
+    - El primer mensaje debe ser del usuario
+
+    Returns:
+        (contenido nuevo por mensaje, o None para descartarlo; bloques corregidos)
+    """
+    plan: List[Optional[Content]] = [m["content"] for m in messages]
+    fixes = 0
+
+    # tool_use sin respuesta: se quitan los bloques (el texto del asistente se conserva)
+    for i, message in enumerate(messages[:-1]):
+        if message["role"] != "assistant":
+            continue
+        uses = block_ids(message["content"], "tool_use")
+        if not uses:
+            continue
+        following = messages[i + 1]
+        answered = block_ids(following["content"], "tool_result") if following["role"] == "user" else set()
+        missing = uses - answered
+        if missing:
+            fixes += len(missing)
+            plan[i] = [b for b in message["content"]
+                       if not (b.get("type") == "tool_use" and b.get("id") in missing)] or None
+
+    # tool_result huérfanos: responden a un tool_use que ya no está justo antes
+    previous_uses: Set[str] = set()
+    for i, message in enumerate(messages):
+        content = plan[i]
+        if content is None:
+            previous_uses = set()
+            continue
+        if message["role"] == "user":
+            orphans = block_ids(content, "tool_result") - previous_uses
+            if orphans:
+                fixes += len(orphans)
+                plan[i] = content = [b for b in content
+                                     if not (b.get("type") == "tool_result" and b.get("tool_use_id") in orphans)] or None
+        previous_uses = block_ids(content, "tool_use") if message["role"] == "assistant" else set()
+
+    # La ventana debe empezar con un mensaje del usuario
+    for i, message in enumerate(messages):
+        if plan[i] is None:
+            continue
+        if message["role"] == "user":
+            break
+        fixes += 1
+        plan[i] = None
+    return plan, fixes
+
+
+def repair_messages(messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reparar una lista de mensajes en formato de la API (ver `_repair_plan`)
+
+    Returns:
+        (mensajes reparados, número de bloques corregidos; 0 si ya era válida)
+    """
+    plan, fixes = _repair_plan(messages)
+    if not fixes:
+        return messages, 0
+    repaired = []
+    for message, content in zip(messages, plan):
+        if content is None:
+            continue
+        repaired.append(message if content is message["content"] else {"role": message["role"], "content": content})
+    return repaired, fixes
+
+
+class Message:
+    """Registro compacto de un mensaje de la conversación"""
+
+    __slots__ = ("seq", "role", "content", "timestamp", "digests", "_api", "_text")
+
+    def __init__(self, role: str, content: Content, timestamp: str = None):
+        self.seq = 0  # Asignado por el ConversationManager; identifica el mensaje en el índice
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.digests: Optional[Dict[str, str]] = None  # tool_use_id → hash del payload internado
+        self._api = None
+        self._text = None
+
+    def to_api(self) -> Dict[str, Any]:
+        """Formato de la API de Claude (sin timestamp); se crea una sola vez"""
+        if self._api is None:
+            self._api = {"role": self.role, "content": self.content}
+        return self._api
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": self.content, "timestamp": self.timestamp}
+
+    @property
+    def text(self) -> str:
+        """Texto plano del contenido, aunque sea una lista de bloques"""
+        if self._text is None:
+            self._text = content_text(self.content)
+        return self._text
+
+    @property
+    def is_tool_result(self) -> bool:
+        """True si el mensaje sólo transporta resultados de herramientas"""
+        return (isinstance(self.content, list) and bool(self.content)
+                and all(isinstance(b, dict) and b.get("type") == "tool_result" for b in self.content))
+
+    @property
+    def answers_tool_use(self) -> bool:
+        """True si el mensaje contiene algún tool_result (depende del tool_use anterior)"""
+        return self.role == "user" and bool(block_ids(self.content, "tool_result"))
+
 
 class ConversationManager:
     """Maneja el historial y contexto de la conversación"""
+
+    PINNED_MESSAGES = 2  # Primeros mensajes del contexto que nunca se descartan
+    MIN_DEDUPE_CHARS = 200  # Resultados más cortos que esto se envían siempre completos
+    MESSAGE_OVERHEAD = 512  # Bytes estimados por mensaje (objeto, dicts y entradas del índice)
     
-    def __init__(self, max_messages: int = 50):
+    def __init__(self, max_messages: int = 50, session_id: str = None, store: SessionStore = None,
+                 compactor: ContextCompactor = None, dedupe_tool_results: bool = True):
         """
         Inicializar el gestor de conversación
         
         Args:
             max_messages: Número máximo de mensajes a mantener en memoria
+            session_id: ID de la sesión persistente (requiere `store`)
+            store: SessionStore donde se registra cada mensaje (opcional)
+            compactor: ContextCompactor que resume los mensajes descartados (opcional)
+            dedupe_tool_results: Internar los tool_result por hash y enviar los repetidos
+                como referencia al resultado idéntico anterior
         """
-        self.messages = []
         self.max_messages = max_messages
+        self.store = store
+        self.compactor = compactor
+        self.dedupe_tool_results = dedupe_tool_results
+        # Payloads de tool_result internados: hash → [payload, referencias en la ventana]
+        self._payloads: Dict[str, List[Any]] = {}
+        self.dedupe_stats = {"tool_results": 0, "duplicate_results": 0, "chars_deduplicated": 0,
+                             "chars_referenced_last_request": 0}
+        self._summary_version = compactor.version if compactor else 0
+        self.session_id = (session_id or SessionStore.new_session_id()) if store else session_id
+        self._unsnapshotted = 0
+        # Los primeros mensajes se conservan siempre; el resto es una ventana deslizante
+        self._pinned: List[Message] = []
+        self._recent: deque = deque()
+        self._api_view = None
+        # Reparaciones del historial antes de enviarlo y reinicios por historial inválido
+        self.history_stats = {"window_repairs": 0, "repaired_blocks": 0, "malformed_history_resets": 0}
+        self._needs_repair = False
+        # Índice invertido de la ventana actual, por número de secuencia del mensaje
+        self._index = InvertedIndex()
+        self._by_seq: Dict[int, Message] = {}
+        self._next_seq = 0
         self.session_start = datetime.now()
         
         # Mensaje del sistema para establecer contexto
@@ -45,47 +246,285 @@ Recuerda que puedes acceder a información específica sobre eclipses solares, e
         
         # No agregamos el mensaje del sistema a self.messages ya que Claude maneja esto internamente
         
-    def add_message(self, role: str, content: str) -> None:
+    def _iter_messages(self) -> Iterator[Message]:
+        return chain(self._pinned, self._recent)
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """Historial completo como lista de dicts (con timestamps)"""
+        return [m.to_dict() for m in self._iter_messages()]
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._recent)
+
+    def add_message(self, role: str, content: Content) -> None:
         """
         Agregar un mensaje al historial de conversación
         
         Args:
             role: 'user' o 'assistant'
-            content: Contenido del mensaje
+            content: Contenido del mensaje (texto o lista de bloques)
         """
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
+        message = Message(role, content)
+        self._store(message)
+        if self.store:
+            self.store.append(self.session_id, message.to_dict())
+            self._unsnapshotted += 1
+            if self._unsnapshotted >= self.store.snapshot_every:
+                self.save_snapshot()
+
+    def _store(self, message: Message, compact: bool = True) -> None:
+        self._check_pairing(message)
+        if self.dedupe_tool_results and message.answers_tool_use:
+            self._intern(message)
+        # Mantiene los primeros mensajes importantes y los más recientes; el deque
+        # descarta por la izquierda sin copiar la lista
+        if not self._recent and (len(self._pinned) < self.PINNED_MESSAGES or self._answers_pinned(message)):
+            self._pinned.append(message)
+        else:
+            if len(self._recent) >= self._window():
+                self._evict_exchange(compact)
+            self._recent.append(message)
+        message.seq = self._next_seq
+        self._next_seq += 1
+        self._by_seq[message.seq] = message
+        self._index.add(message.seq, message.text)
+        self._api_view = None
+
+    def _check_pairing(self, message: Message) -> None:
+        # La poda por intercambios mantiene la ventana válida; sólo hace falta
+        # repararla si llega un mensaje que no encaja con el anterior
+        previous = self._recent[-1] if self._recent else (self._pinned[-1] if self._pinned else None)
+        uses = block_ids(previous.content, "tool_use") if previous and previous.role == "assistant" else set()
+        results = block_ids(message.content, "tool_result") if message.role == "user" else set()
+        if uses != results or (previous is None and message.role != "user"):
+            self._needs_repair = True
+
+    def _window(self) -> int:
+        """
+        Lugares de la ventana deslizante: lo que dejan libre los mensajes fijados
+        (incluido el tool_result que responde a un tool_use fijado), de modo que
+        fijados + recientes no superen max_messages. Un intercambio
+        tool_use/tool_result necesita al menos dos lugares.
+        """
+        return max(self.max_messages - len(self._pinned), 2)
+
+    def _answers_pinned(self, message: Message) -> bool:
+        # El tool_result que responde a un tool_use fijado también queda fijado
+        return (bool(self._pinned) and message.answers_tool_use
+                and bool(block_ids(self._pinned[-1].content, "tool_use")))
+
+    def _evict_exchange(self, compact: bool = True) -> None:
+        """Descartar el mensaje más antiguo de la ventana junto con los tool_result que dependen de él"""
+        self._evict(self._recent.popleft(), compact)
+        # Un tool_use y su tool_result salen juntos: nunca queda un resultado huérfano
+        while self._recent and self._recent[0].answers_tool_use:
+            self._evict(self._recent.popleft(), compact)
+
+    def _evict(self, message: Message, compact: bool) -> None:
+        self._unindex(message)
+        if compact and self.compactor:
+            # El mensaje descartado se resume en segundo plano
+            self.compactor.evicted(message.role, message.text)
+
+    def _unindex(self, message: Message) -> None:
+        self._index.remove(message.seq)
+        self._by_seq.pop(message.seq, None)
+        self._release(message)
+
+    def _intern(self, message: Message) -> None:
+        """Compartir un único payload por hash entre los tool_result idénticos"""
+        content, digests = [], {}
+        for block in message.content:
+            payload = block.get("content") if block.get("type") == "tool_result" else None
+            if not isinstance(payload, str) or len(payload) < self.MIN_DEDUPE_CHARS:
+                content.append(block)
+                continue
+            digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            entry = self._payloads.get(digest)
+            self.dedupe_stats["tool_results"] += 1
+            if entry is None:
+                entry = self._payloads[digest] = [payload, 0]
+            else:
+                self.dedupe_stats["duplicate_results"] += 1
+                self.dedupe_stats["chars_deduplicated"] += len(payload)
+            entry[1] += 1
+            digests[block.get("tool_use_id")] = digest
+            content.append({**block, "content": entry[0]})
+        if digests:
+            message.content = content
+            message.digests = digests
+
+    def _release(self, message: Message) -> None:
+        for digest in (message.digests or {}).values():
+            entry = self._payloads.get(digest)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._payloads[digest]
+        message.digests = None
+
+    def _outgoing(self, message: Message, seen: Dict[str, str]) -> Dict[str, Any]:
+        """Formato de la API con los tool_result repetidos reemplazados por una referencia"""
+        if not message.digests:
+            return message.to_api()
+        content, referenced = [], 0
+        for block in message.content:
+            digest = message.digests.get(block.get("tool_use_id")) if block.get("type") == "tool_result" else None
+            first = seen.get(digest) if digest else None
+            if first is None:
+                if digest:
+                    seen[digest] = block.get("tool_use_id")
+                content.append(block)
+            else:
+                # El resultado idéntico anterior sigue en la ventana: basta con referenciarlo
+                content.append({**block, "content": TOOL_RESULT_REFERENCE.format(tool_use_id=first)})
+                referenced += len(block["content"])
+        if not referenced:
+            return message.to_api()
+        self.dedupe_stats["chars_referenced_last_request"] += referenced
+        return {"role": message.role, "content": content}
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Estado serializable de la ventana (ver `from_state`)"""
+        return {
+            "session_start": self.session_start.isoformat(),
+            "messages": self.messages,
+            "summary": self.compactor.summary if self.compactor else "",
+            "summary_pending": self.compactor.pending if self.compactor else [],
+            "history_stats": dict(self.history_stats),
         }
-        
-        self.messages.append(message)
-        
-        # Mantiene solo los últimos max_messages mensajes para evitar exceder límites de tokens
-        if len(self.messages) > self.max_messages:
-            # Manteniene los primeros mensajes importantes y los más recientes
-            important_messages = self.messages[:2]  # Primeros mensajes del contexto
-            recent_messages = self.messages[-(self.max_messages-2):]
-            self.messages = important_messages + recent_messages
+
+    def save_snapshot(self) -> None:
+        """Guardar la ventana actual como snapshot compactado de la sesión"""
+        if not self.store:
+            return
+        self.store.write_snapshot(self.session_id, self.snapshot_state())
+        self._unsnapshotted = 0
+
+    def memory_estimate(self) -> int:
+        """Bytes aproximados que ocupa la ventana en memoria (texto + sobrecarga por mensaje)"""
+        return sum(len(m.text) for m in self._iter_messages()) + self.MESSAGE_OVERHEAD * len(self)
+
+    @classmethod
+    def resume(cls, session_id: str, store: SessionStore, max_messages: int = 50,
+               compactor: ContextCompactor = None) -> "ConversationManager":
+        """
+        Reanudar una sesión persistente por su ID
+
+        Args:
+            session_id: Sesión a reanudar
+            store: SessionStore donde vive la sesión
+            max_messages: Tamaño de la ventana en memoria
+            compactor: ContextCompactor opcional; recupera el resumen guardado
+
+        Returns:
+            ConversationManager con la ventana restaurada que sigue registrando en la sesión
+        """
+        state = store.load(session_id, max_messages=max_messages)
+        return cls.from_state(state, max_messages, session_id=session_id, store=store, compactor=compactor)
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], max_messages: int = 50, session_id: str = None,
+                   store: SessionStore = None, compactor: ContextCompactor = None) -> "ConversationManager":
+        """
+        Reconstruir una conversación a partir de `snapshot_state()` o de `SessionStore.load()`
+
+        Los mensajes restaurados no se vuelven a registrar en el journal ni a resumir.
+        """
+        conversation = cls(max_messages, session_id=session_id, store=store, compactor=compactor)
+        if state.get("session_start"):
+            conversation.session_start = datetime.fromisoformat(state["session_start"])
+        if compactor and (state.get("summary") or state.get("summary_pending")):
+            compactor.restore(state.get("summary", ""), state.get("summary_pending"))
+        conversation.history_stats.update(state.get("history_stats", {}))
+        for record in state["messages"]:
+            conversation._store(Message(record["role"], record["content"], record.get("timestamp")), compact=False)
+        return conversation
     
-    def get_messages(self) -> List[Dict[str, str]]:
+    def get_messages(self) -> List[Dict[str, Any]]:
         """
         Obtener mensajes formateados para Claude API
         
         Returns:
-            Lista de mensajes en formato requerido por Claude
+            Lista de mensajes en formato requerido por Claude. La lista se cachea
+            hasta la siguiente modificación y no debe modificarse.
         """
-        # Convertir al formato requerido por Claude (sin timestamps)
-        formatted_messages = []
-        
-        for msg in self.messages:
-            formatted_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        
-        return formatted_messages
+        if self.compactor and self.compactor.version != self._summary_version:
+            # Llegó un resumen nuevo desde el hilo de compactación
+            self._summary_version = self.compactor.version
+            self._api_view = None
+        if self._api_view is None:
+            if self._needs_repair:
+                self.repair()
+            seen: Dict[str, str] = {}
+            self.dedupe_stats["chars_referenced_last_request"] = 0
+            view = [self._outgoing(m, seen) for m in self._pinned]
+            summary = self.compactor.summary_message() if self.compactor else None
+            if summary:
+                # El resumen ocupa el lugar de los mensajes descartados
+                view.append(summary)
+            view.extend(self._outgoing(m, seen) for m in self._recent)
+            self._api_view = view
+        return self._api_view
     
+    def repair(self) -> int:
+        """
+        Validar la ventana y reparar intercambios de herramientas incompletos
+
+        Quita los tool_use sin respuesta y los tool_result huérfanos (p. ej. al
+        reanudar desde la cola del journal) en lugar de reiniciar la conversación.
+
+        Returns:
+            Número de bloques corregidos (0 si la ventana ya era válida)
+        """
+        messages = list(self._iter_messages())
+        plan, fixes = _repair_plan([m.to_api() for m in messages])
+        # Un tool_use al final puede seguir pendiente de su resultado
+        self._needs_repair = bool(messages) and bool(block_ids(messages[-1].content, "tool_use"))
+        if not fixes:
+            return 0
+        for message, content in zip(messages, plan):
+            if content is None:
+                self._unindex(message)
+            elif content is not message.content:
+                self._index.remove(message.seq)
+                message.content = content
+                message._api = message._text = None
+                self._index.add(message.seq, message.text)
+        kept = [content is not None for content in plan]
+        n_pinned = len(self._pinned)
+        self._pinned = [m for m, keep in zip(messages[:n_pinned], kept) if keep]
+        self._recent = deque(m for m, keep in zip(messages[n_pinned:], kept[n_pinned:]) if keep)
+        self._api_view = None
+        self.history_stats["window_repairs"] += 1
+        self.history_stats["repaired_blocks"] += fixes
+        return fixes
+
+    def truncate_to_last_turn(self) -> int:
+        """
+        Descartar la ventana reciente anterior al último mensaje del usuario
+
+        Último recurso antes de reiniciar cuando la API rechaza el historial: los
+        mensajes descartados pasan al compactador, así que no se pierden del todo.
+        Después se valida la ventana completa, mensajes fijados incluidos: un
+        tool_use fijado cuya respuesta salió con lo descartado no se envía sin pareja.
+
+        Returns:
+            Número de mensajes descartados
+        """
+        last_turn = None
+        for i, message in enumerate(self._recent):
+            if message.role == "user" and not message.answers_tool_use:
+                last_turn = i
+        if not last_turn:
+            return 0
+        for _ in range(last_turn):
+            self._evict(self._recent.popleft(), compact=True)
+        self._api_view = None
+        self.repair()
+        return last_turn
+
     def get_context(self) -> str:
         """
         Obtener contexto textual de la conversación
@@ -93,18 +532,19 @@ Recuerda que puedes acceder a información específica sobre eclipses solares, e
         Returns:
             Resumen del contexto actual
         """
-        if not self.messages:
+        if not len(self):
             return "Conversación iniciada"
         
-        # Contar mensajes por rol
-        user_msgs = len([m for m in self.messages if m["role"] == "user"])
-        assistant_msgs = len([m for m in self.messages if m["role"] == "assistant"])
+        # Contar mensajes por rol (los resultados de herramientas no son turnos del usuario)
+        user_msgs = sum(1 for m in self._iter_messages() if m.role == "user" and not m.is_tool_result)
+        assistant_msgs = sum(1 for m in self._iter_messages() if m.role == "assistant")
         
         # Obtener los últimos temas mencionados
         recent_content = []
-        for msg in self.messages[-6:]:  # Últimos 6 mensajes
-            content_preview = msg["content"][:50] + "..." if len(msg["content"]) > 50 else msg["content"]
-            recent_content.append(f"{msg['role']}: {content_preview}")
+        for msg in list(self._iter_messages())[-6:]:  # Últimos 6 mensajes
+            text = msg.text
+            content_preview = text[:50] + "..." if len(text) > 50 else text
+            recent_content.append(f"{msg.role}: {content_preview}")
         
         context_info = {
             "session_duration": str(datetime.now() - self.session_start),
@@ -117,39 +557,70 @@ Recuerda que puedes acceder a información específica sobre eclipses solares, e
     def search_context(self, keyword: str) -> List[Dict]:
         """
         Buscar mensajes que contengan una palabra clave
-        
+
+        Une la búsqueda por subcadena de siempre (también a mitad de palabra:
+        'lipse' → 'eclipse') con las coincidencias del índice (términos o
+        prefijos de palabra, sin distinguir acentos), en orden de la
+        conversación: nunca devuelve menos que la búsqueda por subcadena.
+
         Args:
             keyword: Palabra clave a buscar
             
         Returns:
             Lista de mensajes que contienen la palabra clave
         """
-        matching_messages = []
-        
-        for msg in self.messages:
-            if keyword.lower() in msg["content"].lower():
-                matching_messages.append(msg)
-        
-        return matching_messages
+        seqs = set(self._index.match(keyword))
+        seqs.update(msg.seq for msg in self._substring_matches(keyword))
+        return [self._by_seq[seq].to_dict() for seq in sorted(seqs)]
+
+    def _substring_matches(self, keyword: str) -> Iterator[Message]:
+        """Mensajes cuyo texto contiene `keyword` como subcadena (recorrido lineal)"""
+        keyword = keyword.lower()
+        return (msg for msg in self._iter_messages() if keyword in msg.text.lower())
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Búsqueda por relevancia en la ventana de la conversación
+
+        Args:
+            query: Uno o varios términos; cada uno coincide también como prefijo
+            limit: Máximo de resultados
+
+        Returns:
+            Mensajes ordenados por relevancia (BM25), con su puntaje en "score"
+        """
+        return [{**self._by_seq[seq].to_dict(), "score": round(score, 4)}
+                for seq, score in self._index.search(query, limit=limit)]
     
     def get_last_user_message(self) -> str:
-        """Obtener el último mensaje del usuario"""
-        for msg in reversed(self.messages):
-            if msg["role"] == "user":
-                return msg["content"]
+        """Obtener el último mensaje del usuario (texto, sin resultados de herramientas)"""
+        for msg in reversed(list(self._iter_messages())):
+            if msg.role == "user" and not msg.is_tool_result:
+                return msg.text
         return ""
     
     def get_last_assistant_message(self) -> str:
         """Obtener la última respuesta del asistente"""
-        for msg in reversed(self.messages):
-            if msg["role"] == "assistant":
-                return msg["content"]
+        for msg in reversed(list(self._iter_messages())):
+            if msg.role == "assistant" and msg.text:
+                return msg.text
         return ""
     
     def clear_conversation(self):
         """Limpiar el historial de conversación"""
-        self.messages = []
+        self._pinned = []
+        self._recent.clear()
+        self._needs_repair = False
+        self._index.clear()
+        self._by_seq.clear()
+        self._payloads.clear()
+        self._api_view = None
         self.session_start = datetime.now()
+        if self.compactor:
+            self.compactor.restore("")
+        if self.store:
+            self.store.append(self.session_id, {"type": RESET_MARKER, "timestamp": self.session_start.isoformat()})
+            self.save_snapshot()
     
     def export_conversation(self, filename: str = None) -> str:
         """
@@ -169,7 +640,7 @@ Recuerda que puedes acceder a información específica sobre eclipses solares, e
             "session_info": {
                 "start_time": self.session_start.isoformat(),
                 "export_time": datetime.now().isoformat(),
-                "total_messages": len(self.messages)
+                "total_messages": len(self)
             },
             "messages": self.messages
         }
@@ -184,17 +655,21 @@ Recuerda que puedes acceder a información específica sobre eclipses solares, e
     
     def get_conversation_stats(self) -> Dict[str, Any]:
         """Obtener estadísticas de la conversación"""
-        user_messages = [m for m in self.messages if m["role"] == "user"]
-        assistant_messages = [m for m in self.messages if m["role"] == "assistant"]
+        user_messages = [m for m in self._iter_messages() if m.role == "user" and not m.is_tool_result]
+        assistant_messages = [m for m in self._iter_messages() if m.role == "assistant"]
         
         stats = {
-            "total_messages": len(self.messages),
+            "total_messages": len(self),
             "user_messages": len(user_messages),
             "assistant_messages": len(assistant_messages),
             "session_duration": str(datetime.now() - self.session_start),
-            "avg_user_message_length": sum(len(m["content"]) for m in user_messages) / len(user_messages) if user_messages else 0,
-            "avg_assistant_message_length": sum(len(m["content"]) for m in assistant_messages) / len(assistant_messages) if assistant_messages else 0
+            "avg_user_message_length": sum(len(m.text) for m in user_messages) / len(user_messages) if user_messages else 0,
+            "avg_assistant_message_length": sum(len(m.text) for m in assistant_messages) / len(assistant_messages) if assistant_messages else 0
         }
+        stats["history"] = dict(self.history_stats)
+        stats["tool_results"] = {**self.dedupe_stats, "unique_payloads": len(self._payloads)}
+        if self.compactor:
+            stats["compaction"] = self.compactor.get_stats()
         
         return stats
     
@@ -206,13 +681,17 @@ Recuerda que puedes acceder a información específica sobre eclipses solares, e
             topic: Tema a verificar
             
         Returns:
-            True si hay contexto previo sobre el tema
+            True si hay contexto previo sobre el tema (por índice o, si no, por subcadena)
         """
-        for msg in self.messages:
-            if topic.lower() in msg["content"].lower():
-                return True
-        return False
+        return self._index.contains(topic) or next(self._substring_matches(topic), None) is not None
     
-    def reset(self):
-        """Reinicia la conversación. Alias para clear_conversation."""
+    def reset(self, malformed_history: bool = False):
+        """
+        Reinicia la conversación. Alias para clear_conversation.
+
+        Args:
+            malformed_history: Si el reinicio se debe a un historial que la API rechazó
+        """
+        if malformed_history:
+            self.history_stats["malformed_history_resets"] += 1
         self.clear_conversation()
\ No newline at end of file
@@ -0,0 +1,222 @@
+# chatbot/src/conversation_pool.py
+"""
+Pool de conversaciones activas con presupuesto global de memoria
+
+Cuando un proceso atiende a muchos usuarios, cada uno con su
+ConversationManager, el pool mantiene residentes sólo las conversaciones más
+recientes. Si la memoria estimada supera el presupuesto (o el máximo de
+conversaciones residentes), las menos usadas se vuelcan a snapshots
+comprimidos en disco en orden LRU y se rehidratan de forma transparente con
+el siguiente mensaje.
+
+El chatbot (main.py) guarda en un pool las conversaciones de una ejecución
+(`/session <id>`, `/new`). Los volcados van a su propio directorio, fuera
+del de sesiones, para no mezclarse con los journals.
+"""
+
+import json
+import os
+import time
+import zlib
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from context_compactor import ContextCompactor
+from conversation_manager import Content, ConversationManager
+from session_store import SessionStore
+
+DEFAULT_POOL_DIR = os.getenv("MCP_POOL_DIR", "conversation_pool")
+DEFAULT_MEMORY_BUDGET = int(os.getenv("MCP_POOL_MEMORY_MB", "64")) * 1024 * 1024
+
+
+class ConversationPool:
+    """Dueño de todas las conversaciones activas; vuelca a disco las inactivas (LRU)"""
+
+    def __init__(self, spill_dir: str = DEFAULT_POOL_DIR, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 max_resident: int = None, max_messages: int = 50, store: SessionStore = None,
+                 compactor_factory: Callable[[], ContextCompactor] = None, registry=None):
+        """
+        Args:
+            spill_dir: Directorio de los snapshots comprimidos de conversaciones inactivas
+            memory_budget: Bytes estimados que pueden ocupar las conversaciones residentes
+            max_resident: Máximo de conversaciones residentes (None = sin límite)
+            max_messages: Ventana de cada ConversationManager
+            store: SessionStore donde cada conversación registra su journal (opcional)
+            compactor_factory: Crea un ContextCompactor por conversación (opcional)
+            registry: metrics.Registry donde exportar las métricas del pool (opcional)
+        """
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_budget = memory_budget
+        self.max_resident = max_resident
+        self.max_messages = max_messages
+        self.store = store
+        self.compactor_factory = compactor_factory
+        # conversation_id → ConversationManager, del menos al más recientemente usado
+        self._resident: "OrderedDict[str, ConversationManager]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._resident_bytes = 0
+        self._spilled = {p.name[:-len(".json.z")] for p in self.spill_dir.glob("*.json.z")}
+        self._rehydrate_latencies = deque(maxlen=1000)
+        self.stats = {"spills": 0, "rehydrations": 0, "created": 0}
+
+        self._metrics = None
+        if registry is not None:
+            self._metrics = {
+                "resident": registry.gauge("conversation_pool_resident", "Conversaciones residentes en memoria"),
+                "spilled": registry.gauge("conversation_pool_spilled", "Conversaciones volcadas a disco"),
+                "bytes": registry.gauge("conversation_pool_resident_bytes", "Memoria estimada de las conversaciones residentes"),
+                "rehydrate": registry.histogram("conversation_pool_rehydrate_seconds", "Latencia de rehidratación desde disco"),
+            }
+            self._update_gauges()
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._resident or conversation_id in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._spilled)
+
+    def _spill_path(self, conversation_id: str) -> Path:
+        if not conversation_id or "/" in conversation_id or conversation_id.startswith("."):
+            raise ValueError(f"ID de conversación inválido: {conversation_id!r}")
+        return self.spill_dir / f"{conversation_id}.json.z"
+
+    def _new_conversation(self, conversation_id: str, state: Dict[str, Any] = None) -> ConversationManager:
+        compactor = self.compactor_factory() if self.compactor_factory else None
+        session_id = conversation_id if self.store else None
+        if state is None and self.store and self.store.exists(conversation_id):
+            # Sesión guardada en una ejecución anterior: se reanuda desde su journal
+            return ConversationManager.resume(conversation_id, self.store, self.max_messages, compactor=compactor)
+        if state is None:
+            return ConversationManager(self.max_messages, session_id=session_id, store=self.store, compactor=compactor)
+        return ConversationManager.from_state(state, self.max_messages, session_id=session_id,
+                                              store=self.store, compactor=compactor)
+
+    def get(self, conversation_id: str) -> ConversationManager:
+        """
+        Obtener una conversación, rehidratándola desde disco o creándola si no existe
+
+        La conversación pasa a ser la más recientemente usada.
+        """
+        conversation = self._resident.get(conversation_id)
+        if conversation is not None:
+            self._resident.move_to_end(conversation_id)
+            return conversation
+        if conversation_id in self._spilled:
+            conversation = self._rehydrate(conversation_id)
+        else:
+            self._spill_path(conversation_id)  # Valida el ID
+            conversation = self._new_conversation(conversation_id)
+            self.stats["created"] += 1
+        self._resident[conversation_id] = conversation
+        self._track(conversation_id)
+        self._enforce_budget(protect=conversation_id)
+        return conversation
+
+    def add_message(self, conversation_id: str, role: str, content: Content) -> ConversationManager:
+        """Agregar un mensaje a una conversación (rehidratándola si hace falta)"""
+        conversation = self.get(conversation_id)
+        conversation.add_message(role, content)
+        self._track(conversation_id)
+        self._enforce_budget(protect=conversation_id)
+        return conversation
+
+    def _track(self, conversation_id: str) -> None:
+        size = self._resident[conversation_id].memory_estimate()
+        self._resident_bytes += size - self._sizes.get(conversation_id, 0)
+        self._sizes[conversation_id] = size
+        self._update_gauges()
+
+    def _enforce_budget(self, protect: str = None) -> None:
+        """Volcar las conversaciones menos usadas hasta respetar el presupuesto"""
+        while self._resident and (self._resident_bytes > self.memory_budget
+                                  or (self.max_resident and len(self._resident) > self.max_resident)):
+            oldest = next(iter(self._resident))
+            if oldest == protect:
+                break  # La conversación en uso nunca se vuelca
+            self.spill(oldest)
+
+    def spill(self, conversation_id: str) -> None:
+        """Volcar una conversación residente a un snapshot comprimido en disco"""
+        conversation = self._resident.pop(conversation_id)
+        if conversation.compactor:
+            conversation.compactor.close()  # Espera los resúmenes en curso antes de guardar
+        raw = json.dumps(conversation.snapshot_state(), ensure_ascii=False, separators=(",", ":"), default=str)
+        path = self._spill_path(conversation_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(raw.encode("utf-8"), 6))
+        os.replace(tmp_path, path)  # Un snapshot nunca queda a medio escribir
+        if conversation.store:
+            conversation.save_snapshot()
+        self._resident_bytes -= self._sizes.pop(conversation_id, 0)
+        self._spilled.add(conversation_id)
+        self.stats["spills"] += 1
+        self._update_gauges()
+
+    def _rehydrate(self, conversation_id: str) -> ConversationManager:
+        started = time.perf_counter()
+        path = self._spill_path(conversation_id)
+        with open(path, "rb") as f:
+            state = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        conversation = self._new_conversation(conversation_id, state)
+        path.unlink()
+        self._spilled.discard(conversation_id)
+        elapsed = time.perf_counter() - started
+        self._rehydrate_latencies.append(elapsed)
+        self.stats["rehydrations"] += 1
+        if self._metrics:
+            self._metrics["rehydrate"].labels().observe(elapsed)
+        return conversation
+
+    def remove(self, conversation_id: str) -> None:
+        """Olvidar una conversación (residente o volcada)"""
+        conversation = self._resident.pop(conversation_id, None)
+        if conversation is not None and conversation.compactor:
+            conversation.compactor.close()
+        self._resident_bytes -= self._sizes.pop(conversation_id, 0)
+        if conversation_id in self._spilled:
+            self._spilled.discard(conversation_id)
+            self._spill_path(conversation_id).unlink(missing_ok=True)
+        self._update_gauges()
+
+    def spill_all(self) -> None:
+        """Volcar todas las conversaciones residentes (p. ej. al apagar el proceso)"""
+        for conversation_id in list(self._resident):
+            self.spill(conversation_id)
+
+    def close(self) -> None:
+        """
+        Cerrar el pool al salir: las conversaciones residentes con SessionStore
+        sólo guardan su snapshot de sesión (se reanudan desde ahí); las demás se vuelcan
+        """
+        for conversation_id in list(self._resident):
+            conversation = self._resident[conversation_id]
+            if not conversation.store:
+                self.spill(conversation_id)
+                continue
+            if conversation.compactor:
+                conversation.compactor.close()
+            conversation.save_snapshot()
+
+    def _update_gauges(self) -> None:
+        if self._metrics:
+            self._metrics["resident"].labels().set(len(self._resident))
+            self._metrics["spilled"].labels().set(len(self._spilled))
+            self._metrics["bytes"].labels().set(self._resident_bytes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Conversaciones residentes y volcadas, memoria estimada y latencia de rehidratación"""
+        latencies = sorted(self._rehydrate_latencies)
+        percentile = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000 if latencies else 0.0
+        return {
+            "resident": len(self._resident),
+            "spilled": len(self._spilled),
+            "resident_bytes": self._resident_bytes,
+            "memory_budget": self.memory_budget,
+            **self.stats,
+            "rehydrate_ms_p50": round(percentile(0.50), 3),
+            "rehydrate_ms_p95": round(percentile(0.95), 3),
+            "rehydrate_ms_max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        }
@@ -1,430 +1,715 @@
-#!/usr/bin/env python3
-"""
-Servidor MCP personalizado para cálculo de eclipses solares
-Funcionalidad no trivial: Calcula visibilidad, cobertura y tiempos de eclipses
-
-Especificación del servidor:
-- Nombre: Eclipse Calculator MCP
-- Funcionalidad: Cálculo de eclipses solares para ubicaciones específicas
-- Herramientas disponibles:
-  - calculate_eclipse_visibility: Calcula si un eclipse es visible desde una ubicación
-  - get_eclipse_path: Obtiene información del camino de totalidad
-  - predict_next_eclipse: Predice el próximo eclipse visible desde una ubicación
-"""
-
-import asyncio
-import json
-import sys
-from datetime import datetime, timedelta
-from typing import Any, Sequence
-from pathlib import Path
-
-# Importaciones MCP
-from mcp import types
-from mcp.server import NotificationOptions, Server
-from mcp.server.models import InitializationOptions
-from mcp.server.stdio import stdio_server
-
-# Datos de eclipses (normalmente vendría de una base de datos astronómica)
-ECLIPSES_DATA = {
-    "2024-04-08": {
-        "type": "solar_total",
-        "date": "2024-04-08",
-        "max_duration": "04:28",
-        "locations": {
-            "Guatemala City": {
-                "visible": True,
-                "partial": True,
-                "coverage": "65%",
-                "start_time": "12:34:00",
-                "max_time": "14:15:00",
-                "end_time": "15:45:00",
-                "magnitude": 0.65,
-                "obscuration": 0.52
-            },
-            "Mazatenango": {
-                "visible": True,
-                "partial": True,
-                "coverage": "72%",
-                "start_time": "12:32:00",
-                "max_time": "14:13:00",
-                "end_time": "15:43:00",
-                "magnitude": 0.72,
-                "obscuration": 0.61
-            },
-            "Quetzaltenango": {
-                "visible": True,
-                "partial": True,
-                "coverage": "70%",
-                "start_time": "12:35:00",
-                "max_time": "14:16:00",
-                "end_time": "15:46:00",
-                "magnitude": 0.70,
-                "obscuration": 0.58
-            }
-        },
-        "path_totality": [
-            {"lat": 25.295, "lng": -109.077, "duration": "04:20"},
-            {"lat": 25.776, "lng": -108.567, "duration": "04:25"},
-            {"lat": 32.749, "lng": -103.793, "duration": "04:13"}
-        ]
-    },
-    "2030-06-01": {
-        "type": "solar_annular",
-        "date": "2030-06-01",
-        "max_duration": "05:21",
-        "locations": {
-            "Guatemala City": {
-                "visible": True,
-                "partial": True,
-                "coverage": "45%",
-                "start_time": "11:23:00",
-                "max_time": "12:45:00",
-                "end_time": "14:12:00",
-                "magnitude": 0.45,
-                "obscuration": 0.32
-            }
-        }
-    },
-    "2044-08-12": {
-        "type": "solar_total",
-        "date": "2044-08-12",
-        "max_duration": "04:09",
-        "locations": {
-            "Guatemala City": {
-                "visible": True,
-                "partial": True,
-                "coverage": "89%",
-                "start_time": "15:45:00",
-                "max_time": "17:23:00",
-                "end_time": "18:54:00",
-                "magnitude": 0.89,
-                "obscuration": 0.82
-            }
-        }
-    }
-}
-
-class EclipseCalculatorServer:
-    """Servidor MCP para cálculo de eclipses solares"""
-    
-    def __init__(self):
-        self.server = Server("eclipse-calculator")
-    
-    async def calculate_eclipse_visibility(self, date: str, location: str) -> dict:
-        """
-        Calcular visibilidad de eclipse para una fecha y ubicación
-        
-        Args:
-            date: Fecha en formato YYYY-MM-DD
-            location: Nombre de la ubicación
-            
-        Returns:
-            Información detallada del eclipse
-        """
-        # Buscar datos del eclipse
-        eclipse_data = ECLIPSES_DATA.get(date)
-        
-        if not eclipse_data:
-            return {
-                "date": date,
-                "location": location,
-                "visible": False,
-                "reason": "No eclipse data available for this date",
-                "suggestion": f"Try dates: {', '.join(ECLIPSES_DATA.keys())}"
-            }
-        
-        # Buscar ubicación
-        location_data = eclipse_data["locations"].get(location)
-        
-        if not location_data:
-            available_locations = list(eclipse_data["locations"].keys())
-            return {
-                "date": date,
-                "location": location,
-                "visible": False,
-                "reason": "Location not in database",
-                "available_locations": available_locations,
-                "suggestion": f"Try: {', '.join(available_locations)}"
-            }
-        
-        # Calcular información adicional
-        result = {
-            "date": date,
-            "location": location,
-            "eclipse_type": eclipse_data["type"],
-            "visible": location_data["visible"],
-            "is_partial": location_data.get("partial", False),
-            "coverage": location_data.get("coverage"),
-            "magnitude": location_data.get("magnitude"),
-            "obscuration": location_data.get("obscuration"),
-            "times": {
-                "start": location_data.get("start_time"),
-                "maximum": location_data.get("max_time"),
-                "end": location_data.get("end_time")
-            },
-            "duration_at_location": self._calculate_duration(
-                location_data.get("start_time"),
-                location_data.get("end_time")
-            ),
-            "max_duration_global": eclipse_data.get("max_duration"),
-            "safety_advice": self._get_safety_advice(eclipse_data["type"])
-        }
-        
-        return result
-    
-    def _calculate_duration(self, start_time: str, end_time: str) -> str:
-        """Calcular duración del eclipse en la ubicación"""
-        if not start_time or not end_time:
-            return "N/A"
-        
-        try:
-            start = datetime.strptime(start_time, "%H:%M:%S")
-            end = datetime.strptime(end_time, "%H:%M:%S")
-            duration = end - start
-            
-            hours = duration.seconds // 3600
-            minutes = (duration.seconds % 3600) // 60
-            
-            return f"{hours:02d}:{minutes:02d}"
-        except:
-            return "N/A"
-    
-    def _get_safety_advice(self, eclipse_type: str) -> list:
-        """Obtener consejos de seguridad para observación"""
-        base_advice = [
-            "NUNCA mire directamente al Sol sin protección adecuada",
-            "Use filtros solares certificados ISO 12312-2",
-            "Los lentes de sol comunes NO son suficientes",
-            "Supervise siempre a los niños durante la observación"
-        ]
-        
-        if "total" in eclipse_type:
-            base_advice.append("Durante la totalidad es seguro mirar sin filtro POR UNOS SEGUNDOS")
-            base_advice.append("Vuelva a usar filtros cuando termine la totalidad")
-        
-        return base_advice
-    
-    async def get_eclipse_path(self, date: str) -> dict:
-        """
-        Obtener información del camino de totalidad/anularidad
-        
-        Args:
-            date: Fecha del eclipse
-            
-        Returns:
-            Información del camino del eclipse
-        """
-        eclipse_data = ECLIPSES_DATA.get(date)
-        
-        if not eclipse_data:
-            return {
-                "date": date,
-                "error": "Eclipse data not available",
-                "available_dates": list(ECLIPSES_DATA.keys())
-            }
-        
-        return {
-            "date": date,
-            "eclipse_type": eclipse_data["type"],
-            "max_duration": eclipse_data.get("max_duration"),
-            "path_points": eclipse_data.get("path_totality", []),
-            "total_path_length": len(eclipse_data.get("path_totality", [])),
-            "coverage_info": f"Path covers {len(eclipse_data.get('locations', {}))} major cities"
-        }
-    
-    async def predict_next_eclipse(self, location: str, after_date: str = None) -> dict:
-        """
-        Predecir el próximo eclipse visible desde una ubicación
-        
-        Args:
-            location: Ubicación de interés
-            after_date: Fecha después de la cual buscar (opcional)
-            
-        Returns:
-            Información del próximo eclipse
-        """
-        if not after_date:
-            after_date = datetime.now().strftime("%Y-%m-%d")
-        
-        # Buscar eclipses futuros para la ubicación
-        future_eclipses = []
-        
-        for date, eclipse_data in ECLIPSES_DATA.items():
-            if date > after_date:
-                location_data = eclipse_data["locations"].get(location)
-                if location_data and location_data.get("visible"):
-                    future_eclipses.append({
-                        "date": date,
-                        "type": eclipse_data["type"],
-                        "coverage": location_data.get("coverage"),
-                        "magnitude": location_data.get("magnitude")
-                    })
-        
-        if not future_eclipses:
-            return {
-                "location": location,
-                "message": "No upcoming eclipses found in database",
-                "suggestion": "Check back later or try a different location"
-            }
-        
-        # Ordenar por fecha y tomar el primero
-        future_eclipses.sort(key=lambda x: x["date"])
-        next_eclipse = future_eclipses[0]
-        
-        return {
-            "location": location,
-            "next_eclipse": next_eclipse,
-            "years_to_wait": (datetime.strptime(next_eclipse["date"], "%Y-%m-%d") - 
-                            datetime.strptime(after_date, "%Y-%m-%d")).days / 365.25,
-            "all_future_eclipses": future_eclipses
-        }
-    
-    def setup_handlers(self):
-        """Configurar los handlers MCP"""
-        
-        @self.server.list_tools()
-        async def handle_list_tools() -> list[types.Tool]:
-            """Listar herramientas disponibles"""
-            return [
-                types.Tool(
-                    name="calculate_eclipse_visibility",
-                    description="Calculate solar eclipse visibility for a specific date and location",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "date": {
-                                "type": "string",
-                                "description": "Date in YYYY-MM-DD format",
-                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
-                            },
-                            "location": {
-                                "type": "string",
-                                "description": "Location name (e.g., 'Guatemala City')"
-                            }
-                        },
-                        "required": ["date", "location"]
-                    }
-                ),
-                types.Tool(
-                    name="get_eclipse_path",
-                    description="Get eclipse path information including totality/annularity track",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "date": {
-                                "type": "string",
-                                "description": "Date in YYYY-MM-DD format",
-                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
-                            }
-                        },
-                        "required": ["date"]
-                    }
-                ),
-                types.Tool(
-                    name="predict_next_eclipse",
-                    description="Predict next visible eclipse for a location",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "Location name"
-                            },
-                            "after_date": {
-                                "type": "string",
-                                "description": "Find eclipses after this date (optional, defaults to today)",
-                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
-                            }
-                        },
-                        "required": ["location"]
-                    }
-                )
-            ]
-        
-        @self.server.call_tool()
-        async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent]:
-            """Manejar llamadas a herramientas"""
-            
-            if name == "calculate_eclipse_visibility":
-                date = arguments.get("date")
-                location = arguments.get("location")
-                
-                if not date or not location:
-                    return [types.TextContent(
-                        type="text",
-                        text="Error: Both date and location are required"
-                    )]
-                
-                result = await self.calculate_eclipse_visibility(date, location)
-                
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2, ensure_ascii=False)
-                )]
-            
-            elif name == "get_eclipse_path":
-                date = arguments.get("date")
-                
-                if not date:
-                    return [types.TextContent(
-                        type="text",
-                        text="Error: Date is required"
-                    )]
-                
-                result = await self.get_eclipse_path(date)
-                
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2, ensure_ascii=False)
-                )]
-            
-            elif name == "predict_next_eclipse":
-                location = arguments.get("location")
-                after_date = arguments.get("after_date")
-                
-                if not location:
-                    return [types.TextContent(
-                        type="text",
-                        text="Error: Location is required"
-                    )]
-                
-                result = await self.predict_next_eclipse(location, after_date)
-                
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2, ensure_ascii=False)
-                )]
-            
-            else:
-                return [types.TextContent(
-                    type="text",
-                    text=f"Error: Unknown tool '{name}'"
-                )]
-
-async def main():
-    """Función principal del servidor"""
-    server_instance = EclipseCalculatorServer()
-    server_instance.setup_handlers()
-    
-    # Opciones de inicialización
-    init_options = InitializationOptions(
-        server_name="eclipse-calculator",
-        server_version="1.0.0",
-        capabilities=server_instance.server.get_capabilities(
-            notification_options=NotificationOptions(),
-            experimental_capabilities={},
-        ),
-    )
-    
-    # Ejecutar servidor stdio
-    async with stdio_server() as (read_stream, write_stream):
-        await server_instance.server.run(
-            read_stream,
-            write_stream,
-            init_options
-        )
-
-if __name__ == "__main__":
-    print("🌒 Starting Eclipse Calculator MCP Server...", file=sys.stderr)
+#!/usr/bin/env python3
+"""
+Servidor MCP personalizado para cálculo de eclipses solares
+Funcionalidad no trivial: Calcula visibilidad, cobertura y tiempos de eclipses
+
+Especificación del servidor:
+- Nombre: Eclipse Calculator MCP
+- Funcionalidad: Cálculo de eclipses solares para ubicaciones específicas
+- Herramientas disponibles:
+  - calculate_eclipse_visibility: Calcula si un eclipse es visible desde una ubicación
+  - calculate_eclipse_visibility_batch: Lo mismo para listas de fechas y ubicaciones en una llamada
+  - get_eclipse_path: Calcula la franja de totalidad/anularidad (línea central y límites)
+  - get_visibility_map: Ráster de oscurecimiento máximo para una región
+  - predict_next_eclipse: Predice el próximo eclipse visible desde una ubicación
+  - list_saros_series: Miembros de una serie Saros
+  - next_saros_member_visible: Próximo miembro de una serie Saros visible desde una ubicación
+  - find_best_eclipse: Mejores eclipses solares a menos de un radio de una ubicación
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+from pathlib import Path
+
+# Importaciones MCP
+from mcp import types
+from mcp.server import NotificationOptions, Server
+from mcp.server.models import InitializationOptions
+from mcp.server.stdio import stdio_server
+
+# Módulos compartidos con el servidor remoto (catálogo de eclipses, elementos besselianos)
+import shared_modules  # noqa: F401  (añade eclipse-mcp-remote a sys.path)
+from best_eclipse import find_best_eclipse
+from eclipse_batch import visibility_batch
+from eclipse_path import eclipse_path
+from eclipse_queries import DEFAULT_NEXT_LIMIT, eclipse_visibility, next_eclipses
+from eclipse_store import get_store
+from gazetteer import get_gazetteer
+from response_cache import InputValidators, ResponseCache, response_key
+from saros import next_visible_member, series_members
+from visibility_map import visibility_map
+
+# Catálogo compartido con los demás servidores, cargado e indexado una vez por proceso
+ECLIPSES = get_store()
+# Gazetteer offline para resolver nombres de ubicación aproximados a coordenadas
+GAZETTEER = get_gazetteer()
+# Respuestas serializadas (JSON compacto) de las consultas estáticas, memoizadas por argumentos
+RESPONSES = ResponseCache()
+
+class EclipseCalculatorServer:
+    """Servidor MCP para cálculo de eclipses solares"""
+    
+    def __init__(self):
+        self.server = Server("eclipse-calculator")
+        self.validators = None  # InputValidators de list_tools, compilados en la primera llamada que calcula
+    
+    async def calculate_eclipse_visibility(self, date: str, location: str = None, latitude: float = None,
+                                           longitude: float = None, elevation: float = 0.0) -> dict:
+        """
+        Calcular visibilidad de eclipse para una fecha y ubicación
+        
+        Args:
+            date: Fecha en formato YYYY-MM-DD
+            location: Nombre de la ubicación
+            latitude, longitude: Coordenadas en grados (este positivo); si se indican,
+                las circunstancias se calculan (elementos besselianos en eclipses
+                solares, contactos y altura de la Luna en lunares)
+            elevation: Altura del observador en metros
+            
+        Returns:
+            Información detallada del eclipse
+        """
+        result = eclipse_visibility(ECLIPSES, GAZETTEER, date, location, latitude, longitude, elevation)
+        if "error" not in result:
+            result["safety_advice"] = self._get_safety_advice(result["eclipse_type"])
+        return result
+    
+    def _get_safety_advice(self, eclipse_type: str) -> list:
+        """Obtener consejos de seguridad para observación"""
+        base_advice = [
+            "NUNCA mire directamente al Sol sin protección adecuada",
+            "Use filtros solares certificados ISO 12312-2",
+            "Los lentes de sol comunes NO son suficientes",
+            "Supervise siempre a los niños durante la observación"
+        ]
+        
+        if "total" in eclipse_type:
+            base_advice.append("Durante la totalidad es seguro mirar sin filtro POR UNOS SEGUNDOS")
+            base_advice.append("Vuelva a usar filtros cuando termine la totalidad")
+        
+        return base_advice
+    
+    async def get_eclipse_path(self, date: str, resolution_km: float = 1.0, tolerance_km: float = 1.0,
+                               encoding: str = "points") -> dict:
+        """
+        Obtener información del camino de totalidad/anularidad
+        
+        Args:
+            date: Fecha del eclipse
+            resolution_km: Error máximo del muestreo adaptativo de la franja
+            tolerance_km: Tolerancia de simplificación (0 = sin simplificar)
+            encoding: "points" o "polyline" (polilíneas codificadas)
+            
+        Returns:
+            Información del camino del eclipse; en eclipses solares centrales,
+            la franja calculada en "path" (ver eclipse_path.eclipse_path)
+        """
+        eclipse_data = ECLIPSES.get(date)
+        
+        if not eclipse_data:
+            return {
+                "date": date,
+                "error": "Eclipse data not available",
+                "available_dates": ECLIPSES.nearest(date)
+            }
+        
+        if encoding not in ("points", "polyline"):
+            return {"error": "encoding must be 'points' or 'polyline'"}
+        
+        path_key = "path_totality" if "total" in eclipse_data["type"] else "path_annularity"
+        result = {
+            "date": date,
+            "eclipse_type": eclipse_data["type"],
+            "max_duration": eclipse_data.get("max_duration"),
+            "path_points": eclipse_data.get(path_key, []),
+            "total_path_length": len(eclipse_data.get(path_key, [])),
+            "coverage_info": f"Path covers {len(eclipse_data.get('locations', {}))} major cities"
+        }
+        if eclipse_data["type"].startswith("solar"):
+            path = eclipse_path(date, float(resolution_km), float(tolerance_km), encoding)
+            if "error" in path:
+                result["path_note"] = path["error"]
+            else:
+                path.pop("date")
+                result["path"] = path
+        return result
+    
+    async def calculate_eclipse_visibility_batch(self, dates: list, locations: list) -> dict:
+        """
+        Calcular visibilidad para todas las combinaciones fecha × ubicación
+        
+        Args:
+            dates: Fechas en formato YYYY-MM-DD
+            locations: Nombres de ubicación o dicts con latitude/longitude
+            
+        Returns:
+            Resultado columnar (ver eclipse_batch.visibility_batch)
+        """
+        return visibility_batch(dates, locations, ECLIPSES, GAZETTEER)
+    
+    async def get_visibility_map(self, date: str, resolution: float = 1.0, lat_min: float = -90.0,
+                                 lat_max: float = 90.0, lon_min: float = -180.0, lon_max: float = 180.0,
+                                 include_raster: bool = True) -> dict:
+        """
+        Obtener el ráster de oscurecimiento máximo de un eclipse solar
+        
+        Args:
+            date: Fecha en formato YYYY-MM-DD
+            resolution: Tamaño de celda en grados
+            lat_min, lat_max, lon_min, lon_max: Región (lon_min > lon_max cruza el antimeridiano)
+            include_raster: Incluir el ráster en base64 además del resumen
+            
+        Returns:
+            Rejilla, resumen y estado de la caché de teselas
+        """
+        eclipse_data = ECLIPSES.get(date)
+        if not eclipse_data or not eclipse_data["type"].startswith("solar"):
+            return {"error": "No solar eclipse data for this date", "available_dates": ECLIPSES.nearest(date)}
+        return visibility_map(date, float(resolution), float(lat_min), float(lat_max), float(lon_min),
+                              float(lon_max), bool(include_raster))
+    
+    async def predict_next_eclipse(self, location: str, after_date: str = None, before_date: str = None,
+                                   limit: int = None) -> dict:
+        """
+        Predecir el próximo eclipse visible desde una ubicación
+        
+        Args:
+            location: Ubicación de interés
+            after_date: Fecha después de la cual buscar (opcional)
+            before_date: Fecha antes de la cual buscar (opcional)
+            limit: Máximo de eclipses futuros a listar (por defecto 5)
+            
+        Returns:
+            Información del próximo eclipse
+        """
+        return next_eclipses(ECLIPSES, GAZETTEER, location, after_date, before_date, limit or DEFAULT_NEXT_LIMIT)
+    
+    async def list_saros_series(self, saros: int = None, date: str = None, kind: str = "solar") -> dict:
+        """
+        Listar los miembros de una serie Saros presentes en el catálogo
+        
+        Args:
+            saros: Número de la serie (con kind)
+            date: Fecha de un eclipse de la serie, en lugar de saros
+            kind: "solar" o "lunar"
+            
+        Returns:
+            Miembros de la serie y, con date, sus vecinos
+        """
+        return series_members(ECLIPSES, saros, date, kind)
+    
+    async def next_saros_member_visible(self, location, saros: int = None, date: str = None, kind: str = "solar",
+                                        after_date: str = None) -> dict:
+        """
+        Próximo miembro de una serie Saros visible desde una ubicación
+        
+        Args:
+            location: Nombre o dict con latitude/longitude
+            saros, date, kind: Serie, como en list_saros_series
+            after_date: Fecha después de la cual buscar (opcional, por defecto hoy)
+            
+        Returns:
+            Primer miembro visible y los miembros descartados antes
+        """
+        return next_visible_member(ECLIPSES, GAZETTEER, location, saros, date, kind, after_date)
+    
+    async def find_best_eclipse(self, location, radius_km: float = 500.0, years: float = 10.0, after_date: str = None,
+                                eclipse_type: str = "any", limit: int = 5) -> dict:
+        """
+        Mejores eclipses solares alcanzables a menos de un radio de una ubicación
+        
+        Args:
+            location: Nombre o dict con latitude/longitude
+            radius_km: Distancia máxima al punto de observación
+            years: Longitud de la ventana en años desde after_date
+            after_date: Fecha de inicio (opcional, por defecto hoy)
+            eclipse_type: "any", "total", "annular" o "central"
+            limit: Número de eclipses devueltos
+            
+        Returns:
+            Mejor punto de cada eclipse, ordenados por oscurecimiento, duración central y altura del Sol
+        """
+        return find_best_eclipse(ECLIPSES, GAZETTEER, location, float(radius_km), float(years), after_date,
+                                 eclipse_type, int(limit))
+    
+    def setup_handlers(self):
+        """Configurar los handlers MCP"""
+        
+        @self.server.list_tools()
+        async def handle_list_tools() -> list[types.Tool]:
+            """Listar herramientas disponibles"""
+            return [
+                types.Tool(
+                    name="calculate_eclipse_visibility",
+                    description="Calculate solar or lunar eclipse visibility for a specific date and location",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "date": {
+                                "type": "string",
+                                "description": "Date in YYYY-MM-DD format",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            },
+                            "location": {
+                                "type": "string",
+                                "description": "Location name (e.g., 'Guatemala City')"
+                            },
+                            "latitude": {
+                                "type": "number",
+                                "minimum": -90,
+                                "maximum": 90,
+                                "description": "Observer latitude in degrees (use with longitude instead of location)"
+                            },
+                            "longitude": {
+                                "type": "number",
+                                "minimum": -180,
+                                "maximum": 180,
+                                "description": "Observer longitude in degrees, east positive"
+                            },
+                            "elevation": {
+                                "type": "number",
+                                "description": "Observer elevation in meters (optional)"
+                            }
+                        },
+                        "required": ["date"]
+                    }
+                ),
+                types.Tool(
+                    name="calculate_eclipse_visibility_batch",
+                    description="Calculate solar eclipse visibility for every date x location pair in one call (columnar result)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "dates": {
+                                "type": "array",
+                                "items": {"type": "string", "pattern": r"^\d{4}-\d{2}-\d{2}$"},
+                                "description": "Dates in YYYY-MM-DD format"
+                            },
+                            "locations": {
+                                "type": "array",
+                                "description": "Location names or {latitude, longitude[, name, elevation]} objects",
+                                "items": {
+                                    "anyOf": [
+                                        {"type": "string"},
+                                        {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {"type": "string"},
+                                                "latitude": {"type": "number", "minimum": -90, "maximum": 90},
+                                                "longitude": {"type": "number", "minimum": -180, "maximum": 180},
+                                                "elevation": {"type": "number"}
+                                            }
+                                        }
+                                    ]
+                                }
+                            }
+                        },
+                        "required": ["dates", "locations"]
+                    }
+                ),
+                types.Tool(
+                    name="get_eclipse_path",
+                    description="Get the totality/annularity path (centerline, northern and southern limits) computed from Besselian elements",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "date": {
+                                "type": "string",
+                                "description": "Date in YYYY-MM-DD format",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            },
+                            "resolution_km": {
+                                "type": "number",
+                                "description": "Maximum sampling error of the path in km (0.05-100, default 1)"
+                            },
+                            "tolerance_km": {
+                                "type": "number",
+                                "description": "Simplification tolerance in km (0 = none, default 1)"
+                            },
+                            "encoding": {
+                                "type": "string",
+                                "enum": ["points", "polyline"],
+                                "description": "Point lists or encoded polylines (default points)"
+                            }
+                        },
+                        "required": ["date"]
+                    }
+                ),
+                types.Tool(
+                    name="get_visibility_map",
+                    description="Get a lat/lon raster of maximum obscuration for a solar eclipse and region (cached tiles)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "date": {"type": "string", "description": "Solar eclipse date YYYY-MM-DD"},
+                            "resolution": {"type": "number", "description": "Cell size in degrees (0.05-5, default 1)"},
+                            "lat_min": {"type": "number", "description": "Region south edge (default -90)"},
+                            "lat_max": {"type": "number", "description": "Region north edge (default 90)"},
+                            "lon_min": {"type": "number", "description": "Region west edge (default -180)"},
+                            "lon_max": {"type": "number", "description": "Region east edge (default 180; lon_min > lon_max crosses 180°)"},
+                            "include_raster": {"type": "boolean", "description": "Include the base64 uint8 raster (default true)"}
+                        },
+                        "required": ["date"]
+                    }
+                ),
+                types.Tool(
+                    name="predict_next_eclipse",
+                    description="Predict next visible eclipse for a location",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "location": {
+                                "type": "string",
+                                "description": "Location name"
+                            },
+                            "after_date": {
+                                "type": "string",
+                                "description": "Find eclipses after this date (optional, defaults to today)",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            },
+                            "before_date": {
+                                "type": "string",
+                                "description": "Only eclipses before this date (optional)",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of future eclipses to list (default 5)"
+                            }
+                        },
+                        "required": ["location"]
+                    }
+                ),
+                types.Tool(
+                    name="list_saros_series",
+                    description="List the eclipses of a Saros series, by series number or by the date of one member",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "saros": {
+                                "type": "integer",
+                                "description": "Saros series number (use with kind)"
+                            },
+                            "kind": {
+                                "type": "string",
+                                "enum": ["solar", "lunar"],
+                                "description": "Series kind (default solar)"
+                            },
+                            "date": {
+                                "type": "string",
+                                "description": "Date of an eclipse in the series, instead of saros",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="next_saros_member_visible",
+                    description="Find the next eclipse of a Saros series visible from a location",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "location": {
+                                "type": "string",
+                                "description": "Location name"
+                            },
+                            "latitude": {
+                                "type": "number",
+                                "minimum": -90,
+                                "maximum": 90,
+                                "description": "Observer latitude in degrees (use with longitude instead of location)"
+                            },
+                            "longitude": {
+                                "type": "number",
+                                "minimum": -180,
+                                "maximum": 180,
+                                "description": "Observer longitude in degrees, east positive"
+                            },
+                            "saros": {
+                                "type": "integer",
+                                "description": "Saros series number (use with kind)"
+                            },
+                            "kind": {
+                                "type": "string",
+                                "enum": ["solar", "lunar"],
+                                "description": "Series kind (default solar)"
+                            },
+                            "date": {
+                                "type": "string",
+                                "description": "Date of an eclipse in the series, instead of saros",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            },
+                            "after_date": {
+                                "type": "string",
+                                "description": "Find members after this date (optional, defaults to today)",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="find_best_eclipse",
+                    description="Find the best solar eclipses within a radius of a location in a window of years, "
+                                "ranked by obscuration, central duration and sun altitude",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "location": {
+                                "type": "string",
+                                "description": "Location name"
+                            },
+                            "latitude": {
+                                "type": "number",
+                                "minimum": -90,
+                                "maximum": 90,
+                                "description": "Observer latitude in degrees (use with longitude instead of location)"
+                            },
+                            "longitude": {
+                                "type": "number",
+                                "minimum": -180,
+                                "maximum": 180,
+                                "description": "Observer longitude in degrees, east positive"
+                            },
+                            "radius_km": {
+                                "type": "number",
+                                "description": "Maximum distance to the observing spot in km (default 500)",
+                                "minimum": 0,
+                                "maximum": 5000
+                            },
+                            "years": {
+                                "type": "number",
+                                "description": "Window length in years (default 10)",
+                                "minimum": 0,
+                                "maximum": 200
+                            },
+                            "after_date": {
+                                "type": "string",
+                                "description": "Search after this date (optional, defaults to today)",
+                                "pattern": r"^\d{4}-\d{2}-\d{2}$"
+                            },
+                            "eclipse_type": {
+                                "type": "string",
+                                "enum": ["any", "total", "annular", "central"],
+                                "description": "Only eclipses seen as this type at the spot (default any)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Number of eclipses returned (default 5)",
+                                "minimum": 1
+                            }
+                        }
+                    }
+                )
+            ]
+        
+        @self.server.call_tool(validate_input=False)
+        async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent]:
+            """Manejar llamadas a herramientas"""
+            
+            # Consultas estáticas ya respondidas: la respuesta serializada sale de la caché
+            key = response_key(name, arguments)
+            cached = RESPONSES.get(key)
+            if cached is not None:
+                return [types.TextContent(type="text", text=cached)]
+            
+            if self.validators is None:
+                self.validators = InputValidators(await handle_list_tools())
+            error = self.validators.error(name, arguments)
+            if error:
+                return types.CallToolResult(content=[types.TextContent(type="text", text=error)], isError=True)
+            
+            if name == "calculate_eclipse_visibility":
+                date = arguments.get("date")
+                location = arguments.get("location")
+                latitude, longitude = arguments.get("latitude"), arguments.get("longitude")
+                has_coordinates = latitude is not None and longitude is not None
+                
+                if not date or not (location or has_coordinates):
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: date and either location or latitude/longitude are required"
+                    )]
+                
+                result = await self.calculate_eclipse_visibility(
+                    date, location,
+                    float(latitude) if has_coordinates else None,
+                    float(longitude) if has_coordinates else None,
+                    float(arguments.get("elevation") or 0.0)
+                )
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "calculate_eclipse_visibility_batch":
+                dates = arguments.get("dates")
+                locations = arguments.get("locations")
+                
+                if not dates or not locations:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: dates and locations lists are required"
+                    )]
+                
+                result = await self.calculate_eclipse_visibility_batch(dates, locations)
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "get_eclipse_path":
+                date = arguments.get("date")
+                
+                if not date:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: Date is required"
+                    )]
+                
+                result = await self.get_eclipse_path(
+                    date, arguments.get("resolution_km") or 1.0, arguments.get("tolerance_km", 1.0),
+                    arguments.get("encoding") or "points"
+                )
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "get_visibility_map":
+                date = arguments.get("date")
+                
+                if not date:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: Date is required"
+                    )]
+                
+                result = await self.get_visibility_map(
+                    date, arguments.get("resolution") or 1.0,
+                    arguments.get("lat_min", -90.0), arguments.get("lat_max", 90.0),
+                    arguments.get("lon_min", -180.0), arguments.get("lon_max", 180.0),
+                    arguments.get("include_raster", True)
+                )
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "predict_next_eclipse":
+                location = arguments.get("location")
+                after_date = arguments.get("after_date")
+                before_date = arguments.get("before_date")
+                limit = arguments.get("limit")
+                
+                if not location:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: Location is required"
+                    )]
+                
+                result = await self.predict_next_eclipse(location, after_date, before_date, limit)
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "list_saros_series":
+                saros = arguments.get("saros")
+                date = arguments.get("date")
+                
+                if saros is None and not date:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: saros or date is required"
+                    )]
+                
+                result = await self.list_saros_series(saros, date, arguments.get("kind") or "solar")
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "next_saros_member_visible":
+                location = arguments.get("location")
+                latitude, longitude = arguments.get("latitude"), arguments.get("longitude")
+                if latitude is not None and longitude is not None:
+                    location = {"name": location, "latitude": float(latitude), "longitude": float(longitude)}
+                
+                if not location or (arguments.get("saros") is None and not arguments.get("date")):
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: location (or latitude/longitude) and saros or date are required"
+                    )]
+                
+                result = await self.next_saros_member_visible(
+                    location, arguments.get("saros"), arguments.get("date"),
+                    arguments.get("kind") or "solar", arguments.get("after_date")
+                )
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            elif name == "find_best_eclipse":
+                location = arguments.get("location")
+                latitude, longitude = arguments.get("latitude"), arguments.get("longitude")
+                if latitude is not None and longitude is not None:
+                    location = {"name": location, "latitude": float(latitude), "longitude": float(longitude)}
+                
+                if not location:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: location (or latitude/longitude) is required"
+                    )]
+                
+                result = await self.find_best_eclipse(
+                    location, arguments.get("radius_km") or 500.0, arguments.get("years") or 10.0,
+                    arguments.get("after_date"), arguments.get("eclipse_type") or "any", arguments.get("limit") or 5
+                )
+                
+                return [types.TextContent(
+                    type="text",
+                    text=RESPONSES.store(key, result)
+                )]
+            
+            else:
+                return [types.TextContent(
+                    type="text",
+                    text=f"Error: Unknown tool '{name}'"
+                )]
+
+async def main():
+    """Función principal del servidor"""
+    server_instance = EclipseCalculatorServer()
+    server_instance.setup_handlers()
+    
+    # Opciones de inicialización
+    init_options = InitializationOptions(
+        server_name="eclipse-calculator",
+        server_version="1.0.0",
+        capabilities=server_instance.server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+    
+    # Ejecutar servidor stdio
+    async with stdio_server() as (read_stream, write_stream):
+        await server_instance.server.run(
+            read_stream,
+            write_stream,
+            init_options
+        )
+
+if __name__ == "__main__":
+    print("🌒 Starting Eclipse Calculator MCP Server...", file=sys.stderr)
     asyncio.run(main())
\ No newline at end of file
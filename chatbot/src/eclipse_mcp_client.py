@@ -1,6 +1,11 @@
 # eclipse_mcp_client.py
 """
 Cliente MCP para conectar con el servidor Eclipse Calculator (DB Version)
+
+Con `keep_open=True` el subproceso del servidor se arranca en el primer
+`async with` y se reutiliza en los siguientes hasta `close()`: así su caché de
+respuestas (`response_cache`) sobrevive entre llamadas a herramientas. Sin
+él, cada `async with` arranca y cierra su propio servidor.
 """
 
 import asyncio
@@ -9,41 +14,98 @@ import sys
 from pathlib import Path
 from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp.client.stdio import stdio_client, get_default_environment
+
+from shared_modules import get_tracer, inject, trace_environment, SPAN_KIND_CLIENT
+
+tracer = get_tracer("mcp-chatbot")
 
 def content_text(resp) -> str:
     return resp.content[0].text if resp.content and resp.content[0].type == "text" else "{}"
 
 class EclipseMCPClient:
-    def __init__(self):
+    def __init__(self, keep_open: bool = False):
         self.server_path = Path(__file__).parent / "eclipse_mcp_server.py"
-        self.server_params = StdioServerParameters(command=sys.executable, args=[str(self.server_path)])
+        self.server_params = StdioServerParameters(
+            command=sys.executable,
+            args=[str(self.server_path)],
+            env={**get_default_environment(), **trace_environment()},
+        )
+        self.keep_open = keep_open
         self.stack = AsyncExitStack()
         self.session = None
 
+    async def connect(self):
+        """Arrancar el servidor e inicializar la sesión, si no está ya abierta"""
+        if self.session is None:
+            read, write = await self.stack.enter_async_context(stdio_client(self.server_params))
+            self.session = await self.stack.enter_async_context(ClientSession(read, write))
+            await self.session.initialize()
+
+    async def close(self):
+        """Cerrar la sesión y el subproceso del servidor"""
+        self.session = None
+        await self.stack.aclose()
+
     async def __aenter__(self):
-        read, write = await self.stack.enter_async_context(stdio_client(self.server_params))
-        self.session = await self.stack.enter_async_context(ClientSession(read, write))
-        await self.session.initialize()
+        await self.connect()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        await self.stack.aclose()
+        if not self.keep_open:
+            await self.close()
 
     async def _call_tool(self, tool_name: str, params: dict) -> dict:
         if not self.session:
             raise ConnectionError("Session not initialized. Use 'async with' context manager.")
-        try:
-            result = await self.session.call_tool(tool_name, params)
-            return json.loads(content_text(result))
-        except Exception as e:
-            return {"error": str(e)}
+        with tracer.start_span("call_tool", kind=SPAN_KIND_CLIENT, attributes={
+            "mcp.server": "eclipse-calculator-db", "mcp.tool": tool_name
+        }) as span:
+            try:
+                # El contexto de traza viaja en el `_meta` de la petición MCP
+                result = await self.session.call_tool(tool_name, params, meta=inject())
+                return json.loads(content_text(result))
+            except Exception as e:
+                span.record_exception(e)
+                if self.keep_open:
+                    # La sesión puede haber quedado inservible: el próximo `async with` arranca otra
+                    await self.close()
+                return {"error": str(e)}
 
     async def list_eclipses_by_year(self, year: int) -> dict:
         return await self._call_tool("list_eclipses_by_year", {"year": year})
 
-    async def calculate_eclipse_visibility(self, date: str, location: str) -> dict:
-        return await self._call_tool("calculate_eclipse_visibility", {"date": date, "location": location})
+    async def calculate_eclipse_visibility(self, date: str, location: str = None, latitude: float = None,
+                                           longitude: float = None, elevation: float = None) -> dict:
+        params = {"date": date, "location": location, "latitude": latitude, "longitude": longitude,
+                  "elevation": elevation}
+        return await self._call_tool("calculate_eclipse_visibility", {k: v for k, v in params.items() if v is not None})
+
+    async def calculate_eclipse_visibility_batch(self, dates: list, locations: list) -> dict:
+        return await self._call_tool("calculate_eclipse_visibility_batch", {"dates": dates, "locations": locations})
+
+    async def get_visibility_map(self, date: str, **region) -> dict:
+        return await self._call_tool("get_visibility_map", {"date": date, **region})
+
+    async def list_saros_series(self, saros: int = None, date: str = None, kind: str = None) -> dict:
+        params = {"saros": saros, "date": date, "kind": kind}
+        return await self._call_tool("list_saros_series", {k: v for k, v in params.items() if v is not None})
+
+    async def next_saros_member_visible(self, location: str = None, saros: int = None, date: str = None,
+                                        kind: str = None, after_date: str = None, latitude: float = None,
+                                        longitude: float = None) -> dict:
+        params = {"location": location, "saros": saros, "date": date, "kind": kind, "after_date": after_date,
+                  "latitude": latitude, "longitude": longitude}
+        return await self._call_tool("next_saros_member_visible", {k: v for k, v in params.items() if v is not None})
+
+    async def find_best_eclipse(self, location: str = None, radius_km: float = None, years: float = None,
+                                after_date: str = None, eclipse_type: str = None, limit: int = None,
+                                latitude: float = None, longitude: float = None) -> dict:
+        params = {"location": location, "radius_km": radius_km, "years": years, "after_date": after_date,
+                  "eclipse_type": eclipse_type, "limit": limit, "latitude": latitude, "longitude": longitude}
+        return await self._call_tool("find_best_eclipse", {k: v for k, v in params.items() if v is not None})
 
-    async def predict_next_eclipse(self, location: str) -> dict:
-        return await self._call_tool("predict_next_eclipse", {"location": location})
\ No newline at end of file
+    async def predict_next_eclipse(self, location: str, after_date: str = None, before_date: str = None,
+                                   limit: int = None) -> dict:
+        params = {"location": location, "after_date": after_date, "before_date": before_date, "limit": limit}
+        return await self._call_tool("predict_next_eclipse", {k: v for k, v in params.items() if v is not None})
\ No newline at end of file
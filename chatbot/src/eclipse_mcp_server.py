@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 """
 Servidor MCP personalizado para cálculo de eclipses (versión con base de datos interna)
+
+El cliente lanza un proceso nuevo en cada conexión, así que el arranque hasta
+responder a `initialize` es latencia visible. Al importar sólo se cargan el SDK
+de MCP y módulos ligeros; los de cálculo (NumPy, ephem, elementos besselianos,
+zonas horarias...), el catálogo y el gazetteer se importan y cargan en la
+primera herramienta que los usa. `--profile-startup` muestra el desglose del
+tiempo de importación de cada fase.
+
+Uso: python eclipse_mcp_server.py [--profile-startup]
 """
 
 import asyncio
-import json
+import subprocess
 import sys
 from datetime import datetime
+from pathlib import Path
 
 # Importaciones MCP
 from mcp import types
@@ -14,87 +24,87 @@ from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 
+# Módulos compartidos con el servidor remoto (tracing, catálogo de eclipses, elementos besselianos).
+# Los de cálculo se importan dentro de cada método, en su primer uso.
+from shared_modules import get_tracer, extract, SPAN_KIND_SERVER
+from response_cache import InputValidators, ResponseCache, response_key
+
+tracer = get_tracer("eclipse-calculator-db")
+
+# Respuestas serializadas (JSON compacto) de las consultas estáticas, memoizadas por argumentos
+RESPONSES = ResponseCache()
+LAZY_MODULES = ("eclipse_store", "gazetteer", "saros", "timezones", "besselian", "lunar", "eclipse_queries",
+                "eclipse_batch", "visibility_map", "best_eclipse")
+
+
 # --- Base de Datos de Eclipses ---
-ECLIPSES_DATA = {
-    "2025-03-14": {
-        "type": "lunar_total", "description": "Total Lunar Eclipse",
-        "locations": {
-            "Guatemala City": {"visible": True, "partial": False, "coverage": "100%", "max_time": "04:58:00"},
-            "Madrid": {"visible": True, "partial": True, "coverage": "60%", "max_time": "06:30:00"},
-        }
-    },
-    "2025-09-07": {
-        "type": "lunar_total", "description": "Total Lunar Eclipse",
-        "locations": {
-            "Sydney": {"visible": True, "partial": False, "coverage": "100%", "max_time": "21:00:00"},
-            "Guatemala City": {"visible": False, "partial": False, "coverage": "0%"},
-        }
-    },
-    "2026-02-17": {
-        "type": "solar_annular", "description": "Annular Solar Eclipse",
-        "locations": {"Guatemala City": {"visible": True, "partial": True, "coverage": "35%", "max_time": "13:30:00"}},
-    },
-    "2026-08-12": {
-        "type": "solar_total", "description": "Total Solar Eclipse",
-        "locations": {"Madrid": {"visible": True, "partial": False, "coverage": "100%", "max_time": "19:30:00"}},
-    },
-    "2028-01-11": {
-        "type": "lunar_total", "description": "Total Lunar Eclipse",
-        "locations": {"Guatemala City": {"visible": True, "partial": False, "coverage": "100%", "max_time": "22:15:00"}},
-    },
-    "2028-07-22": {
-        "type": "solar_total", "description": "Total Solar Eclipse",
-        "locations": {"Sydney": {"visible": True, "partial": False, "coverage": "100%", "max_time": "14:15:00"}},
-    },
-    "2030-06-01": {
-        "type": "solar_annular", "description": "Annular Solar Eclipse",
-        "locations": {"Guatemala City": {"visible": True, "partial": True, "coverage": "45%", "max_time": "12:45:00"}},
-    },
-}
+def eclipses():
+    """Catálogo compartido con los demás servidores, cargado e indexado una vez por proceso en la primera consulta"""
+    from eclipse_store import get_store
+    return get_store()
+
+
+def gazetteer():
+    """Gazetteer offline para resolver nombres de ubicación aproximados a coordenadas (cargado en la primera consulta)"""
+    from gazetteer import get_gazetteer
+    return get_gazetteer()
 
 class EclipseCalculatorServer:
     def __init__(self):
         self.server = Server("eclipse-calculator-db")
+        self.validators = None  # InputValidators de list_tools, compilados en la primera llamada que calcula
 
     async def list_eclipses_by_year(self, year: int) -> dict:
+        from saros import saros_fields
         eclipses_in_year = []
-        for date, data in ECLIPSES_DATA.items():
-            if date.startswith(str(year)):
-                visible_locations = [loc for loc, loc_data in data.get("locations", {}).items() if loc_data.get("visible")]
-                eclipses_in_year.append({
-                    "date": date, 
-                    "type": data.get("type"), 
-                    "description": data.get("description", "N/A"),
-                    "visible_in": visible_locations
-                })
+        for data in eclipses().eclipses_for_year(year):
+            visible_locations = [loc for loc, loc_data in data.get("locations", {}).items() if loc_data.get("visible")]
+            eclipses_in_year.append({
+                "date": data["date"], 
+                "type": data.get("type"), 
+                "description": data.get("description", "N/A"),
+                "visible_in": visible_locations,
+                **saros_fields(eclipses(), data["date"])
+            })
         return {"year": year, "eclipses": eclipses_in_year}
 
-    async def calculate_eclipse_visibility(self, date: str, location: str) -> dict:
-        eclipse_data = ECLIPSES_DATA.get(date)
-        if not eclipse_data:
-            return {"error": "No eclipse data available for this date"}
-        location_data = eclipse_data["locations"].get(location)
-        if not location_data:
-            return {"error": f"Location '{location}' not in database for this eclipse"}
-        return {"date": date, "location": location, "eclipse_type": eclipse_data["type"], **location_data}
-
-    async def predict_next_eclipse(self, location: str, after_date: str = None) -> dict:
-        if not after_date:
-            after_date = datetime.now().strftime("%Y-%m-%d")
-        future_eclipses = []
-        for date, eclipse_data in ECLIPSES_DATA.items():
-            if date > after_date:
-                if location in eclipse_data["locations"] and eclipse_data["locations"][location].get("visible"):
-                    future_eclipses.append({
-                        "date": date,
-                        "type": eclipse_data.get("type"),
-                        "description": eclipse_data.get("description", "N/A"),
-                        "coverage": eclipse_data["locations"][location].get("coverage")
-                    })
-        if not future_eclipses:
-            return {"error": "No upcoming eclipses found in database for this location"}
-        future_eclipses.sort(key=lambda x: x["date"])
-        return {"location": location, "next_eclipse": future_eclipses[0]}
+    async def calculate_eclipse_visibility(self, date: str, location: str = None, latitude: float = None,
+                                           longitude: float = None, elevation: float = 0.0) -> dict:
+        from eclipse_queries import eclipse_visibility
+        return eclipse_visibility(eclipses(), gazetteer(), date, location, latitude, longitude, elevation)
+
+    async def calculate_eclipse_visibility_batch(self, dates: list, locations: list) -> dict:
+        from eclipse_batch import visibility_batch
+        return visibility_batch(dates, locations, eclipses(), gazetteer())
+
+    async def get_visibility_map(self, date: str, resolution: float = 1.0, lat_min: float = -90.0,
+                                 lat_max: float = 90.0, lon_min: float = -180.0, lon_max: float = 180.0,
+                                 include_raster: bool = True) -> dict:
+        eclipse_data = eclipses().get(date)
+        if not eclipse_data or not eclipse_data["type"].startswith("solar"):
+            return {"error": "No solar eclipse data available for this date"}
+        from visibility_map import visibility_map
+        return visibility_map(date, float(resolution), float(lat_min), float(lat_max), float(lon_min),
+                              float(lon_max), bool(include_raster))
+
+    async def predict_next_eclipse(self, location: str, after_date: str = None, before_date: str = None,
+                                   limit: int = None) -> dict:
+        from eclipse_queries import DEFAULT_NEXT_LIMIT, next_eclipses
+        return next_eclipses(eclipses(), gazetteer(), location, after_date, before_date, limit or DEFAULT_NEXT_LIMIT)
+
+    async def list_saros_series(self, saros: int = None, date: str = None, kind: str = "solar") -> dict:
+        from saros import series_members
+        return series_members(eclipses(), saros, date, kind)
+
+    async def next_saros_member_visible(self, location, saros: int = None, date: str = None, kind: str = "solar",
+                                        after_date: str = None) -> dict:
+        from saros import next_visible_member
+        return next_visible_member(eclipses(), gazetteer(), location, saros, date, kind, after_date)
+
+    async def find_best_eclipse(self, location, radius_km: float = 500.0, years: float = 10.0, after_date: str = None,
+                                eclipse_type: str = "any", limit: int = 5) -> dict:
+        from best_eclipse import find_best_eclipse
+        return find_best_eclipse(eclipses(), gazetteer(), location, radius_km, years, after_date, eclipse_type, limit)
 
     def setup_handlers(self):
         @self.server.list_tools()
@@ -116,9 +126,58 @@ class EclipseCalculatorServer:
                         "type": "object",
                         "properties": {
                             "date": {"type": "string"},
-                            "location": {"type": "string"}
+                            "location": {"type": "string"},
+                            "latitude": {"type": "number", "minimum": -90, "maximum": 90, "description": "Degrees, use with longitude instead of location"},
+                            "longitude": {"type": "number", "minimum": -180, "maximum": 180, "description": "Degrees, east positive"},
+                            "elevation": {"type": "number", "description": "Meters (optional)"}
+                        },
+                        "required": ["date"]
+                    }
+                ),
+                types.Tool(
+                    name="calculate_eclipse_visibility_batch",
+                    description="Eclipse visibility for every date x location pair in one call (columnar result)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "dates": {"type": "array", "items": {"type": "string"}, "description": "YYYY-MM-DD dates"},
+                            "locations": {
+                                "type": "array",
+                                "description": "City names or {latitude, longitude[, name, elevation]} objects",
+                                "items": {
+                                    "anyOf": [
+                                        {"type": "string"},
+                                        {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {"type": "string"},
+                                                "latitude": {"type": "number", "minimum": -90, "maximum": 90},
+                                                "longitude": {"type": "number", "minimum": -180, "maximum": 180},
+                                                "elevation": {"type": "number"}
+                                            }
+                                        }
+                                    ]
+                                }
+                            }
                         },
-                        "required": ["date", "location"]
+                        "required": ["dates", "locations"]
+                    }
+                ),
+                types.Tool(
+                    name="get_visibility_map",
+                    description="Lat/lon raster of maximum obscuration for a solar eclipse and region",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "date": {"type": "string", "description": "Solar eclipse date YYYY-MM-DD"},
+                            "resolution": {"type": "number", "description": "Cell size in degrees (0.05-5, default 1)"},
+                            "lat_min": {"type": "number", "description": "Region south edge (default -90)"},
+                            "lat_max": {"type": "number", "description": "Region north edge (default 90)"},
+                            "lon_min": {"type": "number", "description": "Region west edge (default -180)"},
+                            "lon_max": {"type": "number", "description": "Region east edge (default 180; lon_min > lon_max crosses 180°)"},
+                            "include_raster": {"type": "boolean", "description": "Include the base64 uint8 raster (default true)"}
+                        },
+                        "required": ["date"]
                     }
                 ),
                 types.Tool(
@@ -128,24 +187,185 @@ class EclipseCalculatorServer:
                         "type": "object",
                         "properties": {
                             "location": {"type": "string"},
-                            "after_date": {"type": "string"}
+                            "after_date": {"type": "string", "description": "YYYY-MM-DD (exclusive, defaults to today)"},
+                            "before_date": {"type": "string", "description": "YYYY-MM-DD (exclusive, optional)"},
+                            "limit": {"type": "integer", "description": "Maximum number of future eclipses to list (default 5)"}
                         },
                         "required": ["location"]
                     }
                 ),
+                types.Tool(
+                    name="list_saros_series",
+                    description="List the eclipses of a Saros series (by number or by the date of one member)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "saros": {"type": "integer", "description": "Saros series number (use with kind)"},
+                            "kind": {"type": "string", "enum": ["solar", "lunar"], "description": "Series kind (default solar)"},
+                            "date": {"type": "string", "description": "YYYY-MM-DD of an eclipse in the series, instead of saros"}
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="next_saros_member_visible",
+                    description="Next eclipse of a Saros series visible from a location",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "location": {"type": "string"},
+                            "latitude": {"type": "number", "minimum": -90, "maximum": 90, "description": "Degrees, use with longitude instead of location"},
+                            "longitude": {"type": "number", "minimum": -180, "maximum": 180, "description": "Degrees, east positive"},
+                            "saros": {"type": "integer", "description": "Saros series number (use with kind)"},
+                            "kind": {"type": "string", "enum": ["solar", "lunar"], "description": "Series kind (default solar)"},
+                            "date": {"type": "string", "description": "YYYY-MM-DD of an eclipse in the series, instead of saros"},
+                            "after_date": {"type": "string", "description": "YYYY-MM-DD (exclusive, defaults to today)"}
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="find_best_eclipse",
+                    description="Best solar eclipses within a radius of a location in a window of years, "
+                                "ranked by obscuration, central duration and sun altitude",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "location": {"type": "string"},
+                            "latitude": {"type": "number", "minimum": -90, "maximum": 90, "description": "Degrees, use with longitude instead of location"},
+                            "longitude": {"type": "number", "minimum": -180, "maximum": 180, "description": "Degrees, east positive"},
+                            "radius_km": {"type": "number", "description": "Maximum travel distance in km (default 500)"},
+                            "years": {"type": "number", "description": "Window length in years (default 10)"},
+                            "after_date": {"type": "string", "description": "YYYY-MM-DD (exclusive, defaults to today)"},
+                            "eclipse_type": {"type": "string", "enum": ["any", "total", "annular", "central"]},
+                            "limit": {"type": "integer", "description": "Number of eclipses returned (default 5)"}
+                        }
+                    }
+                ),
             ]
 
-        @self.server.call_tool()
+        @self.server.call_tool(validate_input=False)
         async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent]:
-            if name == "list_eclipses_by_year":
-                result = await self.list_eclipses_by_year(arguments.get("year"))
-            elif name == "calculate_eclipse_visibility":
-                result = await self.calculate_eclipse_visibility(arguments.get("date"), arguments.get("location"))
-            elif name == "predict_next_eclipse":
-                result = await self.predict_next_eclipse(arguments.get("location"), arguments.get("after_date"))
-            else:
-                result = {"error": f"Unknown tool '{name}'"}
-            return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+            # Continuar la traza del cliente a partir del `_meta` de la petición
+            meta = self.server.request_context.meta
+            parent = extract(meta.model_dump() if meta else None)
+            with tracer.start_span(f"tools/call {name}", kind=SPAN_KIND_SERVER, parent=parent,
+                                   attributes={"mcp.tool": name}) as span:
+                key = response_key(name, arguments)
+                cached = RESPONSES.get(key)
+                span.set_attribute("mcp.response_cache", "hit" if cached is not None else "miss" if key else "off")
+                if cached is not None:
+                    return [types.TextContent(type="text", text=cached)]
+                if self.validators is None:
+                    self.validators = InputValidators(await handle_list_tools())
+                error = self.validators.error(name, arguments)
+                if error:
+                    span.set_error(error)
+                    return types.CallToolResult(content=[types.TextContent(type="text", text=error)], isError=True)
+                if name == "list_eclipses_by_year":
+                    result = await self.list_eclipses_by_year(arguments.get("year"))
+                elif name == "calculate_eclipse_visibility":
+                    result = await self.calculate_eclipse_visibility(
+                        arguments.get("date"), arguments.get("location"), arguments.get("latitude"),
+                        arguments.get("longitude"), arguments.get("elevation") or 0.0)
+                elif name == "calculate_eclipse_visibility_batch":
+                    result = await self.calculate_eclipse_visibility_batch(arguments.get("dates") or [],
+                                                                           arguments.get("locations") or [])
+                elif name == "get_visibility_map":
+                    date = arguments.get("date")
+                    result = await self.get_visibility_map(
+                        date, arguments.get("resolution") or 1.0,
+                        arguments.get("lat_min", -90.0), arguments.get("lat_max", 90.0),
+                        arguments.get("lon_min", -180.0), arguments.get("lon_max", 180.0),
+                        arguments.get("include_raster", True))
+                elif name == "predict_next_eclipse":
+                    result = await self.predict_next_eclipse(arguments.get("location"), arguments.get("after_date"),
+                                                             arguments.get("before_date"), arguments.get("limit"))
+                elif name == "list_saros_series":
+                    result = await self.list_saros_series(arguments.get("saros"), arguments.get("date"),
+                                                          arguments.get("kind") or "solar")
+                elif name == "next_saros_member_visible":
+                    location = arguments.get("location")
+                    if arguments.get("latitude") is not None and arguments.get("longitude") is not None:
+                        location = {"name": location, "latitude": arguments["latitude"],
+                                    "longitude": arguments["longitude"]}
+                    if not location:
+                        result = {"error": "location or latitude/longitude is required"}
+                    else:
+                        result = await self.next_saros_member_visible(
+                            location, arguments.get("saros"), arguments.get("date"),
+                            arguments.get("kind") or "solar", arguments.get("after_date"))
+                elif name == "find_best_eclipse":
+                    location = arguments.get("location")
+                    if arguments.get("latitude") is not None and arguments.get("longitude") is not None:
+                        location = {"name": location, "latitude": arguments["latitude"],
+                                    "longitude": arguments["longitude"]}
+                    if not location:
+                        result = {"error": "location or latitude/longitude is required"}
+                    else:
+                        result = await self.find_best_eclipse(
+                            location, arguments.get("radius_km") or 500.0, arguments.get("years") or 10.0,
+                            arguments.get("after_date"), arguments.get("eclipse_type") or "any",
+                            arguments.get("limit") or 5)
+                else:
+                    result = {"error": f"Unknown tool '{name}'"}
+                if "error" in result:
+                    span.set_error(result["error"])
+                return [types.TextContent(type="text", text=RESPONSES.store(key, result))]
+
+def _import_times(stderr: str):
+    """
+    Salida de `-X importtime` con marcas "#fase ms" → {fase: (ms de la fase, [(paquete, ms)])}
+
+    Suma el tiempo propio de cada módulo importado en la fase por paquete de
+    primer nivel, así no depende de qué módulo importó antes a NumPy o a pydantic.
+    """
+    phases, packages = {}, None
+    for line in stderr.splitlines():
+        if line.startswith("#"):
+            phase, total = line[1:].split()
+            if packages is not None:
+                phases[phase] = (float(total), sorted(packages.items(), key=lambda item: -item[1]))
+            packages = {}  # Lo anterior a la primera marca es el arranque del intérprete
+        elif packages is not None and line.startswith("import time:") and "cumulative" not in line:
+            own, _, name = line[len("import time:"):].split("|")
+            package = name.strip().split(".")[0]
+            packages[package] = packages.get(package, 0.0) + int(own) / 1000.0
+    return phases
+
+
+def profile_startup(top: int = 12) -> None:
+    """
+    Desglose del tiempo de importación en un proceso nuevo (`python -X importtime`)
+
+    "startup" es lo que se importa antes de poder responder a `initialize`;
+    "first_use" son los módulos de cálculo diferidos más la carga del
+    catálogo y del gazetteer, que paga la primera herramienta que los usa.
+    """
+    code = ("import sys, time\n"
+            "print('#begin 0', file=sys.stderr, flush=True)\n"
+            "t = time.perf_counter()\n"
+            "import eclipse_mcp_server as server\n"
+            "print(f'#startup {(time.perf_counter() - t) * 1000:.1f}', file=sys.stderr, flush=True)\n"
+            "t = time.perf_counter()\n"
+            "for name in server.LAZY_MODULES:\n"
+            "    __import__(name)\n"
+            "server.eclipses(), server.gazetteer()\n"
+            "print(f'#first_use {(time.perf_counter() - t) * 1000:.1f}', file=sys.stderr, flush=True)\n")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=Path(__file__).resolve().parent,
+                               capture_output=True, text=True)
+    phases = _import_times(completed.stderr)
+    if set(phases) != {"startup", "first_use"}:
+        print(completed.stderr[-2000:], file=sys.stderr)
+        sys.exit("No se pudo medir el arranque")
+    for phase, (total, packages) in phases.items():
+        print(f"{phase}: {total:.1f} ms (incluye la sobrecarga de -X importtime)")
+        for name, ms in packages[:top]:
+            print(f"  {name:<28} {ms:>8.1f} ms {ms / total:>6.1%}")
+        rest = sum(ms for _, ms in packages[top:])
+        if rest:
+            print(f"  {f'({len(packages) - top} paquetes más)':<28} {rest:>8.1f} ms {rest / total:>6.1%}")
+        other = max(0.0, total - sum(ms for _, ms in packages))
+        print(f"  {'(ejecución, no importación)':<28} {other:>8.1f} ms {other / total:>6.1%}")
+
 
 async def main():
     server_instance = EclipseCalculatorServer()
@@ -162,5 +382,8 @@ async def main():
         await server_instance.server.run(read, write, init_options)
 
 if __name__ == "__main__":
-    print("🌒 Starting Eclipse Calculator MCP Server (DB Version)...", file=sys.stderr, flush=True)
-    asyncio.run(main())
+    if "--profile-startup" in sys.argv[1:]:
+        profile_startup()
+    else:
+        print("🌒 Starting Eclipse Calculator MCP Server (DB Version)...", file=sys.stderr, flush=True)
+        asyncio.run(main())
@@ -7,6 +7,10 @@ from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from shared_modules import get_tracer, inject, SPAN_KIND_CLIENT
+
+tracer = get_tracer("mcp-chatbot")
+
 def content_text(resp) -> str:
     """Extraer contenido de texto de respuesta MCP"""
     out = []
@@ -60,7 +64,10 @@ class ExternalMCPClient:
     
     async def call_tool(self, name: str, arguments: dict):
         """Ejecutar una herramienta"""
-        result = await self.session.call_tool(name, arguments)
+        with tracer.start_span("call_tool", kind=SPAN_KIND_CLIENT, attributes={
+            "mcp.server": self.server_path.stem, "mcp.tool": name
+        }):
+            result = await self.session.call_tool(name, arguments, meta=inject())
         text = content_text(result)
         try:
             return json.loads(text)
@@ -6,6 +6,10 @@ from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from shared_modules import get_tracer, inject, SPAN_KIND_CLIENT
+
+tracer = get_tracer("mcp-chatbot")
+
 # Ruta al archivo de configuración de peers
 PEERS_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "others_mcp.json")
 
@@ -43,14 +47,18 @@ class F1MCPClient:
     async def __aexit__(self, exc_type, exc, tb):
         await self.stack.aclose()
 
+    async def call_tool(self, name, arguments):
+        with tracer.start_span("call_tool", kind=SPAN_KIND_CLIENT, attributes={"mcp.server": "f1", "mcp.tool": name}):
+            return await self.session.call_tool(name, arguments, meta=inject())
+
     async def get_calendar(self, season):
-        return await self.session.call_tool("get_calendar", {"season": season})
+        return await self.call_tool("get_calendar", {"season": season})
 
     async def get_race(self, race_id):
-        return await self.session.call_tool("get_race", {"race_id": race_id})
+        return await self.call_tool("get_race", {"race_id": race_id})
 
     async def recommend_strategy(self, race_id, base_laptime_s, deg_soft_s, deg_medium_s, deg_hard_s, min_stint_laps, max_stint_laps, max_stops=2):
-        return await self.session.call_tool("recommend_strategy", {
+        return await self.call_tool("recommend_strategy", {
             "race_id": race_id,
             "base_laptime_s": base_laptime_s,
             "deg_soft_s": deg_soft_s,
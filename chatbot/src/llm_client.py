@@ -1,39 +1,70 @@
 from dotenv import load_dotenv
 import os
 import json
+import re
 from datetime import datetime
 import anthropic
 
+from shared_modules import get_tracer, SPAN_KIND_CLIENT
+
 load_dotenv()
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 LOG_FILE = "chat_log.json"
+tracer = get_tracer("mcp-chatbot")
 
 # Instanciar el cliente oficial de Anthropic
 client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
 
 def ask_claude(messages, model="claude-sonnet-4-20250514", max_tokens=4096, tools=None):
     """Llama a la API de Claude usando la librería oficial, con soporte para herramientas."""
-    try:
-        request_args = {
-            "model": model,
-            "max_tokens": max_tokens,
-            "messages": messages,
-        }
-        if tools:
-            request_args["tools"] = tools
-
-        response = client.messages.create(**request_args)
-        
-        # Devolvemos la respuesta como un diccionario para mantener la compatibilidad
-        return response.model_dump()
-    except Exception as e:
-        print(f"Error al llamar a la API de Claude: {e}")
-        # Devolver un error en un formato compatible
-        return {
-            "type": "error",
-            "error": {"type": "api_error", "message": str(e)}
-        }
+    with tracer.start_span("ask_claude", kind=SPAN_KIND_CLIENT, attributes={
+        "llm.model": model,
+        "llm.messages": len(messages),
+        "llm.tools": len(tools) if tools else 0,
+    }) as span:
+        try:
+            request_args = {
+                "model": model,
+                "max_tokens": max_tokens,
+                "messages": messages,
+            }
+            if tools:
+                request_args["tools"] = tools
+
+            response = client.messages.create(**request_args)
+            result = response.model_dump()
+            usage = result.get("usage") or {}
+            span.set_attribute("llm.input_tokens", usage.get("input_tokens", 0))
+            span.set_attribute("llm.output_tokens", usage.get("output_tokens", 0))
+            span.set_attribute("llm.stop_reason", str(result.get("stop_reason")))
+
+            # Devolvemos la respuesta como un diccionario para mantener la compatibilidad
+            return result
+        except Exception as e:
+            span.record_exception(e)
+            print(f"Error al llamar a la API de Claude: {e}")
+            # Devolver un error en un formato compatible; 400 = la API rechazó la petición
+            error_type = "invalid_request_error" if isinstance(e, anthropic.BadRequestError) else "api_error"
+            return {
+                "type": "error",
+                "error": {
+                    "type": error_type,
+                    "message": str(e),
+                    "malformed_history": error_type == "invalid_request_error" and is_malformed_history(str(e)),
+                }
+            }
+
+
+# Errores 400 por un historial con tool_use/tool_result mal emparejados, p. ej.
+# "`tool_use` ids were found without `tool_result` blocks immediately after" o
+# "unexpected `tool_use_id` found in `tool_result` blocks"
+MALFORMED_HISTORY_RE = re.compile(r"tool_use.*tool_result|tool_result.*tool_use", re.S)
+
+
+def is_malformed_history(message: str) -> bool:
+    """True si el mensaje de un 400 indica que el emparejamiento tool_use/tool_result está roto"""
+    return bool(MALFORMED_HISTORY_RE.search(message or ""))
 
 def log_interaction_json(user_message, assistant_message):
     log_entry = {
@@ -1,5 +1,6 @@
 # chatbot/src/logger.py
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 # Add these imports
@@ -7,11 +8,25 @@ from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
+from blob_store import BlobStore
+
+# Tamaño máximo (en caracteres) de un payload guardado dentro del log
+DEFAULT_MAX_PAYLOAD = int(os.getenv("MCP_LOG_MAX_PAYLOAD", "512"))
+
 class MCPLogger:
-    def __init__(self, log_file="logs/mcp_log.json"):
+    def __init__(self, log_file="logs/mcp_log.json", max_payload=DEFAULT_MAX_PAYLOAD, blob_dir=None):
+        """
+        Args:
+            log_file: Archivo JSON del log
+            max_payload: Caracteres máximos de un payload en línea (None = sin límite);
+                los payloads mayores se guardan completos en el almacén de blobs
+            blob_dir: Directorio del almacén de blobs (por defecto `blobs/` junto al log)
+        """
         self.log_file = Path(log_file)
         print(f"Log file path: {self.log_file.resolve()}")
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_payload = max_payload
+        self.blobs = BlobStore(blob_dir or self.log_file.parent / "blobs")
         self._load_log()
     
     def _load_log(self):
@@ -30,6 +45,35 @@ class MCPLogger:
         with open(self.log_file, 'w', encoding='utf-8') as f:
             json.dump(self.log_data, f, indent=2, ensure_ascii=False)
     
+    def _cap_payload(self, entry, key, payload):
+        """
+        Guardar el payload en la entrada, recortado si excede max_payload.
+        El cuerpo completo va al almacén de blobs y se referencia por hash.
+        Un texto recortado sigue siendo texto (con `<key>_blob` y `<key>_size`
+        al lado); un dict o lista se sustituye por otro dict
+        {"truncated": vista previa, "blob": hash, "size": tamaño}.
+        """
+        text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, default=str)
+        if self.max_payload is None or len(text) <= self.max_payload:
+            entry[key] = payload
+            return
+        preview = text[:self.max_payload] + "…"
+        digest = self.blobs.put(text)
+        if isinstance(payload, str):
+            entry[key] = preview
+            entry[f"{key}_blob"] = digest
+            entry[f"{key}_size"] = len(text)
+        else:
+            entry[key] = {"truncated": preview, "blob": digest, "size": len(text)}
+
+    def get_full_payload(self, entry, key="response"):
+        """Recuperar el payload completo de una entrada (desde el blob si fue recortado)"""
+        value = entry.get(key)
+        if isinstance(value, dict) and value.keys() == {"truncated", "blob", "size"}:
+            return json.loads(self.blobs.get(value["blob"]))
+        digest = entry.get(f"{key}_blob")
+        return self.blobs.get(digest) if digest else value
+
     def log_mcp_request(self, server, method, params):
         """Log MCP server request"""
         entry = {
@@ -37,8 +81,8 @@ class MCPLogger:
             "type": "mcp_request",
             "server": server,
             "method": method,
-            "params": params
         }
+        self._cap_payload(entry, "params", params)
         self.log_data.append(entry)
         self._save_log()
         print(f"Logged MCP request: {server}.{method}")
@@ -51,8 +95,8 @@ class MCPLogger:
             "server": server,
             "method": method,
             "success": success,
-            "response": str(response) if response else None
         }
+        self._cap_payload(entry, "response", str(response) if response else None)
         self.log_data.append(entry)
         self._save_log()
         print(f"Logged MCP response: {server}.{method} ({'✅' if success else '❌'})")
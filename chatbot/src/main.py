@@ -11,6 +11,7 @@ Funcionalidades:
 7. Integración dinámica con servidores MCP de otros estudiantes
 """
 
+import argparse
 import asyncio
 import sys
 import json
@@ -24,10 +25,14 @@ from filesystem_mcp import FilesystemMCP
 from git_mcp import GitMCP
 from logger import MCPLogger
 from conversation_manager import ConversationManager
+from conversation_pool import ConversationPool
+from context_compactor import ContextCompactor
+from session_store import SessionStore
 from eclipse_mcp_client import EclipseMCPClient
 from external_mcp_client import ExternalMCPClient
 from f1_mcp_client import F1MCPClient
 from remote_mcp_client import RemoteMcpClient
+from shared_modules import get_tracer
 
 from rich.console import Console
 from rich.table import Table
@@ -49,14 +54,26 @@ console = Console(theme=Theme({
     "tool_code": "bold yellow",
 }))
 
+tracer = get_tracer("mcp-chatbot")
+
 class MCPChatbot:
     """Chatbot agente que integra múltiples servidores MCP como herramientas."""
 
-    def __init__(self):
-        self.conversation = ConversationManager()
+    def __init__(self, resume_session: str = None):
+        # Cada mensaje se registra en el journal de la sesión para poder reanudarla
+        self.sessions = SessionStore()
+        # Las conversaciones de la ejecución viven en un pool con presupuesto de memoria:
+        # las inactivas se vuelcan a disco y se rehidratan al volver a ellas con /session.
+        # Los mensajes que salen de la ventana se resumen en segundo plano.
+        self.pool = ConversationPool(store=self.sessions, compactor_factory=ContextCompactor)
+        if resume_session and not self._session_exists(resume_session):
+            raise FileNotFoundError(f"No existe la sesión '{resume_session}'")
+        self.session_id = resume_session or SessionStore.new_session_id()
+        self.pool.get(self.session_id)
         self.logger = MCPLogger()
         # Inicializar clientes para las herramientas
-        self.eclipse_mcp = EclipseMCPClient()
+        # Un solo servidor de cálculo para toda la ejecución: su caché de respuestas se reutiliza
+        self.eclipse_mcp = EclipseMCPClient(keep_open=True)
         self.f1_mcp = F1MCPClient()
         self.filesystem_mcp = FilesystemMCP()
         self.git_mcp = GitMCP()
@@ -89,21 +106,96 @@ class MCPChatbot:
                         "location": {
                             "type": "string",
                             "description": "La ciudad o ubicación desde donde se quiere observar. Ejemplo: 'Guatemala City', 'Madrid'."
-                        }
+                        },
+                        "after_date": {"type": "string", "description": "Buscar eclipses posteriores a esta fecha (YYYY-MM-DD, opcional; por defecto hoy)."},
+                        "before_date": {"type": "string", "description": "Buscar sólo eclipses anteriores a esta fecha (YYYY-MM-DD, opcional)."},
+                        "limit": {"type": "integer", "description": "Máximo de eclipses futuros listados (por defecto 5)."}
                     },
                     "required": ["location"]
                 }
             },
             {
                 "name": "calculate_eclipse_visibility",
-                "description": "Calcula si un eclipse específico es visible en una fecha y ubicación dadas. Proporciona detalles como cobertura, hora máxima, etc.",
+                "description": "Calcula si un eclipse específico es visible en una fecha y ubicación dadas. Proporciona detalles como cobertura, hora máxima, etc. Acepta coordenadas en lugar de ciudad; en eclipses lunares calcula los contactos (P1, U1–U4, P4) y la altura de la Luna.",
                 "input_schema": {
                     "type": "object",
                     "properties": {
                         "date": {"type": "string", "description": "La fecha del eclipse en formato YYYY-MM-DD."},
-                        "location": {"type": "string", "description": "La ciudad para verificar la visibilidad."}
+                        "location": {"type": "string", "description": "La ciudad para verificar la visibilidad."},
+                        "latitude": {"type": "number", "minimum": -90, "maximum": 90, "description": "Latitud en grados (alternativa a location)."},
+                        "longitude": {"type": "number", "minimum": -180, "maximum": 180, "description": "Longitud en grados, este positivo."},
+                        "elevation": {"type": "number", "description": "Altura del observador en metros (opcional)."}
+                    },
+                    "required": ["date"]
+                }
+            },
+            {
+                "name": "calculate_eclipse_visibility_batch",
+                "description": "Calcula la visibilidad de eclipses para varias fechas y varias ciudades (o coordenadas) en una sola llamada. Úsala en lugar de llamar muchas veces a calculate_eclipse_visibility. Devuelve columnas con índices a 'dates' y 'locations'.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "dates": {"type": "array", "items": {"type": "string"}, "description": "Fechas YYYY-MM-DD."},
+                        "locations": {
+                            "type": "array",
+                            "description": "Ciudades o objetos {latitude, longitude, name?, elevation?}.",
+                            "items": {"anyOf": [
+                                {"type": "string"},
+                                {"type": "object", "properties": {
+                                    "name": {"type": "string"},
+                                    "latitude": {"type": "number", "minimum": -90, "maximum": 90},
+                                    "longitude": {"type": "number", "minimum": -180, "maximum": 180},
+                                    "elevation": {"type": "number"}
+                                }}
+                            ]}
+                        }
                     },
-                    "required": ["date", "location"]
+                    "required": ["dates", "locations"]
+                }
+            },
+            {
+                "name": "list_saros_series",
+                "description": "Lista los eclipses de una serie Saros (se repiten cada ~18 años y 11 días). Sirve para preguntas como '¿cuándo se repite este eclipse?'. Indica la fecha de un eclipse o el número de serie.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "date": {"type": "string", "description": "Fecha YYYY-MM-DD de un eclipse de la serie."},
+                        "saros": {"type": "integer", "description": "Número de la serie Saros (alternativa a date)."},
+                        "kind": {"type": "string", "enum": ["solar", "lunar"], "description": "Tipo de serie con 'saros' (por defecto solar)."}
+                    }
+                }
+            },
+            {
+                "name": "next_saros_member_visible",
+                "description": "Busca el próximo eclipse de una serie Saros que será visible desde una ciudad o coordenadas.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "location": {"type": "string", "description": "Ciudad desde donde se observa."},
+                        "latitude": {"type": "number", "minimum": -90, "maximum": 90, "description": "Latitud en grados (alternativa a location)."},
+                        "longitude": {"type": "number", "minimum": -180, "maximum": 180, "description": "Longitud en grados, este positivo."},
+                        "date": {"type": "string", "description": "Fecha YYYY-MM-DD de un eclipse de la serie."},
+                        "saros": {"type": "integer", "description": "Número de la serie Saros (alternativa a date)."},
+                        "kind": {"type": "string", "enum": ["solar", "lunar"], "description": "Tipo de serie con 'saros' (por defecto solar)."},
+                        "after_date": {"type": "string", "description": "Buscar miembros posteriores a esta fecha (YYYY-MM-DD, opcional; por defecto hoy)."}
+                    }
+                }
+            },
+            {
+                "name": "find_best_eclipse",
+                "description": "Busca los mejores eclipses solares a los que se puede llegar desde una ciudad o coordenadas: a menos de un radio (km) y en los próximos años. Ordena por oscurecimiento, duración de la totalidad/anularidad y altura del Sol, e indica el punto de observación. Sirve para preguntas como '¿qué eclipse total tengo más cerca en los próximos 10 años?'.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "location": {"type": "string", "description": "Ciudad de partida."},
+                        "latitude": {"type": "number", "minimum": -90, "maximum": 90, "description": "Latitud en grados (alternativa a location)."},
+                        "longitude": {"type": "number", "minimum": -180, "maximum": 180, "description": "Longitud en grados, este positivo."},
+                        "radius_km": {"type": "number", "description": "Distancia máxima de viaje en km (por defecto 500)."},
+                        "years": {"type": "number", "description": "Años hacia adelante (por defecto 10)."},
+                        "after_date": {"type": "string", "description": "Buscar después de esta fecha (YYYY-MM-DD, opcional; por defecto hoy)."},
+                        "eclipse_type": {"type": "string", "enum": ["any", "total", "annular", "central"], "description": "Tipo visto en el punto de observación (por defecto any)."},
+                        "limit": {"type": "integer", "description": "Número de eclipses devueltos (por defecto 5)."}
+                    }
                 }
             },
             {
@@ -149,6 +241,13 @@ class MCPChatbot:
 
     async def execute_tool(self, tool_name: str, tool_args: dict):
         """Ejecuta la herramienta seleccionada y devuelve el resultado."""
+        with tracer.start_span("execute_tool", attributes={"tool.name": tool_name}) as span:
+            result = await self._execute_tool(tool_name, tool_args)
+            if isinstance(result, dict) and "error" in result:
+                span.set_error(str(result["error"]))
+            return result
+
+    async def _execute_tool(self, tool_name: str, tool_args: dict):
         try:
             if tool_name == "create_repository":
                 repo_name = tool_args.get("repo_name")
@@ -165,10 +264,33 @@ class MCPChatbot:
             
             elif tool_name == "predict_next_eclipse":
                 async with self.eclipse_mcp as client:
-                    return await client.predict_next_eclipse(tool_args.get("location"))
+                    return await client.predict_next_eclipse(tool_args.get("location"), tool_args.get("after_date"),
+                                                             tool_args.get("before_date"), tool_args.get("limit"))
             elif tool_name == "calculate_eclipse_visibility":
                 async with self.eclipse_mcp as client:
-                    return await client.calculate_eclipse_visibility(tool_args.get("date"), tool_args.get("location"))
+                    return await client.calculate_eclipse_visibility(tool_args.get("date"), tool_args.get("location"),
+                                                                     tool_args.get("latitude"), tool_args.get("longitude"),
+                                                                     tool_args.get("elevation"))
+            elif tool_name == "calculate_eclipse_visibility_batch":
+                async with self.eclipse_mcp as client:
+                    return await client.calculate_eclipse_visibility_batch(tool_args.get("dates") or [],
+                                                                           tool_args.get("locations") or [])
+            elif tool_name == "list_saros_series":
+                async with self.eclipse_mcp as client:
+                    return await client.list_saros_series(tool_args.get("saros"), tool_args.get("date"),
+                                                          tool_args.get("kind"))
+            elif tool_name == "next_saros_member_visible":
+                async with self.eclipse_mcp as client:
+                    return await client.next_saros_member_visible(
+                        tool_args.get("location"), tool_args.get("saros"), tool_args.get("date"),
+                        tool_args.get("kind"), tool_args.get("after_date"), tool_args.get("latitude"),
+                        tool_args.get("longitude"))
+            elif tool_name == "find_best_eclipse":
+                async with self.eclipse_mcp as client:
+                    return await client.find_best_eclipse(
+                        tool_args.get("location"), tool_args.get("radius_km"), tool_args.get("years"),
+                        tool_args.get("after_date"), tool_args.get("eclipse_type"), tool_args.get("limit"),
+                        tool_args.get("latitude"), tool_args.get("longitude"))
             elif tool_name == "get_f1_calendar":
                 async with self.f1_mcp as client:
                     return await client.get_calendar(tool_args.get("season"))
@@ -199,6 +321,10 @@ class MCPChatbot:
         console.print("  [bold]/help[/bold]  - Muestra esta ayuda.")
         console.print("  [bold]/log[/bold]   - Muestra el log de interacciones MCP.")
         console.print("  [bold]/reset[/bold] - Reinicia la conversación actual.")
+        console.print("  [bold]/session[/bold] - Muestra el ID de la sesión (para reanudar con --resume).")
+        console.print("  [bold]/session <id>[/bold] - Cambia a otra sesión guardada (la actual queda en el pool).")
+        console.print("  [bold]/new[/bold]   - Empieza una conversación nueva sin descartar la actual.")
+        console.print("  [bold]/stats[/bold] - Muestra estadísticas del contexto y de la compactación.")
         console.print("  [bold]/exit[/bold]  - Termina el chatbot.")
 
     async def handle_special_command(self, command: str):
@@ -213,14 +339,100 @@ class MCPChatbot:
             self.conversation.reset()
             console.print("[success]La conversación ha sido reiniciada.[/success]")
             return True
+        if command == "/session":
+            console.print(f"[info]Sesión: [bold]{self.conversation.session_id}[/bold] "
+                          f"({len(self.conversation)} mensajes en contexto)[/info]")
+            return True
+        if command.startswith("/session "):
+            session_id = command.split(maxsplit=1)[1]
+            try:
+                exists = self._session_exists(session_id)
+            except ValueError:
+                exists = False
+            if not exists:
+                console.print(f"[error]No existe la sesión '{session_id}'.[/error]")
+                return True
+            self._switch_to(session_id)
+            return True
+        if command == "/new":
+            self._switch_to(SessionStore.new_session_id())
+            return True
+        if command == "/stats":
+            self.display_stats()
+            return True
         if command in ["/exit", "/quit", "/salir"]:
             return False
         return None
 
+    @property
+    def conversation(self) -> ConversationManager:
+        """Conversación activa (la más recientemente usada del pool)"""
+        return self.pool.get(self.session_id)
+
+    def _add_message(self, role, content):
+        # A través del pool, para que cuente la memoria y vuelque las inactivas
+        self.pool.add_message(self.session_id, role, content)
+
+    def _session_exists(self, session_id: str) -> bool:
+        return session_id in self.pool or self.sessions.exists(session_id)
+
+    def _switch_to(self, session_id: str):
+        self.session_id = session_id
+        console.print(f"[success]Sesión [bold]{session_id}[/bold] "
+                      f"({len(self.conversation)} mensajes en contexto).[/success]")
+
+    def display_stats(self):
+        """Muestra estadísticas de la conversación y de la compactación del contexto."""
+        stats = self.conversation.get_conversation_stats()
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Métrica", style="option")
+        table.add_column("Valor", style="menu")
+        table.add_row("Mensajes en contexto", str(len(self.conversation)))
+        table.add_row("Mensajes de usuario", str(stats.get("user_messages", 0)))
+        table.add_row("Mensajes del asistente", str(stats.get("assistant_messages", 0)))
+        for group in ("history", "tool_results", "compaction"):
+            for key, value in stats.get(group, {}).items():
+                table.add_row(f"{group}.{key}", str(value))
+        for key, value in self.pool.get_stats().items():
+            table.add_row(f"pool.{key}", str(value))
+        console.print(table)
+
+    def _ask_llm(self):
+        """
+        Llama a Claude con la ventana validada de la conversación.
+
+        Si la API rechaza el historial (tool_use/tool_result mal emparejados), se
+        recorta la ventana al turno actual y se reintenta una vez; sólo si vuelve a
+        fallar se reinicia la conversación. Los demás errores (p. ej. otros 400
+        como un prompt demasiado largo) se devuelven sin tocar la conversación.
+        """
+        response = ask_claude(self.conversation.get_messages(), tools=self.tools)
+        if response.get("type") != "error":
+            return response
+
+        error = response.get("error", {})
+        console.print(f"[error]Error de API: {error.get('message', 'Desconocido')}[/error]")
+        if not error.get("malformed_history"):
+            console.print("[info]La conversación se conserva; usa /reset para reiniciarla.[/info]")
+            return response
+        if self.conversation.truncate_to_last_turn():
+            console.print("[info]Se recortó el historial anterior al turno actual; reintentando...[/info]")
+            response = ask_claude(self.conversation.get_messages(), tools=self.tools)
+            if response.get("type") != "error":
+                return response
+            error = response.get("error", {})
+            console.print(f"[error]Error de API: {error.get('message', 'Desconocido')}[/error]")
+
+        self.conversation.reset(malformed_history=True)
+        console.print("[info]La conversación se ha reiniciado debido a un error de API.[/info]")
+        return response
+
     async def run(self):
         """Bucle principal del chatbot agente."""
         self.display_help()
-        console.print("\n[info]Escribe tu mensaje o usa [bold]/help[/bold] para ver los comandos.[/info]")
+        console.print(f"\n[info]Sesión [bold]{self.conversation.session_id}[/bold] "
+                      f"({len(self.conversation)} mensajes en contexto).[/info]")
+        console.print("[info]Escribe tu mensaje o usa [bold]/help[/bold] para ver los comandos.[/info]")
 
         while True:
             try:
@@ -235,22 +447,16 @@ class MCPChatbot:
                         break
                     continue
 
-                self.conversation.add_message("user", user_input)
+                self._add_message("user", user_input)
                 
-                with Live(Spinner("dots", text=" Pensando..."), console=console, transient=True) as live:
+                with tracer.start_span("agent_turn", attributes={"turn.input_length": len(user_input)}), \
+                        Live(Spinner("dots", text=" Pensando..."), console=console, transient=True) as live:
                     # Primer llamado al LLM para ver si usa una herramienta
-                    response = ask_claude(
-                        self.conversation.get_messages(),
-                        tools=self.tools
-                    )
-
+                    response = self._ask_llm()
                     if response.get("type") == "error":
-                        console.print(f"[error]Error de API: {response.get('error', {}).get('message', 'Desconocido')}[/error]")
-                        self.conversation.reset()
-                        console.print("[info]La conversación se ha reiniciado debido a un error de API.[/info]")
                         continue
 
-                    self.conversation.add_message("assistant", response['content'])
+                    self._add_message("assistant", response['content'])
 
                     # Bucle de herramientas: si el LLM quiere usar herramientas, se ejecuta este bloque
                     while response.get("stop_reason") == "tool_use":
@@ -271,16 +477,18 @@ class MCPChatbot:
                                 })
 
                         # Añadir el resultado de la herramienta a la conversación
-                        self.conversation.add_message("user", tool_results)
+                        self._add_message("user", tool_results)
                         
                         live.update(Spinner("dots", text=" Pensando..."))
                         
                         # Volver a llamar al LLM con el resultado de la herramienta
-                        response = ask_claude(
-                            self.conversation.get_messages(),
-                            tools=self.tools
-                        )
-                        self.conversation.add_message("assistant", response['content'])
+                        response = self._ask_llm()
+                        if response.get("type") == "error":
+                            break
+                        self._add_message("assistant", response['content'])
+
+                if response.get("type") == "error":
+                    continue
 
                 # Imprimir la respuesta final del asistente
                 final_response_text = ""
@@ -298,12 +506,32 @@ class MCPChatbot:
             except Exception as e:
                 console.print(f"[error]Ocurrió un error inesperado: {e}[/error]")
         
+        # Resumir lo pendiente para que el snapshot incluya el resumen completo
+        self.conversation.compactor.flush(wait=True)
+        self.pool.close()
+        await self.eclipse_mcp.close()
         console.print("\n[success]¡Hasta luego! 👋[/success]")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Chatbot agente con integración MCP")
+    parser.add_argument("--resume", metavar="SESSION_ID", help="Reanudar una sesión guardada")
+    parser.add_argument("--list-sessions", action="store_true", help="Listar las sesiones guardadas")
+    return parser.parse_args()
+
+
 async def main():
     """Función principal para ejecutar el chatbot."""
-    chatbot = MCPChatbot()
+    args = parse_args()
+    if args.list_sessions:
+        for session_id in SessionStore().list_sessions():
+            console.print(session_id)
+        return
+    try:
+        chatbot = MCPChatbot(resume_session=args.resume)
+    except FileNotFoundError as e:
+        console.print(f"[error]{e}[/error]")
+        return
     await chatbot.run()
 
 if __name__ == "__main__":
@@ -2,6 +2,10 @@ import httpx
 import json
 from typing import Dict, Any
 
+from shared_modules import get_tracer, inject, SPAN_KIND_CLIENT
+
+tracer = get_tracer("mcp-chatbot")
+
 class RemoteMcpClient:
     """Cliente para conectar con el servidor Eclipse MCP remoto"""
     
@@ -13,8 +17,13 @@ class RemoteMcpClient:
             "status": "Verifica el estado del servidor remoto",
             "list_eclipses_by_year": "Lista eclipses para un año dado",
             "calculate_eclipse_visibility": "Calcula la visibilidad de un eclipse",
+            "calculate_eclipse_visibility_batch": "Calcula la visibilidad para varias fechas y ubicaciones",
             "predict_next_eclipse": "Predice el próximo eclipse visible",
+            "list_saros_series": "Lista los eclipses de una serie Saros",
+            "next_saros_member_visible": "Busca el próximo eclipse de una serie Saros visible desde un lugar",
+            "find_best_eclipse": "Busca los mejores eclipses solares a menos de un radio de un lugar",
             "get_eclipse_path": "Obtiene la ruta de un eclipse",
+            "get_visibility_map": "Obtiene el mapa de oscurecimiento de un eclipse",
             "get_safety_advice": "Obtiene consejos de seguridad para un eclipse"
         }
         self.timeout = 10.0
@@ -38,8 +47,12 @@ class RemoteMcpClient:
 
             print(f"🌐 Conectando a servidor remoto: {self.url}")
             
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(f"{self.url}/mcp", json=payload)
+            with tracer.start_span("call_tool", kind=SPAN_KIND_CLIENT, attributes={
+                "mcp.server": self.name, "mcp.tool": command, "http.url": f"{self.url}/mcp"
+            }) as span, httpx.Client(timeout=self.timeout) as client:
+                # El contexto de traza viaja en la cabecera HTTP `traceparent`
+                response = client.post(f"{self.url}/mcp", json=payload, headers=inject())
+                span.set_attribute("http.status_code", response.status_code)
                 response.raise_for_status()
             
             result = response.json()
@@ -85,14 +98,43 @@ class RemoteMcpClient:
     def list_eclipses_by_year(self, year: int) -> dict:
         return self.handle_command("list_eclipses_by_year", {"year": year})
 
-    def calculate_eclipse_visibility(self, date: str, location: str) -> dict:
-        return self.handle_command("calculate_eclipse_visibility", {"date": date, "location": location})
+    def calculate_eclipse_visibility(self, date: str, location: str = None, latitude: float = None,
+                                     longitude: float = None, elevation: float = None) -> dict:
+        params = {"date": date, "location": location, "latitude": latitude, "longitude": longitude,
+                  "elevation": elevation}
+        return self.handle_command("calculate_eclipse_visibility", {k: v for k, v in params.items() if v is not None})
+
+    def calculate_eclipse_visibility_batch(self, dates: list, locations: list) -> dict:
+        return self.handle_command("calculate_eclipse_visibility_batch", {"dates": dates, "locations": locations})
+
+    def get_visibility_map(self, date: str, **region) -> dict:
+        return self.handle_command("get_visibility_map", {"date": date, **region})
+
+    def list_saros_series(self, saros: int = None, date: str = None, kind: str = None) -> dict:
+        params = {"saros": saros, "date": date, "kind": kind}
+        return self.handle_command("list_saros_series", {k: v for k, v in params.items() if v is not None})
+
+    def next_saros_member_visible(self, location: str = None, saros: int = None, date: str = None,
+                                  kind: str = None, after_date: str = None, latitude: float = None,
+                                  longitude: float = None) -> dict:
+        params = {"location": location, "saros": saros, "date": date, "kind": kind, "after_date": after_date,
+                  "latitude": latitude, "longitude": longitude}
+        return self.handle_command("next_saros_member_visible", {k: v for k, v in params.items() if v is not None})
+
+    def find_best_eclipse(self, location: str = None, radius_km: float = None, years: float = None,
+                          after_date: str = None, eclipse_type: str = None, limit: int = None,
+                          latitude: float = None, longitude: float = None) -> dict:
+        params = {"location": location, "radius_km": radius_km, "years": years, "after_date": after_date,
+                  "eclipse_type": eclipse_type, "limit": limit, "latitude": latitude, "longitude": longitude}
+        return self.handle_command("find_best_eclipse", {k: v for k, v in params.items() if v is not None})
 
-    def predict_next_eclipse(self, location: str) -> dict:
-        return self.handle_command("predict_next_eclipse", {"location": location})
+    def predict_next_eclipse(self, location: str, after_date: str = None, before_date: str = None,
+                             limit: int = None) -> dict:
+        params = {"location": location, "after_date": after_date, "before_date": before_date, "limit": limit}
+        return self.handle_command("predict_next_eclipse", {k: v for k, v in params.items() if v is not None})
 
-    def get_eclipse_path(self, date: str) -> dict:
-        return self.handle_command("get_eclipse_path", {"date": date})
+    def get_eclipse_path(self, date: str, **options) -> dict:
+        return self.handle_command("get_eclipse_path", {"date": date, **options})
 
     def get_safety_advice(self, date: str) -> dict:
         return self.handle_command("get_safety_advice", {"date": date})
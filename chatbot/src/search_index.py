@@ -0,0 +1,156 @@
+# chatbot/src/search_index.py
+"""
+Índice invertido incremental para buscar en el historial de una conversación
+
+Cada mensaje se indexa una sola vez al agregarse y se retira al salir de la
+ventana, así que las búsquedas no recorren el contenido de todos los mensajes.
+Soporta consultas de varios términos (todos deben aparecer), búsqueda por
+prefijo sobre un vocabulario ordenado (bisect) y ranking BM25.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Parámetros de BM25
+K1 = 1.2
+B = 0.75
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin acentos, para que 'Astronomía' coincida con 'astronomia'"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+class InvertedIndex:
+    """Índice término → {doc_id: frecuencia} mantenido incrementalmente"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._vocabulary: List[str] = []  # Ordenado, para consultas por prefijo
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, doc_id: int, text: str) -> None:
+        """Indexar un documento (mensaje) nuevo"""
+        terms = Counter(tokenize(text))
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._vocabulary, term)
+            postings[doc_id] = tf
+
+    def remove(self, doc_id: int) -> None:
+        """Retirar un documento (p. ej. un mensaje descartado de la ventana)"""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        """Términos del vocabulario que coinciden con `term` (exacto o por prefijo)"""
+        if not prefix:
+            return [term] if term in self._postings else []
+        matches = []
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            matches.append(self._vocabulary[i])
+            i += 1
+        return matches
+
+    def _term_docs(self, terms: List[str]) -> Set[int]:
+        if len(terms) == 1:
+            return set(self._postings[terms[0]])
+        return set().union(*(self._postings[t] for t in terms))
+
+    def match(self, query: str, prefix: bool = True) -> Set[int]:
+        """
+        Documentos que contienen todos los términos de la consulta (sin ranking)
+
+        Args:
+            query: Uno o varios términos
+            prefix: Si cada término coincide también como prefijo ('eclip' → 'eclipse')
+        """
+        candidates: Set[int] = None
+        # Intersecar empezando por el término con menos coincidencias
+        expanded = [self._expand(t, prefix) for t in dict.fromkeys(tokenize(query))]
+        for terms in sorted(expanded, key=lambda ts: sum(len(self._postings[t]) for t in ts)):
+            if not terms:
+                return set()
+            docs = self._term_docs(terms)
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return set()
+        return candidates or set()
+
+    def search(self, query: str, limit: int = None, prefix: bool = True) -> List[Tuple[int, float]]:
+        """
+        Buscar documentos que contengan todos los términos de la consulta
+
+        Args:
+            query: Uno o varios términos
+            limit: Máximo de resultados (None = todos)
+            prefix: Si cada término coincide también como prefijo ('eclip' → 'eclipse')
+
+        Returns:
+            Lista de (doc_id, puntaje BM25) ordenada por relevancia y luego por recencia
+        """
+        candidates = self.match(query, prefix)
+        if not candidates:
+            return []
+
+        # Sólo se puntúan los candidatos que contienen todos los términos
+        n_docs = len(self._doc_terms)
+        avg_len = self._total_len / n_docs or 1.0
+        scores = dict.fromkeys(candidates, 0.0)
+        for query_term in dict.fromkeys(tokenize(query)):
+            for term in self._expand(query_term, prefix):
+                postings = self._postings[term]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id in (candidates if len(candidates) < len(postings) else postings):
+                    tf = postings.get(doc_id)
+                    if tf is None or doc_id not in scores:
+                        continue
+                    norm = tf + K1 * (1 - B + B * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] += idf * tf * (K1 + 1) / norm
+
+        rank_key = lambda item: (-item[1], -item[0])
+        if limit:
+            return heapq.nsmallest(limit, scores.items(), key=rank_key)
+        return sorted(scores.items(), key=rank_key)
+
+    def contains(self, query: str, prefix: bool = True) -> bool:
+        """True si algún documento contiene todos los términos"""
+        expanded = [self._expand(t, prefix) for t in dict.fromkeys(tokenize(query))]
+        if not expanded or not all(expanded):
+            return False
+        return len(expanded) == 1 or bool(self.match(query, prefix))
@@ -0,0 +1,174 @@
+# chatbot/src/session_store.py
+"""
+Persistencia de sesiones de conversación
+
+Cada sesión vive en `<root>/<session_id>/`:
+- journal.jsonl: un mensaje por línea, agregado en cuanto se recibe (append-only)
+- snapshot.json: ventana compactada de la conversación cada `snapshot_every`
+  mensajes, con el offset del journal en el que fue tomada
+
+Reanudar lee el snapshot y reproduce sólo la cola del journal posterior a él,
+así que el tiempo de carga no depende de la longitud total de la sesión.
+"""
+
+import json
+import os
+import secrets
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SESSIONS_DIR = os.getenv("MCP_SESSIONS_DIR", "sessions")
+
+RESET_MARKER = "reset"
+
+
+class SessionStore:
+    """Journal incremental + snapshots compactados por sesión"""
+
+    def __init__(self, root: str = DEFAULT_SESSIONS_DIR, snapshot_every: int = 50):
+        """
+        Args:
+            root: Directorio donde se guardan las sesiones
+            snapshot_every: Mensajes agregados entre snapshots compactados
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+
+    @staticmethod
+    def new_session_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
+
+    def _session_dir(self, session_id: str) -> Path:
+        if not session_id or "/" in session_id or session_id.startswith("."):
+            raise ValueError(f"ID de sesión inválido: {session_id!r}")
+        return self.root / session_id
+
+    def _journal(self, session_id: str) -> Path:
+        return self._session_dir(session_id) / "journal.jsonl"
+
+    def _snapshot(self, session_id: str) -> Path:
+        return self._session_dir(session_id) / "snapshot.json"
+
+    def exists(self, session_id: str) -> bool:
+        return self._journal(session_id).exists() or self._snapshot(session_id).exists()
+
+    def list_sessions(self) -> List[str]:
+        """Sesiones con journal o snapshot (ignora directorios ocultos y ajenos como `.pool`)"""
+        return sorted(p.name for p in self.root.iterdir()
+                      if p.is_dir() and not p.name.startswith(".")
+                      and ((p / "journal.jsonl").exists() or (p / "snapshot.json").exists()))
+
+    def append(self, session_id: str, record: Dict[str, Any]) -> None:
+        """Agregar un mensaje (o marcador) al journal de la sesión"""
+        journal = self._journal(session_id)
+        journal.parent.mkdir(exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def write_snapshot(self, session_id: str, state: Dict[str, Any]) -> None:
+        """
+        Guardar la ventana compactada de la conversación
+
+        Args:
+            session_id: Sesión a guardar
+            state: {"session_start": ..., "messages": [...], "summary": ...} con la ventana actual
+        """
+        journal = self._journal(session_id)
+        journal.parent.mkdir(exist_ok=True)
+        snapshot = dict(state)
+        snapshot["journal_offset"] = journal.stat().st_size if journal.exists() else 0
+        snapshot["saved_at"] = datetime.now().isoformat()
+
+        path = self._snapshot(session_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)  # Un snapshot nunca queda a medio escribir
+
+    def load(self, session_id: str, max_messages: int = None) -> Dict[str, Any]:
+        """
+        Cargar una sesión: snapshot + cola del journal
+
+        Args:
+            session_id: Sesión a cargar
+            max_messages: Si no hay snapshot, leer a lo sumo los últimos
+                `max_messages` registros del journal (carga en tiempo acotado)
+
+        Returns:
+            {"session_start": str | None, "messages": [...], "summary": str} en orden;
+            los mensajes posteriores a un marcador de reinicio reemplazan a los anteriores
+        """
+        if not self.exists(session_id):
+            raise FileNotFoundError(f"No existe la sesión '{session_id}'")
+
+        snapshot = self._read_snapshot(session_id)
+        journal = self._journal(session_id)
+        if snapshot is not None:
+            messages = snapshot.get("messages", [])
+            tail = self._read_from(journal, snapshot.get("journal_offset", 0))
+            session_start = snapshot.get("session_start")
+            summary = snapshot.get("summary", "")
+            pending = snapshot.get("summary_pending", [])
+        else:
+            messages, session_start, summary, pending = [], None, "", []
+            tail = self._read_tail(journal, max_messages) if max_messages else self._read_from(journal, 0)
+
+        for record in tail:
+            if record.get("type") == RESET_MARKER:
+                messages, summary, pending = [], "", []
+                session_start = record.get("timestamp")
+            else:
+                messages.append(record)
+        return {"session_start": session_start, "messages": messages, "summary": summary,
+                "summary_pending": pending}
+
+    def _read_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        path = self._snapshot(session_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None  # Snapshot corrupto: se recurre al journal
+
+    @staticmethod
+    def _parse_lines(lines) -> List[Dict[str, Any]]:
+        records = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Última línea truncada por una caída
+        return records
+
+    def _read_from(self, journal: Path, offset: int) -> List[Dict[str, Any]]:
+        if not journal.exists():
+            return []
+        with open(journal, "rb") as f:
+            f.seek(offset)
+            return self._parse_lines(f.read().decode("utf-8").splitlines())
+
+    def _read_tail(self, journal: Path, count: int, block_size: int = 65536) -> List[Dict[str, Any]]:
+        """Leer las últimas `count` líneas del journal leyendo bloques desde el final"""
+        if not journal.exists():
+            return []
+        with open(journal, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.decode("utf-8", errors="ignore").splitlines()
+        if position > 0:
+            lines = lines[1:]  # La primera línea puede estar incompleta
+        return self._parse_lines(lines[-count:])
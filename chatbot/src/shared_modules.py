@@ -0,0 +1,21 @@
+"""
+Módulos compartidos con el servidor remoto (eclipse-mcp-remote)
+
+El trazado, el catálogo de eclipses y los cálculos viven junto al servidor
+remoto para que su despliegue sea autocontenido. Importar este módulo añade
+ese directorio a sys.path una sola vez; los clientes y servidores del chatbot
+importan el trazado desde aquí y, a partir de ahí, el resto de módulos
+compartidos por su nombre.
+"""
+
+import sys
+from pathlib import Path
+
+REMOTE_DIR = str(Path(__file__).resolve().parents[2] / "eclipse-mcp-remote")
+if REMOTE_DIR not in sys.path:
+    sys.path.append(REMOTE_DIR)
+
+from tracing import SPAN_KIND_CLIENT, SPAN_KIND_SERVER, extract, get_tracer, inject, trace_environment  # noqa: E402
+
+__all__ = ["REMOTE_DIR", "SPAN_KIND_CLIENT", "SPAN_KIND_SERVER", "extract", "get_tracer", "inject",
+           "trace_environment"]
@@ -0,0 +1,20 @@
+# chatbot/tests/conftest.py
+"""
+Configuración común de las pruebas del chatbot: los módulos de chatbot/src
+se importan planos, igual que desde main.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def tool_use(tool_id, name="calculate_eclipse"):
+    """Mensaje del asistente con un único bloque tool_use"""
+    return [{"type": "tool_use", "id": tool_id, "name": name, "input": {}}]
+
+
+def tool_result(tool_id, text="ok"):
+    """Mensaje del usuario con el tool_result que responde a `tool_id`"""
+    return [{"type": "tool_result", "tool_use_id": tool_id, "content": text}]
@@ -0,0 +1,93 @@
+# chatbot/tests/test_conversation_manager.py
+"""Reparación del historial y poda por intercambios del ConversationManager"""
+
+from conftest import tool_result, tool_use
+from conversation_manager import ConversationManager, block_ids, repair_messages
+
+
+def assert_paired(messages):
+    """Cada tool_result responde al tool_use del mensaje anterior y viceversa"""
+    assert messages[0]["role"] == "user"
+    for previous, message in zip(messages, messages[1:]):
+        uses = block_ids(previous["content"], "tool_use") if previous["role"] == "assistant" else set()
+        results = block_ids(message["content"], "tool_result") if message["role"] == "user" else set()
+        assert uses == results
+
+
+def test_repair_messages_drops_orphaned_tool_result():
+    messages = [
+        {"role": "user", "content": tool_result("a")},
+        {"role": "user", "content": "¿Cuándo es el próximo eclipse?"},
+        {"role": "assistant", "content": "El 12 de agosto de 2026"},
+    ]
+    repaired, fixes = repair_messages(messages)
+    assert fixes == 1
+    assert repaired == messages[1:]
+
+
+def test_repair_messages_drops_unanswered_tool_use_but_keeps_text():
+    use = tool_use("a") + [{"type": "text", "text": "Consultando..."}]
+    messages = [
+        {"role": "user", "content": "Hola"},
+        {"role": "assistant", "content": use},
+        {"role": "user", "content": "¿Sigues ahí?"},
+    ]
+    repaired, fixes = repair_messages(messages)
+    assert fixes == 1
+    assert repaired[1]["content"] == [{"type": "text", "text": "Consultando..."}]
+    assert_paired(repaired)
+
+
+def test_repair_messages_leaves_valid_window_untouched():
+    messages = [
+        {"role": "user", "content": "Hola"},
+        {"role": "assistant", "content": tool_use("a")},
+        {"role": "user", "content": tool_result("a")},
+        {"role": "assistant", "content": tool_use("b")},  # Llamado en curso
+    ]
+    repaired, fixes = repair_messages(messages)
+    assert fixes == 0
+    assert repaired is messages
+
+
+def test_restored_window_with_orphan_is_repaired_before_sending():
+    # Una cola del journal que empieza a mitad de un intercambio
+    state = {"messages": [
+        {"role": "user", "content": tool_result("a")},
+        {"role": "assistant", "content": "Listo"},
+        {"role": "user", "content": "Gracias"},
+        {"role": "assistant", "content": tool_use("b")},
+        {"role": "user", "content": "Otra pregunta"},
+    ]}
+    conversation = ConversationManager.from_state(state, max_messages=10)
+    messages = conversation.get_messages()
+    assert [m["content"] for m in messages] == ["Gracias", "Otra pregunta"]
+    assert_paired(messages)
+    assert conversation.history_stats["window_repairs"] == 1
+    assert conversation.history_stats["repaired_blocks"] == 3
+    assert conversation.repair() == 0
+
+
+def test_eviction_at_window_boundary_keeps_tool_pairs_together():
+    conversation = ConversationManager(max_messages=6)
+    conversation.add_message("user", "Hola")
+    conversation.add_message("assistant", "Hola, ¿en qué te ayudo?")
+    # Fijados: 2; ventana deslizante: 4 lugares
+    conversation.add_message("user", "Eclipse en Madrid")
+    conversation.add_message("assistant", tool_use("a"))
+    conversation.add_message("user", tool_result("a"))
+    conversation.add_message("assistant", "Es el 12 de agosto de 2026")
+    assert len(conversation) == 6
+
+    # El mensaje nuevo desaloja al más antiguo ("Eclipse en Madrid")
+    conversation.add_message("user", "¿Y en Sevilla?")
+    recent = [m["content"] for m in conversation.get_messages()[2:]]
+    assert recent[0] == tool_use("a")
+
+    # El siguiente desaloja el tool_use y, con él, su tool_result
+    conversation.add_message("assistant", tool_use("b"))
+    messages = conversation.get_messages()
+    assert len(conversation) == 5
+    assert [m["content"] for m in messages[2:]] == ["Es el 12 de agosto de 2026", "¿Y en Sevilla?", tool_use("b")]
+    assert_paired(messages)
+    assert conversation.history_stats["window_repairs"] == 0
@@ -0,0 +1,43 @@
+# chatbot/tests/test_conversation_pool.py
+"""Volcado a disco y rehidratación de conversaciones del ConversationPool"""
+
+from conftest import tool_result, tool_use
+from conversation_pool import ConversationPool
+
+
+def test_spill_and_rehydrate_round_trip(tmp_path):
+    pool = ConversationPool(spill_dir=str(tmp_path), memory_budget=10 ** 9, max_resident=1, max_messages=10)
+    pool.add_message("ana", "user", "Eclipse en Madrid")
+    pool.add_message("ana", "assistant", tool_use("a"))
+    pool.add_message("ana", "user", tool_result("a", "12 de agosto de 2026 " * 20))
+    pool.add_message("ana", "assistant", "Es el 12 de agosto de 2026")
+    before = [m.to_dict() for m in pool.get("ana")._iter_messages()]
+    expected_api = pool.get("ana").get_messages()
+
+    # Una segunda conversación supera max_resident y vuelca la primera
+    pool.add_message("luis", "user", "Hola")
+    assert pool.stats["spills"] == 1
+    assert (tmp_path / "ana.json.z").exists()
+    assert "ana" in pool and len(pool) == 2
+
+    conversation = pool.get("ana")
+    assert pool.stats["rehydrations"] == 1
+    assert not (tmp_path / "ana.json.z").exists()
+    assert [m.to_dict() for m in conversation._iter_messages()] == before
+    assert conversation.get_messages() == expected_api
+    assert conversation.search_context("agosto")
+
+    # La conversación rehidratada sigue aceptando mensajes
+    pool.add_message("ana", "user", "¿Y en Sevilla?")
+    assert conversation.get_messages()[-1] == {"role": "user", "content": "¿Y en Sevilla?"}
+
+
+def test_memory_budget_spills_least_recently_used(tmp_path):
+    pool = ConversationPool(spill_dir=str(tmp_path), memory_budget=2500, max_messages=10)
+    pool.add_message("ana", "user", "a" * 500)
+    pool.add_message("luis", "user", "b" * 500)
+    pool.get("ana")  # "luis" pasa a ser la menos usada
+    pool.add_message("eva", "user", "c" * 500)  # ~1 KB cada una: caben dos
+    assert pool.get_stats()["resident"] == 2
+    assert (tmp_path / "luis.json.z").exists()
+    assert pool.get("luis").get_messages() == [{"role": "user", "content": "b" * 500}]
@@ -0,0 +1,53 @@
+# chatbot/tests/test_session_store.py
+"""Reanudación de sesiones desde snapshot + cola del journal"""
+
+import json
+
+from conversation_manager import ConversationManager
+from session_store import RESET_MARKER, SessionStore
+
+
+def contents(state):
+    return [m["content"] for m in state["messages"]]
+
+
+def test_load_replays_only_journal_tail_after_snapshot_offset(tmp_path):
+    store = SessionStore(str(tmp_path), snapshot_every=3)
+    conversation = ConversationManager(max_messages=10, session_id="s1", store=store)
+    for i in range(5):
+        conversation.add_message("user" if i % 2 == 0 else "assistant", f"mensaje {i}")
+
+    snapshot = json.loads((tmp_path / "s1" / "snapshot.json").read_text(encoding="utf-8"))
+    journal = (tmp_path / "s1" / "journal.jsonl").read_bytes()
+    assert contents(snapshot) == ["mensaje 0", "mensaje 1", "mensaje 2"]
+    assert 0 < snapshot["journal_offset"] < len(journal)
+    tail = journal[snapshot["journal_offset"]:].decode("utf-8").splitlines()
+    assert [json.loads(line)["content"] for line in tail] == ["mensaje 3", "mensaje 4"]
+
+    # Los mensajes del snapshot no se duplican al reproducir la cola
+    assert contents(store.load("s1")) == [f"mensaje {i}" for i in range(5)]
+    resumed = ConversationManager.resume("s1", store, max_messages=10)
+    assert [m["content"] for m in resumed.get_messages()] == [f"mensaje {i}" for i in range(5)]
+
+
+def test_load_uses_snapshot_window_and_replays_reset_in_tail(tmp_path):
+    store = SessionStore(str(tmp_path), snapshot_every=100)
+    store.append("s1", {"role": "user", "content": "antiguo", "timestamp": "2026-01-01T00:00:00"})
+    store.write_snapshot("s1", {"session_start": "2026-01-01T00:00:00",
+                                "messages": [{"role": "user", "content": "compactado"}], "summary": "resumen"})
+    store.append("s1", {"type": RESET_MARKER, "timestamp": "2026-01-02T00:00:00"})
+    store.append("s1", {"role": "user", "content": "nuevo", "timestamp": "2026-01-02T00:00:01"})
+
+    state = store.load("s1")
+    assert contents(state) == ["nuevo"]
+    assert state["summary"] == ""
+    assert state["session_start"] == "2026-01-02T00:00:00"
+
+
+def test_load_ignores_truncated_last_line(tmp_path):
+    store = SessionStore(str(tmp_path))
+    store.append("s1", {"role": "user", "content": "completo"})
+    store.write_snapshot("s1", {"messages": []})
+    with open(tmp_path / "s1" / "journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"role": "user", "content": "cort')
+    assert contents(store.load("s1")) == []
@@ -0,0 +1,565 @@
+# eclipse-mcp-remote/besselian.py
+"""
+Circunstancias locales de eclipses solares a partir de elementos besselianos
+
+Los elementos besselianos (x, y, d, μ, l1, l2, tan f1, tan f2) describen la
+sombra de la Luna sobre el plano fundamental. Se derivan de las posiciones
+geocéntricas aparentes del Sol y la Luna (tabla de `ephemeris`, ephem)
+alrededor de la conjunción y se ajustan con polinomios cúbicos en horas desde t0.
+
+Con ellos, `local_circumstances` calcula para muchos observadores a la vez
+(NumPy) los contactos C1–C4, el máximo, la magnitud, el oscurecimiento y la
+altura del Sol, siguiendo el método de Meeus (Elements of Solar Eclipses).
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import ephem
+import numpy as np
+
+from ephemeris import NEW_MOON, moon_phases, positions, to_spherical
+
+EARTH_RADIUS_KM = 6378.137
+AU_KM = 149597870.7
+SUN_RADIUS = 696000.0 / EARTH_RADIUS_KM  # Radios terrestres
+MOON_K1 = 0.2724880  # Radio lunar para la penumbra (radios terrestres)
+MOON_K2 = 0.2722810  # Radio lunar para la umbra
+FLATTENING_B_A = 0.99664719  # Razón de ejes polar/ecuatorial del elipsoide
+FIT_HOURS = 4  # Ventana de ajuste: t0 ± 4 h
+DEG = np.pi / 180.0
+
+
+class BesselianElements:
+    """Polinomios de los elementos besselianos de un eclipse solar alrededor de t0"""
+
+    __slots__ = ("t0", "x", "y", "d", "mu", "l1", "l2", "tan_f1", "tan_f2", "gamma", "t_greatest", "date",
+                 "_matrix", "_derivative")
+
+    def __init__(self, t0: float, coefficients: Dict[str, np.ndarray], tan_f1: float, tan_f2: float):
+        """
+        Args:
+            t0: Instante de referencia (ephem.Date, días UT)
+            coefficients: Coeficientes (grado 0 primero) en horas desde t0 para
+                x, y, d (rad), mu (rad), l1 y l2
+            tan_f1, tan_f2: Tangentes de los ángulos de los conos de penumbra y umbra
+        """
+        self.t0 = t0
+        self.x = coefficients["x"]
+        self.y = coefficients["y"]
+        self.d = coefficients["d"]
+        self.mu = coefficients["mu"]
+        self.l1 = coefficients["l1"]
+        self.l2 = coefficients["l2"]
+        self.tan_f1 = tan_f1
+        self.tan_f2 = tan_f2
+        # Coeficientes de los valores (4×6) y de las derivadas (3×6) para evaluar todo con un producto
+        self._matrix = self.coefficients.T
+        self._derivative = self._matrix[1:] * np.arange(1, 4)[:, None]
+        # Distancia mínima del eje de la sombra al centro de la Tierra (eclipse máximo)
+        t = np.linspace(-FIT_HOURS, FIT_HOURS, 801)
+        distance = np.hypot(np.polyval(self.x[::-1], t), np.polyval(self.y[::-1], t))
+        t = t[int(np.argmin(distance))]
+        for _ in range(3):  # Refinar: x·x' + y·y' = 0
+            e = self.at(np.array([t]))
+            t = float(t - (e["x"] * e["x_dot"] + e["y"] * e["y_dot"])[0] / (e["x_dot"] ** 2 + e["y_dot"] ** 2)[0])
+        self.t_greatest = t
+        self.gamma = float(np.hypot(np.polyval(self.x[::-1], t), np.polyval(self.y[::-1], t)))
+        self.date = ephem.Date(t0 + self.t_greatest / 24.0).datetime().date().isoformat()
+
+    def at(self, t: np.ndarray) -> Dict[str, np.ndarray]:
+        """Elementos y sus derivadas (por hora) en `t` horas desde t0"""
+        t = np.asarray(t, dtype=float)
+        powers = np.stack([np.ones_like(t), t, t * t, t * t * t], axis=-1)
+        values = powers @ self._matrix
+        derivatives = powers[..., :3] @ self._derivative
+        result = {}
+        for i, name in enumerate(("x", "y", "d", "mu", "l1", "l2")):
+            result[name] = values[..., i]
+            result[name + "_dot"] = derivatives[..., i]
+        return result
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        """Coeficientes como matriz 6×4 (x, y, d, mu, l1, l2; grado 0 primero)"""
+        return np.array([self.x, self.y, self.d, self.mu, self.l1, self.l2])
+
+    def to_datetime(self, hours: float) -> datetime:
+        return ephem.Date(self.t0 + hours / 24.0).datetime().replace(tzinfo=timezone.utc)
+
+    @property
+    def central_type(self) -> str:
+        """Tipo en el eje de la sombra al máximo: total, anular o parcial (no central)"""
+        if self.gamma > 1.0 + abs(float(self.l2[0])):
+            return "partial"
+        return "total" if float(self.l2[0]) < 0 else "annular"
+
+
+def _elements_samples(times: np.ndarray) -> Dict[str, np.ndarray]:
+    """Elementos besselianos exactos en varios instantes (posiciones de la tabla de efemérides)"""
+    p = positions(times)
+    sun = p["sun"] * (AU_KM / EARTH_RADIUS_KM)
+    moon = p["moon"] * (AU_KM / EARTH_RADIUS_KM)
+    ra_m, dec_m, r_m = to_spherical(moon)
+    g = sun - moon
+    g_norm = np.linalg.norm(g, axis=1)
+    a = np.arctan2(g[:, 1], g[:, 0])
+    d = np.arcsin(g[:, 2] / g_norm)
+
+    x = r_m * np.cos(dec_m) * np.sin(ra_m - a)
+    y = r_m * (np.sin(dec_m) * np.cos(d) - np.cos(dec_m) * np.sin(d) * np.cos(ra_m - a))
+    z = r_m * (np.sin(dec_m) * np.sin(d) + np.cos(dec_m) * np.cos(d) * np.cos(ra_m - a))
+
+    sin_f1 = (SUN_RADIUS + MOON_K1) / g_norm
+    sin_f2 = (SUN_RADIUS - MOON_K2) / g_norm
+    tan_f1 = sin_f1 / np.sqrt(1 - sin_f1 ** 2)
+    tan_f2 = sin_f2 / np.sqrt(1 - sin_f2 ** 2)
+    c1 = z + MOON_K1 / sin_f1
+    c2 = z - MOON_K2 / sin_f2
+    return {
+        "x": x, "y": y, "d": d, "mu": p["sidereal"] - a,
+        "l1": c1 * tan_f1, "l2": c2 * tan_f2, "tan_f1": tan_f1, "tan_f2": tan_f2,
+    }
+
+
+_preloaded: Dict[str, tuple] = {}
+
+
+def preload_elements(date: str, t0: float, coefficients: Dict[str, np.ndarray], tan_f1: float, tan_f2: float):
+    """
+    Registrar elementos ya calculados (p. ej. del catálogo generado) para no derivarlos
+    de nuevo con ephem; el objeto se construye la primera vez que se pide la fecha
+    """
+    _preloaded[date] = (t0, coefficients, tan_f1, tan_f2)
+
+
+@lru_cache(maxsize=256)
+def besselian_elements(date: str) -> Optional[BesselianElements]:
+    """
+    Elementos besselianos del eclipse solar de una fecha (YYYY-MM-DD, UT)
+
+    Returns:
+        BesselianElements, o None si la luna nueva de esa fecha no produce eclipse
+    """
+    if date in _preloaded:
+        return BesselianElements(*_preloaded[date])
+    day = ephem.Date(date.replace("-", "/"))
+    new_moons = moon_phases(day - 1.0, day + 2.0, NEW_MOON)
+    if not new_moons.size:
+        return None
+    new_moon = float(new_moons[0])
+    t0 = ephem.Date(round(new_moon * 24) / 24.0)  # Hora entera más cercana a la conjunción
+
+    hours = np.arange(-FIT_HOURS, FIT_HOURS + 1, dtype=float)
+    columns = _elements_samples(float(t0) + hours / 24.0)
+    columns["mu"] = np.unwrap(columns["mu"])
+    coefficients = {name: np.polynomial.polynomial.polyfit(hours, columns[name], 3)
+                    for name in ("x", "y", "d", "mu", "l1", "l2")}
+    elements = BesselianElements(float(t0), coefficients,
+                                 float(columns["tan_f1"].mean()), float(columns["tan_f2"].mean()))
+    # Sin eclipse si la penumbra nunca toca la Tierra
+    if elements.gamma > 1.0 + float(np.abs(columns["l1"]).max()):
+        return None
+    return elements
+
+
+def _observer_geocentric(lat: np.ndarray, lon: np.ndarray, elevation: np.ndarray):
+    """ρ sen φ' y ρ cos φ' del observador (latitud geodésica en radianes)"""
+    u = np.arctan(FLATTENING_B_A * np.tan(lat))
+    height = elevation / (EARTH_RADIUS_KM * 1000.0)
+    return FLATTENING_B_A * np.sin(u) + height * np.sin(lat), np.cos(u) + height * np.cos(lat)
+
+
+def _fundamental(elements: BesselianElements, t: np.ndarray, lon: np.ndarray,
+                 rho_sin: np.ndarray, rho_cos: np.ndarray) -> Dict[str, np.ndarray]:
+    """u, v, sus derivadas, L1', L2' y ζ del observador en el plano fundamental"""
+    e = elements.at(t)
+    hour_angle = e["mu"] + lon
+    sin_d, cos_d = np.sin(e["d"]), np.cos(e["d"])
+    sin_h, cos_h = np.sin(hour_angle), np.cos(hour_angle)
+    xi = rho_cos * sin_h
+    eta = rho_sin * cos_d - rho_cos * cos_h * sin_d
+    zeta = rho_sin * sin_d + rho_cos * cos_h * cos_d
+    xi_dot = e["mu_dot"] * rho_cos * cos_h
+    eta_dot = e["mu_dot"] * xi * sin_d - zeta * e["d_dot"]
+    return {
+        "u": e["x"] - xi, "v": e["y"] - eta,
+        "u_dot": e["x_dot"] - xi_dot, "v_dot": e["y_dot"] - eta_dot,
+        "l1": e["l1"] - zeta * elements.tan_f1, "l2": e["l2"] - zeta * elements.tan_f2,
+        "zeta": zeta,
+    }
+
+
+def _contact(elements, t, lon, rho_sin, rho_cos, radius_key: str, sign: float, iterations: int = 4):
+    """Refinar instantes de contacto (Δ = L') por Newton; sign=-1 inicio, +1 fin"""
+    t = t.copy()
+    valid = np.ones_like(t, dtype=bool)
+    for _ in range(iterations):
+        f = _fundamental(elements, t, lon, rho_sin, rho_cos)
+        n2 = f["u_dot"] ** 2 + f["v_dot"] ** 2
+        n = np.sqrt(n2)
+        radius = np.abs(f[radius_key])
+        s = (f["u"] * f["v_dot"] - f["u_dot"] * f["v"]) / (n * radius)
+        valid = np.abs(s) <= 1
+        root = np.sqrt(np.clip(1 - s ** 2, 0, None))
+        t = t - (f["u"] * f["u_dot"] + f["v"] * f["v_dot"]) / n2 + sign * radius / n * root
+    return t, valid
+
+
+def _obscuration(magnitude: np.ndarray, ratio: np.ndarray) -> np.ndarray:
+    """Fracción del disco solar cubierta (radios Sol = 1, Luna = ratio)"""
+    m = np.clip(magnitude, 0, None)
+    sep = np.clip(1 + ratio - 2 * m, 0, None)  # Distancia entre centros
+    full = np.where(ratio >= 1, 1.0, ratio ** 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a1 = np.arccos(np.clip((sep ** 2 + 1 - ratio ** 2) / (2 * sep), -1, 1))
+        a2 = np.arccos(np.clip((sep ** 2 + ratio ** 2 - 1) / (2 * sep * ratio), -1, 1))
+        lens = a1 + ratio ** 2 * a2 - 0.5 * np.sqrt(np.clip(
+            (-sep + 1 + ratio) * (sep + 1 - ratio) * (sep - 1 + ratio) * (sep + 1 + ratio), 0, None))
+    partial = lens / np.pi
+    inside = sep <= np.abs(1 - ratio)
+    return np.where(m <= 0, 0.0, np.where(inside, full, np.clip(partial, 0, 1)))
+
+
+def local_circumstances(elements: BesselianElements, lat, lon, elevation=0.0) -> Dict[str, np.ndarray]:
+    """
+    Circunstancias locales del eclipse para muchos observadores a la vez
+
+    Args:
+        elements: Elementos besselianos del eclipse
+        lat, lon: Latitud y longitud geodésicas en grados (este positivo); escalares o arrays
+        elevation: Altura sobre el elipsoide en metros
+
+    Returns:
+        Dict de arrays (uno por observador): t_max, t_c1, t_c4, t_c2, t_c3 (horas desde
+        t0, NaN si no hay contacto), magnitude, obscuration, sun_altitude (grados al
+        máximo), sun_altitude_c1/sun_altitude_c4, visible (bool), eclipsed (bool), central (bool), local_type ('partial'/'total'/'annular'/'none')
+    """
+    lat = np.radians(np.atleast_1d(np.asarray(lat, dtype=float)))
+    lon = np.radians(np.atleast_1d(np.asarray(lon, dtype=float)))
+    elevation = np.broadcast_to(np.asarray(elevation, dtype=float), lat.shape)
+    rho_sin, rho_cos = _observer_geocentric(lat, lon, elevation)
+
+    # Máximo local: mínimo de Δ por Newton
+    t = np.zeros_like(lat)
+    for _ in range(5):
+        f = _fundamental(elements, t, lon, rho_sin, rho_cos)
+        tau = -(f["u"] * f["u_dot"] + f["v"] * f["v_dot"]) / (f["u_dot"] ** 2 + f["v_dot"] ** 2)
+        t = np.clip(t + tau, -FIT_HOURS, FIT_HOURS)
+    f = _fundamental(elements, t, lon, rho_sin, rho_cos)
+    delta = np.hypot(f["u"], f["v"])
+    l1, l2 = f["l1"], f["l2"]
+    magnitude = np.where(delta < l1, (l1 - delta) / (l1 + l2), 0.0)
+    ratio = (l1 - l2) / (l1 + l2)  # Diámetro aparente Luna / Sol
+    central = delta < np.abs(l2)
+    eclipsed = delta < l1
+
+    c1, ok1 = _contact(elements, t, lon, rho_sin, rho_cos, "l1", -1.0)
+    c4, ok4 = _contact(elements, t, lon, rho_sin, rho_cos, "l1", +1.0)
+    c2, ok2 = _contact(elements, t, lon, rho_sin, rho_cos, "l2", -1.0)
+    c3, ok3 = _contact(elements, t, lon, rho_sin, rho_cos, "l2", +1.0)
+    nan = np.full_like(t, np.nan)
+
+    local_type = np.where(~eclipsed, "none", np.where(~central, "partial", np.where(l2 < 0, "total", "annular")))
+    rho = np.hypot(rho_sin, rho_cos)
+    c1 = np.where(eclipsed & ok1, c1, nan)
+    c4 = np.where(eclipsed & ok4, c4, nan)
+    altitude = _sun_altitude(f["zeta"], rho)
+    altitude_c1 = _sun_altitude(_fundamental(elements, np.nan_to_num(c1), lon, rho_sin, rho_cos)["zeta"], rho)
+    altitude_c4 = _sun_altitude(_fundamental(elements, np.nan_to_num(c4), lon, rho_sin, rho_cos)["zeta"], rho)
+    # Visible si el Sol está sobre el horizonte en el máximo o en alguno de los contactos
+    visible = eclipsed & (np.fmax(np.fmax(altitude, np.where(np.isnan(c1), np.nan, altitude_c1)),
+                                  np.where(np.isnan(c4), np.nan, altitude_c4)) > 0)
+    return {
+        "t_max": t,
+        "t_c1": c1,
+        "t_c4": c4,
+        "t_c2": np.where(central & ok2, c2, nan),
+        "t_c3": np.where(central & ok3, c3, nan),
+        "magnitude": magnitude,
+        "obscuration": np.where(eclipsed, _obscuration(magnitude, ratio), 0.0),
+        "sun_altitude": altitude,
+        "sun_altitude_c1": altitude_c1,
+        "sun_altitude_c4": altitude_c4,
+        "visible": visible,
+        "eclipsed": eclipsed,
+        "central": central,
+        "local_type": local_type,
+    }
+
+
+SCREEN_STEP_HOURS = 0.25
+SCREEN_MARGIN = 0.02  # Radios terrestres: cubre lo que el mínimo en la malla sobreestima
+SCREEN_ZETA_MARGIN = 0.05  # ζ varía como mucho ~0.26 por hora
+
+
+def penumbra_screen(elements: List[BesselianElements], lat: float, lon: float) -> np.ndarray:
+    """
+    Criba rápida de muchos eclipses para un observador: False si no puede verlo
+
+    Evalúa Δ − L1' y ζ en una malla de instantes para todos los eclipses con un
+    solo producto de matrices: un eclipse sólo es visible si la penumbra alcanza
+    al observador con el Sol sobre el horizonte. Los True deben confirmarse con
+    `local_circumstances`.
+    """
+    if not elements:
+        return np.zeros(0, dtype=bool)
+    lat_r, lon_r = np.radians([lat]), np.radians([lon])
+    rho_sin, rho_cos = _observer_geocentric(lat_r, lon_r, np.zeros(1))
+    t = np.arange(-FIT_HOURS, FIT_HOURS + SCREEN_STEP_HOURS / 2, SCREEN_STEP_HOURS)
+    powers = np.stack([np.ones_like(t), t, t * t, t * t * t], axis=-1)
+    values = np.einsum("tk,ekn->etn", powers, np.stack([e._matrix for e in elements]))
+    x, y, d, mu, l1 = (values[..., i] for i in range(5))
+    sin_d, cos_d, cos_h = np.sin(d), np.cos(d), np.cos(mu + lon_r)
+    xi = rho_cos * np.sin(mu + lon_r)
+    eta = rho_sin * cos_d - rho_cos * cos_h * sin_d
+    zeta = rho_sin * sin_d + rho_cos * cos_h * cos_d
+    tan_f1 = np.array([e.tan_f1 for e in elements])[:, None]
+    gap = np.hypot(x - xi, y - eta) - (l1 - zeta * tan_f1)
+    return (np.where(zeta > -SCREEN_ZETA_MARGIN, gap, np.inf).min(axis=1) < SCREEN_MARGIN)
+
+
+def _sun_altitude(zeta: np.ndarray, rho: np.ndarray) -> np.ndarray:
+    """Altura del Sol en grados: ζ es la proyección del observador sobre el eje de la sombra"""
+    return np.degrees(np.arcsin(np.clip(zeta / rho, -1, 1)))
+
+
+def clock_strings(elements: BesselianElements, hours) -> List[Optional[str]]:
+    """Horas desde t0 → "HH:MM:SS" UTC (None donde la hora es NaN), vectorizado"""
+    hours = np.atleast_1d(np.asarray(hours, dtype=float))
+    t0 = elements.to_datetime(0.0)
+    base = t0.hour * 3600 + t0.minute * 60 + t0.second + t0.microsecond / 1e6
+    seconds = np.floor(base + np.nan_to_num(hours) * 3600).astype(np.int64) % 86400
+    return [None if missing else f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}"
+            for s, missing in zip(seconds.tolist(), np.isnan(hours).tolist())]
+
+
+def _clock(elements: BesselianElements, hours: float) -> Optional[str]:
+    return clock_strings(elements, hours)[0]
+
+
+def _epochs(elements: BesselianElements, start: float, maximum: float, end: float) -> Dict[str, Optional[float]]:
+    """Instantes (horas desde t0) → segundos Unix UTC de inicio, máximo y fin (None donde son NaN)"""
+    epoch0 = elements.to_datetime(0.0).timestamp()
+    return {name: None if hours != hours else float(np.floor(epoch0 + hours * 3600))
+            for name, hours in (("start", start), ("maximum", maximum), ("end", end))}
+
+
+def _coverage(obscuration: float) -> str:
+    """Porcentaje de cobertura a partir del oscurecimiento ya redondeado ("99.9%" bajo el 100 %)"""
+    percent = obscuration * 100
+    return f"{percent:.1f}%" if 99.5 <= percent < 100 else f"{round(percent)}%"
+
+
+def rounded_obscuration(obscuration, local_type):
+    """
+    Oscurecimiento redondeado a 3 decimales, vectorizado
+
+    Sólo un eclipse total cubre el 100 % del Sol: en uno parcial o anular
+    el redondeo se queda en 0.999 como máximo (Madrid, 2026-08-12: parcial con
+    magnitud 0.999 no debe mostrar un "100%").
+    """
+    rounded = np.round(np.asarray(obscuration, dtype=float), 3)
+    return np.where(np.asarray(local_type) == "total", rounded, np.minimum(rounded, 0.999))
+
+
+def location_record(elements: BesselianElements, circumstances: Dict[str, np.ndarray], i: int = 0) -> Dict[str, Any]:
+    """
+    Registro de una ubicación con las mismas claves que el catálogo de eclipses
+
+    Las horas están en UTC; "epochs" lleva los mismos instantes como segundos
+    Unix para convertirlos a hora local (`timezones`). El eclipse es visible si
+    el Sol está sobre el horizonte en el máximo o en alguno de los contactos.
+    Si no lo es (fuera de la sombra o en el lado nocturno) el registro es el
+    mismo en los dos casos: local_type "none", sin contactos y magnitud 0.
+    """
+    c = {name: values[i] for name, values in circumstances.items()}
+    eclipsed = bool(c["eclipsed"])
+    visible = bool(c["visible"])
+    t_c1, t_max, t_c4 = (c["t_c1"], c["t_max"], c["t_c4"]) if visible else (np.nan, np.nan, np.nan)
+    obscuration = float(rounded_obscuration(c["obscuration"], c["local_type"])) if visible else 0
+    record = {
+        "visible": visible,
+        "partial": visible and c["local_type"] == "partial",
+        "coverage": _coverage(obscuration),
+        "start_time": _clock(elements, t_c1),
+        "max_time": _clock(elements, t_max),
+        "end_time": _clock(elements, t_c4),
+        "magnitude": round(float(c["magnitude"]), 3) if visible else 0,
+        "obscuration": obscuration,
+        "sun_altitude": round(float(c["sun_altitude"]), 1),
+        "local_type": str(c["local_type"]) if visible else "none",
+        "time_zone": "UTC",
+        "epochs": _epochs(elements, t_c1, t_max, t_c4),
+    }
+    if visible and c["local_type"] in ("total", "annular") and not np.isnan(c["t_c2"]) and not np.isnan(c["t_c3"]):
+        record["central_start_time"] = _clock(elements, c["t_c2"])
+        record["central_end_time"] = _clock(elements, c["t_c3"])
+        record["central_duration_seconds"] = round(float(c["t_c3"] - c["t_c2"]) * 3600)
+    if not visible:
+        record["reason"] = ("El Sol está bajo el horizonte durante el eclipse" if eclipsed
+                            else "La sombra de la Luna no pasa por esta ubicación")
+    return {key: value for key, value in record.items() if value is not None}
+
+
+def solar_circumstances(date: str, latitude: float, longitude: float, elevation: float = 0.0) -> Optional[Dict[str, Any]]:
+    """
+    Datos de visibilidad calculados para unas coordenadas
+
+    Returns:
+        Registro con las claves del catálogo más "coordinates" y "source", o None
+        si en esa fecha no hay eclipse solar
+    """
+    elements = besselian_elements(date)
+    if elements is None:
+        return None
+    record = location_record(elements, local_circumstances(elements, latitude, longitude, elevation))
+    record["coordinates"] = {"latitude": latitude, "longitude": longitude, "elevation": elevation}
+    record["source"] = "besselian"
+    return record
+
+
+def _geographic(e: Dict[str, np.ndarray], xi: np.ndarray, eta: np.ndarray):
+    """Punto (ξ, η) del plano fundamental → latitud y longitud geodésicas en grados (NaN fuera de la Tierra)"""
+    rho1 = np.sqrt(np.sin(e["d"]) ** 2 + (FLATTENING_B_A * np.cos(e["d"])) ** 2)
+    sin_d1, cos_d1 = np.sin(e["d"]) / rho1, FLATTENING_B_A * np.cos(e["d"]) / rho1
+    eta1 = eta / rho1
+    with np.errstate(invalid="ignore"):
+        zeta1 = np.sqrt(1.0 - xi ** 2 - eta1 ** 2)
+    phi1 = np.arcsin(np.clip(eta1 * cos_d1 + zeta1 * sin_d1, -1, 1))
+    hour_angle = np.arctan2(xi, zeta1 * cos_d1 - eta1 * sin_d1)
+    latitude = np.degrees(np.arctan(np.tan(phi1) / FLATTENING_B_A))
+    longitude = (np.degrees(hour_angle - e["mu"]) + 180.0) % 360.0 - 180.0
+    return latitude, longitude
+
+
+def central_phase(elements: BesselianElements) -> Optional[tuple]:
+    """
+    Intervalo (horas desde t0) en que el eje de la sombra corta la Tierra, o None
+    si el eclipse no es central
+    """
+    def inside(t):
+        e = elements.at(t)
+        rho1 = np.sqrt(np.sin(e["d"]) ** 2 + (FLATTENING_B_A * np.cos(e["d"])) ** 2)
+        return 1.0 - e["x"] ** 2 - (e["y"] / rho1) ** 2
+
+    t = np.linspace(-FIT_HOURS, FIT_HOURS, 481)  # Malla de 1 minuto
+    on_earth = inside(t) > 0
+    if not on_earth.any():
+        return None
+    first, last = np.flatnonzero(on_earth)[[0, -1]]
+    # Bisección de los dos bordes a la vez: [fuera, dentro] al inicio y [dentro, fuera] al final
+    low = np.array([t[max(first - 1, 0)], t[last]])
+    high = np.array([t[first], t[min(last + 1, len(t) - 1)]])
+    for _ in range(30):
+        middle = 0.5 * (low + high)
+        inner = inside(middle) > 0
+        toward_start = np.array([True, False])
+        move_high = inner == toward_start
+        high = np.where(move_high, middle, high)
+        low = np.where(move_high, low, middle)
+    return float(high[0]), float(low[1])
+
+
+def path_points(elements: BesselianElements, t) -> Dict[str, np.ndarray]:
+    """
+    Línea central y límites norte y sur de la franja de totalidad/anularidad
+
+    Los límites son los puntos en que el borde de la umbra es tangente a su
+    envolvente: a distancia |L2'| del eje, en perpendicular a la velocidad de
+    la sombra relativa al observador (se itera porque L2' y la velocidad
+    dependen del punto).
+
+    Args:
+        elements: Elementos besselianos del eclipse
+        t: Instantes en horas desde t0 (dentro de `central_phase`)
+
+    Returns:
+        Dict de arrays 3×n: latitude y longitude (grados; filas línea central,
+        límite norte, límite sur; NaN si el punto cae fuera de la Tierra) y
+        arrays n: duration (segundos en la línea central) y l2 (L2' en la
+        línea central: < 0 total, > 0 anular)
+    """
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    e = elements.at(t)
+    latitude, longitude = np.empty((3, len(t))), np.empty((3, len(t)))
+    latitude[0], longitude[0] = _geographic(e, e["x"], e["y"])
+    zeros = np.zeros_like(t)
+
+    def at_point(lat, lon):
+        rho_sin, rho_cos = _observer_geocentric(np.radians(lat), np.radians(lon), zeros)
+        return _fundamental(elements, t, np.radians(lon), rho_sin, rho_cos)
+
+    f = at_point(latitude[0], longitude[0])
+    speed = np.hypot(f["u_dot"], f["v_dot"])
+    for row, side in ((1, 1.0), (2, -1.0)):
+        g = f
+        for _ in range(4):
+            # Normal a la velocidad relativa; +1 hacia el norte del eje (la sombra avanza hacia el este)
+            norm = np.hypot(g["u_dot"], g["v_dot"])
+            offset = side * np.abs(g["l2"]) / norm
+            lat, lon = _geographic(e, e["x"] - offset * g["v_dot"], e["y"] + offset * g["u_dot"])
+            g = at_point(np.nan_to_num(lat), np.nan_to_num(lon))
+        latitude[row], longitude[row] = lat, lon
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "duration": 2 * np.abs(f["l2"]) / speed * 3600.0,
+        "l2": f["l2"],
+    }
+
+
+def greatest_eclipse(elements: BesselianElements) -> Dict[str, Any]:
+    """
+    Punto y circunstancias del eclipse máximo (eje de la sombra más cerca del centro de la Tierra)
+
+    En eclipses no centrales el punto es el del limbo terrestre más cercano al eje.
+    Como en los cánones de eclipses, la magnitud de un eclipse central es la razón
+    de diámetros Luna/Sol; la de uno parcial, la fracción del diámetro solar cubierta.
+
+    Returns:
+        Dict con type (total/annular/hybrid/partial), time (ISO UTC), gamma (con
+        signo: positivo si el eje pasa al norte del centro), latitude, longitude,
+        magnitude, sun_altitude y, si es central, central_duration_seconds
+    """
+    t = np.array([elements.t_greatest])
+    e = elements.at(t)
+    x, y, d, mu, l2 = (float(e[name][0]) for name in ("x", "y", "d", "mu", "l2"))
+    # Elipsoide: coordenadas del plano fundamental escaladas al eje polar (Meeus, cap. 1)
+    rho1 = np.sqrt(np.sin(d) ** 2 + (FLATTENING_B_A * np.cos(d)) ** 2)
+    sin_d1, cos_d1 = np.sin(d) / rho1, FLATTENING_B_A * np.cos(d) / rho1
+    y1 = y / rho1
+    r = float(np.hypot(x, y1))
+    if r < 1.0:
+        xi, eta, zeta = x, y1, np.sqrt(1.0 - r ** 2)
+    else:
+        xi, eta, zeta = x / r, y1 / r, 0.0
+    phi1 = np.arcsin(eta * cos_d1 + zeta * sin_d1)
+    hour_angle = np.arctan2(xi, zeta * cos_d1 - eta * sin_d1)
+    latitude = float(np.degrees(np.arctan(np.tan(phi1) / FLATTENING_B_A)))
+    longitude = float((np.degrees(hour_angle - mu) + 180.0) % 360.0 - 180.0)
+
+    c = local_circumstances(elements, latitude, longitude)
+    rho_sin, rho_cos = _observer_geocentric(np.radians([latitude]), np.radians([longitude]), np.zeros(1))
+    f = _fundamental(elements, t, np.radians([longitude]), rho_sin, rho_cos)
+    l1_local, l2_local = float(f["l1"][0]), float(f["l2"][0])
+    if r < 1.0:
+        # Total en el máximo pero anular en los extremos de la franja (ζ = 0): híbrido
+        eclipse_type = ("annular" if l2_local > 0 else "hybrid" if l2 > 0 else "total")
+        magnitude = (l1_local - l2_local) / (l1_local + l2_local)
+    else:
+        eclipse_type = "partial" if r > 1.0 + abs(l2) else ("total" if l2 < 0 else "annular")
+        magnitude = float(c["magnitude"][0])
+    result = {
+        "type": eclipse_type,
+        "time": elements.to_datetime(float(t[0])).isoformat(timespec="seconds"),
+        "gamma": round(float(np.copysign(np.hypot(x, y), y)), 4),
+        "latitude": round(latitude, 3),
+        "longitude": round(longitude, 3),
+        "magnitude": round(magnitude, 4),
+        "sun_altitude": round(float(c["sun_altitude"][0]), 1),
+    }
+    if not np.isnan(c["t_c2"][0]) and not np.isnan(c["t_c3"][0]):
+        result["central_duration_seconds"] = round(float(c["t_c3"][0] - c["t_c2"][0]) * 3600)
+    return result
@@ -0,0 +1,296 @@
+# eclipse-mcp-remote/best_eclipse.py
+"""
+Búsqueda del mejor eclipse solar a menos de un radio y dentro de una ventana de años
+
+El índice espacial reúne dos clases de puntos:
+- la línea central de cada eclipse central del catálogo (muestreada a lo
+  largo de su fase central con `besselian.path_points`), con la semianchura
+  de la franja en cada punto
+- los registros curados de cada ubicación, en las coordenadas del gazetteer
+
+Los puntos se agrupan en celdas de una retícula latitud/longitud (cubos tipo
+geohash) ordenadas por código de celda, así que una consulta sólo examina las
+celdas que cubren el círculo de búsqueda: unos cortes contiguos de arrays.
+
+Los eclipses de la ventana pasan antes por `besselian.penumbra_screen`, que
+descarta de una vez los que la ubicación no puede ver. Cada candidato se
+evalúa de forma exacta (`local_circumstances`, vectorizado) en sus puntos de
+la franja dentro del radio (acercados hasta el radio si el punto de la línea
+central queda fuera pero la franja no) y en la propia ubicación, que también
+ve los eclipses parciales. Los candidatos se ordenan por oscurecimiento,
+duración de la fase central y altura del Sol.
+"""
+
+from datetime import date as date_type, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from besselian import (EARTH_RADIUS_KM, besselian_elements, central_phase, local_circumstances,
+                       path_points, penumbra_screen, rounded_obscuration)
+from eclipse_batch import LocationInput, resolve_location
+from eclipse_store import EclipseStore
+from gazetteer import Gazetteer
+from timezones import local_iso, record_epochs, timezone_at
+
+CELL_DEGREES = 2.0
+PATH_SAMPLES = 121  # Instantes por línea central: ~1.5 min, decenas de km entre puntos
+RADIUS_RANGE_KM = (0.0, 5000.0)
+MAX_YEARS = 200
+TYPES = ("any", "total", "annular", "central")
+
+_ROWS, _COLUMNS = int(180 / CELL_DEGREES), int(360 / CELL_DEGREES)
+
+
+def _cells(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    row = np.clip(((latitude + 90.0) // CELL_DEGREES).astype(np.int64), 0, _ROWS - 1)
+    column = ((longitude + 180.0) // CELL_DEGREES).astype(np.int64) % _COLUMNS
+    return row * _COLUMNS + column
+
+
+def _unit_vectors(latitude, longitude) -> np.ndarray:
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _distance_km(vectors: np.ndarray, origin: np.ndarray) -> np.ndarray:
+    return np.arccos(np.clip(vectors @ origin, -1.0, 1.0)) * EARTH_RADIUS_KM
+
+
+def _toward(vectors: np.ndarray, origin: np.ndarray, distance_km: np.ndarray, radius_km: float):
+    """Puntos movidos por el círculo máximo hacia `origin` hasta quedar a `radius_km` (los ya dentro no se mueven)"""
+    theta = distance_km / EARTH_RADIUS_KM
+    step = np.clip(distance_km - radius_km, 0.0, None) / EARTH_RADIUS_KM
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a = np.where(theta > 0, np.sin(theta - step) / np.sin(theta), 1.0)
+        b = np.where(theta > 0, np.sin(step) / np.sin(theta), 0.0)
+    moved = a[:, None] * vectors + b[:, None] * origin
+    return np.degrees(np.arcsin(np.clip(moved[:, 2], -1, 1))), np.degrees(np.arctan2(moved[:, 1], moved[:, 0]))
+
+
+class EclipseSpatialIndex:
+    """Puntos de franjas centrales y ubicaciones curadas, agrupados en celdas de la retícula"""
+
+    def __init__(self, store: EclipseStore, gazetteer: Gazetteer):
+        """
+        Args:
+            store: Catálogo de eclipses (se indexan los solares)
+            gazetteer: Coordenadas de las ubicaciones curadas
+        """
+        self.dates: List[str] = [d for d in store.dates
+                                 if store.get(d)["type"].startswith("solar") and besselian_elements(d) is not None]
+        self.elements = [besselian_elements(d) for d in self.dates]
+        ordinals, latitudes, longitudes, half_widths, eclipse_ids, names = [], [], [], [], [], []
+        for i, (date, elements) in enumerate(zip(self.dates, self.elements)):
+            phase = central_phase(elements)
+            if phase is not None:
+                points = path_points(elements, np.linspace(phase[0], phase[1], PATH_SAMPLES))
+                lat, lon = points["latitude"], points["longitude"]
+                # Semianchura: mitad de la distancia entre los límites norte y sur
+                width = np.arccos(np.clip((_unit_vectors(lat[1], lon[1]) * _unit_vectors(lat[2], lon[2])).sum(-1),
+                                          -1, 1)) * EARTH_RADIUS_KM
+                valid = ~np.isnan(lat[0])
+                latitudes.append(lat[0][valid])
+                longitudes.append(lon[0][valid])
+                half_widths.append(np.nan_to_num(width[valid] / 2.0))
+                eclipse_ids.append(np.full(valid.sum(), i))
+                names.extend([""] * int(valid.sum()))
+            for name in store.get(date).get("locations", {}):
+                match = gazetteer.resolve(name)
+                if match:
+                    latitudes.append([match.place.latitude])
+                    longitudes.append([match.place.longitude])
+                    half_widths.append([0.0])
+                    eclipse_ids.append([i])
+                    names.append(name)
+            ordinals.append(date_type.fromisoformat(date).toordinal())
+
+        latitude = np.concatenate(latitudes) if latitudes else np.empty(0)
+        longitude = np.concatenate(longitudes) if longitudes else np.empty(0)
+        cells = _cells(latitude, longitude)
+        order = np.argsort(cells, kind="stable")
+        self.cells = cells[order]
+        self.latitude, self.longitude = latitude[order], longitude[order]
+        self.vectors = _unit_vectors(self.latitude, self.longitude)
+        self.half_width = np.concatenate(half_widths)[order] if half_widths else np.empty(0)
+        self.eclipse = np.concatenate(eclipse_ids).astype(np.int64)[order] if eclipse_ids else np.empty(0, np.int64)
+        self.names = np.array(names, dtype=object)[order]  # Ubicación curada ("" en las franjas)
+        self.curated = self.names != ""
+        self.ordinals = np.array(ordinals, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def _candidate_cells(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Celdas que cubren el círculo de búsqueda (caja en latitud/longitud, con el antimeridiano)"""
+        span = np.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_min, lat_max = max(-90.0, latitude - span), min(90.0, latitude + span)
+        rows = np.arange(int((lat_min + 90.0) // CELL_DEGREES), min(_ROWS - 1, int((lat_max + 90.0) // CELL_DEGREES)) + 1)
+        widest = max(abs(lat_min), abs(lat_max))
+        if widest >= 89.0 or span >= 90.0:
+            columns = np.arange(_COLUMNS)
+        else:
+            lon_span = min(180.0, span / np.cos(np.radians(widest)))
+            first = int((longitude - lon_span + 180.0) // CELL_DEGREES)
+            last = int((longitude + lon_span + 180.0) // CELL_DEGREES)
+            columns = np.unique(np.arange(first, last + 1) % _COLUMNS)
+        return (rows[:, None] * _COLUMNS + columns[None, :]).ravel()
+
+    def query(self, latitude: float, longitude: float, radius_km: float, first_ordinal: int,
+              last_ordinal: int) -> Dict[str, np.ndarray]:
+        """
+        Puntos a menos de `radius_km` (franjas: del borde de la franja) en una ventana de ordinales
+
+        Returns:
+            Dict de arrays: index (posición en el índice), eclipse, distance_km
+            (al punto) y curated
+        """
+        cells = self._candidate_cells(latitude, longitude, radius_km)
+        starts = np.searchsorted(self.cells, cells, side="left")
+        ends = np.searchsorted(self.cells, cells, side="right")
+        keep = ends > starts
+        if not keep.any():
+            empty = np.empty(0, dtype=np.int64)
+            return {"index": empty, "eclipse": empty, "distance_km": np.empty(0), "curated": np.empty(0, bool)}
+        index = np.concatenate([np.arange(s, e) for s, e in zip(starts[keep].tolist(), ends[keep].tolist())])
+        ordinal = self.ordinals[self.eclipse[index]]
+        index = index[(ordinal >= first_ordinal) & (ordinal <= last_ordinal)]
+        distance = _distance_km(self.vectors[index], _unit_vectors(latitude, longitude))
+        inside = distance - self.half_width[index] <= radius_km
+        index, distance = index[inside], distance[inside]
+        return {"index": index, "eclipse": self.eclipse[index], "distance_km": distance,
+                "curated": self.curated[index]}
+
+
+@lru_cache(maxsize=4)
+def get_spatial_index(store: EclipseStore, gazetteer: Gazetteer) -> EclipseSpatialIndex:
+    """Índice del proceso: se construye en la primera búsqueda"""
+    return EclipseSpatialIndex(store, gazetteer)
+
+
+def _rank_key(candidate: Dict[str, Any]):
+    return (-candidate["obscuration"], -(candidate.get("central_duration_seconds") or 0),
+            -(candidate.get("sun_altitude") if candidate.get("sun_altitude") is not None else -90.0))
+
+
+def _evaluate(elements, latitude: np.ndarray, longitude: np.ndarray, distance: np.ndarray) -> Optional[Dict[str, Any]]:
+    """Mejor punto de un eclipse entre varios candidatos (circunstancias exactas, vectorizado)"""
+    c = local_circumstances(elements, latitude, longitude)
+    if not c["visible"].any():
+        return None
+    duration = np.where(np.isnan(c["t_c3"] - c["t_c2"]), 0.0, (c["t_c3"] - c["t_c2"]) * 3600.0)
+    # Orden lexicográfico: oscurecimiento, duración central y altura del Sol (sólo visibles)
+    order = np.lexsort((-c["sun_altitude"], -duration, -np.round(c["obscuration"], 3), ~c["visible"]))
+    k = int(order[0])
+    spot = {
+        "spot": {"latitude": round(float(latitude[k]), 4), "longitude": round(float(longitude[k]), 4)},
+        "distance_km": round(float(distance[k]), 1),
+        "local_type": str(c["local_type"][k]),
+        "obscuration": float(rounded_obscuration(c["obscuration"][k], c["local_type"][k])),
+        "magnitude": round(float(c["magnitude"][k]), 3),
+        "sun_altitude": round(float(c["sun_altitude"][k]), 1),
+        "source": "besselian",
+    }
+    if duration[k] > 0:
+        spot["central_duration_seconds"] = int(round(duration[k]))
+    epoch = elements.to_datetime(float(c["t_max"][k])).timestamp()
+    spot["max_time"] = local_iso(epoch, "UTC")
+    spot["local_max_time"] = local_iso(epoch, timezone_at(latitude[k], longitude[k]))
+    return spot
+
+
+def find_best_eclipse(store: EclipseStore, gazetteer: Gazetteer, location: LocationInput, radius_km: float = 500.0,
+                      years: float = 10.0, after_date: str = None, eclipse_type: str = "any",
+                      limit: int = 5) -> Dict[str, Any]:
+    """
+    Mejores eclipses solares alcanzables a menos de un radio en una ventana de años
+
+    Args:
+        store, gazetteer: Catálogo de eclipses y gazetteer para resolver el lugar
+        location: Nombre del lugar o dict con latitude/longitude (y name)
+        radius_km: Distancia máxima al punto de observación (0–5000 km)
+        years: Ventana desde `after_date` (hasta 200 años)
+        after_date: Fecha YYYY-MM-DD de inicio (exclusiva, por defecto hoy)
+        eclipse_type: "any", "total", "annular" o "central" (total, anular o híbrido)
+        limit: Número de eclipses devueltos
+
+    Returns:
+        Dict con location, radius_km, window, results (un mejor punto por
+        eclipse, ordenados por oscurecimiento, duración central y altura del Sol)
+        y candidates (eclipses examinados)
+    """
+    if eclipse_type not in TYPES:
+        return {"error": f"eclipse_type debe ser uno de {', '.join(TYPES)}"}
+    resolved, error = resolve_location(location, store, gazetteer)
+    if error:
+        return {"error": error, "suggestions": gazetteer.suggestions(location) if isinstance(location, str) else []}
+    if resolved.latitude is None:
+        return {"error": f"La ubicación '{resolved.label}' no tiene coordenadas"}
+    radius_km = float(np.clip(radius_km, *RADIUS_RANGE_KM))
+    years = float(np.clip(years, 0.0, MAX_YEARS))
+    start = date_type.fromisoformat(after_date or datetime.now().strftime("%Y-%m-%d"))
+    first_ordinal, last_ordinal = start.toordinal() + 1, start.toordinal() + int(round(years * 365.25))
+    index = get_spatial_index(store, gazetteer)
+    hits = index.query(resolved.latitude, resolved.longitude, radius_km, first_ordinal, last_ordinal)
+
+    # Eclipses de la ventana que la ubicación puede ver o con puntos de la franja en el radio
+    in_window = np.flatnonzero((index.ordinals >= first_ordinal) & (index.ordinals <= last_ordinal))
+    seen = penumbra_screen([index.elements[i] for i in in_window.tolist()], resolved.latitude, resolved.longitude)
+    reachable = np.union1d(in_window[seen], hits["eclipse"])
+    origin = _unit_vectors(resolved.latitude, resolved.longitude)
+    candidates = []
+    for i in reachable.tolist():
+        date, elements = index.dates[i], index.elements[i]
+        eclipse = store.get(date)
+        if eclipse_type == "total" and eclipse["type"] not in ("solar_total", "solar_hybrid"):
+            continue
+        if eclipse_type == "annular" and eclipse["type"] not in ("solar_annular", "solar_hybrid"):
+            continue
+        mine = hits["eclipse"] == i
+        path = hits["index"][mine & ~hits["curated"]]
+        if eclipse_type != "any" and not len(path):
+            continue
+        distance = hits["distance_km"][mine & ~hits["curated"]]
+        latitude, longitude = _toward(index.vectors[path], origin, distance, radius_km)
+        best = _evaluate(elements, np.concatenate([[resolved.latitude], latitude]),
+                         np.concatenate([[resolved.longitude], longitude]),
+                         np.concatenate([[0.0], np.minimum(distance, radius_km)]))
+        for k in np.flatnonzero(mine & hits["curated"]).tolist():
+            # Registros curados dentro del radio: compiten con sus datos tal cual
+            name = index.names[hits["index"][k]]
+            data = eclipse["locations"].get(name) or {}
+            if data.get("visible"):
+                spot_lat, spot_lon = float(index.latitude[hits["index"][k]]), float(index.longitude[hits["index"][k]])
+                # Las horas curadas son de reloj local: se pasan a UTC como las calculadas
+                zone = timezone_at(spot_lat, spot_lon)
+                epoch = record_epochs(date, data, zone)["maximum"]
+                record = {"spot": {"latitude": spot_lat, "longitude": spot_lon, "name": name},
+                          "distance_km": round(float(hits["distance_km"][k]), 1),
+                          "obscuration": data.get("obscuration", 0), "magnitude": data.get("magnitude", 0),
+                          "max_time": local_iso(epoch, "UTC"), "local_max_time": local_iso(epoch, zone),
+                          "source": "catalog"}
+                if best is None or _rank_key(record) < _rank_key(best):
+                    best = record
+        if best is None:
+            continue
+        if eclipse_type in ("total", "annular", "central") and best.get("local_type") not in (
+                ("total", "annular") if eclipse_type == "central" else (eclipse_type,)):
+            continue
+        candidates.append({"date": date, "type": eclipse["type"], **best})
+
+    candidates.sort(key=_rank_key)
+    result = {
+        "location": resolved.label,
+        "coordinates": {"latitude": resolved.latitude, "longitude": resolved.longitude},
+        "radius_km": radius_km,
+        "window": [start.isoformat(), date_type.fromordinal(last_ordinal).isoformat()],
+        "eclipse_type": eclipse_type,
+        "results": candidates[:max(1, int(limit))],
+        "candidates": len(candidates),
+        "screened": len(in_window),
+        "time_zone": "UTC (max_time); local_max_time in the spot's zone",
+    }
+    if resolved.resolved:
+        result["resolved_location"] = resolved.resolved
+    return result
@@ -0,0 +1,217 @@
+# eclipse-mcp-remote/eclipse_batch.py
+"""
+Visibilidad de eclipses para muchas ubicaciones y fechas en una sola pasada
+
+Evalúa el producto cartesiano fechas × ubicaciones. Cada ubicación se resuelve
+una sola vez (catálogo, gazetteer o coordenadas explícitas) y, por cada
+eclipse solar, todas las ubicaciones que no tienen datos curados se calculan
+con una única llamada vectorizada a `local_circumstances`. En los eclipses
+lunares se calculan todas las ubicaciones con coordenadas, también las del
+catálogo, con una llamada a `lunar_local_circumstances` (contactos globales y
+altura de la Luna por ubicación).
+
+La respuesta es columnar: una lista por columna, con índices a `dates` y
+`locations` en lugar de repetir las cadenas en cada fila.
+
+Cada fila lleva inicio, máximo y fin en UTC y en hora local, ISO 8601. Los
+instantes se manejan como segundos Unix UTC; la zona de cada ubicación se
+busca una sola vez por lote (`timezones.timezones_at`) y los desfases se
+memoizan por zona, así que la conversión no cuesta una búsqueda por fila.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from besselian import besselian_elements, local_circumstances, rounded_obscuration
+from eclipse_store import EclipseStore
+from gazetteer import Gazetteer, coordinate_error
+from lunar import lunar_eclipse, lunar_local_circumstances
+from timezones import ephem_to_epoch, local_iso, record_epochs, timezones_at
+
+MAX_BATCH_CELLS = int(os.getenv("ECLIPSE_BATCH_MAX_CELLS", "20000"))
+
+COLUMNS = ("date", "location", "visible", "local_type", "magnitude", "obscuration",
+           "start", "maximum", "end", "local_start", "local_maximum", "local_end", "sun_altitude",
+           "moon_altitude", "source")
+
+LocationInput = Union[str, Dict[str, Any]]
+
+
+class _Location:
+    """Ubicación resuelta: nombre, entrada del catálogo (si la hay) y coordenadas"""
+
+    __slots__ = ("label", "catalog_name", "latitude", "longitude", "elevation", "resolved")
+
+    def __init__(self, label: str, catalog_name: Optional[str] = None, latitude: float = None,
+                 longitude: float = None, elevation: float = 0.0, resolved: Dict[str, Any] = None):
+        self.label = label
+        self.catalog_name = catalog_name
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation = elevation
+        self.resolved = resolved
+
+
+def resolve_location(location: LocationInput, store: EclipseStore, gazetteer: Gazetteer) -> Tuple[Optional[_Location], Optional[str]]:
+    """Resolver una ubicación de entrada; devuelve (ubicación, error)"""
+    if isinstance(location, dict):
+        latitude, longitude = location.get("latitude"), location.get("longitude")
+        if latitude is None or longitude is None:
+            name = location.get("name") or location.get("location")
+            if not name:
+                return None, "Cada ubicación necesita 'name' o 'latitude' y 'longitude'"
+            return resolve_location(name, store, gazetteer)
+        error = coordinate_error(float(latitude), float(longitude))
+        if error:
+            return None, error
+        label = location.get("name") or f"{float(latitude):.4f}, {float(longitude):.4f}"
+        # Coordenadas explícitas: siempre se calculan, como en calculate_eclipse_visibility
+        return _Location(label, None, float(latitude), float(longitude), float(location.get("elevation") or 0.0)), None
+
+    catalog_name, match = gazetteer.resolve_location(location, store.locations)
+    if match is None and catalog_name:
+        # Nombre exacto del catálogo: coordenadas del gazetteer para eclipses sin datos curados
+        match = gazetteer.resolve(catalog_name)
+    if match is None and not catalog_name:
+        return None, f"Ubicación '{location}' no encontrada"
+    place = match.place if match else None
+    return _Location(
+        catalog_name or place.name, catalog_name,
+        place.latitude if place else None, place.longitude if place else None, 0.0,
+        match.to_dict(location) if match and (catalog_name or place.name) != location else None,
+    ), None
+
+
+def visibility_batch(dates: Sequence[str], locations: Sequence[LocationInput], store: EclipseStore,
+                     gazetteer: Gazetteer) -> Dict[str, Any]:
+    """
+    Visibilidad de cada combinación fecha × ubicación
+
+    Args:
+        dates: Fechas YYYY-MM-DD
+        locations: Nombres ("Madrid", "ciudad de guatemala") o dicts con
+            latitude/longitude (y opcionalmente name y elevation)
+        store: Catálogo de eclipses
+        gazetteer: Gazetteer para resolver nombres
+
+    Returns:
+        Dict con `dates`, `locations` (nombres resueltos), `columns` (lista por
+        columna, filas en orden fecha-mayor), `rows` y `errors`
+    """
+    dates = list(dict.fromkeys(dates))
+    cells = len(dates) * len(locations)
+    if not dates or not locations:
+        return {"error": "Se requiere al menos una fecha y una ubicación"}
+    if cells > MAX_BATCH_CELLS:
+        return {"error": f"El lote tiene {cells} combinaciones; el máximo es {MAX_BATCH_CELLS}"}
+
+    errors: List[Dict[str, Any]] = []
+    resolved: List[_Location] = []
+    for location in locations:
+        entry, error = resolve_location(location, store, gazetteer)
+        if error:
+            errors.append({"location": location, "error": error})
+        else:
+            resolved.append(entry)
+    if not resolved:
+        return {"error": "Ninguna ubicación pudo resolverse", "errors": errors}
+
+    n = len(resolved)
+    columns: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+    has_coordinates = np.array([loc.latitude is not None for loc in resolved])
+    lats = np.array([loc.latitude if loc.latitude is not None else np.nan for loc in resolved])
+    lons = np.array([loc.longitude if loc.longitude is not None else np.nan for loc in resolved])
+    elevations = np.array([loc.elevation for loc in resolved])
+    zones = ["UTC"] * n
+    for j, zone in zip(np.flatnonzero(has_coordinates).tolist(),
+                       timezones_at(lats[has_coordinates], lons[has_coordinates])):
+        zones[j] = zone
+
+    for d, date in enumerate(dates):
+        eclipse = store.get(date)
+        curated = eclipse["locations"] if eclipse else {}
+        if not eclipse:
+            errors.append({"date": date, "error": "No hay datos de eclipse para esta fecha"})
+        row = {name: [None] * n for name in COLUMNS[2:]}
+        epochs: List[Optional[Dict[str, Optional[float]]]] = [None] * n
+        lunar = lunar_eclipse(date, tolerance_days=1) if eclipse and eclipse["type"].startswith("lunar") else None
+
+        for j, loc in enumerate(resolved):
+            data = curated.get(loc.catalog_name) if loc.catalog_name else None
+            if data and not (lunar is not None and has_coordinates[j]):
+                row["visible"][j] = data.get("visible", False)
+                row["local_type"][j] = "partial" if data.get("partial") else eclipse["type"].split("_")[-1]
+                row["magnitude"][j] = data.get("magnitude", 0)
+                row["obscuration"][j] = data.get("obscuration", 0)
+                row["source"][j] = "catalog"
+                epochs[j] = record_epochs(date, data, zones[j])
+
+        # Una llamada vectorizada por eclipse solar para todas las ubicaciones sin datos curados
+        compute = np.array([row["source"][j] is None for j in range(n)]) & has_coordinates
+        elements = besselian_elements(date) if eclipse and eclipse["type"].startswith("solar") and compute.any() else None
+        if elements is not None:
+            idx = np.flatnonzero(compute)
+            c = local_circumstances(elements, lats[idx], lons[idx], elevations[idx])
+            visible = c["visible"]
+            magnitude = np.where(visible, np.round(c["magnitude"], 3), 0.0)
+            obscuration = np.where(visible, rounded_obscuration(c["obscuration"], c["local_type"]), 0.0)
+            # Sin contactos donde no es visible (como solar_circumstances): fuera de la sombra o de noche
+            contacts = np.where(visible[:, None], np.stack([c["t_c1"], c["t_max"], c["t_c4"]], axis=1), np.nan)
+            epoch0 = elements.to_datetime(0.0).timestamp()
+            instants = np.floor(epoch0 + contacts * 3600).tolist()
+            for k, j in enumerate(idx.tolist()):
+                row["visible"][j] = bool(visible[k])
+                row["local_type"][j] = str(c["local_type"][k]) if visible[k] else "none"
+                row["magnitude"][j] = float(magnitude[k])
+                row["obscuration"][j] = float(obscuration[k])
+                row["sun_altitude"][j] = round(float(c["sun_altitude"][k]), 1)
+                row["source"][j] = "besselian"
+                epochs[j] = dict(zip(("start", "maximum", "end"), instants[k]))
+
+        # Eclipse lunar: horas globales (U1–U4, o P1–P4 si es penumbral) y altura de la Luna por ubicación
+        if lunar is not None and compute.any():
+            idx = np.flatnonzero(compute)
+            c = lunar_local_circumstances(lunar, lats[idx], lons[idx])
+            magnitude = round(lunar.umbral_magnitude, 3)
+            p1, u1, _, _, u4, p4, greatest = np.floor(ephem_to_epoch([*lunar.contacts, lunar.greatest])).tolist()
+            instants = dict(zip(("start", "maximum", "end"), (u1, greatest, u4) if u1 == u1 else (p1, greatest, p4)))
+            for k, j in enumerate(idx.tolist()):
+                row["visible"][j] = bool(c["visible"][k])
+                row["local_type"][j] = str(c["local_type"][k])
+                row["magnitude"][j] = magnitude if c["umbral_visible"][k] else 0.0
+                row["moon_altitude"][j] = round(float(c["moon_altitude"][k]), 1)
+                row["source"][j] = "ephemeris"
+                epochs[j] = instants
+
+        # Horas UTC y locales de cada celda a partir de sus instantes, sea el registro curado o calculado
+        for j, instants in enumerate(epochs):
+            if instants:
+                row["start"][j] = local_iso(instants["start"], "UTC")
+                row["maximum"][j] = local_iso(instants["maximum"], "UTC")
+                row["end"][j] = local_iso(instants["end"], "UTC")
+                row["local_start"][j] = local_iso(instants["start"], zones[j])
+                row["local_maximum"][j] = local_iso(instants["maximum"], zones[j])
+                row["local_end"][j] = local_iso(instants["end"], zones[j])
+
+        columns["date"].extend([d] * n)
+        columns["location"].extend(range(n))
+        for name, values in row.items():
+            columns[name].extend(values)
+
+    result = {
+        "dates": dates,
+        "locations": [loc.label for loc in resolved],
+        "time_zones": zones,
+        "columns": columns,
+        "rows": len(dates) * n,
+        "time_zone": "start/maximum/end: UTC (source=besselian/ephemeris), catalog times as stored; "
+                     "local_*: ISO 8601 in time_zones",
+    }
+    resolutions = [loc.resolved for loc in resolved if loc.resolved]
+    if resolutions:
+        result["resolved_locations"] = resolutions
+    if errors:
+        result["errors"] = errors
+    return result
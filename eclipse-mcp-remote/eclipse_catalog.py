@@ -0,0 +1,248 @@
+# eclipse-mcp-remote/eclipse_catalog.py
+"""
+Catálogo generado de eclipses solares y lunares
+
+`generate_catalog` recorre las lunas nuevas y llenas de un rango de años y
+conserva las que producen eclipse:
+- solares: elementos besselianos (`besselian.besselian_elements`) y
+  circunstancias del eclipse máximo (tipo, gamma, magnitud, punto y duración
+  central)
+- lunares: geometría de la Luna frente a la sombra (`lunar.lunar_eclipse_near`)
+  y los contactos P1, U1–U4 y P4
+
+Las sizigias y las posiciones salen de la tabla de efemérides (`ephemeris`),
+que el primer uso rellena con ephem.
+
+Cada año es una tarea independiente repartida en un pool de procesos. El
+resultado se guarda como archivo columnar `.npz` (un array por campo, los
+elementos besselianos como matriz N×6×4), que `load_catalog` convierte en
+registros con la forma de `eclipses.json`; `eclipse_store.get_store` los
+añade al catálogo curado, que tiene prioridad en las fechas que comparten.
+
+Uso: python eclipse_catalog.py [--start 1900] [--end 2100] [--workers 4] [--output eclipse_catalog.npz]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List
+
+import ephem
+import numpy as np
+
+from besselian import besselian_elements, greatest_eclipse, preload_elements
+from eclipse_store import DEFAULT_CATALOG_FILE
+from ephemeris import FULL_MOON, NEW_MOON, ecliptic, moon_phases, positions
+from lunar import CONTACTS, lunar_eclipse_near
+
+CATALOG_VERSION = 2
+# Latitud eclíptica máxima de la Luna en la sizigia para que pueda haber eclipse (con margen)
+ECLIPSE_LATITUDE_LIMIT = np.radians(1.7)
+
+DESCRIPTIONS = {
+    "solar_total": "Total Solar Eclipse",
+    "solar_annular": "Annular Solar Eclipse",
+    "solar_hybrid": "Hybrid Solar Eclipse",
+    "solar_partial": "Partial Solar Eclipse",
+    "lunar_total": "Total Lunar Eclipse",
+    "lunar_partial": "Partial Lunar Eclipse",
+    "lunar_penumbral": "Penumbral Lunar Eclipse",
+}
+
+# Columnas del archivo: nombre → (dtype, valor para los eclipses a los que no aplica)
+COLUMNS = {
+    "date": ("<U10", ""),
+    "type": ("<U15", ""),
+    "greatest": (np.float64, np.nan),  # Instante del máximo (ephem.Date, días UT)
+    "gamma": (np.float64, np.nan),
+    "magnitude": (np.float64, np.nan),  # Solar: magnitud en el máximo; lunar: umbral
+    "penumbral_magnitude": (np.float64, np.nan),
+    "latitude": (np.float64, np.nan),  # Punto del eclipse solar máximo
+    "longitude": (np.float64, np.nan),
+    "sun_altitude": (np.float64, np.nan),
+    "central_duration": (np.float64, np.nan),  # Segundos en el punto del máximo
+    "t0": (np.float64, np.nan),  # Elementos besselianos
+    "besselian": (np.float64, np.nan),
+    "tan_f": (np.float64, np.nan),
+    "contacts": (np.float64, np.nan),  # Lunar: P1, U1, U2, U3, U4 y P4 (ephem.Date)
+}
+
+
+def _near_node(times: np.ndarray) -> np.ndarray:
+    """Descartar sizigias en las que la Luna está demasiado lejos de la eclíptica"""
+    latitude = ecliptic(positions(times)["moon"], times)[1] if times.size else times
+    return np.abs(latitude) < ECLIPSE_LATITUDE_LIMIT
+
+
+def search_year(year: int) -> List[Dict[str, Any]]:
+    """Eclipses cuya sizigia cae en un año (se ejecuta en los procesos del pool)"""
+    start, end = ephem.Date(f"{year}/1/1"), ephem.Date(f"{year + 1}/1/1")
+    rows = []
+
+    new_moons = moon_phases(start, end, NEW_MOON)
+    for when in new_moons[_near_node(new_moons)].tolist():
+        elements = besselian_elements(ephem.Date(when).datetime().date().isoformat())
+        if elements is not None:
+            greatest = greatest_eclipse(elements)
+            rows.append({
+                "date": elements.date,
+                "type": f"solar_{greatest['type']}",
+                "greatest": elements.t0 + elements.t_greatest / 24.0,
+                "gamma": greatest["gamma"],
+                "magnitude": greatest["magnitude"],
+                "latitude": greatest["latitude"],
+                "longitude": greatest["longitude"],
+                "sun_altitude": greatest["sun_altitude"],
+                "central_duration": greatest.get("central_duration_seconds", np.nan),
+                "t0": elements.t0,
+                "besselian": elements.coefficients,
+                "tan_f": np.array([elements.tan_f1, elements.tan_f2]),
+            })
+
+    full_moons = moon_phases(start, end, FULL_MOON)
+    for when in full_moons[_near_node(full_moons)].tolist():
+        eclipse = lunar_eclipse_near(when)
+        if eclipse is not None:
+            rows.append({
+                "date": eclipse.date,
+                "type": f"lunar_{eclipse.type}",
+                "greatest": eclipse.greatest,
+                "gamma": round(eclipse.gamma, 4),
+                "magnitude": round(eclipse.umbral_magnitude, 4),
+                "penumbral_magnitude": round(eclipse.penumbral_magnitude, 4),
+                "contacts": eclipse.contacts,
+            })
+    return rows
+
+
+def generate_catalog(start_year: int, end_year: int, workers: int = None) -> Dict[str, np.ndarray]:
+    """
+    Buscar todos los eclipses entre dos años (ambos inclusive)
+
+    Args:
+        start_year, end_year: Rango de años
+        workers: Procesos del pool (None = uno por CPU; 1 = en este proceso)
+
+    Returns:
+        Columnas del catálogo ordenadas por fecha
+    """
+    years = list(range(start_year, end_year + 1))
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            per_year = list(pool.map(search_year, years, chunksize=max(1, len(years) // (workers * 4))))
+    else:
+        per_year = [search_year(year) for year in years]
+    rows = sorted((row for rows in per_year for row in rows), key=lambda row: row["greatest"])
+
+    columns = {}
+    for name, (dtype, missing) in COLUMNS.items():
+        shape = {"besselian": (6, 4), "tan_f": (2,), "contacts": (6,)}.get(name, ())
+        column = np.full((len(rows),) + shape, missing, dtype=dtype)
+        for i, row in enumerate(rows):
+            if name in row:
+                column[i] = row[name]
+        columns[name] = column
+    columns["span"] = np.array([start_year, end_year])
+    columns["version"] = np.array(CATALOG_VERSION)
+    return columns
+
+
+def save_catalog(columns: Dict[str, np.ndarray], path: str = DEFAULT_CATALOG_FILE):
+    np.savez_compressed(path, **columns)
+
+
+def _format_duration(seconds: float) -> str:
+    return f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+
+
+def _lunar_duration(contacts: List[float]) -> str:
+    """Duración HH:MM de la fase principal de un eclipse lunar: total (U2–U3), umbral (U1–U4) o penumbral (P1–P4)"""
+    p1, u1, u2, u3, u4, p4 = contacts
+    start, end = (u2, u3) if u2 == u2 else (u1, u4) if u1 == u1 else (p1, p4)
+    minutes = round((end - start) * 1440.0)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def load_catalog(path: str = DEFAULT_CATALOG_FILE, preload: bool = True) -> List[Dict[str, Any]]:
+    """
+    Registros de eclipse (forma de eclipses.json, sin ubicaciones) desde un archivo generado
+
+    Args:
+        path: Archivo .npz de `save_catalog`
+        preload: Registrar los elementos besselianos en `besselian` para no recalcularlos
+
+    Returns:
+        Lista de registros con date, type, description, greatest_eclipse, gamma,
+        magnitude, max_duration (eclipses solares centrales: MM:SS en el punto
+        del máximo; lunares: HH:MM de la fase principal), contactos de los
+        lunares, locations vacío y source "generated"
+    """
+    with np.load(path, allow_pickle=False) as data:
+        columns = {name: data[name] for name in data.files}
+    if int(columns["version"]) != CATALOG_VERSION:
+        raise ValueError(f"Versión de catálogo {int(columns['version'])} no soportada en {path}")
+
+    # Columnas como listas de Python: evita crear escalares NumPy fila a fila
+    rows = {name: columns[name].tolist() for name in COLUMNS if name not in ("besselian", "tan_f", "contacts")}
+    contacts = columns["contacts"]
+    contact_times = np.full(contacts.shape, "", dtype=object)
+    present = ~np.isnan(contacts)
+    contact_times[present] = np.char.add(np.datetime_as_string(
+        np.datetime64("1899-12-31T12:00:00") + np.floor(contacts[present] * 86400).astype("timedelta64[s]")), "+00:00")
+    # ephem.Date cuenta días desde 1899-12-31 12:00 UT
+    seconds = np.floor(columns["greatest"] * 86400).astype("timedelta64[s]")
+    greatest = np.datetime_as_string(np.datetime64("1899-12-31T12:00:00") + seconds).tolist()
+    records = []
+    for i, (date, eclipse_type) in enumerate(zip(rows["date"], rows["type"])):
+        record = {
+            "date": date,
+            "type": eclipse_type,
+            "description": DESCRIPTIONS[eclipse_type],
+            "greatest_eclipse": {"time": greatest[i] + "+00:00"},
+            "gamma": rows["gamma"][i],
+            "magnitude": rows["magnitude"][i],
+            "locations": {},
+            "source": "generated",
+        }
+        if eclipse_type.startswith("solar"):
+            record["greatest_eclipse"].update(latitude=rows["latitude"][i], longitude=rows["longitude"][i],
+                                              sun_altitude=rows["sun_altitude"][i])
+            if rows["central_duration"][i] == rows["central_duration"][i]:  # No NaN
+                record["max_duration"] = _format_duration(rows["central_duration"][i])
+            if preload:
+                coefficients = dict(zip(("x", "y", "d", "mu", "l1", "l2"), columns["besselian"][i]))
+                tan_f1, tan_f2 = columns["tan_f"][i].tolist()
+                preload_elements(date, rows["t0"][i], coefficients, tan_f1, tan_f2)
+        else:
+            record["umbral_magnitude"] = record.pop("magnitude")
+            record["penumbral_magnitude"] = rows["penumbral_magnitude"][i]
+            record["contacts"] = {name: time for name, time in zip(CONTACTS, contact_times[i].tolist()) if time}
+            record["max_duration"] = _lunar_duration(contacts[i].tolist())
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--start", type=int, default=1900)
+    parser.add_argument("--end", type=int, default=2100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default=DEFAULT_CATALOG_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    columns = generate_catalog(args.start, args.end, args.workers)
+    elapsed = time.perf_counter() - start
+    save_catalog(columns, args.output)
+    types, counts = np.unique(columns["type"], return_counts=True)
+    print(f"{len(columns['date'])} eclipses ({args.start}–{args.end}) en {elapsed:.1f} s "
+          f"con {args.workers} proceso(s) → {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    for eclipse_type, count in zip(types.tolist(), counts.tolist()):
+        print(f"  {eclipse_type:<16} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# eclipse-mcp-remote/eclipse_path.py
+"""
+Franja de totalidad/anularidad calculada con muestreo adaptativo
+
+La línea central y los límites norte y sur salen de los elementos
+besselianos (`besselian.path_points`) a lo largo de la fase central. El
+muestreo empieza con una malla gruesa de instantes y parte cada intervalo
+cuyo punto medio se aleja del arco entre sus extremos más que la resolución
+pedida, así que los puntos se concentran donde la franja se curva (cerca de
+la salida y la puesta del Sol) y no en los tramos casi rectos.
+
+Después cada línea se simplifica con Douglas–Peucker (distancias sobre la
+esfera) con la tolerancia pedida, y puede devolverse como lista de puntos o
+como polilínea codificada (algoritmo de Google, 5 decimales), que es varias
+veces más compacta.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from besselian import EARTH_RADIUS_KM, besselian_elements, central_phase, clock_strings, path_points
+
+INITIAL_SAMPLES = 33
+MAX_PASSES = 14  # Cada pasada puede duplicar los puntos de un tramo
+MIN_INTERVAL_HOURS = 1.0 / 3600.0
+RESOLUTION_RANGE_KM = (0.05, 100.0)
+TOLERANCE_RANGE_KM = (0.0, 100.0)
+LINES = ("centerline", "northern_limit", "southern_limit")
+
+
+def _unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Latitud/longitud en grados (... × n) → vectores unitarios (... × n × 3)"""
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _cross_track_km(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Distancia (km) de cada punto al círculo máximo entre `start` y `end` (vectores unitarios)"""
+    normal = np.cross(start, end)
+    length = np.linalg.norm(normal, axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normal = normal / length
+        distance = np.abs(np.arcsin(np.clip((points * normal).sum(axis=-1), -1, 1))) * EARTH_RADIUS_KM
+    # Extremos coincidentes: distancia directa al extremo
+    chord = np.linalg.norm(points - start, axis=-1) * EARTH_RADIUS_KM
+    return np.where(length[..., 0] > 1e-12, distance, chord)
+
+
+def sample_path(elements, resolution_km: float) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Instantes y puntos de la franja con error de cuerda menor que `resolution_km`
+
+    Returns:
+        `besselian.path_points` en los instantes elegidos, más "t" (horas desde
+        t0), o None si el eclipse no es central
+    """
+    phase = central_phase(elements)
+    if phase is None:
+        return None
+    t = np.linspace(phase[0], phase[1], INITIAL_SAMPLES)
+    points = path_points(elements, t)
+    for _ in range(MAX_PASSES):
+        middle = 0.5 * (t[:-1] + t[1:])
+        mid_points = path_points(elements, middle)
+        vectors = _unit_vectors(points["latitude"], points["longitude"])
+        deviation = _cross_track_km(_unit_vectors(mid_points["latitude"], mid_points["longitude"]),
+                                    vectors[:, :-1], vectors[:, 1:])
+        # Partir si alguna línea se desvía, o si un límite aparece o desaparece en el tramo
+        missing = np.isnan(points["latitude"])
+        appears = missing[:, :-1] != missing[:, 1:]
+        split = (np.nan_to_num(deviation) > resolution_km).any(axis=0) | appears.any(axis=0)
+        split &= np.diff(t) > MIN_INTERVAL_HOURS
+        if not split.any():
+            break
+        order = np.argsort(np.concatenate([t, middle[split]]), kind="stable")
+        t = np.concatenate([t, middle[split]])[order]
+        points = {name: np.concatenate([values, mid_points[name][..., split]], axis=-1)[..., order]
+                  for name, values in points.items()}
+    points["t"] = t
+    return points
+
+
+@lru_cache(maxsize=64)
+def _sampled(date: str, resolution_km: float) -> Optional[Dict[str, np.ndarray]]:
+    """Muestreo de un eclipse por proceso: otras tolerancias y codificaciones lo reutilizan (sólo lectura)"""
+    elements = besselian_elements(date)
+    return sample_path(elements, resolution_km) if elements is not None else None
+
+
+def simplify(latitude: np.ndarray, longitude: np.ndarray, tolerance_km: float) -> np.ndarray:
+    """Índices de los puntos que conserva Douglas–Peucker con una tolerancia en km"""
+    n = len(latitude)
+    if n <= 2 or tolerance_km <= 0:
+        return np.arange(n)
+    vectors = _unit_vectors(latitude, longitude)
+    points = vectors.tolist()
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+    # Comparar senos de la distancia angular (monótonos) y convertir a km sólo el máximo
+    threshold = np.sin(min(tolerance_km / EARTH_RADIUS_KM, np.pi / 2))
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        (ax, ay, az), (bx, by, bz) = points[first], points[last]  # np.cross es lento para un solo par
+        normal = np.array([ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx])
+        length = np.sqrt(normal @ normal)
+        inner = vectors[first + 1:last]
+        if length > 1e-12:
+            distance = np.abs(inner @ normal) / length
+        else:
+            distance = np.sqrt(((inner - vectors[first]) ** 2).sum(axis=1))
+        i = int(np.argmax(distance))
+        if distance[i] > threshold:
+            keep[first + 1 + i] = True
+            stack.extend(((first, first + 1 + i), (first + 1 + i, last)))
+    return np.flatnonzero(keep)
+
+
+def encode_polyline(latitude, longitude, precision: int = 5) -> str:
+    """Polilínea codificada (algoritmo de Google Maps) de una secuencia de puntos"""
+    scale = 10 ** precision
+    values = np.round(np.column_stack([latitude, longitude]) * scale).astype(np.int64)
+    deltas = np.diff(values, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel().tolist()
+    chars: List[str] = []
+    for value in deltas:
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            chars.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        chars.append(chr(value + 63))
+    return "".join(chars)
+
+
+def _duration(seconds: float) -> str:
+    return f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+
+
+def eclipse_path(date: str, resolution_km: float = 1.0, tolerance_km: float = 1.0,
+                 encoding: str = "points") -> Dict[str, Any]:
+    """
+    Línea central y límites de la franja de un eclipse solar central
+
+    Args:
+        date: Fecha del eclipse (YYYY-MM-DD)
+        resolution_km: Error máximo de cuerda del muestreo (0.05–100 km)
+        tolerance_km: Tolerancia de la simplificación (0 = sin simplificar)
+        encoding: "points" (listas de {lat, lng, ...}) o "polyline" (polilíneas codificadas)
+
+    Returns:
+        Dict con central_type, central_phase (UTC), centerline, northern_limit,
+        southern_limit y el número de puntos muestreados y devueltos; con
+        "polyline" las horas y duraciones de la línea central van en listas aparte
+    """
+    if encoding not in ("points", "polyline"):
+        return {"error": "encoding debe ser 'points' o 'polyline'"}
+    elements = besselian_elements(date)
+    if elements is None:
+        return {"error": f"No hay eclipse solar el {date}"}
+    resolution_km = float(np.clip(resolution_km, *RESOLUTION_RANGE_KM))
+    tolerance_km = float(np.clip(tolerance_km, *TOLERANCE_RANGE_KM))
+    points = _sampled(date, resolution_km)
+    if points is None:
+        return {"error": f"El eclipse del {date} no es central: no tiene franja de totalidad ni anularidad"}
+
+    l2 = points["l2"]
+    central_type = "total" if (l2 < 0).all() else "annular" if (l2 > 0).all() else "hybrid"
+    times = clock_strings(elements, points["t"])
+    result: Dict[str, Any] = {
+        "date": date,
+        "central_type": central_type,
+        "central_phase": {"start": times[0], "end": times[-1], "time_zone": "UTC"},
+        "resolution_km": resolution_km,
+        "tolerance_km": tolerance_km,
+        "encoding": encoding,
+        "sampled_points": len(points["t"]),
+        "returned_points": {},
+    }
+    for row, name in enumerate(LINES):
+        valid = np.flatnonzero(~np.isnan(points["latitude"][row]))
+        lat, lon = points["latitude"][row][valid], points["longitude"][row][valid]
+        kept = valid[simplify(lat, lon, tolerance_km)]
+        lat = np.round(points["latitude"][row][kept], 5).tolist()
+        lon = np.round(points["longitude"][row][kept], 5).tolist()
+        result["returned_points"][name] = len(kept)
+        if encoding == "polyline":
+            result[name] = encode_polyline(lat, lon)
+        elif row == 0:
+            result[name] = [{"lat": la, "lng": lo, "time": times[i], "duration": _duration(points["duration"][i])}
+                            for la, lo, i in zip(lat, lon, kept.tolist())]
+        else:
+            result[name] = [{"lat": la, "lng": lo} for la, lo in zip(lat, lon)]
+        if encoding == "polyline" and row == 0:
+            result["centerline_times"] = [times[i] for i in kept.tolist()]
+            result["centerline_durations"] = [_duration(points["duration"][i]) for i in kept.tolist()]
+    return result
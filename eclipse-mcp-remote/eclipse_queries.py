@@ -0,0 +1,168 @@
+# eclipse-mcp-remote/eclipse_queries.py
+"""
+Visibilidad de un eclipse y próximos eclipses de una ubicación
+
+Lógica común de las herramientas `calculate_eclipse_visibility` y
+`predict_next_eclipse` de los tres servidores (los dos stdio del chatbot y
+el remoto), que comparten el catálogo: el mismo resultado, con las mismas
+claves, y la misma forma de error, `{"error": mensaje, ...}` con
+sugerencias. Cada servidor sólo añade lo suyo (consejos de seguridad,
+`status`).
+"""
+
+from datetime import date as date_type, datetime
+from typing import Any, Dict, Optional
+
+from besselian import solar_circumstances
+from eclipse_store import EclipseStore
+from gazetteer import Gazetteer, coordinate_error
+from lunar import lunar_circumstances
+from saros import saros_fields
+from timezones import local_times, location_zone, utc_times
+
+DEFAULT_NEXT_LIMIT = 5
+
+# Claves de los registros calculados que se copian tal cual al resultado
+EXTRA_KEYS = ("sun_altitude", "moon_altitude", "local_type", "central_duration_seconds", "penumbral_magnitude",
+              "contacts", "visible_from", "visible_until", "eclipse_date", "coordinates", "source")
+
+
+def eclipse_visibility(store: EclipseStore, gazetteer: Gazetteer, date: str, location: str = None,
+                       latitude: float = None, longitude: float = None, elevation: float = 0.0) -> Dict[str, Any]:
+    """
+    Visibilidad de un eclipse desde una ubicación del catálogo, un lugar o unas coordenadas
+
+    Los nombres no exactos ("Ciudad de Guatemala", "madrid") se resuelven con el
+    gazetteer: a una ubicación del catálogo si existe, o a las coordenadas del
+    lugar. Los datos curados tienen prioridad en eclipses solares; con
+    coordenadas las circunstancias se calculan (elementos besselianos, o
+    contactos y altura de la Luna en eclipses lunares, también para las
+    ubicaciones del catálogo).
+
+    Returns:
+        Resultado de visibilidad, o {"error": ..., "available_dates" | "available_locations", "suggestions"}
+    """
+    if not location and (latitude is None or longitude is None):
+        return {"error": "Either location or latitude/longitude is required"}
+    if latitude is not None and longitude is not None:
+        error = coordinate_error(float(latitude), float(longitude))
+        if error:
+            return {"error": error}
+    eclipse_data = store.get(date)
+    if not eclipse_data:
+        return {"error": f"No eclipse data available for {date}", "available_dates": store.nearest(date)}
+
+    query, resolved = location, None
+    if latitude is None and location:
+        catalog_name, resolved = gazetteer.resolve_location(location, eclipse_data["locations"])
+        if catalog_name:
+            location = catalog_name
+        elif resolved:
+            location = resolved.place.name
+            latitude, longitude = resolved.place.latitude, resolved.place.longitude
+    lunar = eclipse_data["type"].startswith("lunar")
+    if lunar and latitude is None and location:
+        match = resolved or gazetteer.resolve(location)
+        if match:
+            latitude, longitude = match.place.latitude, match.place.longitude
+
+    curated = eclipse_data["locations"].get(location)
+    location_data = curated if latitude is None else None
+    if not location_data and latitude is not None and longitude is not None:
+        if lunar:
+            location_data = lunar_circumstances(date, latitude, longitude, elevation or 0.0) or curated
+        else:
+            location_data = solar_circumstances(date, latitude, longitude, elevation or 0.0)
+        if not location_data:
+            return {"error": f"Could not compute the circumstances of the {date} eclipse"}
+        location = location or f"{latitude:.4f}, {longitude:.4f}"
+    if not location_data:
+        available_locations = list(eclipse_data["locations"])
+        return {"error": f"Location '{location}' not in database for this eclipse",
+                "available_locations": available_locations,
+                "suggestions": gazetteer.suggestions(location or "") or available_locations}
+
+    # "times" en UTC para cualquier registro (los curados guardan hora local); "local_times" en la zona
+    # de la ubicación (la del gazetteer o la de las coordenadas)
+    zone = location_zone(gazetteer, location, latitude, longitude)
+    times_local = local_times(date, location_data, zone)
+    result = {
+        "date": date,
+        "location": location,
+        "eclipse_type": eclipse_data["type"],
+        "description": eclipse_data.get("description", ""),
+        "visible": location_data.get("visible", False),
+        "partial": location_data.get("partial", False),
+        "coverage": location_data.get("coverage"),
+        "magnitude": location_data.get("magnitude"),
+        "obscuration": location_data.get("obscuration"),
+        "times": utc_times(date, location_data, zone),
+        "local_times": times_local,
+        "duration_at_location": times_local["duration"] if location_data.get("visible") else "N/A",
+        "max_duration_global": eclipse_data.get("max_duration"),
+    }
+    for key in EXTRA_KEYS:
+        if key in location_data:
+            result[key] = location_data[key]
+    if resolved:
+        result["resolved_location"] = resolved.to_dict(query)
+    if not location_data.get("visible"):
+        result["reason"] = location_data.get("reason", "Eclipse not visible from this location")
+    return result
+
+
+def next_eclipses(store: EclipseStore, gazetteer: Gazetteer, location: str, after_date: str = None,
+                  before_date: str = None, limit: Optional[int] = DEFAULT_NEXT_LIMIT) -> Dict[str, Any]:
+    """
+    Próximos eclipses visibles desde una ubicación del catálogo (búsqueda binaria)
+
+    Args:
+        location: Ubicación del catálogo (los nombres aproximados se resuelven con el gazetteer)
+        after_date: Fecha YYYY-MM-DD exclusiva (por defecto hoy)
+        before_date: Fecha YYYY-MM-DD límite, exclusiva (opcional)
+        limit: Máximo de eclipses listados (por defecto DEFAULT_NEXT_LIMIT; None = todos)
+
+    Returns:
+        {"location", "next_eclipse", "years_to_wait", "total_future_eclipses", "all_future_eclipses"}
+        (cada eclipse con su `max_time` UTC), o {"error": ..., "available_locations", "suggestions"}
+        si no hay ninguno
+    """
+    if not after_date:
+        after_date = datetime.now().strftime("%Y-%m-%d")
+    try:
+        start = date_type.fromisoformat(after_date)
+    except ValueError:
+        return {"error": f"Invalid after_date '{after_date}', expected YYYY-MM-DD"}
+    location = gazetteer.canonical(location, store.locations) or location
+    dates, total = store.next_after(after_date, location=location, limit=limit, before_date=before_date)
+    if not dates:
+        # Sugerir ubicaciones del catálogo con algún eclipse en la ventana, las más cercanas primero
+        candidates = [name for name in store.locations
+                      if name != location and store.next_after(after_date, location=name, limit=1,
+                                                               before_date=before_date)[0]]
+        return {"error": f"No upcoming eclipses found in database for {location}",
+                "available_locations": store.locations,
+                "suggestions": gazetteer.nearest(location, candidates)}
+
+    zone = location_zone(gazetteer, location)
+    future_eclipses = []
+    for date in dates:
+        eclipse_data = store.get(date)
+        location_data = eclipse_data["locations"][location]
+        future_eclipses.append({
+            "date": date,
+            "type": eclipse_data["type"],
+            "description": eclipse_data.get("description", ""),
+            "coverage": location_data.get("coverage"),
+            "magnitude": location_data.get("magnitude"),
+            "max_time": utc_times(date, location_data, zone)["maximum"],
+            "years_to_wait": round((date_type.fromisoformat(date) - start).days / 365.25, 1),
+            **saros_fields(store, date),
+        })
+    return {
+        "location": location,
+        "next_eclipse": future_eclipses[0],
+        "years_to_wait": future_eclipses[0]["years_to_wait"],
+        "total_future_eclipses": total,
+        "all_future_eclipses": future_eclipses,
+    }
@@ -0,0 +1,252 @@
+# eclipse-mcp-remote/eclipse_store.py
+"""
+Almacén único de datos de eclipses, compartido por los tres servidores MCP
+
+Los datos viven en `eclipses.json` (o en el archivo de `ECLIPSE_DATA_FILE`) y
+se cargan una sola vez por proceso. Al cargar se precalculan índices para que
+las consultas no recorran todo el catálogo:
+- fechas ordenadas
+- fechas por ubicación (todas y sólo las visibles)
+- fechas por año
+- fechas por tipo de eclipse
+
+Como todas las listas están ordenadas, las consultas por rango ("los próximos
+K después de una fecha", "todos entre dos fechas") son búsquedas binarias.
+
+Si existe el catálogo generado (`eclipse_catalog.npz` o `ECLIPSE_CATALOG_FILE`,
+ver `eclipse_catalog.py`), sus eclipses se añaden a los curados. Los datos
+curados tienen prioridad: en una fecha compartida sólo se les añaden los
+campos globales generados (gamma, magnitud, eclipse máximo).
+
+Los eclipses con instante del máximo (los del catálogo generado) se sitúan
+además en la retícula Saros–Inex: a partir de su número de lunación se
+resuelve
+
+    Δlunaciones = 223·ΔInex + 358·ΔSaros
+
+respecto a un eclipse de referencia de número Saros conocido. Los miembros
+consecutivos de una serie Saros difieren en un Inex, así que el anterior y el
+siguiente son consultas a un diccionario, sin recorrer el catálogo.
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date as date_type, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DATA_FILE = os.getenv("ECLIPSE_DATA_FILE", str(Path(__file__).resolve().parent / "eclipses.json"))
+DEFAULT_CATALOG_FILE = os.getenv("ECLIPSE_CATALOG_FILE", str(Path(__file__).resolve().parent / "eclipse_catalog.npz"))
+
+SYNODIC_MONTH = 29.530588861
+SAROS_LUNATIONS, INEX_LUNATIONS = 223, 358
+# Eclipses de referencia por clase: (máximo, Saros). El Inex se numera desde la serie
+# Inex de la referencia (0), porque no hay una numeración publicada de uso común.
+SAROS_REFERENCES = {
+    "solar": (datetime.fromisoformat("2024-04-08T18:17:17+00:00"), 139),
+    "lunar": (datetime.fromisoformat("2025-03-14T06:58:43+00:00"), 123),
+}
+_INEX_INVERSE = pow(INEX_LUNATIONS, -1, SAROS_LUNATIONS)  # 358⁻¹ mód 223
+
+
+def saros_inex(kind: str, greatest: str) -> Optional[Tuple[int, int]]:
+    """
+    Números Saros e Inex de un eclipse
+
+    Args:
+        kind: "solar" o "lunar"
+        greatest: Instante del máximo en ISO 8601 con zona (p. ej. "2024-04-08T18:17:17+00:00")
+
+    Returns:
+        (saros, inex), o None si la clase no es solar ni lunar
+    """
+    if kind not in SAROS_REFERENCES:
+        return None
+    reference, reference_saros = SAROS_REFERENCES[kind]
+    lunations = round((datetime.fromisoformat(greatest) - reference).total_seconds() / 86400.0 / SYNODIC_MONTH)
+    # ΔSaros ≡ Δk·358⁻¹ (mód 223); de las soluciones, la de menor |ΔSaros| (las demás distan milenios)
+    saros = lunations * _INEX_INVERSE % SAROS_LUNATIONS
+    if saros > SAROS_LUNATIONS // 2:
+        saros -= SAROS_LUNATIONS
+    inex = (lunations - INEX_LUNATIONS * saros) // SAROS_LUNATIONS
+    return reference_saros + saros, inex
+
+
+class EclipseStore:
+    """Catálogo de eclipses indexado por fecha, ubicación, año y tipo"""
+
+    def __init__(self, eclipses: Iterable[Dict[str, Any]]):
+        """
+        Args:
+            eclipses: Registros de eclipse con al menos "date" (YYYY-MM-DD), "type" y "locations"
+        """
+        self._by_date: Dict[str, Dict[str, Any]] = {e["date"]: e for e in eclipses}
+        self.dates: List[str] = sorted(self._by_date)
+        self._by_location: Dict[str, List[str]] = {}
+        self._visible_by_location: Dict[str, List[str]] = {}
+        self._by_year: Dict[int, List[str]] = {}
+        self._by_type: Dict[str, List[str]] = {}
+        self._by_saros: Dict[Tuple[str, int], List[str]] = {}
+        self._by_lattice: Dict[Tuple[str, int, int], str] = {}
+        # Al recorrer las fechas en orden, cada lista del índice queda ordenada
+        for date in self.dates:
+            eclipse = self._by_date[date]
+            self._by_year.setdefault(int(date[:4]), []).append(date)
+            self._by_type.setdefault(eclipse.get("type", ""), []).append(date)
+            for location, location_data in eclipse.get("locations", {}).items():
+                self._by_location.setdefault(location, []).append(date)
+                if location_data.get("visible"):
+                    self._visible_by_location.setdefault(location, []).append(date)
+            greatest = eclipse.get("greatest_eclipse", {}).get("time")
+            kind = eclipse.get("type", "").split("_")[0]
+            numbers = saros_inex(kind, greatest) if greatest else None
+            if numbers:
+                eclipse["saros"], eclipse["inex"] = numbers
+                self._by_saros.setdefault((kind, numbers[0]), []).append(date)
+                self._by_lattice[(kind,) + numbers] = date
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_DATA_FILE) -> "EclipseStore":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["eclipses"])
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, date: str) -> bool:
+        return date in self._by_date
+
+    def get(self, date: str) -> Optional[Dict[str, Any]]:
+        """Eclipse de una fecha, o None si no está en el catálogo"""
+        return self._by_date.get(date)
+
+    def location_data(self, date: str, location: str) -> Optional[Dict[str, Any]]:
+        """Datos de una ubicación para el eclipse de una fecha"""
+        eclipse = self._by_date.get(date)
+        return eclipse["locations"].get(location) if eclipse else None
+
+    @property
+    def locations(self) -> List[str]:
+        """Todas las ubicaciones con datos en algún eclipse"""
+        return list(self._by_location)
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(self._by_year)
+
+    def dates_for_location(self, location: str, visible_only: bool = False) -> List[str]:
+        """Fechas (ordenadas) de los eclipses con datos para una ubicación"""
+        index = self._visible_by_location if visible_only else self._by_location
+        return index.get(location, [])
+
+    def dates_for_year(self, year: int) -> List[str]:
+        """Fechas (ordenadas) de los eclipses de un año"""
+        return self._by_year.get(int(year), [])
+
+    def dates_for_type(self, eclipse_type: str) -> List[str]:
+        """Fechas (ordenadas) de los eclipses de un tipo (p. ej. 'solar_total')"""
+        return self._by_type.get(eclipse_type, [])
+
+    def saros_series(self, kind: str, saros: int) -> List[str]:
+        """Fechas (ordenadas) de los miembros de una serie Saros ("solar" o "lunar")"""
+        return self._by_saros.get((kind, int(saros)), [])
+
+    def series_neighbor(self, date: str, steps: int = 1, series: str = "saros") -> Optional[str]:
+        """
+        Eclipse a `steps` pasos de otro dentro de su serie, en tiempo constante
+
+        Args:
+            date: Fecha de un eclipse con números Saros/Inex
+            steps: Pasos hacia delante (negativo = hacia atrás)
+            series: "saros" (cada 223 lunaciones, ~18 años) o "inex" (cada 358, ~29 años)
+
+        Returns:
+            Fecha del eclipse, o None si no está en el catálogo
+        """
+        eclipse = self._by_date.get(date)
+        if not eclipse or "saros" not in eclipse:
+            return None
+        kind = eclipse["type"].split("_")[0]
+        if series == "inex":
+            return self._by_lattice.get((kind, eclipse["saros"] + steps, eclipse["inex"]))
+        return self._by_lattice.get((kind, eclipse["saros"], eclipse["inex"] + steps))
+
+    def eclipses_for_year(self, year: int) -> List[Dict[str, Any]]:
+        return [self._by_date[d] for d in self.dates_for_year(year)]
+
+    @staticmethod
+    def _range(dates: List[str], after: str = None, before: str = None,
+               inclusive: bool = False) -> Tuple[int, int]:
+        """Índices [i, j) de `dates` entre `after` y `before` (exclusivos salvo `inclusive`)"""
+        if after is None:
+            i = 0
+        else:
+            i = bisect_left(dates, after) if inclusive else bisect_right(dates, after)
+        if before is None:
+            j = len(dates)
+        else:
+            j = bisect_right(dates, before) if inclusive else bisect_left(dates, before)
+        return i, max(i, j)
+
+    def next_after(self, after_date: str, location: str = None, limit: int = None,
+                   before_date: str = None, visible_only: bool = True) -> Tuple[List[str], int]:
+        """
+        Próximos eclipses estrictamente posteriores a una fecha
+
+        Args:
+            after_date: Fecha YYYY-MM-DD (exclusiva)
+            location: Restringir a una ubicación (None = todo el catálogo)
+            limit: Máximo de fechas devueltas (None = todas)
+            before_date: Fecha YYYY-MM-DD límite (exclusiva, opcional)
+            visible_only: Con `location`, sólo eclipses visibles desde ella
+
+        Returns:
+            (fechas ordenadas, total de fechas en el rango antes de aplicar `limit`)
+        """
+        dates = self.dates if location is None else self.dates_for_location(location, visible_only)
+        i, j = self._range(dates, after_date, before_date)
+        end = j if limit is None else min(j, i + limit)
+        return dates[i:end], j - i
+
+    def nearest(self, date: str, limit: int = 6) -> List[str]:
+        """Las `limit` fechas del catálogo más cercanas a una fecha (para sugerencias), ordenadas"""
+        i = bisect_left(self.dates, date)
+        window = self.dates[max(0, i - limit):i + limit]
+        try:
+            target = date_type.fromisoformat(date)
+        except ValueError:
+            return window[:limit]
+        closest = sorted(window, key=lambda d: abs((date_type.fromisoformat(d) - target).days))
+        return sorted(closest[:limit])
+
+    def between(self, start_date: str = None, end_date: str = None, location: str = None,
+                visible_only: bool = False) -> List[str]:
+        """Fechas entre `start_date` y `end_date`, ambas inclusivas (None = sin límite)"""
+        dates = self.dates if location is None else self.dates_for_location(location, visible_only)
+        i, j = self._range(dates, start_date, end_date, inclusive=True)
+        return dates[i:j]
+
+
+def merge_generated(curated: Iterable[Dict[str, Any]], generated: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Unir eclipses curados y generados; en fechas compartidas (mismo Sol/Luna) mandan los curados"""
+    merged = {e["date"]: e for e in generated}
+    for eclipse in curated:
+        match = merged.get(eclipse["date"])
+        if match and match["type"].split("_")[0] == eclipse.get("type", "").split("_")[0]:
+            eclipse = {**match, **eclipse}
+            eclipse.pop("source", None)
+        merged[eclipse["date"]] = eclipse
+    return list(merged.values())
+
+
+@lru_cache(maxsize=None)
+def get_store(path: str = DEFAULT_DATA_FILE, catalog_path: str = DEFAULT_CATALOG_FILE) -> EclipseStore:
+    """Almacén del proceso: se carga e indexa una sola vez por archivo (catalog_path="" = sólo curados)"""
+    with open(path, "r", encoding="utf-8") as f:
+        eclipses = json.load(f)["eclipses"]
+    if catalog_path and Path(catalog_path).exists():
+        from eclipse_catalog import load_catalog  # NumPy sólo si hay catálogo generado
+        eclipses = merge_generated(eclipses, load_catalog(catalog_path))
+    return EclipseStore(eclipses)
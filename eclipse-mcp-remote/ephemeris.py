@@ -0,0 +1,267 @@
+# eclipse-mcp-remote/ephemeris.py
+"""
+Tabla precalculada de posiciones geocéntricas del Sol y la Luna
+
+Cada 6 horas entre 1900 y 2100 se guardan los vectores geocéntricos aparentes
+(ecuatoriales de la fecha, en UA) del Sol y la Luna y el tiempo sidéreo
+aparente de Greenwich, tal como los da `ephem`. La tabla es un archivo
+memory-mapped en `ECLIPSE_EPHEMERIS_CACHE` que se rellena por bloques la
+primera vez que se necesitan (un mapa de bits marca los bloques ya
+calculados), así que varios procesos la comparten y sólo se paga `ephem` una
+vez por bloque.
+
+`positions(times)` interpola con Lagrange de 6 puntos miles de instantes en
+una sola llamada NumPy; con esta cadencia el error queda por debajo de 0.01"
+(el propio redondeo de `ephem`). Los instantes fuera de la tabla se calculan
+directamente con `ephem`.
+
+Uso: python ephemeris.py [--cache-dir DIR] [--workers 4]   (rellena la tabla completa de una vez)
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Tuple
+
+import ephem
+import numpy as np
+
+EPHEMERIS_CACHE_DIR = os.getenv("ECLIPSE_EPHEMERIS_CACHE", str(Path(tempfile.gettempdir()) / "eclipse-ephemeris"))
+START, END = ephem.Date("1900/1/1"), ephem.Date("2101/1/1")
+STEP_DAYS = 0.25  # Cadencia de 6 horas
+BLOCK_SAMPLES = 128  # Bloques de 32 días
+ORDER = 6  # Puntos de la interpolación de Lagrange
+FIELDS = 7  # Sol xyz, Luna xyz, tiempo sidéreo
+EPHEM_UNIX_DAYS = 25567.5  # ephem.Date del 1970-01-01 00:00 UT (para pasar a segundos Unix)
+
+_NODES = np.arange(-ORDER // 2 + 1, ORDER // 2 + 1)  # -2..3 alrededor del nodo inferior
+_OTHERS = np.array([[m for m in _NODES if m != j] for j in _NODES])  # ORDER × (ORDER-1)
+_DENOMINATORS = np.prod(_NODES[:, None] - _OTHERS, axis=1)
+
+
+def sample(when: float) -> np.ndarray:
+    """Vectores del Sol y la Luna (UA) y tiempo sidéreo aparente (rad) en un instante, con ephem"""
+    row = np.empty(FIELDS)
+    for i, body in enumerate((ephem.Sun(), ephem.Moon())):
+        body.compute(when)
+        ra, dec, distance = float(body.g_ra), float(body.g_dec), body.earth_distance
+        row[3 * i:3 * i + 3] = distance * np.array([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)])
+    observer = ephem.Observer()
+    observer.lon, observer.lat, observer.elevation, observer.pressure = "0", "0", 0, 0
+    observer.date = when
+    row[6] = float(observer.sidereal_time())
+    return row
+
+
+def compute_rows(start: float, step: float, first: int, count: int) -> np.ndarray:
+    """Filas `first`..`first+count` de la tabla calculadas con ephem (se ejecuta en los procesos del pool)"""
+    return np.array([sample(start + (first + i) * step) for i in range(count)])
+
+
+def direct_positions(times) -> Dict[str, np.ndarray]:
+    """Mismo resultado que `EphemerisTable.positions`, llamando a ephem en cada instante"""
+    rows = np.array([sample(float(t)) for t in np.atleast_1d(times)]).reshape(-1, FIELDS)
+    return {"sun": rows[:, 0:3], "moon": rows[:, 3:6], "sidereal": rows[:, 6]}
+
+
+def _create_zeroed(path: Path, dtype, shape) -> None:
+    """
+    Crear un archivo memmap a ceros si no existe, sin pisar nunca uno existente
+
+    Se escribe en un temporal del mismo directorio y se enlaza con `os.link`,
+    que falla si el destino ya existe: con varios procesos arrancando en frío
+    (los workers de `eclipse_catalog`) gana el primero y ninguno trunca una
+    tabla que otro ya está rellenando y marcando.
+    """
+    if path.exists():
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        np.memmap(tmp_path, dtype=dtype, mode="w+", shape=shape).flush()
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp_path)
+
+
+class EphemerisTable:
+    """Tabla Sol/Luna a cadencia fija, persistida como memmap y rellenada por bloques"""
+
+    def __init__(self, cache_dir: str = EPHEMERIS_CACHE_DIR, start: float = START, end: float = END,
+                 step_days: float = STEP_DAYS):
+        self.start = float(start)
+        self.step = float(step_days)
+        self.samples = int(np.ceil((float(end) - self.start) / self.step)) + 1
+        self.blocks = -(-self.samples // BLOCK_SAMPLES)
+        self.end = self.start + (self.samples - 1) * self.step
+        self._lock = threading.Lock()
+
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        first_day = ephem.Date(self.start).datetime()
+        stem = Path(cache_dir) / f"sunmoon_{first_day:%Y%m%d}_{self.samples}x{round(self.step * 1440)}min"
+        self.data_path = stem.with_suffix(".f64")
+        self.blocks_path = stem.with_suffix(".blocks")
+        # Primero los datos: un mapa de bloques existente implica que su tabla ya existía
+        _create_zeroed(self.data_path, np.float64, (self.samples, FIELDS))
+        _create_zeroed(self.blocks_path, np.uint8, (self.blocks,))
+        self.data = np.memmap(self.data_path, dtype=np.float64, mode="r+", shape=(self.samples, FIELDS))
+        self.filled = np.memmap(self.blocks_path, dtype=np.uint8, mode="r+", shape=(self.blocks,))
+        # Vistas ndarray del mismo mapeo: indexarlas evita la sobrecarga de la subclase memmap
+        self._rows = self.data.view(np.ndarray)
+        self._filled = self.filled.view(np.ndarray)
+
+    def covers(self, times: np.ndarray) -> bool:
+        """Si todos los instantes tienen los nodos de interpolación dentro de la tabla"""
+        margin = (ORDER // 2) * self.step
+        return bool(times.size) and times.min() >= self.start + margin and times.max() <= self.end - margin
+
+    def block_job(self, block: int) -> Tuple[float, float, int, int]:
+        first = block * BLOCK_SAMPLES
+        return self.start, self.step, first, min(BLOCK_SAMPLES, self.samples - first)
+
+    def ensure(self, blocks, executor: ProcessPoolExecutor = None) -> int:
+        """Rellenar los bloques pedidos que falten (opcionalmente en un pool); devuelve cuántos se calcularon"""
+        blocks = np.unique(blocks)
+        if self._filled[blocks].all():
+            return 0
+        with self._lock:
+            missing = blocks[self._filled[blocks] == 0].tolist()
+            jobs = [self.block_job(block) for block in missing]
+            results = executor.map(compute_rows, *zip(*jobs)) if executor and jobs else (compute_rows(*job) for job in jobs)
+            for (_, _, first, count), rows in zip(jobs, results):
+                self.data[first:first + count] = rows
+            if missing:
+                self.data.flush()
+                # Marcar los bloques sólo después de escribir sus datos
+                self.filled[missing] = 1
+                self.filled.flush()
+        return len(missing)
+
+    def positions(self, times) -> Dict[str, np.ndarray]:
+        """
+        Posiciones interpoladas para muchos instantes a la vez
+
+        Args:
+            times: Instantes (ephem.Date, días UT); escalar o array dentro de la tabla
+
+        Returns:
+            Dict con sun y moon (n×3, UA, ecuatoriales aparentes de la fecha) y
+            sidereal (n, tiempo sidéreo aparente de Greenwich en radianes, 0..2π)
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        u = (times - self.start) / self.step
+        k = np.floor(u).astype(np.int64)
+        f = u - k
+        index = k[:, None] + _NODES[None, :]
+        self.ensure(np.unique(index) // BLOCK_SAMPLES)
+
+        # Pesos de Lagrange (n × ORDER) sobre los nodos k-2..k+3
+        weights = np.prod(f[:, None, None] - _OTHERS[None], axis=2) / _DENOMINATORS
+        rows = self._rows[index]  # n × ORDER × FIELDS
+        vectors = np.einsum("no,nof->nf", weights, rows[:, :, :6])
+        # El tiempo sidéreo avanza ~1.575 rad por nodo: desenrollar antes de interpolar
+        sidereal = np.einsum("no,no->n", weights, np.unwrap(rows[:, :, 6], axis=1)) % (2 * np.pi)
+        return {"sun": vectors[:, 0:3], "moon": vectors[:, 3:6], "sidereal": sidereal}
+
+
+@lru_cache(maxsize=None)
+def get_table(cache_dir: str = EPHEMERIS_CACHE_DIR) -> EphemerisTable:
+    """Tabla del proceso: el memmap se abre una sola vez"""
+    return EphemerisTable(cache_dir)
+
+
+def positions(times) -> Dict[str, np.ndarray]:
+    """Posiciones del Sol y la Luna para muchos instantes: tabla si los cubre, ephem si no"""
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    table = get_table()
+    return table.positions(times) if table.covers(times) else direct_positions(times)
+
+
+def to_spherical(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectores n×3 → ascensión recta (0..2π), declinación (rad) y distancia (UA)"""
+    distance = np.linalg.norm(vectors, axis=1)
+    ra = np.arctan2(vectors[:, 1], vectors[:, 0]) % (2 * np.pi)
+    return ra, np.arcsin(vectors[:, 2] / distance), distance
+
+
+NEW_MOON, FULL_MOON = 0.0, np.pi
+
+
+def ecliptic(vectors: np.ndarray, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitud y latitud eclípticas de la fecha (oblicuidad media) de vectores ecuatoriales n×3"""
+    centuries = (np.asarray(times, dtype=float) - ephem.J2000) / 36525.0
+    obliquity = np.radians(23.439291 - 0.0130042 * centuries)
+    x, y, z = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+    y_ecl = y * np.cos(obliquity) + z * np.sin(obliquity)
+    z_ecl = z * np.cos(obliquity) - y * np.sin(obliquity)
+    return np.arctan2(y_ecl, x), np.arcsin(z_ecl / np.linalg.norm(vectors, axis=1))
+
+
+def _elongation(times: np.ndarray, phase: float, p: Dict[str, np.ndarray] = None) -> np.ndarray:
+    """Diferencia de longitudes Luna − Sol menos la fase buscada, en (-π, π]"""
+    p = positions(times) if p is None else p
+    difference = ecliptic(p["moon"], times)[0] - ecliptic(p["sun"], times)[0] - phase
+    return np.angle(np.exp(1j * difference))
+
+
+def moon_phases(start: float, end: float, phase: float = NEW_MOON) -> np.ndarray:
+    """
+    Instantes de luna nueva (NEW_MOON) o llena (FULL_MOON) entre dos fechas (ephem.Date)
+
+    Busca los cambios de signo de la elongación en los nodos de la tabla y los
+    refina por la secante, todo vectorizado. Fuera de la tabla usa ephem.
+    """
+    table = get_table()
+    if not table.covers(np.array([start - 1.0, end + 1.0])):
+        find = ephem.next_new_moon if phase == NEW_MOON else ephem.next_full_moon
+        found, when = [], find(ephem.Date(start))
+        while when < end:
+            found.append(float(when))
+            when = find(ephem.Date(when + 1))
+        return np.array(found)
+
+    first = int(np.floor((start - table.start) / table.step))
+    last = int(np.ceil((end - table.start) / table.step))
+    times = table.start + np.arange(first, last + 1) * table.step
+    # En los nodos no hace falta interpolar: se leen las filas tal cual
+    table.ensure(np.arange(first - ORDER, last + ORDER + 1) // BLOCK_SAMPLES)
+    rows = table._rows[first:last + 1]
+    value = _elongation(times, phase, {"sun": rows[:, 0:3], "moon": rows[:, 3:6]})
+    # Cruce de - a + (la elongación crece ~0.2 rad por nodo; los saltos de ±π no cuentan)
+    i = np.flatnonzero((value[:-1] < 0) & (value[1:] >= 0) & (value[1:] - value[:-1] < np.pi))
+    a, b = times[i], times[i + 1]
+    fa, fb = value[i], value[i + 1]
+    for _ in range(3):
+        t = a - fa * (b - a) / (fb - fa)
+        a, fa, b, fb = b, fb, t, _elongation(t, phase) if t.size else t
+    found = b if i.size else np.array([])
+    return found[(found >= start) & (found < end)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cache-dir", default=EPHEMERIS_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    table = EphemerisTable(args.cache_dir)
+    started = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as pool:
+            computed = table.ensure(np.arange(table.blocks), pool)
+    else:
+        computed = table.ensure(np.arange(table.blocks))
+    print(f"{table.data_path}: {table.samples} filas, {computed} bloques calculados "
+          f"en {time.perf_counter() - started:.1f} s ({table.data_path.stat().st_size / 2 ** 20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# eclipse-mcp-remote/gazetteer.py
+"""
+Gazetteer offline de ciudades con búsqueda aproximada
+
+Los datos viven en `gazetteer.tsv` (o en el archivo de `GAZETTEER_FILE`): nombre,
+país, coordenadas, zona horaria IANA y nombres alternativos ("Ciudad de
+Guatemala", "Nueva York", ...). Al cargar se construye un índice compacto:
+- claves normalizadas (minúsculas, sin acentos ni puntuación) → lugares
+- las mismas claves ordenadas, para búsqueda por prefijo con bisect
+- trigramas → claves, para tolerar errores de escritura
+
+Así "guatemala", "Ciudad de Guatemala" o "Guatemla City" resuelven al mismo
+lugar en bastante menos de un milisegundo.
+"""
+
+import math
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher, get_close_matches
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_GAZETTEER_FILE = os.getenv("GAZETTEER_FILE", str(Path(__file__).resolve().parent / "gazetteer.tsv"))
+
+MIN_SCORE = 0.5  # Puntuación mínima para aceptar una coincidencia aproximada
+EARTH_MEAN_RADIUS_KM = 6371.0
+RESCORE_CANDIDATES = 8  # Claves con más trigramas en común que se comparan carácter a carácter
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin acentos y con la puntuación reducida a espacios simples"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", ascii_text.lower()).strip()
+
+
+def coordinate_error(latitude: float, longitude: float) -> Optional[str]:
+    """Mensaje de error si las coordenadas están fuera de rango (|latitud| > 90, |longitud| > 180), o None"""
+    if not -90.0 <= latitude <= 90.0:
+        return f"Latitud {latitude} fuera de rango: se requiere -90 <= latitude <= 90"
+    if not -180.0 <= longitude <= 180.0:
+        return f"Longitud {longitude} fuera de rango: se requiere -180 <= longitude <= 180"
+    return None
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de círculo máximo (haversine, Tierra esférica) en km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_MEAN_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Place:
+    """Un lugar del gazetteer"""
+
+    __slots__ = ("name", "country", "latitude", "longitude", "timezone", "alternate_names")
+
+    def __init__(self, name: str, country: str, latitude: float, longitude: float, timezone: str,
+                 alternate_names: Iterable[str] = ()):
+        self.name = name
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timezone = timezone
+        self.alternate_names = tuple(alternate_names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "country": self.country,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "timezone": self.timezone,
+        }
+
+
+class Match:
+    """Resultado de una búsqueda: lugar, puntuación (0–1) y nombre que coincidió"""
+
+    __slots__ = ("place", "score", "matched")
+
+    def __init__(self, place: Place, score: float, matched: str):
+        self.place = place
+        self.score = score
+        self.matched = matched
+
+    def to_dict(self, query: str = None) -> Dict[str, Any]:
+        result = {**self.place.to_dict(), "score": round(self.score, 3)}
+        if query is not None:
+            result["query"] = query
+        return result
+
+
+class Gazetteer:
+    """Índice de nombres de lugar: exacto, por prefijo y por trigramas"""
+
+    def __init__(self, places: Iterable[Place]):
+        self.places: List[Place] = list(places)
+        self._by_key: Dict[str, List[int]] = {}
+        for i, place in enumerate(self.places):
+            for name in (place.name, *place.alternate_names):
+                ids = self._by_key.setdefault(normalize(name), [])
+                if i not in ids:
+                    ids.append(i)
+        self._keys: List[str] = sorted(self._by_key)
+        self._grams: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        for k, key in enumerate(self._keys):
+            grams = trigrams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(k)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_GAZETTEER_FILE) -> "Gazetteer":
+        places = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                name, country, lat, lon, timezone, alternates = line.rstrip("\n").split("\t")
+                places.append(Place(name, country, float(lat), float(lon), timezone,
+                                    [a for a in alternates.split("|") if a]))
+        return cls(places)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _candidates(self, key: str) -> Dict[str, float]:
+        """Claves del índice con su puntuación para una consulta normalizada"""
+        scores: Dict[str, float] = {}
+        if key in self._by_key:
+            scores[key] = 1.0
+        # Prefijo: "guatem" → "guatemala", "guatemala city"
+        if len(key) >= 3:
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i].startswith(key):
+                candidate = self._keys[i]
+                scores.setdefault(candidate, 0.8 + 0.2 * len(key) / len(candidate))
+                i += 1
+        if scores:
+            return scores
+        # Palabras iniciales: "dallas tx", "paris france"
+        words = key.split()
+        for n in range(len(words) - 1, 0, -1):
+            head = " ".join(words[:n])
+            if head in self._by_key:
+                scores[head] = 0.9
+                return scores
+        # Trigramas (coeficiente de Dice) para errores de escritura; las claves con más
+        # trigramas en común se comparan además carácter a carácter (letras transpuestas)
+        grams = trigrams(key)
+        shared = Counter(k for gram in grams for k in self._grams.get(gram, ()))
+        for k, common in shared.most_common(RESCORE_CANDIDATES):
+            candidate = self._keys[k]
+            dice = 2 * common / (len(grams) + self._gram_counts[k])
+            similarity = max(dice, SequenceMatcher(None, key, candidate).ratio())
+            if similarity >= MIN_SCORE:
+                scores[candidate] = max(scores.get(candidate, 0.0), similarity * 0.95)
+        return scores
+
+    def lookup(self, query: str, limit: int = 5, country: str = None) -> List[Match]:
+        """
+        Lugares que coinciden con un nombre, de mejor a peor
+
+        Args:
+            query: Nombre tal como lo escribió el usuario ("ciudad de guatemala", "Madrid, ES")
+            limit: Máximo de resultados
+            country: Código ISO de país para desempatar/filtrar (opcional)
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        scores = self._candidates(key)
+        # "Madrid, España": si la consulta completa no coincide exactamente, probar la parte antes de la coma
+        if "," in query and scores.get(key, 0) < 1.0:
+            head, _, tail = query.partition(",")
+            tail_key = normalize(tail)
+            if len(tail_key) == 2 and country is None:
+                country = tail_key.upper()
+            for candidate, score in self._candidates(normalize(head)).items():
+                scores[candidate] = max(scores.get(candidate, 0.0), score)
+
+        best: Dict[int, Match] = {}
+        for candidate, score in scores.items():
+            for i in self._by_key[candidate]:
+                place = self.places[i]
+                if country and place.country != country:
+                    continue
+                # A igual puntuación, preferir el nombre principal sobre un alternativo
+                adjusted = score if normalize(place.name) == candidate else score - 1e-3
+                if i not in best or adjusted > best[i].score:
+                    best[i] = Match(place, adjusted, candidate)
+        ranked = sorted(best.values(), key=lambda m: (-m.score, m.place.name))
+        return ranked[:limit]
+
+    def resolve(self, query: str, country: str = None) -> Optional[Match]:
+        """Mejor coincidencia con puntuación suficiente, o None"""
+        matches = self.lookup(query, limit=1, country=country)
+        return matches[0] if matches and matches[0].score >= MIN_SCORE else None
+
+    def resolve_location(self, query: str, names: Collection[str]) -> Tuple[Optional[str], Optional[Match]]:
+        """
+        Resolver una consulta contra un conjunto de nombres conocidos (p. ej. las ubicaciones de un eclipse)
+
+        Returns:
+            (nombre de `names` al que resuelve la consulta o None, coincidencia del gazetteer o None).
+            Una coincidencia exacta en `names` no consulta el gazetteer; entre coincidencias empatadas
+            se prefiere la que está en `names` ("antigua" → "Antigua Guatemala").
+        """
+        if query in names:
+            return query, None
+        matches = [m for m in self.lookup(query, limit=5) if m.score >= MIN_SCORE]
+        if not matches:
+            return None, None
+        for match in matches:
+            if match.score < matches[0].score - 2e-3:
+                break
+            if match.place.name in names:
+                return match.place.name, match
+        return None, matches[0]
+
+    def canonical(self, query: str, names: Collection[str]) -> Optional[str]:
+        """Nombre de `names` al que resuelve la consulta, o None"""
+        return self.resolve_location(query, names)[0]
+
+    def suggestions(self, query: str, limit: int = 3) -> List[str]:
+        return [m.place.name for m in self.lookup(query, limit=limit)]
+
+    def nearest(self, query: str, names: Collection[str], limit: int = 3) -> List[str]:
+        """
+        Nombres de `names` más cercanos al lugar de la consulta
+
+        Si la consulta resuelve a un lugar, se ordenan por distancia a él (los nombres
+        sin coordenadas en el gazetteer quedan fuera); si no, por parecido del nombre.
+        """
+        match = self.resolve(query) if query else None
+        if match is None:
+            return get_close_matches(query or "", list(names), n=limit, cutoff=0.0)
+        origin = match.place
+        ranked = []
+        for name in names:
+            place = self.resolve(name)
+            if place is not None and name != origin.name:
+                ranked.append((distance_km(origin.latitude, origin.longitude,
+                                           place.place.latitude, place.place.longitude), name))
+        return [name for _, name in sorted(ranked)[:limit]]
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer(path: str = DEFAULT_GAZETTEER_FILE) -> Gazetteer:
+    """Gazetteer del proceso: se carga e indexa una sola vez por archivo"""
+    return Gazetteer.from_file(path)
@@ -0,0 +1,356 @@
+# eclipse-mcp-remote/lunar.py
+"""
+Eclipses lunares: geometría de la Luna frente a la sombra de la Tierra
+
+Alrededor de cada luna llena se busca el instante en que el centro de la Luna
+pasa más cerca del eje de la sombra (el punto antisolar) y se comparan las
+distancias con los radios de la umbra y la penumbra en el cielo, calculados
+con la regla de Danjon (la atmósfera agranda la sombra en un 1% de la
+paralaje lunar):
+
+    umbra     = 1.01·π_Luna + π_Sol − s_Sol
+    penumbra  = 1.01·π_Luna + π_Sol + s_Sol
+
+Las magnitudes umbral y penumbral son las fracciones del diámetro lunar
+dentro de cada sombra en el máximo.
+
+Los contactos son los instantes en que el borde de la Luna toca el de cada
+sombra: P1/P4 (penumbra, exteriores), U1/U4 (umbra, exteriores) y U2/U3
+(umbra, interiores: principio y fin de la totalidad). Se localizan en una
+malla de un minuto alrededor del máximo y se afinan con un paso de secante.
+
+Las circunstancias locales sólo dependen de la altura de la Luna: el eclipse
+es el mismo para todo el hemisferio nocturno. `lunar_local_circumstances`
+evalúa de una vez una matriz observadores × instantes (contactos, máximo y
+una malla entre P1 y P4) para miles de ubicaciones por eclipse.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import ephem
+import numpy as np
+
+from besselian import AU_KM, EARTH_RADIUS_KM, SUN_RADIUS
+from ephemeris import EPHEM_UNIX_DAYS, FULL_MOON, moon_phases, positions, to_spherical
+
+MOON_RADIUS_KM = 1737.4
+DANJON = 1.01
+SEARCH_HOURS = 5  # La luna llena y el máximo del eclipse distan a lo sumo unas horas
+CONTACTS = ("P1", "U1", "U2", "U3", "U4", "P4")
+CONTACT_HOURS = 4  # Un eclipse penumbral dura a lo sumo ~6 h: ±4 h alrededor del máximo
+VISIBILITY_STEP = 2.0 / 1440.0  # Malla de 2 minutos para saber si la Luna está sobre el horizonte
+
+
+def _shadow_geometry(times) -> Dict[str, np.ndarray]:
+    """Separación Luna–punto antisolar y radios angulares (radianes) en varios instantes"""
+    p = positions(times)
+    sun, moon = p["sun"], p["moon"]
+    sun_km = np.linalg.norm(sun, axis=1) * AU_KM
+    moon_km = np.linalg.norm(moon, axis=1) * AU_KM
+    cos_separation = -(sun * moon).sum(axis=1) / (np.linalg.norm(sun, axis=1) * np.linalg.norm(moon, axis=1))
+    moon_parallax = np.arcsin(EARTH_RADIUS_KM / moon_km)
+    sun_parallax = np.arcsin(EARTH_RADIUS_KM / sun_km)
+    sun_semidiameter = np.arcsin(SUN_RADIUS * EARTH_RADIUS_KM / sun_km)
+    return {
+        "separation": np.arccos(np.clip(cos_separation, -1, 1)),
+        # Con signo: positivo si la Luna pasa al norte del eje de la sombra
+        "north": to_spherical(moon)[1] + to_spherical(sun)[1],
+        "umbra": DANJON * moon_parallax + sun_parallax - sun_semidiameter,
+        "penumbra": DANJON * moon_parallax + sun_parallax + sun_semidiameter,
+        "moon_radius": np.arcsin(MOON_RADIUS_KM / moon_km),
+        "moon_parallax": moon_parallax,
+    }
+
+
+def _contact_offsets(geometry: Dict[str, np.ndarray]) -> np.ndarray:
+    """Separación menos el umbral de cada contacto (3 × n): penumbra exterior, umbra exterior, umbra interior"""
+    return geometry["separation"] - np.stack([
+        geometry["penumbra"] + geometry["moon_radius"],
+        geometry["umbra"] + geometry["moon_radius"],
+        geometry["umbra"] - geometry["moon_radius"],
+    ])
+
+
+def contact_times(greatest: float) -> np.ndarray:
+    """
+    Instantes de los contactos P1, U1, U2, U3, U4 y P4 (ephem.Date; NaN si no hay esa fase)
+
+    Args:
+        greatest: Instante del máximo del eclipse (ephem.Date)
+    """
+    step = 1.0 / 1440.0
+    offsets = np.arange(-CONTACT_HOURS * 60, CONTACT_HOURS * 60 + 1)
+    times = greatest + offsets * step
+    f = _contact_offsets(_shadow_geometry(times))
+    middle = len(offsets) // 2
+    estimates = np.full(6, np.nan)
+    # Antes del máximo la separación cruza cada umbral hacia dentro; después, hacia fuera
+    for row, (before, after) in enumerate(((0, 5), (1, 4), (2, 3))):
+        if f[row, middle] >= 0:
+            continue  # La Luna no llega a esa sombra (o no entra entera)
+        outside = np.flatnonzero(f[row, :middle] >= 0)
+        i = outside[-1] if outside.size else 0
+        estimates[before] = times[i] + step * f[row, i] / (f[row, i] - f[row, i + 1])
+        outside = np.flatnonzero(f[row, middle:] >= 0)
+        j = middle + (outside[0] if outside.size else len(offsets) - 1 - middle)
+        estimates[after] = times[j - 1] + step * f[row, j - 1] / (f[row, j - 1] - f[row, j])
+
+    # Paso de secante con la geometría exacta en cada estimación y 10 s después
+    valid = np.flatnonzero(~np.isnan(estimates))
+    if valid.size:
+        delta = 10.0 / 86400.0
+        rows = np.array([0, 1, 2, 2, 1, 0])[valid]
+        f = _contact_offsets(_shadow_geometry(np.concatenate([estimates[valid], estimates[valid] + delta])))
+        f0 = f[rows, np.arange(valid.size)]
+        f1 = f[rows, valid.size + np.arange(valid.size)]
+        slope = (f1 - f0) / delta
+        estimates[valid] -= np.where(slope != 0, f0 / np.where(slope != 0, slope, 1.0), 0.0)
+    return estimates
+
+
+class LunarEclipse:
+    """Circunstancias globales de un eclipse lunar: máximo y contactos"""
+
+    __slots__ = ("greatest", "date", "type", "umbral_magnitude", "penumbral_magnitude", "gamma", "geometry",
+                 "contacts")
+
+    def __init__(self, greatest: float, geometry: Dict[str, float], contacts: np.ndarray = None):
+        """
+        Args:
+            greatest: Instante del máximo (ephem.Date, días UT)
+            geometry: Resultado de `_shadow_geometry` en ese instante (escalares)
+            contacts: Instantes de P1, U1, U2, U3, U4 y P4 (None = calcularlos)
+        """
+        self.greatest = greatest
+        self.geometry = geometry
+        self.contacts = contact_times(greatest) if contacts is None else np.asarray(contacts, dtype=float)
+        diameter = 2 * geometry["moon_radius"]
+        self.umbral_magnitude = (geometry["umbra"] + geometry["moon_radius"] - geometry["separation"]) / diameter
+        self.penumbral_magnitude = (geometry["penumbra"] + geometry["moon_radius"] - geometry["separation"]) / diameter
+        # Distancia del centro de la Luna al eje de la sombra en radios terrestres
+        self.gamma = float(np.copysign(np.sin(geometry["separation"]) / np.sin(geometry["moon_parallax"]),
+                                       geometry["north"]))
+        if self.umbral_magnitude >= 1:
+            self.type = "total"
+        elif self.umbral_magnitude > 0:
+            self.type = "partial"
+        else:
+            self.type = "penumbral"
+        self.date = ephem.Date(greatest).datetime().date().isoformat()
+
+    @property
+    def phases(self) -> Dict[str, Optional[float]]:
+        """Duración (minutos) de las fases penumbral (P1–P4), umbral (U1–U4) y total (U2–U3)"""
+        p1, u1, u2, u3, u4, p4 = self.contacts.tolist()
+        return {name: None if end != end or start != start else round((end - start) * 1440.0, 1)
+                for name, (start, end) in (("penumbral", (p1, p4)), ("umbral", (u1, u4)), ("total", (u2, u3)))}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "time": ephem.Date(self.greatest).datetime().strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+            "gamma": round(self.gamma, 4),
+            "umbral_magnitude": round(self.umbral_magnitude, 4),
+            "penumbral_magnitude": round(self.penumbral_magnitude, 4),
+            "contacts": dict(zip(CONTACTS, timestamps(self.contacts))),
+            "phase_minutes": self.phases,
+        }
+
+
+def clock_strings(times) -> List[Optional[str]]:
+    """Instantes ephem.Date → "HH:MM:SS" UTC (None donde el instante es NaN), vectorizado"""
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    # ephem.Date cuenta días desde 1899-12-31 12:00 UT
+    seconds = np.floor((np.nan_to_num(times) + 0.5) * 86400.0).astype(np.int64) % 86400
+    return [None if missing else f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}"
+            for s, missing in zip(seconds.tolist(), np.isnan(times).tolist())]
+
+
+def timestamps(times) -> List[Optional[str]]:
+    """Instantes ephem.Date → ISO 8601 UTC (None donde el instante es NaN)"""
+    return [None if t != t else ephem.Date(t).datetime().strftime("%Y-%m-%dT%H:%M:%S+00:00")
+            for t in np.atleast_1d(np.asarray(times, dtype=float)).tolist()]
+
+
+def _altitudes(times, latitude, longitude) -> np.ndarray:
+    """Altura topocéntrica de la Luna (grados), matriz observadores × instantes"""
+    p = positions(times)
+    ra, dec, distance = to_spherical(p["moon"])
+    lat = np.radians(np.atleast_1d(np.asarray(latitude, dtype=float)))[:, None]
+    hour_angle = p["sidereal"][None, :] + np.radians(np.atleast_1d(np.asarray(longitude, dtype=float)))[:, None] - ra
+    altitude = np.arcsin(np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle))
+    # Paralaje en altura: la Luna se ve más baja desde la superficie que desde el centro
+    parallax = np.arcsin(EARTH_RADIUS_KM / (distance * AU_KM))
+    return np.degrees(altitude - parallax * np.cos(altitude))
+
+
+def moon_altitude(times, latitude: float, longitude: float) -> np.ndarray:
+    """Altura topocéntrica de la Luna (grados) desde unas coordenadas en varios instantes (ephem.Date)"""
+    return _altitudes(times, latitude, longitude)[0]
+
+
+def lunar_local_circumstances(eclipse: LunarEclipse, latitude, longitude) -> Dict[str, np.ndarray]:
+    """
+    Circunstancias de un eclipse lunar para muchas ubicaciones a la vez
+
+    Args:
+        eclipse: Eclipse lunar (`lunar_eclipse`)
+        latitude, longitude: Coordenadas en grados (escalares o arrays de n)
+
+    Returns:
+        Dict de arrays de n: moon_altitude (en el máximo), contact_altitudes
+        (n × 6, NaN si no hay ese contacto), visible / umbral_visible /
+        total_visible (Luna sobre el horizonte en algún momento de la fase
+        penumbral, umbral o total), local_type ("total", "partial",
+        "penumbral" o "none"), visible_start y visible_end (ephem.Date del
+        primer y último instante de la malla con la Luna sobre el horizonte
+        durante el eclipse; NaN si no lo está nunca)
+    """
+    latitude = np.atleast_1d(np.asarray(latitude, dtype=float))
+    longitude = np.atleast_1d(np.asarray(longitude, dtype=float))
+    p1, u1, u2, u3, u4, p4 = eclipse.contacts
+    grid = np.arange(p1, p4, VISIBILITY_STEP)
+    has_contact = ~np.isnan(eclipse.contacts)
+    # Una sola evaluación: máximo, contactos existentes y la malla entre P1 y P4
+    times = np.concatenate([[eclipse.greatest], eclipse.contacts[has_contact], grid, [p4]])
+    altitude = _altitudes(times, latitude, longitude)
+    n_contacts = int(has_contact.sum())
+
+    contact_altitudes = np.full((len(latitude), 6), np.nan)
+    contact_altitudes[:, has_contact] = altitude[:, 1:1 + n_contacts]
+    # La malla incluye los contactos: la ventana de cada fase es un tramo de instantes ordenados
+    order = np.argsort(times[1:], kind="stable")
+    window_times = times[1:][order]
+    above = altitude[:, 1:][:, order] > 0
+
+    def phase_visible(start, end):
+        if start != start:
+            return np.zeros(len(latitude), dtype=bool)
+        inside = (window_times >= start) & (window_times <= end)
+        return above[:, inside].any(axis=1)
+
+    visible = above.any(axis=1)
+    umbral_visible = phase_visible(u1, u4)
+    total_visible = phase_visible(u2, u3)
+    local_type = np.where(total_visible, "total",
+                          np.where(umbral_visible, "partial", np.where(visible, "penumbral", "none")))
+    first = np.where(visible, above.argmax(axis=1), 0)
+    last = np.where(visible, above.shape[1] - 1 - above[:, ::-1].argmax(axis=1), 0)
+    return {
+        "moon_altitude": altitude[:, 0],
+        "contact_altitudes": contact_altitudes,
+        "visible": visible,
+        "umbral_visible": umbral_visible,
+        "total_visible": total_visible,
+        "local_type": local_type,
+        "visible_start": np.where(visible, window_times[first], np.nan),
+        "visible_end": np.where(visible, window_times[last], np.nan),
+    }
+
+
+def lunar_location_record(eclipse: LunarEclipse, circumstances: Dict[str, np.ndarray], i: int = 0) -> Dict[str, Any]:
+    """
+    Registro de una ubicación con las mismas claves que el catálogo de eclipses
+
+    Las horas están en UTC; "epochs" lleva inicio, máximo y fin como segundos
+    Unix. start_time y end_time son P1 y P4 (U1 y U4 si hay fase umbral);
+    visible_from y visible_until acotan la parte del eclipse con la Luna sobre
+    el horizonte.
+    """
+    c = {name: values[i] for name, values in circumstances.items()}
+    visible = bool(c["visible"])
+    local_type = str(c["local_type"])
+    p1, u1, u2, u3, u4, p4 = eclipse.contacts.tolist()
+    umbral = u1 == u1
+    coverage = min(max(eclipse.umbral_magnitude, 0.0), 1.0) if c["umbral_visible"] else 0.0
+    contacts = clock_strings(eclipse.contacts)
+    window = clock_strings([c["visible_start"], c["visible_end"]])
+    record = {
+        "visible": visible,
+        "partial": visible and local_type != "total",
+        "coverage": f"{round(coverage * 100)}%",
+        "start_time": contacts[1] if umbral else contacts[0],
+        "max_time": clock_strings(eclipse.greatest)[0],
+        "end_time": contacts[4] if umbral else contacts[5],
+        "magnitude": round(eclipse.umbral_magnitude, 3) if c["umbral_visible"] else 0,
+        "penumbral_magnitude": round(eclipse.penumbral_magnitude, 3) if visible else 0,
+        "moon_altitude": round(float(c["moon_altitude"]), 1),
+        "local_type": local_type,
+        "contacts": {name: {"time": time, "moon_altitude": round(float(altitude), 1)}
+                     for name, time, altitude in zip(CONTACTS, contacts, c["contact_altitudes"].tolist())
+                     if time is not None},
+        "visible_from": window[0],
+        "visible_until": window[1],
+        "time_zone": "UTC",
+        "epochs": {name: None if t != t else float(np.floor((t - EPHEM_UNIX_DAYS) * 86400.0))
+                   for name, t in (("start", u1 if umbral else p1), ("maximum", eclipse.greatest),
+                                   ("end", u4 if umbral else p4))},
+    }
+    if not visible:
+        record["reason"] = "La Luna está bajo el horizonte durante todo el eclipse"
+    return {key: value for key, value in record.items() if value is not None}
+
+
+def lunar_eclipse_near(full_moon: float) -> Optional[LunarEclipse]:
+    """
+    Eclipse lunar de una luna llena, o None si la Luna no toca la penumbra
+
+    Args:
+        full_moon: Instante de la luna llena (ephem.Date)
+    """
+    # Mínimo de la separación: malla de 20 min y parábola por los tres puntos del mínimo
+    step = 1.0 / 72.0
+    times = full_moon + np.arange(-SEARCH_HOURS * 3, SEARCH_HOURS * 3 + 1) * step
+    separations = _shadow_geometry(times)["separation"]
+    i = int(np.clip(np.argmin(separations), 1, len(times) - 2))
+    s0, s1, s2 = separations[i - 1:i + 2]
+    curvature = s0 - 2 * s1 + s2
+    offset = 0.5 * (s0 - s2) / curvature if curvature > 0 else 0.0
+    greatest = float(times[i] + np.clip(offset, -1, 1) * step)
+    geometry = {name: float(value[0]) for name, value in _shadow_geometry(greatest).items()}
+    if geometry["separation"] >= geometry["penumbra"] + geometry["moon_radius"]:
+        return None
+    return LunarEclipse(greatest, geometry)
+
+
+@lru_cache(maxsize=256)
+def lunar_eclipse(date: str, tolerance_days: int = 0) -> Optional[LunarEclipse]:
+    """
+    Eclipse lunar de una fecha (YYYY-MM-DD, UT), o None si no lo hay
+
+    Args:
+        date: Fecha del eclipse
+        tolerance_days: Aceptar un máximo hasta ese número de días de distancia
+            (las fechas del catálogo curado son locales: en América un eclipse
+            de madrugada UT cae el día anterior)
+    """
+    day = ephem.Date(date.replace("-", "/"))
+    full_moons = moon_phases(day - 1.0 - tolerance_days, day + 2.0 + tolerance_days, FULL_MOON)
+    for full_moon in full_moons.tolist():
+        eclipse = lunar_eclipse_near(full_moon)
+        if eclipse is not None and abs(ephem.Date(eclipse.date.replace("-", "/")) - day) <= tolerance_days:
+            return eclipse
+    return None
+
+
+def lunar_circumstances(date: str, latitude: float, longitude: float, elevation: float = 0.0) -> Optional[Dict[str, Any]]:
+    """
+    Datos de visibilidad de un eclipse lunar calculados para unas coordenadas
+
+    La altitud del observador no cambia la altura de la Luna de forma
+    apreciable; se devuelve en "coordinates" como en `besselian.solar_circumstances`.
+
+    Returns:
+        Registro con las claves del catálogo más "coordinates", "source" y
+        "eclipse_date" (fecha UT del máximo), o None si no hay eclipse lunar
+        en esa fecha (con un día de margen)
+    """
+    eclipse = lunar_eclipse(date, tolerance_days=1)
+    if eclipse is None:
+        return None
+    record = lunar_location_record(eclipse, lunar_local_circumstances(eclipse, latitude, longitude))
+    record["coordinates"] = {"latitude": latitude, "longitude": longitude, "elevation": elevation}
+    record["eclipse_date"] = eclipse.date
+    record["source"] = "ephemeris"
+    return record
@@ -7,168 +7,51 @@ Funcionalidad: Cálculo de eclipses solares para ubicaciones específicas
 
 import json
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from typing import Dict, Any, List
 import os
 
 # Dependencias para servidor web
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+from eclipse_batch import visibility_batch
+from best_eclipse import find_best_eclipse
+from eclipse_path import eclipse_path
+from eclipse_queries import DEFAULT_NEXT_LIMIT, eclipse_visibility, next_eclipses
+from eclipse_store import get_store
+from gazetteer import get_gazetteer
+from saros import next_visible_member, saros_fields, series_members
+from visibility_map import visibility_map
+from metrics import Registry, CONTENT_TYPE, DEFAULT_SIZE_BUCKETS
+from response_cache import ResponseCache, dumps, response_key
+from tracing import get_tracer, extract, SPAN_KIND_SERVER
+
+tracer = get_tracer("eclipse-calculator-remote")
+
+# --- Métricas ---
+METRICS = Registry()
+MCP_REQUESTS = METRICS.counter("mcp_requests_total", "Peticiones /mcp por comando", ["command"])
+MCP_ERRORS = METRICS.counter("mcp_errors_total", "Respuestas de error /mcp por comando y tipo", ["command", "error_type"])
+MCP_IN_FLIGHT = METRICS.gauge("mcp_requests_in_flight", "Peticiones /mcp en curso por comando", ["command"])
+MCP_LATENCY = METRICS.histogram("mcp_request_duration_seconds", "Latencia de /mcp por comando", ["command"])
+MCP_REQUEST_SIZE = METRICS.histogram("mcp_request_size_bytes", "Tamaño del cuerpo de la petición /mcp",
+                                     ["command"], buckets=DEFAULT_SIZE_BUCKETS)
+MCP_RESPONSE_SIZE = METRICS.histogram("mcp_response_size_bytes", "Tamaño del cuerpo de la respuesta /mcp",
+                                      ["command"], buckets=DEFAULT_SIZE_BUCKETS)
+MCP_CACHE_HITS = METRICS.counter("mcp_response_cache_hits_total", "Respuestas /mcp servidas desde la caché", ["command"])
+
+# Respuestas /mcp de las consultas estáticas, ya serializadas (sin `timestamp`, que se añade en cada respuesta)
+RESPONSES = ResponseCache()
+
 # --- Base de Datos de Eclipses ---
-ECLIPSES_DATA = {
-    "2025-03-14": {
-        "type": "lunar_total", 
-        "description": "Total Lunar Eclipse",
-        "max_duration": "01:05",
-        "locations": {
-            "Guatemala City": {
-                "visible": True, 
-                "partial": False, 
-                "coverage": "100%", 
-                "start_time": "04:30:00",
-                "max_time": "04:58:00",
-                "end_time": "05:26:00",
-                "magnitude": 1.18,
-                "obscuration": 1.0
-            },
-            "Madrid": {
-                "visible": True, 
-                "partial": True, 
-                "coverage": "60%", 
-                "start_time": "06:00:00",
-                "max_time": "06:30:00",
-                "end_time": "07:00:00",
-                "magnitude": 0.60,
-                "obscuration": 0.42
-            },
-            "Mexico City": {
-                "visible": True, 
-                "partial": False, 
-                "coverage": "95%",
-                "start_time": "03:45:00",
-                "max_time": "04:58:00",
-                "end_time": "06:11:00",
-                "magnitude": 1.15,
-                "obscuration": 0.95
-            }
-        }
-    },
-    "2026-02-17": {
-        "type": "solar_annular", 
-        "description": "Annular Solar Eclipse",
-        "max_duration": "02:20",
-        "locations": {
-            "Guatemala City": {
-                "visible": True, 
-                "partial": True, 
-                "coverage": "35%", 
-                "start_time": "12:45:00",
-                "max_time": "13:30:00",
-                "end_time": "14:15:00",
-                "magnitude": 0.35,
-                "obscuration": 0.22
-            },
-            "Antigua Guatemala": {
-                "visible": True,
-                "partial": True,
-                "coverage": "42%",
-                "start_time": "12:43:00",
-                "max_time": "13:28:00", 
-                "end_time": "14:13:00",
-                "magnitude": 0.42,
-                "obscuration": 0.28
-            }
-        },
-        "path_annularity": [
-            {"lat": 14.6349, "lng": -90.5069, "duration": "01:45"},
-            {"lat": 15.7835, "lng": -88.5976, "duration": "02:15"}
-        ]
-    },
-    "2026-08-12": {
-        "type": "solar_total", 
-        "description": "Total Solar Eclipse",
-        "max_duration": "02:18",
-        "locations": {
-            "Madrid": {
-                "visible": True, 
-                "partial": False, 
-                "coverage": "100%", 
-                "start_time": "18:30:00",
-                "max_time": "19:30:00",
-                "end_time": "20:30:00",
-                "magnitude": 1.05,
-                "obscuration": 1.0
-            },
-            "Barcelona": {
-                "visible": True,
-                "partial": True,
-                "coverage": "85%",
-                "start_time": "18:45:00",
-                "max_time": "19:45:00",
-                "end_time": "20:45:00",
-                "magnitude": 0.85,
-                "obscuration": 0.76
-            }
-        },
-        "path_totality": [
-            {"lat": 40.4168, "lng": -3.7038, "duration": "02:18"},
-            {"lat": 41.3851, "lng": 2.1734, "duration": "01:55"}
-        ]
-    },
-    "2028-07-22": {
-        "type": "solar_total", 
-        "description": "Total Solar Eclipse",
-        "max_duration": "05:09",
-        "locations": {
-            "Sydney": {
-                "visible": True, 
-                "partial": False, 
-                "coverage": "100%", 
-                "start_time": "13:15:00",
-                "max_time": "14:15:00",
-                "end_time": "15:15:00",
-                "magnitude": 1.06,
-                "obscuration": 1.0
-            },
-            "Guatemala City": {
-                "visible": False,
-                "partial": False,
-                "coverage": "0%",
-                "reason": "Eclipse not visible from this location"
-            }
-        }
-    },
-    "2030-06-01": {
-        "type": "solar_annular", 
-        "description": "Annular Solar Eclipse",
-        "max_duration": "05:21",
-        "locations": {
-            "Guatemala City": {
-                "visible": True, 
-                "partial": True, 
-                "coverage": "45%", 
-                "start_time": "11:23:00",
-                "max_time": "12:45:00",
-                "end_time": "14:12:00",
-                "magnitude": 0.45,
-                "obscuration": 0.32
-            },
-            "Quetzaltenango": {
-                "visible": True,
-                "partial": True,
-                "coverage": "48%",
-                "start_time": "11:25:00",
-                "max_time": "12:47:00",
-                "end_time": "14:14:00",
-                "magnitude": 0.48,
-                "obscuration": 0.35
-            }
-        }
-    }
-}
+# Catálogo compartido con los servidores stdio, cargado e indexado una vez por proceso
+ECLIPSES = get_store()
+# Gazetteer offline para resolver nombres de ubicación aproximados a coordenadas
+GAZETTEER = get_gazetteer()
 
 # Modelos Pydantic para validación
 class MCPRequest(BaseModel):
@@ -197,6 +80,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class ResponseSizeMiddleware:
+    """Middleware ASGI que registra el tamaño de las respuestas de /mcp"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/mcp":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                for key, value in message.get("headers", ()):
+                    if key == b"content-length":
+                        # El handler guarda el comando en request.state (scope["state"])
+                        command = scope.get("state", {}).get("mcp_command", "unknown")
+                        MCP_RESPONSE_SIZE.labels(command).observe(int(value))
+                        break
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+app.add_middleware(ResponseSizeMiddleware)
+
 class EclipseCalculatorServer:
     """Servidor MCP remoto para cálculo de eclipses"""
     
@@ -205,27 +113,32 @@ class EclipseCalculatorServer:
         self.version = "2.1.0"
         self.capabilities = {
             "list_eclipses_by_year": "Lista todos los eclipses conocidos para un año dado",
-            "calculate_eclipse_visibility": "Calcula visibilidad de eclipse para fecha y ubicación",
+            "calculate_eclipse_visibility": "Calcula visibilidad de eclipse para fecha y ubicación (nombre o latitude/longitude)",
+            "calculate_eclipse_visibility_batch": "Calcula visibilidad para listas de fechas y ubicaciones en una sola llamada (columnar)",
             "predict_next_eclipse": "Predice próximo eclipse visible desde una ubicación",
-            "get_eclipse_path": "Obtiene información del camino de totalidad/anularidad",
+            "list_saros_series": "Lista los miembros de una serie Saros (por número o por fecha de un eclipse)",
+            "next_saros_member_visible": "Próximo miembro de una serie Saros visible desde una ubicación",
+            "find_best_eclipse": "Mejores eclipses solares a menos de un radio de una ubicación en una ventana de años",
+            "get_eclipse_path": "Calcula la franja de totalidad/anularidad (línea central y límites, simplificada)",
+            "get_visibility_map": "Ráster de oscurecimiento máximo de un eclipse solar para una región",
             "get_safety_advice": "Proporciona consejos de seguridad para observación"
         }
 
     def list_eclipses_by_year(self, year: int) -> Dict[str, Any]:
         """Lista eclipses por año"""
         eclipses_in_year = []
-        for date, data in ECLIPSES_DATA.items():
-            if date.startswith(str(year)):
-                visible_locations = [loc for loc, loc_data in data.get("locations", {}).items() 
-                                   if loc_data.get("visible")]
-                eclipses_in_year.append({
-                    "date": date, 
-                    "type": data.get("type"), 
-                    "description": data.get("description", "N/A"),
-                    "max_duration": data.get("max_duration", "N/A"),
-                    "visible_in": visible_locations,
-                    "total_locations": len(data.get("locations", {}))
-                })
+        for data in ECLIPSES.eclipses_for_year(year):
+            visible_locations = [loc for loc, loc_data in data.get("locations", {}).items() 
+                               if loc_data.get("visible")]
+            eclipses_in_year.append({
+                "date": data["date"], 
+                "type": data.get("type"), 
+                "description": data.get("description", "N/A"),
+                "max_duration": data.get("max_duration", "N/A"),
+                "visible_in": visible_locations,
+                "total_locations": len(data.get("locations", {})),
+                **saros_fields(ECLIPSES, data["date"])
+            })
         
         return {
             "year": year, 
@@ -234,115 +147,73 @@ class EclipseCalculatorServer:
             "status": "success"
         }
 
-    def calculate_eclipse_visibility(self, date: str, location: str) -> Dict[str, Any]:
-        """Calcula visibilidad de eclipse para fecha y ubicación"""
-        eclipse_data = ECLIPSES_DATA.get(date)
-        if not eclipse_data:
-            available_dates = list(ECLIPSES_DATA.keys())
-            return {
-                "error": f"No hay datos de eclipse para la fecha {date}",
-                "available_dates": available_dates,
-                "suggestion": f"Prueba con: {', '.join(available_dates[:3])}"
-            }
-        
-        location_data = eclipse_data["locations"].get(location)
-        if not location_data:
-            available_locations = list(eclipse_data["locations"].keys())
-            return {
-                "error": f"Ubicación '{location}' no disponible para este eclipse",
-                "available_locations": available_locations,
-                "suggestion": f"Prueba con: {', '.join(available_locations)}"
-            }
-        
-        # Calcular duración si está visible
-        duration = "N/A"
-        if location_data.get("visible") and location_data.get("start_time") and location_data.get("end_time"):
-            duration = self._calculate_duration(location_data["start_time"], location_data["end_time"])
-        
-        result = {
-            "date": date,
-            "location": location,
-            "eclipse_type": eclipse_data["type"],
-            "description": eclipse_data.get("description", ""),
-            "visible": location_data.get("visible", False),
-            "partial": location_data.get("partial", False),
-            "coverage": location_data.get("coverage", "0%"),
-            "magnitude": location_data.get("magnitude", 0),
-            "obscuration": location_data.get("obscuration", 0),
-            "times": {
-                "start": location_data.get("start_time", "N/A"),
-                "maximum": location_data.get("max_time", "N/A"),
-                "end": location_data.get("end_time", "N/A")
-            },
-            "duration_at_location": duration,
-            "max_duration_global": eclipse_data.get("max_duration", "N/A"),
-            "safety_advice": self._get_safety_advice(eclipse_data["type"]),
-            "status": "success"
-        }
-        
-        if not location_data.get("visible"):
-            result["reason"] = location_data.get("reason", "Eclipse no visible desde esta ubicación")
-        
+    def calculate_eclipse_visibility(self, date: str, location: str = None, latitude: float = None,
+                                     longitude: float = None, elevation: float = 0.0) -> Dict[str, Any]:
+        """Calcula visibilidad de eclipse para fecha y ubicación (nombre del catálogo o coordenadas)"""
+        result = eclipse_visibility(ECLIPSES, GAZETTEER, date, location, latitude, longitude, elevation)
+        if "error" not in result:
+            result.update(safety_advice=self._get_safety_advice(result["eclipse_type"]), status="success")
         return result
 
-    def predict_next_eclipse(self, location: str, after_date: str = None) -> Dict[str, Any]:
+    def calculate_eclipse_visibility_batch(self, dates: List[str], locations: List[Any]) -> Dict[str, Any]:
+        """Calcula visibilidad para el producto fechas × ubicaciones (respuesta columnar)"""
+        result = visibility_batch(dates, locations, ECLIPSES, GAZETTEER)
+        if "error" not in result:
+            result["status"] = "success"
+        return result
+
+    def predict_next_eclipse(self, location: str, after_date: str = None, before_date: str = None,
+                             limit: int = DEFAULT_NEXT_LIMIT) -> Dict[str, Any]:
         """Predice próximo eclipse visible desde una ubicación"""
-        if not after_date:
-            after_date = datetime.now().strftime("%Y-%m-%d")
-        
-        future_eclipses = []
-        for date, eclipse_data in ECLIPSES_DATA.items():
-            if date > after_date:
-                if location in eclipse_data["locations"] and eclipse_data["locations"][location].get("visible"):
-                    location_data = eclipse_data["locations"][location]
-                    future_eclipses.append({
-                        "date": date,
-                        "type": eclipse_data.get("type"),
-                        "description": eclipse_data.get("description", "N/A"),
-                        "coverage": location_data.get("coverage", "0%"),
-                        "magnitude": location_data.get("magnitude", 0),
-                        "max_time": location_data.get("max_time", "N/A"),
-                        "years_from_now": round((datetime.strptime(date, "%Y-%m-%d") - datetime.now()).days / 365.25, 1)
-                    })
-        
-        if not future_eclipses:
-            # Buscar ubicaciones disponibles
-            available_locations = set()
-            for eclipse_data in ECLIPSES_DATA.values():
-                available_locations.update(eclipse_data.get("locations", {}).keys())
-            
-            return {
-                "error": f"No se encontraron eclipses futuros para {location}",
-                "available_locations": list(available_locations),
-                "suggestion": "Prueba con Guatemala City, Madrid o Mexico City"
-            }
-        
-        future_eclipses.sort(key=lambda x: x["date"])
-        next_eclipse = future_eclipses[0]
-        
-        return {
-            "location": location,
-            "next_eclipse": next_eclipse,
-            "years_to_wait": next_eclipse["years_from_now"],
-            "total_future_eclipses": len(future_eclipses),
-            "all_future_eclipses": future_eclipses[:5],  # Máximo 5 para no sobrecargar
-            "status": "success"
-        }
+        result = next_eclipses(ECLIPSES, GAZETTEER, location, after_date, before_date, limit)
+        if "error" not in result:
+            # Contrato de /mcp: cada eclipse lleva `years_from_now` (los servidores stdio usan `years_to_wait`)
+            for eclipse in result["all_future_eclipses"]:
+                eclipse["years_from_now"] = eclipse.pop("years_to_wait")
+            result["status"] = "success"
+        return result
+
+    def list_saros_series(self, saros: int = None, date: str = None, kind: str = "solar") -> Dict[str, Any]:
+        """Lista los miembros de una serie Saros presentes en el catálogo"""
+        result = series_members(ECLIPSES, saros, date, kind)
+        if "error" not in result:
+            result["status"] = "success"
+        return result
+
+    def next_saros_member_visible(self, location: Any, saros: int = None, date: str = None, kind: str = "solar",
+                                  after_date: str = None) -> Dict[str, Any]:
+        """Próximo miembro de una serie Saros visible desde una ubicación (saltos de serie en tiempo constante)"""
+        result = next_visible_member(ECLIPSES, GAZETTEER, location, saros, date, kind, after_date)
+        if "error" not in result:
+            result["status"] = "success"
+        return result
+
+    def find_best_eclipse(self, location: Any, radius_km: float = 500.0, years: float = 10.0,
+                          after_date: str = None, eclipse_type: str = "any", limit: int = 5) -> Dict[str, Any]:
+        """Mejores eclipses solares alcanzables a menos de un radio (índice espacial de franjas y ubicaciones)"""
+        result = find_best_eclipse(ECLIPSES, GAZETTEER, location, radius_km, years, after_date, eclipse_type, limit)
+        if "error" not in result:
+            result["status"] = "success"
+        return result
 
-    def get_eclipse_path(self, date: str) -> Dict[str, Any]:
-        """Obtiene información del camino de totalidad/anularidad"""
-        eclipse_data = ECLIPSES_DATA.get(date)
+    def get_eclipse_path(self, date: str, resolution_km: float = 1.0, tolerance_km: float = 1.0,
+                         encoding: str = "points") -> Dict[str, Any]:
+        """Obtiene el camino de totalidad/anularidad: puntos curados y franja calculada con elementos besselianos"""
+        eclipse_data = ECLIPSES.get(date)
         if not eclipse_data:
             return {
                 "error": f"No hay datos de eclipse para {date}",
-                "available_dates": list(ECLIPSES_DATA.keys())
+                "available_dates": ECLIPSES.nearest(date)
             }
         
         eclipse_type = eclipse_data.get("type", "")
+        if encoding not in ("points", "polyline"):
+            return {"error": "encoding debe ser 'points' o 'polyline'"}
+        
         path_key = "path_totality" if "total" in eclipse_type else "path_annularity"
         path_data = eclipse_data.get(path_key, [])
         
-        return {
+        result = {
             "date": date,
             "eclipse_type": eclipse_type,
             "description": eclipse_data.get("description", ""),
@@ -353,6 +224,30 @@ class EclipseCalculatorServer:
             "visible_locations": list(eclipse_data.get("locations", {}).keys()),
             "status": "success"
         }
+        if eclipse_type.startswith("solar"):
+            path = eclipse_path(date, resolution_km, tolerance_km, encoding)
+            if "error" in path:
+                result["path_note"] = path["error"]
+            else:
+                path.pop("date")
+                result["path"] = path
+        return result
+
+    def get_visibility_map(self, date: str, resolution: float = 1.0, lat_min: float = -90.0, lat_max: float = 90.0,
+                           lon_min: float = -180.0, lon_max: float = 180.0, include_raster: bool = True) -> Dict[str, Any]:
+        """Ráster de oscurecimiento máximo (teselas en caché memmap, calculadas en paralelo)"""
+        eclipse_data = ECLIPSES.get(date)
+        if not eclipse_data:
+            return {
+                "error": f"No hay datos de eclipse para {date}",
+                "available_dates": ECLIPSES.nearest(date)
+            }
+        if not eclipse_data["type"].startswith("solar"):
+            return {"error": "El mapa de visibilidad sólo está disponible para eclipses solares"}
+        result = visibility_map(date, resolution, lat_min, lat_max, lon_min, lon_max, include_raster)
+        if "error" not in result:
+            result.update(eclipse_type=eclipse_data["type"], status="success")
+        return result
 
     def get_safety_advice(self, eclipse_type: str = "solar") -> Dict[str, Any]:
         """Proporciona consejos de seguridad para observación de eclipses"""
@@ -370,27 +265,6 @@ class EclipseCalculatorServer:
             "status": "success"
         }
 
-    def _calculate_duration(self, start_time: str, end_time: str) -> str:
-        """Calcula duración del eclipse en la ubicación"""
-        if not start_time or not end_time:
-            return "N/A"
-        
-        try:
-            start = datetime.strptime(start_time, "%H:%M:%S")
-            end = datetime.strptime(end_time, "%H:%M:%S")
-            
-            # Manejar casos donde el eclipse cruza medianoche
-            if end < start:
-                end = end + timedelta(days=1)
-            
-            duration = end - start
-            hours = duration.seconds // 3600
-            minutes = (duration.seconds % 3600) // 60
-            
-            return f"{hours:02d}:{minutes:02d}"
-        except:
-            return "N/A"
-    
     def _get_safety_advice(self, eclipse_type: str) -> List[str]:
         """Obtener consejos de seguridad para observación"""
         base_advice = [
@@ -428,8 +302,8 @@ async def root():
         "version": eclipse_server.version,
         "description": "Servidor MCP remoto para cálculos de eclipses solares y lunares",
         "capabilities": eclipse_server.capabilities,
-        "total_eclipses": len(ECLIPSES_DATA),
-        "available_years": sorted(list(set(date[:4] for date in ECLIPSES_DATA.keys()))),
+        "total_eclipses": len(ECLIPSES),
+        "available_years": [str(year) for year in ECLIPSES.years],
         "status": "online",
         "timestamp": datetime.now().isoformat()
     }
@@ -442,12 +316,57 @@ async def health_check():
         "timestamp": datetime.now().isoformat(),
         "server": eclipse_server.name,
         "version": eclipse_server.version,
-        "eclipses_loaded": len(ECLIPSES_DATA)
+        "eclipses_loaded": len(ECLIPSES)
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Endpoint de métricas en formato de texto de Prometheus"""
+    return Response(content=METRICS.render(), media_type=CONTENT_TYPE)
+
 @app.post("/mcp", response_model=MCPResponse)
-async def handle_mcp_request(request: MCPRequest):
+async def handle_mcp_request(request: MCPRequest, http_request: Request):
     """Endpoint principal para manejar peticiones MCP"""
+    command = request.command.lower()
+    # Comandos desconocidos comparten etiqueta para acotar la cardinalidad de las métricas
+    label = command if command in eclipse_server.capabilities or command == "status" else "unknown"
+    http_request.state.mcp_command = label
+    content_length = http_request.headers.get("content-length")
+    if content_length:
+        MCP_REQUEST_SIZE.labels(label).observe(int(content_length))
+
+    in_flight = MCP_IN_FLIGHT.labels(label)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        # Continuar la traza del cliente a partir de la cabecera `traceparent`
+        parent = extract(http_request.headers)
+        with tracer.start_span(f"mcp {command}", kind=SPAN_KIND_SERVER, parent=parent,
+                               attributes={"mcp.tool": command}) as span:
+            key = response_key(command, request.params)
+            cached = RESPONSES.get(key)
+            span.set_attribute("mcp.response_cache", "hit" if cached is not None else "miss" if key else "off")
+            if cached is not None:
+                MCP_CACHE_HITS.labels(label).inc()
+                return _json_response(cached)
+            response = await dispatch_mcp_request(request)
+            if response.status == "error":
+                span.set_error(response.message)
+                MCP_ERRORS.labels(label, response.data.get("error_type", "tool_error")).inc()
+                return _json_response(dumps(response.model_dump(exclude={"timestamp"})))
+            return _json_response(RESPONSES.store(key, response.model_dump(exclude={"timestamp"})))
+    finally:
+        in_flight.dec()
+        MCP_REQUESTS.labels(label).inc()
+        MCP_LATENCY.labels(label).observe(time.perf_counter() - started)
+
+def _json_response(body: str) -> Response:
+    """Respuesta /mcp a partir de su JSON compacto sin `timestamp` (se añade el de ahora)"""
+    body = f'{body[:-1]},"timestamp":{dumps(datetime.now().isoformat())}}}'
+    return Response(content=body, media_type="application/json")
+
+async def dispatch_mcp_request(request: MCPRequest) -> MCPResponse:
+    """Despacha el comando MCP a la herramienta correspondiente"""
     try:
         command = request.command.lower()
         params = request.params
@@ -460,8 +379,8 @@ async def handle_mcp_request(request: MCPRequest):
                     "server_name": eclipse_server.name,
                     "version": eclipse_server.version,
                     "capabilities": list(eclipse_server.capabilities.keys()),
-                    "total_eclipses": len(ECLIPSES_DATA),
-                    "available_locations": list(set().union(*[d.get("locations", {}).keys() for d in ECLIPSES_DATA.values()]))
+                    "total_eclipses": len(ECLIPSES),
+                    "available_locations": ECLIPSES.locations
                 },
                 timestamp=datetime.now().isoformat()
             )
@@ -480,16 +399,23 @@ async def handle_mcp_request(request: MCPRequest):
         elif command == "calculate_eclipse_visibility":
             date = params.get("date")
             location = params.get("location")
+            latitude, longitude = params.get("latitude"), params.get("longitude")
+            has_coordinates = latitude is not None and longitude is not None
             
-            if not date or not location:
+            if not date or not (location or has_coordinates):
                 return MCPResponse(
                     status="error",
-                    message="Se requieren los parámetros 'date' y 'location'",
-                    data={"example": {"date": "2026-02-17", "location": "Guatemala City"}},
+                    message="Se requieren 'date' y 'location' (o 'latitude' y 'longitude')",
+                    data={"error_type": "invalid_params", "example": {"date": "2026-02-17", "location": "Guatemala City"}},
                     timestamp=datetime.now().isoformat()
                 )
             
-            result = eclipse_server.calculate_eclipse_visibility(date, location)
+            result = eclipse_server.calculate_eclipse_visibility(
+                date, location,
+                float(latitude) if has_coordinates else None,
+                float(longitude) if has_coordinates else None,
+                float(params.get("elevation") or 0.0)
+            )
             
             if "error" in result:
                 return MCPResponse(
@@ -506,19 +432,51 @@ async def handle_mcp_request(request: MCPRequest):
                 timestamp=datetime.now().isoformat()
             )
         
+        elif command == "calculate_eclipse_visibility_batch":
+            dates = params.get("dates")
+            locations = params.get("locations")
+            
+            if not isinstance(dates, list) or not isinstance(locations, list):
+                return MCPResponse(
+                    status="error",
+                    message="Se requieren las listas 'dates' y 'locations'",
+                    data={"error_type": "invalid_params",
+                          "example": {"dates": ["2026-08-12"], "locations": ["Madrid", {"latitude": 43.36, "longitude": -8.41}]}},
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            result = eclipse_server.calculate_eclipse_visibility_batch(dates, locations)
+            
+            if "error" in result:
+                return MCPResponse(
+                    status="error",
+                    message=result["error"],
+                    data=result,
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            return MCPResponse(
+                status="success",
+                message=f"Visibilidad calculada para {result['rows']} combinaciones fecha × ubicación",
+                data=result,
+                timestamp=datetime.now().isoformat()
+            )
+        
         elif command == "predict_next_eclipse":
             location = params.get("location")
             after_date = params.get("after_date")
+            before_date = params.get("before_date")
+            limit = int(params.get("limit") or DEFAULT_NEXT_LIMIT)
             
             if not location:
                 return MCPResponse(
                     status="error",
                     message="Se requiere el parámetro 'location'",
-                    data={"example": {"location": "Guatemala City"}},
+                    data={"error_type": "invalid_params", "example": {"location": "Guatemala City"}},
                     timestamp=datetime.now().isoformat()
                 )
             
-            result = eclipse_server.predict_next_eclipse(location, after_date)
+            result = eclipse_server.predict_next_eclipse(location, after_date, before_date, limit)
             
             if "error" in result:
                 return MCPResponse(
@@ -535,6 +493,108 @@ async def handle_mcp_request(request: MCPRequest):
                 timestamp=datetime.now().isoformat()
             )
         
+        elif command == "list_saros_series":
+            saros = params.get("saros")
+            date = params.get("date")
+            
+            if saros is None and not date:
+                return MCPResponse(
+                    status="error",
+                    message="Se requiere 'saros' (con 'kind') o 'date'",
+                    data={"error_type": "invalid_params", "example": {"saros": 139, "kind": "solar"}},
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            result = eclipse_server.list_saros_series(int(saros) if saros is not None else None, date,
+                                                      params.get("kind") or "solar")
+            
+            if "error" in result:
+                return MCPResponse(
+                    status="error",
+                    message=result["error"],
+                    data=result,
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            return MCPResponse(
+                status="success",
+                message=f"Serie Saros {result['kind']} {result['saros']}: {result['total_members']} eclipses en el catálogo",
+                data=result,
+                timestamp=datetime.now().isoformat()
+            )
+        
+        elif command == "next_saros_member_visible":
+            saros = params.get("saros")
+            date = params.get("date")
+            location = params.get("location")
+            latitude, longitude = params.get("latitude"), params.get("longitude")
+            if latitude is not None and longitude is not None:
+                location = {"name": location, "latitude": float(latitude), "longitude": float(longitude),
+                            "elevation": float(params.get("elevation") or 0.0)}
+            
+            if not location or (saros is None and not date):
+                return MCPResponse(
+                    status="error",
+                    message="Se requieren 'location' (o 'latitude' y 'longitude') y 'saros' o 'date'",
+                    data={"error_type": "invalid_params", "example": {"date": "2024-04-08", "location": "Madrid"}},
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            result = eclipse_server.next_saros_member_visible(location, int(saros) if saros is not None else None,
+                                                              date, params.get("kind") or "solar",
+                                                              params.get("after_date"))
+            
+            if "error" in result:
+                return MCPResponse(
+                    status="error",
+                    message=result["error"],
+                    data=result,
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            return MCPResponse(
+                status="success",
+                message=f"Próximo eclipse de la serie Saros {result['saros']} visible desde {result['location']}: "
+                        f"{result['next_visible']['date']}",
+                data=result,
+                timestamp=datetime.now().isoformat()
+            )
+        
+        elif command == "find_best_eclipse":
+            location = params.get("location")
+            latitude, longitude = params.get("latitude"), params.get("longitude")
+            if latitude is not None and longitude is not None:
+                location = {"name": location, "latitude": float(latitude), "longitude": float(longitude),
+                            "elevation": float(params.get("elevation") or 0.0)}
+            
+            if not location:
+                return MCPResponse(
+                    status="error",
+                    message="Se requiere 'location' (o 'latitude' y 'longitude')",
+                    data={"error_type": "invalid_params", "example": {"location": "Madrid", "radius_km": 500, "years": 10}},
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            result = eclipse_server.find_best_eclipse(location, float(params.get("radius_km") or 500.0),
+                                                      float(params.get("years") or 10.0), params.get("after_date"),
+                                                      params.get("eclipse_type") or "any", int(params.get("limit") or 5))
+            
+            if "error" in result:
+                return MCPResponse(
+                    status="error",
+                    message=result["error"],
+                    data=result,
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            return MCPResponse(
+                status="success",
+                message=f"{result['candidates']} eclipses alcanzables a menos de {result['radius_km']:.0f} km de "
+                        f"{result['location']} entre {result['window'][0]} y {result['window'][1]}",
+                data=result,
+                timestamp=datetime.now().isoformat()
+            )
+        
         elif command == "get_eclipse_path":
             date = params.get("date")
             
@@ -542,11 +602,13 @@ async def handle_mcp_request(request: MCPRequest):
                 return MCPResponse(
                     status="error",
                     message="Se requiere el parámetro 'date'",
-                    data={"example": {"date": "2026-08-12"}},
+                    data={"error_type": "invalid_params", "example": {"date": "2026-08-12"}},
                     timestamp=datetime.now().isoformat()
                 )
             
-            result = eclipse_server.get_eclipse_path(date)
+            result = eclipse_server.get_eclipse_path(date, float(params.get("resolution_km") or 1.0),
+                                                     float(params.get("tolerance_km", 1.0)),
+                                                     params.get("encoding") or "points")
             
             if "error" in result:
                 return MCPResponse(
@@ -563,6 +625,40 @@ async def handle_mcp_request(request: MCPRequest):
                 timestamp=datetime.now().isoformat()
             )
         
+        elif command == "get_visibility_map":
+            date = params.get("date")
+            
+            if not date:
+                return MCPResponse(
+                    status="error",
+                    message="Se requiere el parámetro 'date'",
+                    data={"error_type": "invalid_params",
+                          "example": {"date": "2026-08-12", "resolution": 0.5, "lat_min": 35, "lat_max": 45, "lon_min": -10, "lon_max": 5}},
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            result = eclipse_server.get_visibility_map(
+                date, float(params.get("resolution") or 1.0),
+                float(params.get("lat_min", -90.0)), float(params.get("lat_max", 90.0)),
+                float(params.get("lon_min", -180.0)), float(params.get("lon_max", 180.0)),
+                bool(params.get("include_raster", True))
+            )
+            
+            if "error" in result:
+                return MCPResponse(
+                    status="error",
+                    message=result["error"],
+                    data=result,
+                    timestamp=datetime.now().isoformat()
+                )
+            
+            return MCPResponse(
+                status="success",
+                message=f"Mapa de visibilidad del eclipse del {date} ({result['shape'][0]}x{result['shape'][1]} celdas)",
+                data=result,
+                timestamp=datetime.now().isoformat()
+            )
+        
         elif command == "get_safety_advice":
             eclipse_type = params.get("eclipse_type", "solar")
             result = eclipse_server.get_safety_advice(eclipse_type)
@@ -580,12 +676,18 @@ async def handle_mcp_request(request: MCPRequest):
                 status="error",
                 message=f"Comando '{command}' no reconocido",
                 data={
+                    "error_type": "unknown_command",
                     "available_commands": available_commands,
                     "example_usage": {
                         "list_eclipses_by_year": {"year": 2026},
                         "calculate_eclipse_visibility": {"date": "2026-02-17", "location": "Guatemala City"},
-                        "predict_next_eclipse": {"location": "Guatemala City"},
-                        "get_eclipse_path": {"date": "2026-08-12"},
+                        "calculate_eclipse_visibility_batch": {"dates": ["2026-08-12"], "locations": ["Madrid", "Bilbao"]},
+                        "predict_next_eclipse": {"location": "Guatemala City", "after_date": "2026-01-01", "limit": 3},
+                        "list_saros_series": {"saros": 139, "kind": "solar"},
+                        "next_saros_member_visible": {"date": "2024-04-08", "location": "Madrid"},
+                        "find_best_eclipse": {"location": "Madrid", "radius_km": 500, "years": 10},
+                        "get_eclipse_path": {"date": "2026-08-12", "tolerance_km": 2, "encoding": "polyline"},
+                        "get_visibility_map": {"date": "2026-08-12", "resolution": 0.5, "lat_min": 35, "lat_max": 45, "lon_min": -10, "lon_max": 5},
                         "get_safety_advice": {"eclipse_type": "solar"}
                     }
                 },
@@ -596,7 +698,7 @@ async def handle_mcp_request(request: MCPRequest):
         return MCPResponse(
             status="error",
             message=f"Error interno del servidor: {str(e)}",
-            data={},
+            data={"error_type": type(e).__name__},
             timestamp=datetime.now().isoformat()
         )
 
@@ -609,8 +711,9 @@ if __name__ == "__main__":
     print(f"📡 Endpoints disponibles:")
     print(f"   GET  / - Información del servidor")
     print(f"   GET  /health - Health check")
+    print(f"   GET  /metrics - Métricas Prometheus")
     print(f"   POST /mcp - Endpoint MCP principal")
-    print(f"🌍 Eclipses disponibles: {len(ECLIPSES_DATA)} eventos")
+    print(f"🌍 Eclipses disponibles: {len(ECLIPSES)} eventos")
     print(f"🚀 Listo para desplegar en la nube!")
     
     uvicorn.run(
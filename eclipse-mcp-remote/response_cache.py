@@ -0,0 +1,124 @@
+# eclipse-mcp-remote/response_cache.py
+"""
+Respuestas serializadas memoizadas para las consultas estáticas de los servidores MCP
+
+Las herramientas de consulta del catálogo (año, fecha, fecha × ubicación,
+serie Saros, franja, mapa) devuelven siempre lo mismo para los mismos
+argumentos: el catálogo y los cálculos no cambian durante la vida del
+proceso. Su respuesta se serializa una sola vez, en JSON compacto (sin
+sangría ni espacios), y las llamadas repetidas son una búsqueda en un dict.
+
+Las que dependen de "hoy" (predict_next_eclipse, next_saros_member_visible,
+find_best_eclipse) sólo se memoizan cuando traen `after_date`. Los
+resultados con "error" no se guardan. La caché es LRU con un presupuesto de
+bytes (`ECLIPSE_RESPONSE_CACHE_MB`, 32 por defecto) y no guarda respuestas
+de más de una octava parte del presupuesto (mapas con ráster grandes).
+
+El SDK de MCP valida los argumentos contra el inputSchema en cada llamada y
+vuelve a comprobar el propio esquema cada vez (varios ms, más que la consulta
+memoizada). Los servidores registran el handler sin esa validación y validan
+sólo al calcular, con `InputValidators` compilados una vez: la clave lleva
+los argumentos tal cual llegan (también los null explícitos), así que una clave
+ya en la caché tiene los mismos argumentos que una llamada que ya pasó la
+validación.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+import jsonschema
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("ECLIPSE_RESPONSE_CACHE_MB", "32")) * 1024 * 1024)
+STATIC_TOOLS = frozenset({
+    "list_eclipses_by_year", "calculate_eclipse_visibility", "list_saros_series", "get_eclipse_path",
+    "get_visibility_map", "get_safety_advice",
+})
+DATED_TOOLS = frozenset({"predict_next_eclipse", "next_saros_member_visible", "find_best_eclipse"})
+
+
+def dumps(result: Any) -> str:
+    """JSON compacto: sin sangría ni espacios tras los separadores, UTF-8 sin escapar"""
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+
+
+def response_key(name: str, arguments: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Clave de una llamada (herramienta y argumentos canónicos), o None si no es estática
+
+    No se descartan los argumentos null: {"limit": null} puede no pasar la
+    validación, y su clave no debe coincidir con la de una llamada sin `limit`.
+    """
+    arguments = arguments or {}
+    if name not in STATIC_TOOLS and not (name in DATED_TOOLS and arguments.get("after_date")):
+        return None
+    if name == "list_eclipses_by_year" and arguments.get("year") is None:
+        return None  # El servidor remoto usa el año en curso
+    return name + json.dumps(arguments, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+class ResponseCache:
+    """Respuestas ya serializadas por clave de llamada, LRU con presupuesto de bytes"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Tamaño total máximo de las respuestas guardadas (caracteres UTF-8 ≈ bytes)
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """Respuesta guardada de una clave (None si no es estática o aún no se ha calculado)"""
+        if key is None:
+            return None
+        text = self._entries.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def store(self, key: Optional[str], result: Dict[str, Any]) -> str:
+        """Serializar un resultado y guardarlo si la llamada es estática y no es un error"""
+        text = dumps(result)
+        if key is None or "error" in result or len(text) > self.max_bytes // 8:
+            return text
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = text
+        self.size += len(text)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        return text
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+class InputValidators:
+    """Validadores de los inputSchema de las herramientas, compilados una sola vez"""
+
+    def __init__(self, tools: Iterable[Any]):
+        """
+        Args:
+            tools: Definiciones de herramienta (types.Tool) con name e inputSchema
+        """
+        self._validators = {tool.name: jsonschema.validators.validator_for(tool.inputSchema)(tool.inputSchema)
+                            for tool in tools}
+
+    def error(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Mensaje de error como el del SDK ("Input validation error: ..."), o None si los argumentos son válidos"""
+        validator = self._validators.get(name)
+        error = jsonschema.exceptions.best_match(validator.iter_errors(arguments)) if validator else None
+        return f"Input validation error: {error.message}" if error else None
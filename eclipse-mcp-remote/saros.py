@@ -0,0 +1,179 @@
+# eclipse-mcp-remote/saros.py
+"""
+Series Saros: miembros de una serie y próximo miembro visible desde un lugar
+
+Las series salen del índice Saros–Inex de `EclipseStore`: los miembros de una
+serie están separados por 223 lunaciones (~18 años y 11 días) y se recorren
+saltando de uno al siguiente con `series_neighbor`, una consulta a diccionario
+por paso, en lugar de examinar todos los eclipses posteriores a una fecha.
+
+La visibilidad de los eclipses solares usa los datos curados de la ubicación
+si los hay y, si no, los elementos besselianos. La de los lunares se calcula
+con los contactos y la altura de la Luna durante el eclipse
+(`lunar.lunar_circumstances`).
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from besselian import solar_circumstances
+from eclipse_batch import LocationInput, resolve_location
+from eclipse_store import EclipseStore
+from gazetteer import Gazetteer
+from lunar import lunar_circumstances
+from timezones import local_iso, record_epochs, timezone_at
+
+SAROS_INTERVAL = "223 lunaciones (~18 años y 11 días)"
+
+
+def _member(eclipse: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumen de un miembro de la serie"""
+    member = {
+        "date": eclipse["date"],
+        "type": eclipse["type"],
+        "inex": eclipse["inex"],
+        "greatest_time": eclipse["greatest_eclipse"]["time"],
+        "gamma": eclipse.get("gamma"),
+    }
+    if eclipse["type"].startswith("lunar"):
+        member["umbral_magnitude"] = eclipse.get("umbral_magnitude")
+    else:
+        member["magnitude"] = eclipse.get("magnitude")
+        if "max_duration" in eclipse:
+            member["max_duration"] = eclipse["max_duration"]
+    return member
+
+
+def saros_fields(store: EclipseStore, date: str) -> Dict[str, Any]:
+    """Serie de un eclipse para añadir a otras respuestas: saros, inex y el siguiente miembro ({} si no hay)"""
+    eclipse = store.get(date)
+    if not eclipse or "saros" not in eclipse:
+        return {}
+    return {"saros": eclipse["saros"], "inex": eclipse["inex"], "next_in_saros": store.series_neighbor(date, 1)}
+
+
+def _series(store: EclipseStore, saros: Optional[int], date: Optional[str], kind: str):
+    """(clase, número Saros) de una fecha o de un número explícito; (None, error) si no hay serie"""
+    if date:
+        eclipse = store.get(date)
+        if not eclipse:
+            return None, f"No hay datos de eclipse para {date}"
+        if "saros" not in eclipse:
+            return None, f"El eclipse del {date} no tiene número Saros (sin instante del máximo)"
+        return (eclipse["type"].split("_")[0], eclipse["saros"]), None
+    if saros is None:
+        return None, "Se requiere 'saros' o 'date'"
+    if kind not in ("solar", "lunar"):
+        return None, "El tipo de serie debe ser 'solar' o 'lunar'"
+    if not store.saros_series(kind, saros):
+        return None, f"No hay eclipses de la serie Saros {kind} {saros} en el catálogo"
+    return (kind, int(saros)), None
+
+
+def series_members(store: EclipseStore, saros: int = None, date: str = None, kind: str = "solar") -> Dict[str, Any]:
+    """
+    Miembros de una serie Saros presentes en el catálogo
+
+    Args:
+        store: Catálogo de eclipses
+        saros: Número de la serie (con `kind`)
+        date: Alternativa a `saros`: fecha de un eclipse de la serie
+        kind: "solar" o "lunar" (se ignora con `date`)
+
+    Returns:
+        Dict con kind, saros, members (ordenados), total_members y, con `date`,
+        la posición del eclipse y sus miembros anterior y siguiente
+    """
+    series, error = _series(store, saros, date, kind)
+    if error:
+        return {"error": error}
+    kind, saros = series
+    dates = store.saros_series(kind, saros)
+    result = {
+        "kind": kind,
+        "saros": saros,
+        "interval": SAROS_INTERVAL,
+        "members": [_member(store.get(d)) for d in dates],
+        "total_members": len(dates),
+        "catalog_span": [dates[0], dates[-1]],
+    }
+    if date:
+        # Los miembros consecutivos difieren en un Inex: la posición sale de la diferencia
+        result["reference"] = {
+            "date": date,
+            "position": store.get(date)["inex"] - store.get(dates[0])["inex"] + 1,
+            "previous": store.series_neighbor(date, -1),
+            "next": store.series_neighbor(date, 1),
+        }
+    return result
+
+
+def _visibility(eclipse: Dict[str, Any], location) -> Dict[str, Any]:
+    """Visibilidad de un eclipse desde una ubicación resuelta (`eclipse_batch.resolve_location`)"""
+    lunar = eclipse["type"].startswith("lunar")
+    curated = eclipse["locations"].get(location.catalog_name) if location.catalog_name else None
+    zone = timezone_at(location.latitude, location.longitude) if location.latitude is not None else "UTC"
+    if curated and not (lunar and location.latitude is not None):
+        # Las horas curadas son de reloj local: se pasan a UTC como las calculadas
+        epoch = record_epochs(eclipse["date"], curated, zone)["maximum"]
+        return {"visible": curated.get("visible", False), "coverage": curated.get("coverage"),
+                "max_time": local_iso(epoch, "UTC"), "local_max_time": local_iso(epoch, zone), "source": "catalog"}
+    if location.latitude is None:
+        return {"visible": False, "reason": "Ubicación sin coordenadas ni datos en este eclipse"}
+    if lunar:
+        record = lunar_circumstances(eclipse["date"], location.latitude, location.longitude, location.elevation)
+    else:
+        record = solar_circumstances(eclipse["date"], location.latitude, location.longitude, location.elevation)
+    if not record:
+        return {"visible": False, "reason": "No se pudieron calcular las circunstancias del eclipse"}
+    visibility = {key: record[key] for key in ("visible", "local_type", "coverage", "magnitude",
+                                               "sun_altitude", "moon_altitude", "visible_from", "visible_until",
+                                               "source", "reason") if key in record}
+    visibility["max_time"] = local_iso(record["epochs"]["maximum"], "UTC")
+    visibility["local_max_time"] = local_iso(record["epochs"]["maximum"], zone)
+    return visibility
+
+
+def next_visible_member(store: EclipseStore, gazetteer: Gazetteer, location: LocationInput, saros: int = None,
+                        date: str = None, kind: str = "solar", after_date: str = None) -> Dict[str, Any]:
+    """
+    Primer miembro de una serie Saros posterior a una fecha que es visible desde un lugar
+
+    Args:
+        store, gazetteer: Catálogo de eclipses y gazetteer para resolver el lugar
+        location: Nombre del lugar o dict con latitude/longitude (y name, elevation)
+        saros, date, kind: Serie, como en `series_members`
+        after_date: Fecha YYYY-MM-DD (exclusiva, por defecto hoy)
+
+    Returns:
+        Dict con location, kind, saros, next_visible (miembro con su
+        visibilidad) y skipped (miembros anteriores no visibles y el motivo)
+    """
+    series, error = _series(store, saros, date, kind)
+    if error:
+        return {"error": error}
+    resolved, error = resolve_location(location, store, gazetteer)
+    if error:
+        return {"error": error, "suggestions": gazetteer.suggestions(location) if isinstance(location, str) else []}
+    kind, saros = series
+    after_date = after_date or datetime.now().strftime("%Y-%m-%d")
+
+    dates = store.saros_series(kind, saros)
+    i = bisect_right(dates, after_date)
+    current = dates[i] if i < len(dates) else None
+    skipped = []
+    while current:
+        eclipse = store.get(current)
+        visibility = _visibility(eclipse, resolved)
+        if visibility["visible"]:
+            result = {"location": resolved.label, "kind": kind, "saros": saros,
+                      "next_visible": {**_member(eclipse), **visibility}, "skipped": skipped}
+            if resolved.resolved:
+                result["resolved_location"] = resolved.resolved
+            return result
+        skipped.append({"date": current, **{k: v for k, v in visibility.items() if k != "visible"}})
+        current = store.series_neighbor(current, 1)
+    return {"error": f"Ningún miembro de la serie Saros {kind} {saros} posterior a {after_date} es visible "
+                     f"desde {resolved.label} en el catálogo ({dates[0][:4]}–{dates[-1][:4]})",
+            "skipped": skipped}
@@ -0,0 +1,244 @@
+# eclipse-mcp-remote/timezones.py
+"""
+Zonas horarias offline: de coordenadas a zona IANA y de UTC a hora local
+
+La zona de unas coordenadas es la de la ciudad de referencia más cercana:
+las ciudades representativas de tzdata (`zone1970.tab` del sistema) más las
+del gazetteer, que traen su zona. En mar abierto, lejos de cualquier ciudad,
+se usa la zona náutica `Etc/GMT±N` de la longitud. Los desfases y las reglas
+de horario de verano salen de la tzdata del sistema (`zoneinfo`).
+
+Internamente los instantes son segundos Unix UTC (epoch). Todo se memoiza:
+la zona por coordenadas (redondeadas a 0.001°), el desfase por zona y tramo
+de 15 minutos (los cambios de hora caen siempre en un cuarto de hora UTC) y
+la conversión de las horas de reloj del catálogo curado, que son locales.
+"""
+
+import zoneinfo
+from datetime import date as date_type, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from besselian import EARTH_RADIUS_KM
+from ephemeris import EPHEM_UNIX_DAYS
+
+MAX_CITY_DISTANCE_KM = 1500.0  # Más lejos de cualquier ciudad: zona náutica por longitud
+MAX_CACHED_COORDINATES = 100000
+OFFSET_BUCKET_SECONDS = 900
+UNIX_ORDINAL = date_type(1970, 1, 1).toordinal()
+
+
+def ephem_to_epoch(times):
+    """Instantes ephem.Date (días desde 1899-12-31 12:00 UT) → segundos Unix UTC"""
+    return (np.asarray(times, dtype=float) - EPHEM_UNIX_DAYS) * 86400.0
+
+
+def _tab_coordinate(text: str, degree_digits: int) -> float:
+    """"+4030" / "-003415" (±GGMM[SS] o ±GGGMM[SS]) → grados decimales"""
+    sign = -1.0 if text[0] == "-" else 1.0
+    digits = text[1:]
+    degrees = int(digits[:degree_digits])
+    minutes = int(digits[degree_digits:degree_digits + 2])
+    seconds = int(digits[degree_digits + 2:] or 0)
+    return sign * (degrees + minutes / 60.0 + seconds / 3600.0)
+
+
+def tzdata_cities() -> List[Tuple[float, float, str]]:
+    """(latitud, longitud, zona) de las ciudades representativas de la tzdata del sistema ([] si no está)"""
+    for directory in zoneinfo.TZPATH:
+        for name in ("zone1970.tab", "zone.tab"):
+            path = Path(directory) / name
+            if not path.exists():
+                continue
+            cities = []
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("#") or not line.strip():
+                        continue
+                    fields = line.split("\t")
+                    coordinates, zone = fields[1], fields[2].strip()
+                    split = max(coordinates.rfind("+"), coordinates.rfind("-"))
+                    cities.append((_tab_coordinate(coordinates[:split], 2), _tab_coordinate(coordinates[split:], 3),
+                                   zone))
+            return cities
+    return []
+
+
+def _unit_vectors(latitude, longitude) -> np.ndarray:
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def nautical_zone(longitude: float) -> str:
+    """Zona náutica de una longitud (los nombres Etc/GMT llevan el signo invertido)"""
+    hours = int(round(longitude / 15.0))
+    hours = max(-12, min(12, hours))
+    return "Etc/GMT" if hours == 0 else f"Etc/GMT{-hours:+d}"
+
+
+class TimezoneIndex:
+    """Ciudades de referencia con su zona, para buscar la más cercana a unas coordenadas"""
+
+    def __init__(self, cities: Iterable[Tuple[float, float, str]]):
+        """
+        Args:
+            cities: (latitud, longitud, zona IANA) de cada ciudad
+        """
+        cities = [city for city in cities if city[2]]
+        self.zones: List[str] = [zone for _, _, zone in cities]
+        self._vectors = _unit_vectors(np.array([c[0] for c in cities]), np.array([c[1] for c in cities]))
+        self._min_cosine = np.cos(MAX_CITY_DISTANCE_KM / EARTH_RADIUS_KM)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def zones_at(self, latitude, longitude) -> List[str]:
+        """Zona de cada par de coordenadas (arrays de n), en una pasada vectorizada"""
+        latitude = np.atleast_1d(np.asarray(latitude, dtype=float))
+        longitude = np.atleast_1d(np.asarray(longitude, dtype=float))
+        cosines = _unit_vectors(latitude, longitude) @ self._vectors.T
+        nearest = cosines.argmax(axis=1)
+        near = cosines[np.arange(len(nearest)), nearest] >= self._min_cosine
+        return [self.zones[i] if ok else nautical_zone(lon)
+                for i, ok, lon in zip(nearest.tolist(), near.tolist(), longitude.tolist())]
+
+
+@lru_cache(maxsize=None)
+def get_timezone_index() -> TimezoneIndex:
+    """Índice del proceso: tzdata del sistema más las ciudades del gazetteer"""
+    from gazetteer import get_gazetteer
+    places = get_gazetteer().places
+    return TimezoneIndex(tzdata_cities() + [(p.latitude, p.longitude, p.timezone) for p in places])
+
+
+_zones: Dict[Tuple[float, float], str] = {}  # Coordenadas redondeadas → zona
+
+
+def timezones_at(latitude, longitude) -> List[str]:
+    """Zona de muchas coordenadas: las ya vistas salen de la caché y el resto en una sola búsqueda"""
+    keys = [(round(a, 3), round(o, 3)) for a, o in zip(np.atleast_1d(latitude).tolist(),
+                                                         np.atleast_1d(longitude).tolist())]
+    missing = [key for key in dict.fromkeys(keys) if key not in _zones]
+    if missing:
+        if len(_zones) + len(missing) > MAX_CACHED_COORDINATES:
+            _zones.clear()
+        _zones.update(zip(missing, get_timezone_index().zones_at([k[0] for k in missing], [k[1] for k in missing])))
+    return [_zones[key] for key in keys]
+
+
+def timezone_at(latitude: float, longitude: float) -> str:
+    """Zona IANA de unas coordenadas (memoizada por coordenadas redondeadas a 0.001°)"""
+    return timezones_at([latitude], [longitude])[0]
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> zoneinfo.ZoneInfo:
+    """ZoneInfo de un nombre; UTC si la tzdata del sistema no lo tiene"""
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return zoneinfo.ZoneInfo("UTC")
+
+
+@lru_cache(maxsize=16384)
+def _offset(zone: str, bucket: int) -> int:
+    return int(datetime.fromtimestamp(bucket * OFFSET_BUCKET_SECONDS, get_zone(zone)).utcoffset().total_seconds())
+
+
+def utc_offset(zone: str, epoch: float) -> int:
+    """Desfase (segundos) de una zona en un instante, memoizado por zona y cuarto de hora"""
+    return _offset(zone, int(epoch // OFFSET_BUCKET_SECONDS))
+
+
+@lru_cache(maxsize=256)
+def _format_offset(seconds: int) -> str:
+    sign = "-" if seconds < 0 else "+"
+    seconds = abs(seconds)
+    return f"{sign}{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+
+@lru_cache(maxsize=4096)
+def _date_string(day: int) -> str:
+    """Días desde 1970-01-01 → fecha ISO (YYYY-MM-DD)"""
+    return date_type.fromordinal(UNIX_ORDINAL + day).isoformat()
+
+
+def local_iso(epoch: Optional[float], zone: str) -> Optional[str]:
+    """Instante UTC → hora local ISO 8601 con desfase ("2024-04-08T12:17:21-06:00"); None si no hay instante"""
+    if epoch is None or epoch != epoch:
+        return None
+    epoch = int(epoch // 1)
+    offset = utc_offset(zone, epoch)
+    day, seconds = divmod(epoch + offset, 86400)
+    return (f"{_date_string(day)}T{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+            f"{_format_offset(offset)}")
+
+
+@lru_cache(maxsize=4096)
+def local_to_epoch(date: str, clock: str, zone: str) -> Optional[float]:
+    """Fecha y hora de reloj locales ("2024-04-08", "12:34:00") en una zona → segundos Unix UTC"""
+    try:
+        year, month, day = map(int, date.split("-"))
+        hour, minute, second = (list(map(int, clock.split(":"))) + [0, 0])[:3]
+    except (AttributeError, ValueError):
+        return None
+    return datetime(year, month, day, hour, minute, second, tzinfo=get_zone(zone)).timestamp()
+
+
+def record_epochs(date: str, record: Dict[str, Any], zone: str) -> Dict[str, Optional[float]]:
+    """
+    Instantes UTC (start, maximum, end) de un registro de ubicación
+
+    Los registros calculados traen sus instantes en "epochs". Las horas de los
+    registros curados son de reloj local en la fecha del eclipse; si una hora
+    es anterior a la de inicio, el eclipse ha cruzado la medianoche local.
+    """
+    if "epochs" in record:
+        return record["epochs"]
+    clock_zone = "UTC" if record.get("time_zone") == "UTC" else zone
+    epochs = {name: local_to_epoch(date, record[key], clock_zone) if record.get(key) else None
+              for name, key in (("start", "start_time"), ("maximum", "max_time"), ("end", "end_time"))}
+    start = epochs["start"]
+    for name in ("maximum", "end"):
+        if start is not None and epochs[name] is not None and epochs[name] < start:
+            epochs[name] += 86400.0
+    return epochs
+
+
+def format_duration(start: Optional[float], end: Optional[float]) -> str:
+    """Duración HH:MM entre dos instantes UTC ("N/A" si falta alguno)"""
+    if start is None or end is None:
+        return "N/A"
+    minutes = int(end - start) // 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def local_times(date: str, record: Dict[str, Any], zone: str) -> Dict[str, Any]:
+    """Inicio, máximo y fin de un registro de ubicación en hora local, con su duración"""
+    epochs = record_epochs(date, record, zone)
+    reference = next((e for e in epochs.values() if e is not None), None)
+    return {
+        "start": local_iso(epochs["start"], zone),
+        "maximum": local_iso(epochs["maximum"], zone),
+        "end": local_iso(epochs["end"], zone),
+        "duration": format_duration(epochs["start"], epochs["end"]),
+        "time_zone": zone,
+        "utc_offset": _format_offset(utc_offset(zone, reference)) if reference is not None else None,
+    }
+
+
+def utc_times(date: str, record: Dict[str, Any], zone: str) -> Dict[str, Optional[str]]:
+    """Inicio, máximo y fin de un registro de ubicación en UTC (ISO 8601), sea curado o calculado"""
+    epochs = record_epochs(date, record, zone)
+    return {name: local_iso(epochs[name], "UTC") for name in ("start", "maximum", "end")}
+
+
+def location_zone(gazetteer, name: str = None, latitude: float = None, longitude: float = None) -> str:
+    """Zona de una ubicación: la del gazetteer si el nombre resuelve, si no la de sus coordenadas (UTC sin datos)"""
+    if latitude is not None and longitude is not None:
+        return timezone_at(latitude, longitude)
+    match = gazetteer.resolve(name) if name else None
+    return match.place.timezone if match else "UTC"
@@ -0,0 +1,309 @@
+# eclipse-mcp-remote/tracing.py
+"""
+Trazas distribuidas ligeras para el chatbot y los servidores MCP.
+
+- Propagación: W3C Trace Context (llave/cabecera `traceparent`), tanto en el
+  `_meta` de las peticiones MCP como en las cabeceras HTTP del servidor remoto.
+- Exportación: archivo local en formato OTLP/JSON, una ExportTraceServiceRequest
+  por línea (compatible con el receptor `otlpjsonfile` de OpenTelemetry),
+  escrita por lotes desde un hilo de fondo. Al superar `MCP_TRACE_MAX_MB` el
+  archivo se renombra a `<archivo>.1` (sustituyendo al anterior) y se empieza
+  uno nuevo, así que el disco usado queda acotado a unas dos veces ese tamaño.
+
+Se comparte con los módulos de `chatbot/src` a través de `shared_modules.py`.
+"""
+
+import atexit
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+TRACEPARENT = "traceparent"
+TRACE_FILE = os.getenv("MCP_TRACE_FILE", "logs/traces.jsonl")
+TRACING_ENABLED = os.getenv("MCP_TRACING", "1") != "0"
+TRACE_MAX_BYTES = int(float(os.getenv("MCP_TRACE_MAX_MB", "64")) * 1024 * 1024)
+# Spans en espera de escritura y spans por línea exportada
+EXPORT_QUEUE_SIZE = 4096
+EXPORT_BATCH_SIZE = 512
+
+# Valores de SpanKind según OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class SpanContext:
+    """Identificadores de un span propagables entre procesos"""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, value: str) -> Optional["SpanContext"]:
+        """Parsear una cabecera `traceparent`; None si es inválida"""
+        try:
+            version, trace_id, span_id, flags = value.strip().split("-")
+            int(trace_id, 16), int(span_id, 16), int(flags, 16)
+        except (AttributeError, ValueError):
+            return None
+        if version == "ff" or len(trace_id) != 32 or len(span_id) != 16:
+            return None
+        if trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+class Span:
+    """Operación temporizada dentro de una traza"""
+
+    __slots__ = ("name", "context", "parent_span_id", "kind", "start_ns", "end_ns",
+                 "attributes", "error")
+
+    def __init__(self, name: str, context: SpanContext, parent_span_id: str = None,
+                 kind: int = SPAN_KIND_INTERNAL, attributes: Dict[str, Any] = None):
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.set_error(f"{type(exc).__name__}: {exc}")
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Representación OTLP/JSON del span"""
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class FileSpanExporter:
+    """
+    Escribe spans terminados como líneas OTLP/JSON en un archivo local
+
+    `export` sólo encola el span: un hilo de fondo vacía la cola por lotes
+    (una ExportTraceServiceRequest por lote, agrupada por servicio) y escribe
+    con una sola apertura del archivo, fuera de los handlers async. Con la
+    cola llena los spans se descartan y se cuentan en `dropped`. Lo pendiente
+    se escribe al salir del proceso o con `flush()`. El archivo rota por
+    tamaño: cuando una línea lo haría pasar de `max_bytes`, se renombra a
+    `<archivo>.1` antes de escribirla.
+    """
+
+    def __init__(self, path: str = TRACE_FILE, max_queue: int = EXPORT_QUEUE_SIZE,
+                 max_batch: int = EXPORT_BATCH_SIZE, max_bytes: int = TRACE_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rollover_path = self.path.with_name(self.path.name + ".1")
+        self.max_batch = max_batch
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(max_queue)
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span, service_name: str) -> None:
+        try:
+            self._queue.put_nowait((service_name, span))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Esperar a que se escriban los spans encolados; False si no dio tiempo"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return not self._queue.unfinished_tasks
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Escribir lo pendiente y parar el hilo"""
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            spans = [item for item in batch if item is not None]
+            try:
+                if spans:
+                    self._write(spans)
+            except OSError:
+                pass  # Las trazas nunca deben romper la petición
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, spans) -> None:
+        services: Dict[str, list] = {}
+        for service_name, span in spans:
+            services.setdefault(service_name, []).append(span.to_otlp())
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": "mcp-chatbot"}, "spans": otlp}],
+            } for service_name, otlp in services.items()]
+        }
+        line = json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._rotate(len(line.encode("utf-8")))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _rotate(self, incoming: int) -> None:
+        """Pasar el archivo actual a `<archivo>.1` si con `incoming` bytes más superaría `max_bytes`"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size and size + incoming > self.max_bytes:
+            # Otro proceso que comparta el archivo puede haberlo rotado ya: se ignora su ausencia
+            try:
+                os.replace(self.path, self.rollover_path)
+            except FileNotFoundError:
+                pass
+
+
+class Tracer:
+    """Crea spans anidados usando el contexto actual (contextvars)"""
+
+    def __init__(self, service_name: str, exporter: FileSpanExporter = None):
+        self.service_name = service_name
+        self.exporter = exporter
+
+    @contextmanager
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL,
+                   attributes: Dict[str, Any] = None, parent: SpanContext = None):
+        """
+        Abrir un span hijo del span actual (o de `parent` si viene de otro proceso)
+
+        Args:
+            name: Nombre de la operación
+            kind: SPAN_KIND_INTERNAL, SPAN_KIND_SERVER o SPAN_KIND_CLIENT
+            attributes: Atributos iniciales del span
+            parent: Contexto remoto extraído con `extract()`
+        """
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current else None
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        context = SpanContext(trace_id, secrets.token_hex(8), parent.sampled if parent else True)
+        span = Span(name, context, parent.span_id if parent else None, kind, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            if self.exporter and context.sampled:
+                self.exporter.export(span, self.service_name)
+
+
+def trace_environment() -> Dict[str, str]:
+    """Variables de entorno para que un servidor stdio hijo exporte al mismo archivo"""
+    return {
+        "MCP_TRACE_FILE": str(Path(TRACE_FILE).resolve()),
+        "MCP_TRACING": "1" if TRACING_ENABLED else "0",
+        "MCP_TRACE_MAX_MB": str(TRACE_MAX_BYTES / (1024 * 1024)),
+    }
+
+
+def current_span() -> Optional[Span]:
+    """Span activo en el contexto actual"""
+    return _current_span.get()
+
+
+def inject(carrier: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Agregar `traceparent` del span actual a un dict de metadatos o cabeceras"""
+    carrier = {} if carrier is None else carrier
+    span = _current_span.get()
+    if span is not None:
+        carrier[TRACEPARENT] = span.context.to_traceparent()
+    return carrier
+
+
+def extract(carrier: Optional[Dict[str, Any]]) -> Optional[SpanContext]:
+    """Leer el contexto remoto de un dict de metadatos o cabeceras"""
+    if not carrier:
+        return None
+    value = carrier.get(TRACEPARENT)
+    return SpanContext.from_traceparent(value) if value else None
+
+
+_tracers: Dict[str, Tracer] = {}
+_exporter: Optional[FileSpanExporter] = None
+
+
+def get_tracer(service_name: str) -> Tracer:
+    """Obtener (o crear) el tracer del servicio; todos comparten el exportador de archivo"""
+    global _exporter
+    tracer = _tracers.get(service_name)
+    if tracer is None:
+        if TRACING_ENABLED and _exporter is None:
+            _exporter = FileSpanExporter(TRACE_FILE)
+        tracer = Tracer(service_name, _exporter if TRACING_ENABLED else None)
+        _tracers[service_name] = tracer
+    return tracer
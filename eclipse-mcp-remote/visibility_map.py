@@ -0,0 +1,246 @@
+# eclipse-mcp-remote/visibility_map.py
+"""
+Mapas ráster de oscurecimiento máximo con caché de teselas en memmap
+
+Para cada eclipse solar y resolución existe un ráster global (celdas de
+`resolution` grados, de sur a norte y de oeste a este) guardado como array
+memory-mapped en `ECLIPSE_MAP_CACHE`, junto a un mapa de bits de teselas ya
+calculadas. Una petición de región calcula sólo las teselas que le faltan,
+repartidas entre procesos, y el resto se lee del memmap: las peticiones
+repetidas o solapadas no recalculan nada.
+
+El valor de cada celda es el oscurecimiento en el máximo local (0 si el
+eclipse no es visible desde allí), calculado con `besselian.local_circumstances`.
+"""
+
+import base64
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from besselian import besselian_elements, local_circumstances
+
+MAP_CACHE_DIR = os.getenv("ECLIPSE_MAP_CACHE", str(Path(tempfile.gettempdir()) / "eclipse-map-cache"))
+MAP_WORKERS = int(os.getenv("ECLIPSE_MAP_WORKERS", str(os.cpu_count() or 1)))
+MAX_MAP_CELLS = int(os.getenv("ECLIPSE_MAP_MAX_CELLS", "1000000"))
+TILE_CELLS = 64  # Teselas de 64×64 celdas
+MIN_RESOLUTION, MAX_RESOLUTION = 0.05, 5.0
+PARALLEL_MIN_TILES = 4  # Con menos teselas pendientes se calcula en el propio proceso
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_maps: Dict[Tuple[str, float, str], "VisibilityMap"] = {}
+_maps_lock = threading.Lock()
+
+
+def snap_resolution(resolution: float) -> float:
+    """Ajustar la resolución a un divisor exacto de 180° para que la rejilla global sea regular"""
+    resolution = min(max(float(resolution), MIN_RESOLUTION), MAX_RESOLUTION)
+    return 180.0 / round(180.0 / resolution)
+
+
+def compute_tile(date: str, resolution: float, row0: int, col0: int, rows: int, cols: int) -> np.ndarray:
+    """Oscurecimiento máximo de una tesela (se ejecuta en los procesos del pool)"""
+    elements = besselian_elements(date)
+    lats = -90.0 + (row0 + np.arange(rows) + 0.5) * resolution
+    lons = -180.0 + (col0 + np.arange(cols) + 0.5) * resolution
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    c = local_circumstances(elements, lat_grid.ravel(), lon_grid.ravel())
+    values = np.where(c["visible"], c["obscuration"], 0.0)
+    return values.reshape(rows, cols).astype(np.float32)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Pool de procesos compartido (spawn: seguro aunque el servidor tenga hilos)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=MAP_WORKERS, mp_context=get_context("spawn"))
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+class VisibilityMap:
+    """Ráster global de un eclipse a una resolución, persistido como memmap y calculado por teselas"""
+
+    def __init__(self, date: str, resolution: float, cache_dir: str = MAP_CACHE_DIR):
+        self.date = date
+        self.resolution = snap_resolution(resolution)
+        self.rows = int(round(180.0 / self.resolution))
+        self.cols = 2 * self.rows
+        self.tile_rows = -(-self.rows // TILE_CELLS)
+        self.tile_cols = -(-self.cols // TILE_CELLS)
+        # El cerrojo sólo protege el registro de teselas en cálculo: cada tesela la calcula
+        # un único hilo y los que la necesitan esperan a su evento, no a todo el mapa
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[int, int], threading.Event] = {}
+
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        stem = Path(cache_dir) / f"{date}_{self.rows}x{self.cols}"
+        self.data_path = stem.with_suffix(".f32")
+        self.tiles_path = stem.with_suffix(".tiles")
+        # Crear los archivos de una vez (tamaño fijo); después siempre se abren en r+
+        if not self.tiles_path.exists() or not self.data_path.exists():
+            np.memmap(self.data_path, dtype=np.float32, mode="w+", shape=(self.rows, self.cols)).flush()
+            np.memmap(self.tiles_path, dtype=np.uint8, mode="w+", shape=(self.tile_rows, self.tile_cols)).flush()
+        self.data = np.memmap(self.data_path, dtype=np.float32, mode="r+", shape=(self.rows, self.cols))
+        self.tiles = np.memmap(self.tiles_path, dtype=np.uint8, mode="r+", shape=(self.tile_rows, self.tile_cols))
+
+    def _tile_bounds(self, tile_row: int, tile_col: int) -> Tuple[int, int, int, int]:
+        row0, col0 = tile_row * TILE_CELLS, tile_col * TILE_CELLS
+        return row0, col0, min(TILE_CELLS, self.rows - row0), min(TILE_CELLS, self.cols - col0)
+
+    def ensure(self, row_index: np.ndarray, col_index: np.ndarray) -> Tuple[int, int]:
+        """
+        Calcular las teselas que cubren las filas/columnas pedidas y aún no están en caché
+
+        Returns:
+            (teselas calculadas, teselas servidas desde la caché)
+        """
+        tile_rows = np.unique(row_index // TILE_CELLS)
+        tile_cols = np.unique(col_index // TILE_CELLS)
+        wanted = [(r, c) for r in tile_rows.tolist() for c in tile_cols.tolist()]
+        computed = 0
+        while True:
+            # Reservar las teselas que faltan y nadie calcula; anotar las que calcula otro hilo
+            with self._lock:
+                missing = [(r, c) for r, c in wanted if not self.tiles[r, c]]
+                claimed = [tile for tile in missing if tile not in self._pending]
+                waiting = [self._pending[tile] for tile in missing if tile in self._pending]
+                for tile in claimed:
+                    self._pending[tile] = threading.Event()
+            if not missing:
+                return computed, len(wanted) - computed
+            if claimed:
+                try:
+                    self._compute(claimed)
+                    computed += len(claimed)
+                finally:
+                    with self._lock:
+                        for tile in claimed:
+                            self._pending.pop(tile).set()
+            for event in waiting:
+                event.wait()
+            # Si el otro hilo falló, sus teselas siguen sin marcar y se reservan en la siguiente vuelta
+
+    def _compute(self, tiles: List[Tuple[int, int]]) -> None:
+        """Calcular y guardar teselas (sin el cerrojo: otras regiones se calculan a la vez)"""
+        jobs = [(self.date, self.resolution, *self._tile_bounds(r, c)) for r, c in tiles]
+        if len(tiles) >= PARALLEL_MIN_TILES and MAP_WORKERS > 1:
+            results = get_executor().map(compute_tile, *zip(*jobs))
+        else:
+            results = (compute_tile(*job) for job in jobs)
+        for (r, c), values in zip(tiles, results):
+            row0, col0, rows, cols = self._tile_bounds(r, c)
+            self.data[row0:row0 + rows, col0:col0 + cols] = values
+        self.data.flush()
+        # Marcar las teselas sólo después de escribir sus datos
+        for r, c in tiles:
+            self.tiles[r, c] = 1
+        self.tiles.flush()
+
+    def indices(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Filas y columnas de la región (lon_min > lon_max cruza el antimeridiano)"""
+        res = self.resolution
+        r0 = int(np.clip(np.floor((lat_min + 90.0) / res), 0, self.rows - 1))
+        r1 = int(np.clip(np.ceil((lat_max + 90.0) / res), r0 + 1, self.rows))
+        c0 = int(np.clip(np.floor((lon_min + 180.0) / res), 0, self.cols - 1))
+        c1 = int(np.clip(np.ceil((lon_max + 180.0) / res), 0, self.cols))
+        rows = np.arange(r0, r1)
+        cols = np.arange(c0, c1) if c1 > c0 else np.r_[np.arange(c0, self.cols), np.arange(0, c1)]
+        return rows, cols
+
+    def region(self, lat_min: float = -90.0, lat_max: float = 90.0, lon_min: float = -180.0,
+               lon_max: float = 180.0) -> Dict[str, Any]:
+        """Ráster de una región (calculando lo que falte) con sus coordenadas y estadísticas"""
+        rows, cols = self.indices(lat_min, lat_max, lon_min, lon_max)
+        start = time.perf_counter()
+        computed, cached = self.ensure(rows, cols)
+        values = np.asarray(self.data[rows[0]:rows[-1] + 1][:, cols])
+        return {
+            "values": values,
+            "lat_start": float(-90.0 + (rows[0] + 0.5) * self.resolution),
+            "lon_start": float(-180.0 + (cols[0] + 0.5) * self.resolution),
+            "tiles_computed": computed,
+            "tiles_cached": cached,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+
+def get_map(date: str, resolution: float, cache_dir: str = MAP_CACHE_DIR) -> VisibilityMap:
+    """Mapa del proceso para (eclipse, resolución): los memmaps se abren una sola vez"""
+    key = (date, snap_resolution(resolution), cache_dir)
+    with _maps_lock:
+        if key not in _maps:
+            _maps[key] = VisibilityMap(date, resolution, cache_dir)
+        return _maps[key]
+
+
+def _summary(values: np.ndarray, lat_start: float, lon_start: float, resolution: float) -> Dict[str, Any]:
+    total = values.size
+    peak = np.unravel_index(int(np.argmax(values)), values.shape)
+    return {
+        "max_obscuration": round(float(values[peak]), 3),
+        "max_at": {"latitude": round(float(lat_start + peak[0] * resolution), 3),
+                   "longitude": round(float((lon_start + peak[1] * resolution + 180.0) % 360.0 - 180.0), 3)},
+        "fraction_eclipsed": round(float(np.count_nonzero(values > 0)) / total, 4),
+        "fraction_over_50": round(float(np.count_nonzero(values >= 0.5)) / total, 4),
+        "fraction_over_90": round(float(np.count_nonzero(values >= 0.9)) / total, 4),
+    }
+
+
+def visibility_map(date: str, resolution: float = 1.0, lat_min: float = -90.0, lat_max: float = 90.0,
+                   lon_min: float = -180.0, lon_max: float = 180.0, include_raster: bool = True,
+                   cache_dir: str = MAP_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Mapa de oscurecimiento máximo de un eclipse solar para una región
+
+    Returns:
+        Dict con la rejilla (resolution, lat_start, lon_start, shape: filas sur→norte,
+        columnas oeste→este), un resumen y, con `include_raster`, el ráster como
+        porcentajes uint8 en base64 (fila a fila)
+    """
+    if besselian_elements(date) is None:
+        return {"error": f"No hay un eclipse solar calculable para {date}"}
+    if not (-90.0 <= lat_min < lat_max <= 90.0):
+        return {"error": "Se requiere -90 <= lat_min < lat_max <= 90"}
+    if lon_min == lon_max:
+        return {"error": "Se requiere lon_min != lon_max (con lon_min > lon_max la región cruza el antimeridiano)"}
+    vmap = get_map(date, resolution, cache_dir)
+    rows, cols = vmap.indices(lat_min, lat_max, lon_min, lon_max)
+    if rows.size * cols.size > MAX_MAP_CELLS:
+        return {"error": f"La región tiene {rows.size * cols.size} celdas; el máximo es {MAX_MAP_CELLS}. "
+                         f"Reduce la región o aumenta la resolución"}
+
+    region = vmap.region(lat_min, lat_max, lon_min, lon_max)
+    values = region["values"]
+    result = {
+        "date": date,
+        "resolution": vmap.resolution,
+        "lat_start": round(region["lat_start"], 6),
+        "lon_start": round(region["lon_start"], 6),
+        "shape": list(values.shape),
+        "summary": _summary(values, region["lat_start"], region["lon_start"], vmap.resolution),
+        "cache": {key: region[key] for key in ("tiles_computed", "tiles_cached", "elapsed_ms")},
+    }
+    if include_raster:
+        percent = np.round(values * 100).astype(np.uint8)
+        result["raster"] = {
+            "encoding": "uint8 percent, row-major (south to north, west to east), base64",
+            "data": base64.b64encode(percent.tobytes()).decode("ascii"),
+        }
+    return result